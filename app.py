@@ -1,9 +1,11 @@
 import streamlit as st
 import time
 from datetime import date, datetime
-from database.db_manager import DatabaseManager
+from database.db_manager import get_db_manager
 from utils.auth import generate_parent_code, validate_parent_code
 from utils.menu import hide_sidebar_navigation
+from styles.registry import inject_global_styles, inject_page_styles, stylesheet
+from utils import profiler as prof
 from services.oauth_service import OAuthService
 import re
 
@@ -45,8 +47,8 @@ st.set_page_config(
 # ===== 전역 리디자인 CSS (로그인 화면 포함) =====
 # - utils/menu.py의 전역 토큰과 톤을 맞춥니다.
 # - f-string 금지(CSS의 { } 충돌 방지)
-st.markdown(
-    """
+# - 세션당 1번만 <head> 에 주입(styles/registry.py)
+_APP_GLOBAL_CSS = """
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Pretendard:wght@300;400;500;600;700;800;900&display=swap');
     :root {
@@ -86,9 +88,10 @@ st.markdown(
         border: 1px solid var(--amf-border) !important;
     }
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+    """
+prof.start_page("app")
+prof.mark("styles", "render")
+inject_global_styles("app", stylesheet("app.global", _APP_GLOBAL_CSS))
 
 # 세션 상태 초기화
 if 'logged_in' not in st.session_state:
@@ -136,7 +139,7 @@ if 'show_signup' not in st.session_state:
 if 'current_auth_screen' not in st.session_state:
     st.session_state.current_auth_screen = 'login'  # 'login', 'signup', 'find_username', 'find_password'
 
-db = DatabaseManager()
+db = get_db_manager()
 
 def handle_oauth_callback():
     """
@@ -2258,7 +2261,7 @@ def parent_dashboard(user_name):
         if not found:
             monthly_savings.append(0)
 
-    st.markdown("""
+    inject_page_styles(stylesheet("app.parent_home", """
     <style>
     /* 부모 홈 전용 스타일 */
     .main { background-color: #f0f2f6 !important; }
@@ -2318,7 +2321,7 @@ def parent_dashboard(user_name):
         color: #6366f1;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """))
 
     today_str = datetime.now().strftime("%Y.%m.%d")
     st.markdown(
@@ -2447,7 +2450,7 @@ def parent_dashboard(user_name):
 
 def child_dashboard(user_name):
     """아이용 홈 - Style A (친근하고 귀여운 카드형)"""
-    st.markdown("""
+    inject_page_styles(stylesheet("app.child_home", """
     <style>
     /* 아이 홈 전용 스타일 */
     .main { background-color: #fcfdfe !important; }
@@ -2472,7 +2475,7 @@ def child_dashboard(user_name):
     .card-mascot { position: absolute; right: 15px; bottom: 10px; font-size: 60px; opacity: 0.9; }
     @media (max-width: 768px) { .dashboard-header { flex-direction: column; text-align: center; } }
     </style>
-    """, unsafe_allow_html=True)
+    """))
 
     # NOTE: 호칭(“~아/야”)은 어색하다는 피드백이 있어 제거하고 중립 문구로 표시
     st.markdown(
@@ -2514,9 +2517,13 @@ def child_dashboard(user_name):
 
 # 메인 로직
 # OAuth 콜백 처리
+prof.mark("oauth", "compute")
 handle_oauth_callback()
 
 if st.session_state.get("logged_in", False):
+    prof.mark("main_page", "render")
     main_page()
 else:
+    prof.mark("login_page", "render")
     login_page()
+prof.render_footer()
@@ -0,0 +1,6 @@
+"""
+성능 벤치마크(가상 가족 데이터 + DB 핫 경로 측정).
+
+- benchmarks.synthetic: 규모별 가상 데이터 생성(Scale, SCALES, build_dataset)
+- benchmarks.run: 측정 CLI(JSON 출력, --compare 로 커밋 간 비교)
+"""
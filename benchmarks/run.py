@@ -0,0 +1,275 @@
+"""
+핫 경로 벤치마크 CLI
+
+규모별로 임시 DB 에 가상 가족 데이터를 만들고, 자주 불리는 DatabaseManager 경로의
+소요 시간(ms)을 반복 측정해서 JSON 으로 저장합니다. 커밋 간 결과 비교도 지원합니다.
+
+사용 예:
+    python -m benchmarks.run --scales small medium --out bench_before.json
+    python -m benchmarks.run --scales small --cases get_xp get_balance -n 200
+    python -m benchmarks.run --compare bench_before.json bench_after.json --threshold 1.2
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.synthetic import SCALES, Scale, build_dataset
+from database.db_manager import DatabaseManager
+
+
+# 케이스: name → (설명, (db, info, rng) 를 받아 (측정할 함수, 준비 함수 | None) 반환)
+CaseFactory = Callable[[DatabaseManager, Dict, random.Random], Tuple[Callable[[], object], Optional[Callable[[], None]]]]
+
+
+def _case_get_xp(db, info, rng):
+    return (lambda: db.get_xp(rng.choice(info["children"]))), None
+
+
+def _case_get_balance(db, info, rng):
+    return (lambda: db.get_balance(rng.choice(info["children"]))), None
+
+
+def _case_challenge_progress(db, info, rng):
+    insts = [i for c in info["children"][:50] for i in db.get_challenge_instances(c, status="active")]
+    return (lambda: db.compute_challenge_progress(rng.choice(insts))), None
+
+
+def _case_challenge_progress_bulk(db, info, rng):
+    return (lambda: db.compute_progress_bulk(rng.choice(info["children"]))), None
+
+
+def _case_family_summary(db, info, rng):
+    return (lambda: db.get_family_summary(rng.choice(info["parent_codes"]))), None
+
+
+def _case_monthly_savings(db, info, rng):
+    return (lambda: db.get_children_monthly_savings(rng.choice(info["parent_codes"]))), None
+
+
+def _case_growth_daily(db, info, rng):
+    def run():
+        uid = rng.choice(info["children"])
+        return db.get_behavior_daily(uid, days=90), db.get_emotion_daily(uid, days=90)
+
+    return run, None
+
+
+def _case_habit_counts(db, info, rng):
+    return (lambda: db.get_habit_counts(parent_code=rng.choice(info["parent_codes"]))), None
+
+
+def _case_emotion_logs(db, info, rng):
+    return (lambda: db.get_family_emotion_logs(rng.choice(info["parent_codes"]))), None
+
+
+def _case_messages_page(db, info, rng):
+    return (lambda: db.get_messages_page(rng.choice(info["conversations"]))), None
+
+
+def _case_recurring(db, info, rng):
+    # 매 회차 전에 모든 정기 용돈을 '어제 지급 예정'으로 되돌림(측정에서 제외)
+    def _reset():
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        with db.connection() as conn:
+            conn.execute("UPDATE recurring_allowances SET next_run = ?", (yesterday,))
+            conn.execute("DELETE FROM job_runs WHERE job = 'recurring_allowance'")
+            conn.commit()
+
+    return (lambda: db.run_due_recurring_allowances(limit=1000)), _reset
+
+
+CASES: Dict[str, Tuple[str, CaseFactory]] = {
+    "get_xp": ("XP 조회(자녀 1명)", _case_get_xp),
+    "get_balance": ("지갑 잔액(자녀 1명)", _case_get_balance),
+    "compute_challenge_progress": ("챌린지 진행도(1개)", _case_challenge_progress),
+    "compute_progress_bulk": ("챌린지 진행도(자녀의 진행 중 전체)", _case_challenge_progress_bulk),
+    "get_family_summary": ("부모 리포트 가족 집계(이번 달)", _case_family_summary),
+    "get_children_monthly_savings": ("최근 6개월 월별 저축", _case_monthly_savings),
+    "growth_daily_90d": ("내 성장 차트 90일(일별 롤업)", _case_growth_daily),
+    "get_habit_counts": ("습관 점수 집계(가족)", _case_habit_counts),
+    "get_family_emotion_logs": ("가족 감정 기록", _case_emotion_logs),
+    "get_messages_page": ("대화 메시지 한 페이지", _case_messages_page),
+    "run_due_recurring_allowances": ("정기 용돈 일괄 지급(전체)", _case_recurring),
+}
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def time_case(fn: Callable[[], object], setup: Optional[Callable[[], None]], n: int, warmup: int) -> Dict:
+    """n 회 측정(준비 함수 시간은 제외). return: ms 단위 통계"""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples: List[float] = []
+    for _ in range(n):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "n": n,
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(_percentile(samples, 0.5), 4),
+        "p95_ms": round(_percentile(samples, 0.95), 4),
+        "max_ms": round(samples[-1], 4),
+        "mean_ms": round(mean, 4),
+        "ops_per_sec": round(1000.0 / mean, 1) if mean > 0 else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_benchmarks(
+    scales: List[Scale],
+    cases: List[str],
+    n: int = 50,
+    warmup: int = 3,
+    seed: int = 42,
+    workdir: Optional[str] = None,
+    keep_db: bool = False,
+) -> Dict:
+    """규모별 데이터 생성 → 케이스 측정. return: JSON 으로 저장할 dict"""
+    result: Dict = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": seed,
+            "n": n,
+            "warmup": warmup,
+        },
+        "datasets": {},
+        "results": [],
+    }
+    tmp = workdir or tempfile.mkdtemp(prefix="amf_bench_")
+    for scale in scales:
+        db_path = os.path.join(tmp, f"bench_{scale.name}.db")
+        print(f"[bench] {scale.name}: 데이터 생성 중...", file=sys.stderr)
+        db, info = build_dataset(db_path, scale, seed=seed)
+        result["datasets"][scale.name] = {
+            "scale": info["scale"],
+            "counts": info["counts"],
+            "generate_sec": info["generate_sec"],
+            "db_bytes": info["db_bytes"],
+        }
+        print(f"[bench] {scale.name}: {info['counts']} ({info['generate_sec']}s)", file=sys.stderr)
+        for name in cases:
+            label, factory = CASES[name]
+            rng = random.Random(seed)
+            fn, setup = factory(db, info, rng)
+            stats = time_case(fn, setup, n=n, warmup=warmup)
+            result["results"].append({"scale": scale.name, "case": name, "label": label, **stats})
+            print(f"[bench] {scale.name:<7} {name:<30} median {stats['median_ms']:>9.3f} ms  p95 {stats['p95_ms']:>9.3f} ms", file=sys.stderr)
+        if not keep_db:
+            db._pool.close_all()
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(db_path + suffix)
+                except FileNotFoundError:
+                    pass
+    return result
+
+
+def compare(base: Dict, head: Dict, threshold: float = 1.2) -> Tuple[List[Dict], bool]:
+    """median 기준 비교. return: (행 목록, threshold 배 이상 느려진 케이스가 있는지)"""
+    before = {(r["scale"], r["case"]): r for r in base.get("results", [])}
+    rows, regressed = [], False
+    for r in head.get("results", []):
+        b = before.get((r["scale"], r["case"]))
+        if not b:
+            continue
+        ratio = (r["median_ms"] / b["median_ms"]) if b["median_ms"] else None
+        slow = ratio is not None and ratio >= threshold
+        regressed = regressed or slow
+        rows.append({
+            "scale": r["scale"],
+            "case": r["case"],
+            "base_ms": b["median_ms"],
+            "head_ms": r["median_ms"],
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "regressed": slow,
+        })
+    return rows, regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="DB 핫 경로 벤치마크")
+    parser.add_argument("--scales", nargs="+", default=["small"], choices=sorted(SCALES), help="데이터 규모")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES), help="측정할 케이스")
+    parser.add_argument("-n", type=int, default=50, help="케이스별 측정 횟수")
+    parser.add_argument("--warmup", type=int, default=3, help="측정 전 예열 횟수")
+    parser.add_argument("--seed", type=int, default=42, help="데이터 생성 시드")
+    parser.add_argument("--workdir", default=None, help="임시 DB 폴더(기본: 시스템 임시 폴더)")
+    parser.add_argument("--keep-db", action="store_true", help="측정 후 DB 파일을 지우지 않음")
+    parser.add_argument("--out", default=None, help="결과 JSON 경로(없으면 표준출력)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="두 결과 JSON 비교")
+    parser.add_argument("--threshold", type=float, default=1.2, help="회귀로 볼 median 배율(기본 1.2)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            head = json.load(f)
+        rows, regressed = compare(base, head, threshold=args.threshold)
+        print(f"base={base['meta'].get('commit')} head={head['meta'].get('commit')}")
+        for r in rows:
+            mark = "[SLOW]" if r["regressed"] else "      "
+            print(f"{mark} {r['scale']:<7} {r['case']:<30} {r['base_ms']:>9.3f} → {r['head_ms']:>9.3f} ms  x{r['ratio']}")
+        return 1 if regressed else 0
+
+    result = run_benchmarks(
+        [SCALES[s] for s in args.scales],
+        args.cases,
+        n=args.n,
+        warmup=args.warmup,
+        seed=args.seed,
+        workdir=args.workdir,
+        keep_db=args.keep_db,
+    )
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"[OK] {args.out}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
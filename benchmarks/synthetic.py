@@ -0,0 +1,281 @@
+"""
+벤치마크용 가상 가족 데이터 생성기
+
+DatabaseManager 로 임시 SQLite 파일을 만들고(스키마 + 마이그레이션 그대로),
+부모/자녀와 수년치 behaviors, 감정 기록, 미션, 챌린지, 대화 메시지를 채웁니다.
+- 행 수가 많아서 DatabaseManager 의 풀 커넥션으로 executemany 일괄 INSERT
+  (지갑 원장/XP 카운터는 트리거가 함께 갱신하므로 앱에서 쌓인 데이터와 같은 상태)
+- 같은 seed + Scale 이면 같은 데이터(커밋 간 비교용)
+
+사용 예:
+    db, info = build_dataset("/tmp/bench.db", SCALES["small"])
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import bcrypt
+
+from database.db_manager import DatabaseManager
+
+
+# create_user 의 bcrypt(기본 12 rounds)는 사용자당 수백 ms 라서,
+# 가벼운 해시 하나를 모든 가상 사용자에 사용(비밀번호: "bench1234")
+PASSWORD = "bench1234"
+_PASSWORD_HASH = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+BEHAVIOR_MIX = (
+    # (behavior_type, 비중, 금액 범위, 카테고리 후보)
+    ("allowance", 0.08, (3000, 10000), ("용돈",)),
+    ("saving", 0.30, (500, 5000), ("저금통", "목표저축")),
+    ("planned_spending", 0.27, (500, 8000), ("간식", "학용품", "장난감", "교통")),
+    ("impulse_buying", 0.12, (500, 6000), ("간식", "장난감", "게임")),
+    ("comparing_prices", 0.13, None, (None,)),
+    ("delayed_gratification", 0.10, None, (None,)),
+)
+EMOTIONS = ("excited", "happy", "neutral", "worried", "angry")
+EMOTION_CONTEXTS = ("pre_spend", "post_spend", "daily")
+CHALLENGES = (
+    ("이번 주 지출 1만원 이하", "spend_cap", {"cap_amount": 10000}),
+    ("간식 줄이기", "reduce_category", {"category": "간식", "baseline_amount": 8000, "reduction_pct": 20}),
+    ("매일 500원 저축", "daily_save_fixed", {"daily_amount": 500}),
+    ("100원씩 늘려 저축", "daily_save_increasing", {"start_amount": 500, "daily_increment": 100}),
+    ("가격 비교 7번", "habit_custom", {"target_count": 7}),
+)
+CHAT_LINES = (
+    ("user", "저축은 왜 해야 해?"),
+    ("assistant", "저축하면 나중에 더 큰 꿈을 이룰 수 있어요!"),
+    ("user", "용돈을 어떻게 나눠 쓰면 좋아?"),
+    ("assistant", "쓰기, 모으기, 나누기로 나눠보면 좋아요."),
+)
+
+
+@dataclass(frozen=True)
+class Scale:
+    """데이터 규모(자녀 1명 기준 하루 평균 건수)"""
+    name: str
+    families: int
+    children_per_family: int
+    days: int
+    behaviors_per_day: float = 3.0
+    emotions_per_day: float = 1.0
+    missions_per_day: int = 3
+    mission_completion: float = 0.6
+    challenges_per_child: int = 3
+    chat_days_ratio: float = 0.3
+    messages_per_chat: int = 6
+    recurring_per_child: int = 1
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale("small", families=5, children_per_family=2, days=90),
+    "medium": Scale("medium", families=40, children_per_family=2, days=365),
+    "large": Scale("large", families=150, children_per_family=3, days=730),
+}
+
+
+def _ts(day: date, rng: random.Random) -> str:
+    return f"{day.isoformat()} {rng.randint(7, 21):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # 작은 평균에서만 쓰므로 단순 곱셈법으로 충분
+    if mean <= 0:
+        return 0
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def _pick_behavior(rng: random.Random) -> Tuple[str, Optional[float], Optional[str]]:
+    r, acc = rng.random(), 0.0
+    for btype, weight, amount_range, cats in BEHAVIOR_MIX:
+        acc += weight
+        if r <= acc:
+            break
+    amount = float(rng.randrange(amount_range[0], amount_range[1] + 1, 100)) if amount_range else None
+    return btype, amount, rng.choice(cats)
+
+
+def generate(db: DatabaseManager, scale: Scale, seed: int = 42, today: Optional[date] = None) -> Dict:
+    """
+    가족 데이터 생성. return: {"parents": [...], "children": [...], "parent_codes": [...],
+    "challenge_instances": [...], "conversations": [...], "counts": {...}, "generate_sec": float}
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    first_day = today - timedelta(days=scale.days - 1)
+    t0 = time.perf_counter()
+    db.seed_default_missions_and_badges()
+
+    out: Dict = {"parents": [], "children": [], "parent_codes": [], "challenge_instances": [], "conversations": []}
+    counts = {k: 0 for k in ("users", "behaviors", "emotion_logs", "mission_assignments", "challenge_instances",
+                             "challenge_checkins", "conversations", "messages", "recurring_allowances")}
+
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        conn.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT id FROM mission_templates WHERE parent_code IS NULL AND is_active = 1 ORDER BY id")
+        mission_ids = [int(r["id"]) for r in cursor.fetchall()]
+
+        template_ids = []
+        for title, ctype, params in CHALLENGES:
+            cursor.execute(
+                """
+                INSERT INTO challenge_templates (parent_code, title, challenge_type, params_json, reward_amount, reward_coins, is_active)
+                VALUES (NULL, ?, ?, ?, 1000, 10, 1)
+                """,
+                (title, ctype, json.dumps(params, ensure_ascii=False)),
+            )
+            template_ids.append(int(cursor.lastrowid))
+
+        for f in range(scale.families):
+            code = f"BENCH{seed:03d}{f:05d}"
+            cursor.execute(
+                """
+                INSERT INTO users (username, password_hash, name, age, parent_code, user_type, coins, last_reward_level)
+                VALUES (?, ?, ?, 40, ?, 'parent', 0, 0)
+                """,
+                (f"bench_parent_{seed}_{f}", _PASSWORD_HASH, f"부모{f}", code),
+            )
+            parent_id = int(cursor.lastrowid)
+            out["parents"].append(parent_id)
+            out["parent_codes"].append(code)
+            counts["users"] += 1
+
+            for c in range(scale.children_per_family):
+                cursor.execute(
+                    """
+                    INSERT INTO users (username, password_hash, name, age, parent_code, user_type, parent_id, coins, last_reward_level)
+                    VALUES (?, ?, ?, ?, ?, 'child', ?, 0, 0)
+                    """,
+                    (f"bench_child_{seed}_{f}_{c}", _PASSWORD_HASH, f"아이{f}-{c}", rng.randint(7, 13), code, parent_id),
+                )
+                child_id = int(cursor.lastrowid)
+                out["children"].append(child_id)
+                counts["users"] += 1
+                _fill_child(cursor, rng, scale, child_id, parent_id, first_day, today, mission_ids, template_ids, out, counts)
+        conn.commit()
+
+    out["counts"] = counts
+    out["generate_sec"] = round(time.perf_counter() - t0, 3)
+    return out
+
+
+def _fill_child(cursor, rng, scale, child_id, parent_id, first_day, today, mission_ids, template_ids, out, counts) -> None:
+    behaviors: List[Tuple] = []
+    emotions: List[Tuple] = []
+    missions: List[Tuple] = []
+    for i in range(scale.days):
+        day = first_day + timedelta(days=i)
+        for _ in range(_poisson(rng, scale.behaviors_per_day)):
+            btype, amount, cat = _pick_behavior(rng)
+            behaviors.append((child_id, btype, amount, cat, None, _ts(day, rng)))
+        for _ in range(_poisson(rng, scale.emotions_per_day)):
+            emotions.append((child_id, rng.choice(EMOTION_CONTEXTS), rng.choice(EMOTIONS), None, _ts(day, rng)))
+        for tid in rng.sample(mission_ids, min(scale.missions_per_day, len(mission_ids))):
+            done = rng.random() < scale.mission_completion
+            missions.append((
+                child_id, tid, day.isoformat(),
+                "completed" if done else "active",
+                _ts(day, rng) if done else None,
+            ))
+
+    cursor.executemany(
+        "INSERT INTO behaviors (user_id, behavior_type, amount, category, description, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+        behaviors,
+    )
+    cursor.executemany(
+        "INSERT INTO emotion_logs (user_id, context, emotion, note, created_at) VALUES (?, ?, ?, ?, ?)",
+        emotions,
+    )
+    cursor.executemany(
+        """
+        INSERT INTO mission_assignments (user_id, template_id, cycle, assigned_date, status, completed_at)
+        VALUES (?, ?, 'daily', ?, ?, ?)
+        """,
+        missions,
+    )
+    counts["behaviors"] += len(behaviors)
+    counts["emotion_logs"] += len(emotions)
+    counts["mission_assignments"] += len(missions)
+
+    # 진행 중 챌린지(최근 2주 시작) + 체크인
+    for k in range(scale.challenges_per_child):
+        tid = template_ids[(child_id + k) % len(template_ids)]
+        start = today - timedelta(days=rng.randint(0, 13))
+        end = start + timedelta(days=13)
+        cursor.execute(
+            "INSERT INTO challenge_instances (user_id, template_id, start_date, end_date, status) VALUES (?, ?, ?, ?, 'active')",
+            (child_id, tid, start.isoformat(), end.isoformat()),
+        )
+        iid = int(cursor.lastrowid)
+        out["challenge_instances"].append(iid)
+        counts["challenge_instances"] += 1
+        checkins = [
+            (iid, (start + timedelta(days=d)).isoformat(), 1.0)
+            for d in range((today - start).days + 1)
+            if rng.random() < 0.7
+        ]
+        cursor.executemany(
+            "INSERT OR IGNORE INTO challenge_checkins (instance_id, checkin_date, value) VALUES (?, ?, ?)",
+            checkins,
+        )
+        counts["challenge_checkins"] += len(checkins)
+
+    # AI 친구 대화(일부 날짜에 하루 1개)
+    for i in range(scale.days):
+        if rng.random() >= scale.chat_days_ratio:
+            continue
+        day = first_day + timedelta(days=i)
+        ts = [_ts(day, rng) for _ in range(scale.messages_per_chat)]
+        ts.sort()
+        cursor.execute(
+            """
+            INSERT INTO conversations (user_id, created_at, message_count, first_message_at, last_message_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (child_id, ts[0], len(ts), ts[0], ts[-1]),
+        )
+        cid = int(cursor.lastrowid)
+        out["conversations"].append(cid)
+        cursor.executemany(
+            "INSERT INTO messages (conversation_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
+            [(cid, *CHAT_LINES[j % len(CHAT_LINES)], t) for j, t in enumerate(ts)],
+        )
+        counts["conversations"] += 1
+        counts["messages"] += len(ts)
+
+    for _ in range(scale.recurring_per_child):
+        cursor.execute(
+            """
+            INSERT INTO recurring_allowances (parent_id, child_id, amount, frequency, day_of_week, next_run, memo)
+            VALUES (?, ?, ?, 'weekly', ?, ?, '벤치마크')
+            """,
+            (parent_id, child_id, 5000, today.weekday(), (today - timedelta(days=1)).isoformat()),
+        )
+        counts["recurring_allowances"] += 1
+
+
+def build_dataset(db_path: str, scale: Scale, seed: int = 42) -> Tuple[DatabaseManager, Dict]:
+    """db_path 에 새 DB 를 만들고 데이터 생성(기존 파일은 지움)"""
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(db_path + suffix)
+        except FileNotFoundError:
+            pass
+    db = DatabaseManager(db_path)
+    info = generate(db, scale, seed=seed)
+    info["scale"] = asdict(scale)
+    info["db_bytes"] = os.path.getsize(db_path)
+    return db, info
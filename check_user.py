@@ -1,7 +1,7 @@
 """사용자 계정 확인 스크립트"""
-from database.db_manager import DatabaseManager
+from database.db_manager import get_db_manager
 
-db = DatabaseManager()
+db = get_db_manager()
 
 # seokwoon 계정 확인
 seokwoon_user = db.get_user_by_username("seokwoon")
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import base64
 from pathlib import Path
 from typing import Optional
 
 import streamlit as st
 
+from utils.assets import asset_url, thumbnail_bytes
+
 #
 # 동글이(감정) 이미지 렌더링 컴포넌트
 #
@@ -43,11 +44,10 @@ def _first_existing_path(*rel_paths: str) -> Optional[Path]:
     return None
 
 
-def _png_data_uri(path: Path) -> Optional[str]:
+def _png_data_uri(path: Path, size: int) -> Optional[str]:
+    # 표시 크기로 줄인 썸네일 data URI(프로세스 캐시, 원본 mtime 기준으로 갱신)
     try:
-        b = path.read_bytes()
-        encoded = base64.b64encode(b).decode("ascii")
-        return "data:image/png;base64," + encoded
+        return asset_url(path, int(size))
     except Exception:
         return None
 
@@ -76,7 +76,7 @@ def get_blob_html(emotion: str, size: int = 80, alt: str | None = None) -> str:
     if not p:
         return f'<div style="width:{int(size)}px;height:{int(size)}px;background:#ddd;border-radius:50%;"></div>'
 
-    uri = _png_data_uri(p)
+    uri = _png_data_uri(p, size)
     if not uri:
         return f'<div style="width:{int(size)}px;height:{int(size)}px;background:#ddd;border-radius:50%;"></div>'
 
@@ -105,7 +105,7 @@ def show_blob(emotion: str, size: int = 100, caption: str | None = None) -> None
 
     # Streamlit 기본 이미지 렌더링(가볍고 안정적)
     st.markdown("<div style='text-align:center;'>", unsafe_allow_html=True)
-    st.image(str(p), width=int(size))
+    st.image(thumbnail_bytes(p, int(size)) or str(p), width=int(size))
     if caption:
         st.caption(str(caption))
     st.markdown("</div>", unsafe_allow_html=True)
@@ -36,6 +36,11 @@ def get_gemini_api_key():
 
 class Config:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY") or ""
+    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") or ""
+    # 관리자(디버그 패널 등) 사용자 id 목록: AMF_ADMIN_USER_IDS=1,7
+    ADMIN_USER_IDS = frozenset(
+        int(x) for x in (os.getenv("AMF_ADMIN_USER_IDS") or "").split(",") if x.strip().isdigit()
+    )
     
     @staticmethod
     def get_gemini_api_key():
@@ -48,3 +53,5 @@ class Config:
         return get_gemini_api_key()
     
     DATABASE_PATH = "data/money_kids.db"
+    # 클라이언트-서버 DB URL(비어 있으면 DATABASE_PATH 의 SQLite 사용, database/backends.py 참고)
+    DATABASE_URL = os.getenv("AMF_DATABASE_URL", "").strip()
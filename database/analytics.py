@@ -0,0 +1,267 @@
+"""
+분석(리포트/성장/부모 대시보드 집계) 전용 읽기 경로
+
+    AMF_ANALYTICS_MODE=ro          (기본) 같은 DB 파일을 file:...?mode=ro 로 여는 별도 읽기 전용 풀
+    AMF_ANALYTICS_MODE=snapshot    SQLite backup API 로 만든 스냅샷 파일을 mode=ro 로 읽음
+                                   (AMF_ANALYTICS_SNAPSHOT_SECONDS 마다 백그라운드로 갱신, 기본 300초)
+    AMF_ANALYTICS_MODE=primary     분리하지 않음(기존 동작)
+
+- @analytics_read 가 붙은 DatabaseManager 메서드는 _get_connection() 이 자동으로 이 경로의 커넥션을 돌려줌
+  → 무거운 집계가 쓰기 풀의 커넥션을 차지하지 않고, 쿼리는 query_only 로 쓰기 잠금을 잡지 않음
+- snapshot 모드는 집계가 메인 파일의 WAL 체크포인트를 붙잡지 않는 대신 최대 갱신 주기만큼 늦은 값을 보여줌
+- transaction() 블록 안, 드라이버 백엔드(fake:// 등), :memory: DB 는 항상 기본 풀을 사용
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from database.pool import ConnectionPool
+
+
+MODES = ("primary", "ro", "snapshot")
+DEFAULT_SNAPSHOT_SECONDS = 300.0
+SNAPSHOT_DIR = "data/snapshots"
+
+# 읽기 전용 커넥션 PRAGMA(journal_mode 는 읽기 전용이라 바꾸지 않음)
+READONLY_PRAGMAS: tuple[tuple[str, object], ...] = (
+    ("query_only", "ON"),
+    ("cache_size", -16000),  # 집계용으로 쓰기 풀보다 넉넉히(약 16MB)
+    ("mmap_size", 128 * 1024 * 1024),
+    ("temp_store", "MEMORY"),
+)
+
+_routed: contextvars.ContextVar[bool] = contextvars.ContextVar("amf_analytics_routed", default=False)
+
+
+def analytics_read(fn: Callable) -> Callable:
+    """DatabaseManager 메서드 데코레이터: 실행 중 _get_connection() 을 분석용 읽기 경로로 보냄"""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with routed():
+            return fn(*args, **kwargs)
+
+    wrapper.__amf_analytics__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+@contextmanager
+def routed() -> Iterator[None]:
+    """블록 안의 _get_connection() 을 분석용 읽기 경로로 보냄"""
+    token = _routed.set(True)
+    try:
+        yield
+    finally:
+        _routed.reset(token)
+
+
+def is_routed() -> bool:
+    return _routed.get()
+
+
+def _mode_from_env() -> str:
+    mode = str(os.getenv("AMF_ANALYTICS_MODE", "ro")).strip().lower()
+    return mode if mode in MODES else "ro"
+
+
+def _snapshot_seconds_from_env() -> float:
+    try:
+        return max(1.0, float(os.getenv("AMF_ANALYTICS_SNAPSHOT_SECONDS") or DEFAULT_SNAPSHOT_SECONDS))
+    except ValueError:
+        return DEFAULT_SNAPSHOT_SECONDS
+
+
+def _ro_uri(path: str) -> str:
+    # 경로의 한글/공백은 as_uri() 가 퍼센트 인코딩
+    return f"{Path(os.path.abspath(path)).as_uri()}?mode=ro"
+
+
+class ReadOnlyConnectionPool(ConnectionPool):
+    """file:...?mode=ro 로 여는 풀(대여/반납/통계는 ConnectionPool 그대로)"""
+
+    def __init__(self, db_path: str, **kwargs):
+        kwargs.setdefault("pragmas", READONLY_PRAGMAS)
+        super().__init__(db_path, **kwargs)
+        self._retired = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(_ro_uri(self.db_path), uri=True, timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas:
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.DatabaseError:
+                pass
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if self._retired:
+            # 교체된 스냅샷의 커넥션은 풀로 돌리지 않고 닫음
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                pass
+            self._close_raw(conn)
+            return
+        super().release(conn)
+
+    def retire(self) -> None:
+        self._retired = True
+        self.close_all()
+
+
+class AnalyticsSource:
+    """
+    DB 파일 1개에 대한 분석용 읽기 경로
+    - ro: 원본 파일을 읽기 전용으로 여는 풀 1개
+    - snapshot: 스냅샷 파일 2개(a/b)를 번갈아 갱신 → 읽는 중인 파일은 덮어쓰지 않음
+    """
+
+    def __init__(self, db_path: str, mode: str = "ro", refresh_seconds: float = DEFAULT_SNAPSHOT_SECONDS, max_size: int = 4):
+        self.db_path = db_path
+        self.mode = mode
+        self.refresh_seconds = float(refresh_seconds)
+        self.max_size = int(max_size)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._slot = -1
+        self._refreshed_at = 0.0
+        self._refreshes = 0
+        self._last_error: Optional[str] = None
+        self._pool: Optional[ReadOnlyConnectionPool] = None
+        if mode == "ro":
+            self._pool = ReadOnlyConnectionPool(db_path, max_size=self.max_size)
+
+    # ---------- 스냅샷 ----------
+
+    def snapshot_path(self, slot: int) -> str:
+        # 이름이 같은 다른 경로의 DB 와 겹치지 않도록 절대경로 해시를 붙임
+        stem = Path(self.db_path).stem
+        tag = zlib.crc32(os.path.abspath(self.db_path).encode("utf-8"))
+        return os.path.join(SNAPSHOT_DIR, f"{stem}-{tag:08x}.analytics-{'ab'[slot]}.db")
+
+    def refresh(self) -> str:
+        """
+        스냅샷 갱신(SQLite online backup). return: 새 스냅샷 경로
+        - 원본은 WAL 읽기 트랜잭션으로 한 번에 복사하므로 쓰기를 막지 않음
+        - 새 파일을 다 만든 뒤 풀을 교체(이전 스냅샷 풀은 반납되는 커넥션부터 닫힘)
+        """
+        with self._refresh_lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> str:
+        # 이전 스냅샷(다른 슬롯)은 지금 읽히고 있을 수 있으므로 두 번 전 슬롯에 덮어씀
+        slot = (self._slot + 1) % 2
+        path = self.snapshot_path(slot)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        src = sqlite3.connect(self.db_path, timeout=5.0)
+        dst = sqlite3.connect(path, timeout=5.0)
+        try:
+            src.backup(dst)
+            # 읽기 전용으로 열 때 -wal/-shm 이 필요 없도록 롤백 저널 모드로 저장
+            dst.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            dst.close()
+            src.close()
+
+        new_pool = ReadOnlyConnectionPool(path, max_size=self.max_size)
+        with self._lock:
+            old, self._pool = self._pool, new_pool
+            self._slot = slot
+            self._refreshed_at = time.time()
+            self._refreshes += 1
+            self._last_error = None
+        if old is not None:
+            old.retire()
+        return path
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            with self._lock:
+                self._last_error = f"{type(e).__name__}: {e}"
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _ensure_fresh(self) -> None:
+        if self.mode != "snapshot":
+            return
+        if self._pool is None:
+            # 첫 스냅샷은 동기로 생성(동시에 들어온 호출은 만들어질 때까지 대기)
+            with self._refresh_lock:
+                if self._pool is None:
+                    self._refresh_locked()
+            return
+        if time.time() - self._refreshed_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, name="amf-analytics-snapshot", daemon=True).start()
+
+    # ---------- 공개 API ----------
+
+    def acquire(self):
+        """분석용 읽기 전용 커넥션 대여(conn.close() 로 반납)"""
+        self._ensure_fresh()
+        pool = self._pool
+        if pool is None:
+            raise sqlite3.OperationalError("analytics snapshot is not available")
+        return pool.acquire()
+
+    def close_all(self) -> None:
+        with self._lock:
+            pool = self._pool
+        if pool is not None:
+            pool.close_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pool = self._pool
+            out: Dict[str, Any] = {
+                "mode": self.mode,
+                "source": pool.db_path if pool is not None else None,
+                "refreshes": self._refreshes,
+                "refreshed_at": self._refreshed_at or None,
+                "age_sec": round(time.time() - self._refreshed_at, 1) if self._refreshed_at else None,
+                "last_error": self._last_error,
+            }
+        if pool is not None:
+            out["pool"] = pool.stats()
+        return out
+
+
+_sources: Dict[str, AnalyticsSource] = {}
+_sources_lock = threading.Lock()
+
+
+def get_source(db_path: str, mode: Optional[str] = None) -> Optional[AnalyticsSource]:
+    """
+    DB 파일별 프로세스 전역 분석 경로(없으면 생성). 분리하지 않는 경우 None
+    - mode 생략 시 AMF_ANALYTICS_MODE
+    """
+    mode = mode or _mode_from_env()
+    if mode == "primary" or db_path == ":memory:" or "://" in db_path:
+        return None
+    key = f"{mode}:{os.path.abspath(db_path)}"
+    with _sources_lock:
+        source = _sources.get(key)
+        if source is None:
+            source = AnalyticsSource(db_path, mode=mode, refresh_seconds=_snapshot_seconds_from_env())
+            _sources[key] = source
+        return source
@@ -0,0 +1,422 @@
+"""
+저장소 백엔드 - DatabaseManager 가 쓰는 커넥션 풀 + 스키마 준비를 설정으로 선택
+
+- 대상 문자열(AMF_DATABASE_URL 또는 Config.DATABASE_PATH):
+    data/money_kids.db, sqlite:///data/money_kids.db  → SQLiteBackend(로컬 파일, 기존 동작)
+    fake://shared                                      → DriverBackend(database/fake_server.py, 로컬 테스트용)
+- DriverBackend: DB-API 2.0 드라이버 모듈로 여는 SQLite 방언 백엔드(교체 지점)
+  - 풀: database.pool.ConnectionPool 을 그대로 사용(대여/반납/대기/통계 동일), 커넥션만 드라이버로 엶
+  - 앱 SQL 은 qmark('?') 그대로 두고 드라이버 paramstyle(format/pyformat/numeric/named)로 변환
+  - 결과 행은 sqlite3.Row 처럼 row["col"] / row[0] / dict(row) 지원
+  - 드라이버 예외는 sqlite3 예외(IntegrityError/OperationalError/...)로 바꿔서 기존 except 절 유지
+  - 스키마는 기존 마이그레이션(트리거/집계 테이블 포함)을 그대로 실행
+- 클라이언트-서버 DB(PostgreSQL/MySQL)는 지원하지 않음: 앱 SQL 이 SQLite 전용 구문
+  (date('now', ...), strftime, INSERT OR REPLACE, ON CONFLICT ... excluded)과 트리거로 유지되는 집계 테이블
+  (wallet_balances, user_xp, notification_counters, behavior_daily, emotion_daily)에 의존하므로
+  SQL 포팅 + 트리거 대체 후 DRIVERS 에 추가해야 함
+"""
+from __future__ import annotations
+
+import functools
+import importlib
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from database.migrations import ensure_schema
+from database.pool import ConnectionPool, PooledConnection, get_pool
+
+
+DEFAULT_POOL_SIZE = 8
+
+
+class StorageBackend:
+    """저장소 백엔드 기본형"""
+
+    name = "backend"
+
+    def __init__(self, target: str):
+        self.target = target
+
+    @property
+    def pool(self) -> ConnectionPool:
+        raise NotImplementedError
+
+    def ensure_schema(self) -> None:
+        raise NotImplementedError
+
+    def describe(self) -> Dict[str, Any]:
+        """상태 표시용(비밀번호 제외)"""
+        return {"backend": self.name, "target": _redact(self.target)}
+
+
+class SQLiteBackend(StorageBackend):
+    """로컬 SQLite 파일(WAL) - 단일 노드"""
+
+    name = "sqlite"
+
+    def __init__(self, target: str):
+        path = target[len("sqlite:///"):] if target.startswith("sqlite:///") else target
+        super().__init__(path)
+        self.db_path = path
+        db_dir = os.path.dirname(path)
+        if db_dir and path != ":memory:" and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        self._pool = get_pool(path)
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool
+
+    def ensure_schema(self) -> None:
+        ensure_schema(self._pool, self.db_path)
+
+
+# ========== SQL 변환(qmark → 드라이버 paramstyle) ==========
+
+_TOKEN_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*|/\*.*?\*/|\?|%)""", re.S)
+
+
+def _placeholder(paramstyle: str, index: int) -> str:
+    if paramstyle in ("format", "pyformat"):
+        return "%s"
+    if paramstyle == "numeric":
+        return f":{index}"
+    if paramstyle == "named":
+        return f":p{index}"
+    return "?"
+
+
+@functools.lru_cache(maxsize=1024)
+def translate_sql(sql: str, paramstyle: str, has_params: bool = True) -> str:
+    """
+    앱 SQL(qmark) → 드라이버 paramstyle
+    - 문자열/식별자 리터럴과 주석 안의 '?' 는 건드리지 않음
+    - format/pyformat 드라이버는 파라미터가 있으면 '%' 를 '%%' 로 이스케이프(리터럴 포함, 드라이버가 문자열 전체를 포맷)
+    """
+    escape_pct = has_params and paramstyle in ("format", "pyformat")
+    if paramstyle == "qmark" and not escape_pct:
+        return sql
+
+    out: List[str] = []
+    index = 0
+    pos = 0
+    for m in _TOKEN_RE.finditer(sql):
+        out.append(sql[pos:m.start()])
+        tok = m.group(0)
+        if tok == "?":
+            index += 1
+            out.append(_placeholder(paramstyle, index))
+        elif escape_pct:
+            out.append(tok.replace("%", "%%"))
+        else:
+            out.append(tok)
+        pos = m.end()
+    out.append(sql[pos:])
+    return "".join(out)
+
+
+def _convert_params(params: Sequence, paramstyle: str):
+    if paramstyle == "named":
+        return {f"p{i}": v for i, v in enumerate(params, start=1)}
+    return tuple(params)
+
+
+# ========== 드라이버 커넥션 래퍼 ==========
+
+class Row(tuple):
+    """sqlite3.Row 호환 행: row["col"], row[0], row.keys(), dict(row)"""
+
+    __slots__ = ()
+    _index: Dict[str, int] = {}
+    _keys: Tuple[str, ...] = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+
+@functools.lru_cache(maxsize=256)
+def _row_class(keys: Tuple[str, ...]) -> type:
+    return type("Row", (Row,), {"__slots__": (), "_keys": keys, "_index": {k: i for i, k in enumerate(keys)}})
+
+
+class _ErrorMap:
+    """드라이버 예외 → sqlite3 예외(기존 except sqlite3.IntegrityError 등이 그대로 동작)"""
+
+    _ORDER = (
+        ("IntegrityError", sqlite3.IntegrityError),
+        ("OperationalError", sqlite3.OperationalError),
+        ("ProgrammingError", sqlite3.ProgrammingError),
+        ("DataError", sqlite3.DataError),
+        ("NotSupportedError", sqlite3.NotSupportedError),
+        ("InternalError", sqlite3.InternalError),
+        ("DatabaseError", sqlite3.DatabaseError),
+        ("Error", sqlite3.Error),
+    )
+
+    def __init__(self, driver):
+        self.pairs = [(getattr(driver, n), target) for n, target in self._ORDER if isinstance(getattr(driver, n, None), type)]
+        self.base = getattr(driver, "Error", Exception)
+
+    def convert(self, exc: BaseException) -> BaseException:
+        for src, target in self.pairs:
+            if isinstance(exc, src):
+                return target(str(exc))
+        return sqlite3.DatabaseError(str(exc))
+
+
+class DriverCursor:
+    """드라이버 커서 래퍼(SQL/파라미터 변환 + Row 변환 + 예외 변환)"""
+
+    def __init__(self, owner: "DriverConnection", cur):
+        self._owner = owner
+        self._cur = cur
+
+    def _row(self, values):
+        if values is None:
+            return None
+        desc = self._cur.description or ()
+        return _row_class(tuple(d[0] for d in desc))(values)
+
+    def execute(self, sql: str, parameters: Sequence = ()):
+        owner = self._owner
+        params = tuple(parameters or ())
+        stmt = translate_sql(sql, owner.paramstyle, bool(params))
+        try:
+            if params:
+                self._cur.execute(stmt, _convert_params(params, owner.paramstyle))
+            else:
+                self._cur.execute(stmt)
+        except owner.errors.base as e:
+            raise owner.errors.convert(e) from e
+        owner.in_transaction = True
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters):
+        owner = self._owner
+        rows = [tuple(p) for p in seq_of_parameters]
+        if not rows:
+            return self
+        stmt = translate_sql(sql, owner.paramstyle, True)
+        try:
+            self._cur.executemany(stmt, [_convert_params(p, owner.paramstyle) for p in rows])
+        except owner.errors.base as e:
+            raise owner.errors.convert(e) from e
+        owner.in_transaction = True
+        return self
+
+    def executescript(self, script: str):
+        # 스키마 스크립트(마이그레이션)용: 드라이버가 지원할 때만
+        fn = getattr(self._cur, "executescript", None)
+        if fn is None:
+            raise sqlite3.NotSupportedError("executescript is not supported by this driver")
+        try:
+            fn(script)
+        except self._owner.errors.base as e:
+            raise self._owner.errors.convert(e) from e
+        return self
+
+    def fetchone(self):
+        return self._row(self._cur.fetchone())
+
+    def fetchmany(self, size: Optional[int] = None):
+        rows = self._cur.fetchmany(size) if size is not None else self._cur.fetchmany()
+        return [self._row(r) for r in rows]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.fetchall())
+
+    @property
+    def rowcount(self) -> int:
+        return self._cur.rowcount
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return getattr(self._cur, "lastrowid", None)
+
+    def close(self) -> None:
+        self._cur.close()
+
+
+class DriverConnection:
+    """
+    드라이버 커넥션 래퍼(풀에 들어가는 객체)
+    - in_transaction: 쓰기/조회 후 True, commit/rollback 후 False(풀 반납 시 롤백 판단용)
+    - row_factory: sqlite3 호환용 자리(무시)
+    """
+
+    def __init__(self, conn, driver):
+        self._conn = conn
+        self.driver = driver
+        self.paramstyle = getattr(driver, "paramstyle", "qmark")
+        self.errors = _ErrorMap(driver)
+        self.in_transaction = False
+        self.row_factory = None
+
+    def cursor(self, *args, **kwargs) -> DriverCursor:
+        return DriverCursor(self, self._conn.cursor())
+
+    def execute(self, sql: str, parameters: Sequence = ()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script: str):
+        return self.cursor().executescript(script)
+
+    def commit(self) -> None:
+        try:
+            self._conn.commit()
+        except self.errors.base as e:
+            raise self.errors.convert(e) from e
+        self.in_transaction = False
+
+    def rollback(self) -> None:
+        try:
+            self._conn.rollback()
+        except self.errors.base as e:
+            raise self.errors.convert(e) from e
+        self.in_transaction = False
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+# ========== DB-API 드라이버 백엔드 ==========
+
+# scheme → 드라이버 모듈(모두 SQLite 방언. 다른 방언은 앱 SQL/트리거 포팅 후 추가)
+DRIVERS: Dict[str, str] = {
+    "fake": "database.fake_server",
+}
+
+
+class DriverConnectionPool(ConnectionPool):
+    """ConnectionPool 의 대여/대기/통계를 그대로 쓰고 커넥션만 드라이버로 여는 풀"""
+
+    # 계측 프록시(sqlite3.Cursor 기반)로 교체되지 않도록 고정
+    proxy_class = PooledConnection
+
+    def __init__(self, target: str, connect, driver, **kwargs):
+        super().__init__(target, pragmas=(), **kwargs)
+        self._connect = connect
+        self._driver = driver
+
+    def _open(self) -> DriverConnection:
+        errors = _ErrorMap(self._driver)
+        try:
+            raw = self._connect()
+        except errors.base as e:
+            raise errors.convert(e) from e
+        return DriverConnection(raw, self._driver)
+
+
+class DriverBackend(StorageBackend):
+    """DB-API 드라이버로 여는 SQLite 방언 백엔드(fake:// 등)"""
+
+    name = "driver"
+
+    def __init__(self, target: str):
+        super().__init__(target)
+        parts = urlsplit(target)
+        scheme = parts.scheme.lower()
+        if scheme not in DRIVERS:
+            raise ValueError(
+                f"지원하지 않는 DB URL 입니다: {scheme}:// (AMF_DATABASE_URL={_redact(target)}). "
+                "앱 SQL 이 SQLite 전용이라 SQLite 파일 경로나 fake:// 만 쓸 수 있어요."
+            )
+        self.driver = importlib.import_module(DRIVERS[scheme])
+
+        query = dict(parse_qsl(parts.query))
+        pool_size = int(query.pop("pool_size", DEFAULT_POOL_SIZE))
+        wait_timeout = float(query.pop("pool_timeout", 2.0))
+        name = parts.netloc or parts.path.strip("/") or "default"
+        driver = self.driver
+        self._pool = DriverConnectionPool(
+            target, lambda: driver.connect(name), driver, max_size=pool_size, wait_timeout=wait_timeout
+        )
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool
+
+    def ensure_schema(self) -> None:
+        """기존 마이그레이션(트리거/집계 테이블 포함)을 풀 커넥션으로 실행"""
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            ensure_schema(self._pool, self.target)
+            self._schema_ready = True
+
+    def describe(self) -> Dict[str, Any]:
+        out = super().describe()
+        out["driver"] = getattr(self.driver, "__name__", "")
+        out["paramstyle"] = getattr(self.driver, "paramstyle", "")
+        return out
+
+
+# ========== 선택 ==========
+
+_backends: Dict[str, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def _redact(target: str) -> str:
+    if "://" not in target:
+        return target
+    parts = urlsplit(target)
+    if parts.password:
+        netloc = parts.netloc.replace(f":{parts.password}@", ":***@")
+        return parts._replace(netloc=netloc).geturl()
+    return target
+
+
+def backend_key(target: str) -> str:
+    """같은 대상을 가리키는 문자열을 하나로(sqlite:///data/x.db ≡ data/x.db ≡ 절대경로)"""
+    if "://" in target and not target.startswith("sqlite:///"):
+        return target
+    path = target[len("sqlite:///"):] if target.startswith("sqlite:///") else target
+    return path if path == ":memory:" else os.path.abspath(path)
+
+
+def get_backend(target: str) -> StorageBackend:
+    """대상(파일 경로 또는 URL)별 프로세스 전역 백엔드 1개"""
+    key = backend_key(target)
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            if "://" in target and not target.startswith("sqlite:///"):
+                backend = DriverBackend(target)
+            else:
+                backend = SQLiteBackend(target)
+            _backends[key] = backend
+        return backend
@@ -10,51 +10,54 @@ from datetime import timedelta as _timedelta2
 import random as _random
 import re as _re
 import json as _json
+import zlib as _zlib
+from database.backends import backend_key, get_backend
+from database import unit_of_work as _uow
+from database import analytics as _analytics
+from database.analytics import analytics_read
+from database import hot_queries as _sql
+from database.migrations import (
+    BEHAVIOR_DAILY_SELECT_SQL,
+    EMOTION_DAILY_SELECT_SQL,
+    NOTIFICATION_COUNTER_REBUILD_SQL,
+    WALLET_REBUILD_SQL,
+    XP_FULL_SQL,
+    XP_REBUILD_SQL,
+    rollup_rebuild_sql,
+)
+import threading as _threading
+from contextlib import contextmanager
+
+
+def day_range(start_date, end_date) -> Tuple[str, str]:
+    """
+    날짜 구간(양끝 포함, 'YYYY-MM-DD') → 반열림 timestamp 구간 [start, end+1일)
+    - `date(timestamp) BETWEEN ? AND ?` 대신 `timestamp >= ? AND timestamp < ?` 로 써야
+      timestamp 인덱스를 탈 수 있습니다(컬럼을 함수로 감싸지 않기).
+    """
+    s = _date.fromisoformat(str(start_date)[:10])
+    e = _date.fromisoformat(str(end_date)[:10])
+    return s.isoformat(), (e + _timedelta(days=1)).isoformat()
 
 class DatabaseManager:
     """데이터베이스 관리 클래스"""
     
     def __init__(self, db_path: str = None):
-        self.db_path = db_path or Config.DATABASE_PATH
-        self._ensure_db_exists()
+        # db_path: SQLite 파일 경로 또는 DB URL(database/backends.py)
+        self.db_path = db_path or Config.DATABASE_URL or Config.DATABASE_PATH
+        self._backend = get_backend(self.db_path)
+        self._pool = self._backend.pool
         self._init_database()
-    
-    def _ensure_db_exists(self):
-        """데이터베이스 파일이 존재하도록 디렉토리 생성"""
-        db_dir = os.path.dirname(self.db_path)
-        if db_dir and not os.path.exists(db_dir):
-            os.makedirs(db_dir)
+        # 리포트/집계용 읽기 전용 경로(AMF_ANALYTICS_MODE, database/analytics.py). 분리 안 하면 None
+        self._analytics = _analytics.get_source(getattr(self._backend, "db_path", self.db_path))
     
     def _init_database(self):
-        """데이터베이스 초기화 및 테이블 생성"""
-        with open(os.path.join(os.path.dirname(__file__), 'schema.sql'), 'r', encoding='utf-8') as f:
-            schema = f.read()
-        
-        conn = sqlite3.connect(self.db_path)
-        conn.executescript(schema)
-        conn.commit()
-        conn.close()
-
-        # 기존 DB 마이그레이션(컬럼 추가 등)
-        self._ensure_columns()
-
-        # 기존 DB에 새 테이블이 추가되었을 수 있으니 한 번 더 보정
-        self._ensure_tables()
+        """데이터베이스 초기화(버전 마이그레이션/스키마 확인, 프로세스당 대상당 1회)"""
+        self._backend.ensure_schema()
 
-    def _ensure_tables(self):
-        """기존 DB에 누락된 테이블을 보정(CREATE TABLE IF NOT EXISTS)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            # schema.sql 전체를 다시 실행하면 안전(CREATE IF NOT EXISTS)
-            with open(os.path.join(os.path.dirname(__file__), "schema.sql"), "r", encoding="utf-8") as f:
-                schema = f.read()
-            conn.executescript(schema)
-            conn.commit()
-        except Exception:
-            pass
-        finally:
-            conn.close()
+    def backend_info(self) -> Dict:
+        """사용 중인 저장소 백엔드 정보(비밀번호 제외)"""
+        return self._backend.describe()
 
     # ========== 초대코드(MF-XXXX) ==========
 
@@ -258,96 +261,6 @@ class DatabaseManager:
         finally:
             conn.close()
 
-    def _ensure_columns(self):
-        """기존 DB에 누락된 컬럼/테이블 보정(안전한 ALTER)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            # behaviors 확장 컬럼
-            try:
-                cursor.execute("ALTER TABLE behaviors ADD COLUMN category TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE behaviors ADD COLUMN related_request_id INTEGER")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-
-            # users 확장 컬럼
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN birth_date TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN character_code TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN character_nickname TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN character_skin_code TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN coins INTEGER NOT NULL DEFAULT 0")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN last_reward_level INTEGER NOT NULL DEFAULT 0")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-
-            # 회원가입(문서 템플릿) 호환 컬럼
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN invite_code TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN parent_id INTEGER")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN children_json TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN agree_marketing INTEGER NOT NULL DEFAULT 0")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-
-            # user_skins 테이블(없으면 생성)
-            try:
-                cursor.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS user_skins (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER NOT NULL,
-                        skin_code TEXT NOT NULL,
-                        unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(user_id, skin_code)
-                    )
-                    """
-                )
-                conn.commit()
-            except Exception:
-                pass
-        finally:
-            conn.close()
-
     # ========== 미션 ==========
 
     def seed_default_missions_and_badges(self):
@@ -355,51 +268,6 @@ class DatabaseManager:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            # ✅ Cloud/구버전 DB 방어: 필요한 테이블이 없으면 먼저 생성
-            # (schema.sql이 적용되지 않았거나, 초기 DB가 최소 테이블만 가진 경우)
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS mission_templates (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    parent_code TEXT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    difficulty TEXT DEFAULT 'easy',
-                    reward_amount REAL DEFAULT 0,
-                    is_active INTEGER DEFAULT 1,
-                    created_by INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS mission_assignments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    template_id INTEGER NOT NULL,
-                    cycle TEXT NOT NULL, -- daily/weekly/custom
-                    assigned_date TEXT NOT NULL,
-                    status TEXT NOT NULL DEFAULT 'active', -- active/completed
-                    completed_at TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS badges (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    code TEXT UNIQUE NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    icon TEXT,
-                    required_xp INTEGER NOT NULL DEFAULT 0
-                )
-                """
-            )
-            conn.commit()
-
             # 기본 미션 템플릿(시스템 공용)
             cursor.execute("SELECT COUNT(*) as cnt FROM mission_templates")
             row = cursor.fetchone()
@@ -454,6 +322,42 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    def assign_custom_mission(
+        self,
+        template_id: int,
+        child_ids: List[int],
+        date_str: str,
+        notify_title: Optional[str] = "새 미션이 도착했어요!",
+        notify_body: Optional[str] = None,
+    ) -> int:
+        """
+        커스텀 미션을 자녀들에게 바로 배정 + 알림(한 트랜잭션)
+        return: 배정 건수
+        """
+        ids = [int(c) for c in child_ids or []]
+        if not ids:
+            return 0
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor.executemany(
+                """
+                INSERT INTO mission_assignments (user_id, template_id, cycle, assigned_date, status)
+                VALUES (?, ?, 'custom', ?, 'active')
+                """,
+                [(cid, int(template_id), date_str) for cid in ids],
+            )
+            if notify_title:
+                self._insert_notifications(cursor, [(cid, notify_title, notify_body, "info") for cid in ids])
+            conn.commit()
+            return len(ids)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
     def get_custom_missions(self, parent_code: str):
         conn = self._get_connection()
         cursor = conn.cursor()
@@ -533,56 +437,72 @@ class DatabaseManager:
     # ========== 배지/성장 ==========
 
     def get_xp(self, user_id: int) -> int:
-        """XP(가중치): behaviors 개수 + 완료 미션 난이도 가중 합"""
+        """
+        XP(가중치): behaviors 개수 + 완료 미션 난이도 가중 합
+        - user_xp 카운터(트리거로 갱신)를 읽음. 전체 계산과의 비교는 verify_user_xp()
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("SELECT COUNT(*) as cnt FROM behaviors WHERE user_id = ?", (user_id,))
-            bcnt = int(cursor.fetchone()["cnt"] or 0)
-            # missions: difficulty join (없으면 count fallback)
-            try:
-                cursor.execute(
-                    """
-                    SELECT COALESCE(SUM(
-                        CASE COALESCE(t.difficulty,'normal')
-                            WHEN 'easy' THEN 5
-                            WHEN 'hard' THEN 12
-                            ELSE 8
-                        END
-                    ),0) as xp
-                    FROM mission_assignments a
-                    JOIN mission_templates t ON a.template_id = t.id
-                    WHERE a.user_id = ? AND a.status='completed'
-                    """,
-                    (user_id,),
-                )
-                row = cursor.fetchone()
-                mxp = int((row["xp"] if row else 0) or 0)
-            except Exception:
-                cursor.execute(
-                    "SELECT COUNT(*) as cnt FROM mission_assignments WHERE user_id = ? AND status='completed'",
-                    (user_id,),
-                )
-                mxp = int(cursor.fetchone()["cnt"] or 0)
-            return int(bcnt + mxp)
+            cursor.execute(
+                "SELECT behavior_count + mission_xp as xp FROM user_xp WHERE user_id = ?",
+                (int(user_id),),
+            )
+            row = cursor.fetchone()
+            return int((row["xp"] if row else 0) or 0)
+        finally:
+            conn.close()
+
+    def rebuild_user_xp(self) -> int:
+        """user_xp 카운터를 behaviors/mission_assignments 전체로 재구축. return: 사용자 수"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM user_xp")
+            cursor.execute(XP_REBUILD_SQL)
+            conn.commit()
+            cursor.execute("SELECT COUNT(*) as cnt FROM user_xp")
+            return int(cursor.fetchone()["cnt"] or 0)
+        finally:
+            conn.close()
+
+    def verify_user_xp(self) -> List[Dict]:
+        """
+        user_xp 카운터 ↔ 전체 계산 비교(reconcile)
+        return: 불일치 목록 [{"user_id", "counter", "actual"}]
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(XP_FULL_SQL)
+            actual = {int(r["user_id"]): int(r["behavior_count"] or 0) + int(r["mission_xp"] or 0) for r in cursor.fetchall()}
+            cursor.execute("SELECT user_id, behavior_count + mission_xp as xp FROM user_xp")
+            counter = {int(r["user_id"]): int(r["xp"] or 0) for r in cursor.fetchall()}
         finally:
             conn.close()
 
+        return [
+            {"user_id": uid, "counter": counter.get(uid, 0), "actual": actual.get(uid, 0)}
+            for uid in sorted(set(actual) | set(counter))
+            if counter.get(uid, 0) != actual.get(uid, 0)
+        ]
+
     def award_badges_if_needed(self, user_id: int):
         self.seed_default_missions_and_badges()
         xp = self.get_xp(user_id)
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("SELECT badge_id FROM user_badges WHERE user_id = ?", (user_id,))
-            owned = {int(r["badge_id"]) for r in cursor.fetchall()}
-            cursor.execute("SELECT * FROM badges ORDER BY required_xp ASC")
-            for b in cursor.fetchall():
-                bid = int(b["id"])
-                if bid in owned:
-                    continue
-                if xp >= int(b["required_xp"] or 0):
-                    cursor.execute("INSERT INTO user_badges (user_id, badge_id) VALUES (?, ?)", (user_id, bid))
+            # 조건을 만족하는 미보유 배지만 한 번에 지급(UNIQUE(user_id, badge_id))
+            cursor.execute(
+                """
+                INSERT OR IGNORE INTO user_badges (user_id, badge_id)
+                SELECT ?, id FROM badges
+                WHERE COALESCE(required_xp, 0) <= ?
+                ORDER BY required_xp ASC
+                """,
+                (user_id, int(xp)),
+            )
             conn.commit()
         finally:
             conn.close()
@@ -671,21 +591,13 @@ class DatabaseManager:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(
-                """
-                SELECT *
-                FROM emotion_logs
-                WHERE user_id = ?
-                ORDER BY created_at DESC, id DESC
-                LIMIT ?
-                """,
-                (int(user_id), int(limit)),
-            )
+            cursor.execute(_sql.EMOTION_LOGS_RECENT_SQL, (int(user_id), int(limit)))
             rows = cursor.fetchall()
             return [dict(r) for r in rows]
         finally:
             conn.close()
 
+    @analytics_read
     def get_family_emotion_logs(self, parent_code: str, limit: int = 80) -> List[Dict]:
         """부모 코드 기준: 자녀들의 감정 기록(최근)"""
         if not parent_code:
@@ -755,6 +667,7 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    @analytics_read
     def get_family_risk_signals(self, parent_code: str, limit: int = 80) -> List[Dict]:
         if not parent_code:
             return []
@@ -779,10 +692,63 @@ class DatabaseManager:
             conn.close()
     
     def _get_connection(self):
-        """데이터베이스 연결 반환"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """
+        데이터베이스 연결 반환(커넥션 풀에서 대여)
+        - 호출부의 conn.close()는 풀 반납으로 동작합니다.
+        - transaction() 블록 안이면 공유 커넥션의 SAVEPOINT 핸들(commit/close 가 RELEASE/되돌림)
+        """
+        uow = _uow.current(self._pool)
+        if uow is not None:
+            return _uow.SavepointConnection(uow)
+        if self._analytics is not None and _analytics.is_routed():
+            try:
+                return self._analytics.acquire()
+            except sqlite3.Error:
+                pass
+        return self._pool.acquire()
+
+    def analytics_connection(self):
+        """
+        분석용 읽기 전용 커넥션(pandas.read_sql_query 등 직접 집계용, conn.close() 로 반납)
+        - 분석 경로가 없거나 열 수 없으면 기본 풀 커넥션
+        """
+        with _analytics.routed():
+            return self._get_connection()
+
+    def analytics_info(self) -> Dict:
+        """분석 읽기 경로 상태(모드/스냅샷 나이/풀 통계)"""
+        if self._analytics is None:
+            return {"mode": "primary"}
+        return self._analytics.stats()
+
+    @contextmanager
+    def connection(self):
+        """
+        with db.connection() as conn: ...
+        - 블록 종료 시 자동 반납(미커밋 변경은 롤백)
+        """
+        conn = self._get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def transaction(self):
+        """
+        작업 단위: with db.transaction(): ... 안의 DatabaseManager 호출이 커넥션 1개 + COMMIT 1회를 공유
+        - 정상 종료 시 커밋, 예외 시 전체 롤백(중첩은 SAVEPOINT). 자세한 규칙은 database/unit_of_work.py
+        """
+        return _uow.transaction(self._pool)
+
+    @staticmethod
+    def _claim_job(cursor, job_key: str, job: str) -> bool:
+        """멱등 키 선점(job_runs). 이미 처리된 키면 False — 호출자 트랜잭션 안에서 사용"""
+        cursor.execute("INSERT OR IGNORE INTO job_runs (job_key, job) VALUES (?, ?)", (str(job_key), str(job)))
+        return cursor.rowcount == 1
+
+    def pool_stats(self) -> Dict:
+        """커넥션 풀 카운터(hits/misses/waits/wait_time_total 등)"""
+        return self._pool.stats()
     
     # ========== 사용자 관리 ==========
     
@@ -814,56 +780,6 @@ class DatabaseManager:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            # 기존 테이블에 컬럼이 없을 수 있으므로 ALTER TABLE 시도
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN user_type TEXT DEFAULT 'child'")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN parent_ssn TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN phone_number TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN birth_date TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN character_code TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN character_nickname TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN character_skin_code TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN coins INTEGER NOT NULL DEFAULT 0")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN last_reward_level INTEGER NOT NULL DEFAULT 0")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            
             cursor.execute("""
                 INSERT INTO users (
                     username, password_hash, name, age,
@@ -980,67 +896,69 @@ class DatabaseManager:
         - coins: 레벨당 10코인 + (5레벨마다 추가 50코인)
         - skins: 캐릭터별 스킨(required_level) 자동 해금
         """
-        user = self.get_user_by_id(int(user_id)) or {}
-        xp = 0
-        try:
-            xp = int(self.get_xp(int(user_id)) or 0)
-        except Exception:
+        # 코인/스킨/last_reward_level 을 한 트랜잭션으로(동시 rerun 중복 지급 방지)
+        with self.transaction():
+            user = self.get_user_by_id(int(user_id)) or {}
             xp = 0
-        level_now = self._level_from_xp(xp)
-        last_paid = int(user.get("last_reward_level") or 0)
-        coins_before = int(user.get("coins") or 0)
-        coins_gain = 0
-        skins_unlocked: list[str] = []
+            try:
+                xp = int(self.get_xp(int(user_id)) or 0)
+            except Exception:
+                xp = 0
+            level_now = self._level_from_xp(xp)
+            last_paid = int(user.get("last_reward_level") or 0)
+            coins_before = int(user.get("coins") or 0)
+            coins_gain = 0
+            skins_unlocked: list[str] = []
+
+            if level_now <= last_paid:
+                return {
+                    "level_now": level_now,
+                    "levels_gained": 0,
+                    "coins_gained": 0,
+                    "coins_now": coins_before,
+                    "skins_unlocked": [],
+                }
+
+            for lv in range(last_paid + 1, level_now + 1):
+                coins_gain += 10
+                if lv % 5 == 0:
+                    coins_gain += 50
+
+            if coins_gain:
+                self.add_coins(int(user_id), coins_gain)
+
+            # 스킨 해금: 기본 스킨만(상점 스킨은 구매)
+            ccode = (user.get("character_code") or "").strip()
+            if ccode:
+                for skin in get_skins_for_character(ccode):
+                    if int(skin.get("price") or 0) != 0:
+                        continue
+                    req = int(skin.get("required_level") or 9999)
+                    if req <= level_now:
+                        if self.unlock_skin(int(user_id), skin.get("code")):
+                            skins_unlocked.append(str(skin.get("code")))
+
+            # last_reward_level 업데이트
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("UPDATE users SET last_reward_level = ? WHERE id = ?", (int(level_now), int(user_id)))
+                conn.commit()
+            finally:
+                conn.close()
+
+            # coins_now 재조회(간단)
+            updated = self.get_user_by_id(int(user_id)) or {}
+            coins_now = int(updated.get("coins") or 0)
 
-        if level_now <= last_paid:
             return {
                 "level_now": level_now,
-                "levels_gained": 0,
-                "coins_gained": 0,
-                "coins_now": coins_before,
-                "skins_unlocked": [],
+                "levels_gained": int(level_now - last_paid),
+                "coins_gained": int(coins_gain),
+                "coins_now": coins_now,
+                "skins_unlocked": skins_unlocked,
             }
 
-        for lv in range(last_paid + 1, level_now + 1):
-            coins_gain += 10
-            if lv % 5 == 0:
-                coins_gain += 50
-
-        if coins_gain:
-            self.add_coins(int(user_id), coins_gain)
-
-        # 스킨 해금: 기본 스킨만(상점 스킨은 구매)
-        ccode = (user.get("character_code") or "").strip()
-        if ccode:
-            for skin in get_skins_for_character(ccode):
-                if int(skin.get("price") or 0) != 0:
-                    continue
-                req = int(skin.get("required_level") or 9999)
-                if req <= level_now:
-                    if self.unlock_skin(int(user_id), skin.get("code")):
-                        skins_unlocked.append(str(skin.get("code")))
-
-        # last_reward_level 업데이트
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("UPDATE users SET last_reward_level = ? WHERE id = ?", (int(level_now), int(user_id)))
-            conn.commit()
-        finally:
-            conn.close()
-
-        # coins_now 재조회(간단)
-        updated = self.get_user_by_id(int(user_id)) or {}
-        coins_now = int(updated.get("coins") or 0)
-
-        return {
-            "level_now": level_now,
-            "levels_gained": int(level_now - last_paid),
-            "coins_gained": int(coins_gain),
-            "coins_now": coins_now,
-            "skins_unlocked": skins_unlocked,
-        }
-
     # ========== 리마인더(예약 알림) ==========
 
     def create_reminder(self, user_id: int, title: str, body: str, due_at: str) -> int:
@@ -1060,82 +978,85 @@ class DatabaseManager:
         finally:
             conn.close()
 
-    def run_due_reminders(self) -> int:
+    def run_due_reminders(self, limit: int = 200) -> int:
         """
         due_at <= now 인 예약 리마인더를 notifications로 발행하고 is_sent=1 처리.
-        - 스케줄러가 없으므로 앱 실행/페이지 진입 시 호출하는 방식
+        - 예약 작업(services.scheduler)에서 호출. 한 트랜잭션으로 일괄 처리
+        - 멱등 키 'reminder:<id>' + is_sent 조건부 UPDATE 로 중복 발행 방지
         """
         conn = self._get_connection()
         cursor = conn.cursor()
         sent = 0
+        notices: List[Tuple] = []
         try:
+            conn.execute("BEGIN IMMEDIATE")
             cursor.execute(
                 """
                 SELECT id, user_id, title, body
                 FROM reminders
                 WHERE is_sent = 0
-                  AND datetime(due_at) <= datetime('now')
+                  AND due_at <= datetime('now')
                 ORDER BY due_at ASC
-                LIMIT 50
-                """
+                LIMIT ?
+                """,
+                (int(limit),),
             )
-            rows = cursor.fetchall()
-            for r in rows:
-                uid = int(r["user_id"])
-                cursor.execute(
-                    "INSERT INTO notifications (user_id, title, body, level) VALUES (?, ?, ?, ?)",
-                    (uid, r["title"], r["body"], "info"),
-                )
-                cursor.execute("UPDATE reminders SET is_sent = 1 WHERE id = ?", (int(r["id"]),))
+            for r in cursor.fetchall():
+                rid = int(r["id"])
+                if not self._claim_job(cursor, f"reminder:{rid}", "reminder"):
+                    continue
+                cursor.execute("UPDATE reminders SET is_sent = 1 WHERE id = ? AND is_sent = 0", (rid,))
+                if cursor.rowcount != 1:
+                    continue
+                notices.append((int(r["user_id"]), r["title"], r["body"], "info"))
                 sent += 1
+            self._insert_notifications(cursor, notices)
             conn.commit()
             return sent
         except Exception:
-            try:
-                conn.commit()
-            except Exception:
-                pass
-            return sent
+            conn.rollback()
+            raise
         finally:
             conn.close()
 
     def purchase_skin(self, user_id: int, skin_code: str, price: int, required_level: int) -> tuple[bool, str]:
-        """스킨 구매(코인 차감 + 해금 + 적용)"""
-        user = self.get_user_by_id(int(user_id)) or {}
-        coins = int(user.get("coins") or 0)
-        xp = 0
-        try:
-            xp = int(self.get_xp(int(user_id)) or 0)
-        except Exception:
+        """스킨 구매(코인 차감 + 해금 + 적용) — 한 트랜잭션"""
+        with self.transaction():
+            user = self.get_user_by_id(int(user_id)) or {}
+            coins = int(user.get("coins") or 0)
             xp = 0
-        lvl = self._level_from_xp(xp)
-        if lvl < int(required_level or 1):
-            return False, f"레벨 {required_level} 이상이 필요해요."
-        if coins < int(price or 0):
-            return False, "코인이 부족해요."
+            try:
+                xp = int(self.get_xp(int(user_id)) or 0)
+            except Exception:
+                xp = 0
+            lvl = self._level_from_xp(xp)
+            if lvl < int(required_level or 1):
+                return False, f"레벨 {required_level} 이상이 필요해요."
+            if coins < int(price or 0):
+                return False, "코인이 부족해요."
 
-        # 이미 해금?
-        try:
-            unlocked = set(self.get_unlocked_skins(int(user_id)))
-            if skin_code in unlocked:
-                return False, "이미 보유한 스킨이에요."
-        except Exception:
-            pass
+            # 이미 해금?
+            try:
+                unlocked = set(self.get_unlocked_skins(int(user_id)))
+                if skin_code in unlocked:
+                    return False, "이미 보유한 스킨이에요."
+            except Exception:
+                pass
 
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("UPDATE users SET coins = COALESCE(coins,0) - ? WHERE id = ? AND COALESCE(coins,0) >= ?", (int(price), int(user_id), int(price)))
-            if cursor.rowcount <= 0:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("UPDATE users SET coins = COALESCE(coins,0) - ? WHERE id = ? AND COALESCE(coins,0) >= ?", (int(price), int(user_id), int(price)))
+                if cursor.rowcount <= 0:
+                    conn.commit()
+                    return False, "코인이 부족해요."
                 conn.commit()
-                return False, "코인이 부족해요."
-            conn.commit()
-        finally:
-            conn.close()
+            finally:
+                conn.close()
 
-        self.unlock_skin(int(user_id), skin_code)
-        self.update_user_character_skin_code(int(user_id), skin_code)
-        return True, "구매 완료! 스킨을 적용했어요."
+            self.unlock_skin(int(user_id), skin_code)
+            self.update_user_character_skin_code(int(user_id), skin_code)
+            return True, "구매 완료! 스킨을 적용했어요."
     
     def get_user_by_username(self, username: str) -> Optional[Dict]:
         """사용자명으로 사용자 조회"""
@@ -1368,12 +1289,13 @@ class DatabaseManager:
         cursor = conn.cursor()
         try:
             # 오늘 생성된 대화 세션 찾기
+            start, end = day_range(today, today)
             cursor.execute("""
                 SELECT id FROM conversations 
-                WHERE user_id = ? AND DATE(created_at) = ?
+                WHERE user_id = ? AND created_at >= ? AND created_at < ?
                 ORDER BY created_at DESC
                 LIMIT 1
-            """, (user_id, today.isoformat()))
+            """, (user_id, start, end))
             
             row = cursor.fetchone()
             if row:
@@ -1389,8 +1311,8 @@ class DatabaseManager:
         finally:
             conn.close()
     
-    def save_message(self, conversation_id: int, role: str, content: str):
-        """메시지 저장"""
+    def save_message(self, conversation_id: int, role: str, content: str) -> int:
+        """메시지 저장(return: 메시지 id)"""
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
@@ -1398,50 +1320,202 @@ class DatabaseManager:
                 INSERT INTO messages (conversation_id, role, content)
                 VALUES (?, ?, ?)
             """, (conversation_id, role, content))
+            message_id = cursor.lastrowid
+            # 대화 요약 행(개수/처음/마지막 시각)을 같은 트랜잭션에서 갱신
+            cursor.execute("""
+                UPDATE conversations SET
+                    message_count = message_count + 1,
+                    first_message_at = COALESCE(first_message_at, (SELECT timestamp FROM messages WHERE id = ?)),
+                    last_message_at = (SELECT timestamp FROM messages WHERE id = ?)
+                WHERE id = ?
+            """, (message_id, message_id, conversation_id))
             conn.commit()
+            return message_id
         finally:
             conn.close()
     
     def get_conversation_messages(self, conversation_id: int, limit: int = 10) -> List[Dict]:
-        """대화 메시지 조회 (최근 N개)"""
+        """대화 메시지 조회 (최근 N개, 오래된 순으로 반환)"""
+        return self.get_messages_page(conversation_id, limit=limit)["messages"]
+    
+    def get_messages_page(self, conversation_id: int, before_id: Optional[int] = None, limit: int = 50) -> Dict:
+        """
+        최신순 키셋 페이지(before_id 보다 오래된 메시지 limit 개)
+        - 첫 페이지는 before_id=None, 다음 페이지는 반환된 next_before_id 를 넘김
+        - 보관(archive)된 대화는 압축 보관본에서 같은 방식으로 잘라서 반환
+        return: {"messages": [...](오래된 순), "next_before_id": int|None, "has_more": bool}
+        """
+        limit = max(1, int(limit))
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT archived_at FROM conversations WHERE id = ?", (conversation_id,))
+            conv = cursor.fetchone()
+            if conv and conv["archived_at"]:
+                rows = self._load_archive(cursor, conversation_id)
+                if before_id is not None:
+                    rows = [r for r in rows if int(r["id"]) < int(before_id)]
+                page = rows[-(limit + 1):]
+            else:
+                if before_id is None:
+                    cursor.execute("""
+                        SELECT id, role, content, timestamp
+                        FROM messages
+                        WHERE conversation_id = ?
+                        ORDER BY id DESC
+                        LIMIT ?
+                    """, (conversation_id, limit + 1))
+                else:
+                    cursor.execute("""
+                        SELECT id, role, content, timestamp
+                        FROM messages
+                        WHERE conversation_id = ? AND id < ?
+                        ORDER BY id DESC
+                        LIMIT ?
+                    """, (conversation_id, int(before_id), limit + 1))
+                page = [dict(row) for row in reversed(cursor.fetchall())]
+            has_more = len(page) > limit
+            if has_more:
+                page = page[1:]
+            return {
+                "messages": page,
+                "next_before_id": int(page[0]["id"]) if has_more and page else None,
+                "has_more": has_more,
+            }
+        finally:
+            conn.close()
+    
+    def get_recent_messages(self, conversation_id: int, limit: int = 20, after_id: int = 0) -> List[Dict]:
+        """
+        최근 메시지 N개(id > after_id 중 최신 N개, 오래된 순으로 반환)
+        - messages(conversation_id, id) 인덱스로 읽는 양이 대화 길이와 무관
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
             cursor.execute("""
-                SELECT role, content, timestamp
+                SELECT id, role, content, timestamp
                 FROM messages
-                WHERE conversation_id = ?
-                ORDER BY timestamp ASC
+                WHERE conversation_id = ? AND id > ?
+                ORDER BY id DESC
                 LIMIT ?
-            """, (conversation_id, limit))
+            """, (conversation_id, int(after_id or 0), int(limit)))
             rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return [dict(row) for row in reversed(rows)]
+        finally:
+            conn.close()
+    
+    def get_conversation_context(self, conversation_id: int) -> Dict:
+        """대화 누적 요약 조회. return: {"summary", "summarized_upto"}"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT summary, summarized_upto FROM conversation_context
+                WHERE conversation_id = ?
+            """, (conversation_id,))
+            row = cursor.fetchone()
+            if not row:
+                return {"summary": "", "summarized_upto": 0}
+            return {"summary": row["summary"] or "", "summarized_upto": int(row["summarized_upto"] or 0)}
         finally:
             conn.close()
     
-    def get_user_conversations_by_date(self, user_id: int) -> List[Dict]:
-        """사용자의 날짜별 대화 목록 조회"""
+    def update_conversation_context(self, conversation_id: int, summary: str, summarized_upto: int) -> None:
+        """대화 누적 요약 저장(요약 범위는 앞으로만 이동)"""
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
             cursor.execute("""
+                INSERT INTO conversation_context (conversation_id, summary, summarized_upto, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(conversation_id) DO UPDATE SET
+                    summary = excluded.summary,
+                    summarized_upto = excluded.summarized_upto,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE excluded.summarized_upto > conversation_context.summarized_upto
+            """, (conversation_id, summary or "", int(summarized_upto)))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def get_user_conversations_by_date(self, user_id: int, limit: Optional[int] = None) -> List[Dict]:
+        """사용자의 날짜별 대화 목록 조회(대화 요약 행 기준, messages 를 읽지 않음)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            sql = """
                 SELECT 
-                    c.id as conversation_id,
-                    DATE(c.created_at) as date,
-                    COUNT(m.id) as message_count,
-                    MIN(m.timestamp) as first_message_time,
-                    MAX(m.timestamp) as last_message_time
-                FROM conversations c
-                LEFT JOIN messages m ON c.id = m.conversation_id
-                WHERE c.user_id = ?
-                GROUP BY c.id, DATE(c.created_at)
-                ORDER BY c.created_at DESC
-            """, (user_id,))
+                    id as conversation_id,
+                    DATE(created_at) as date,
+                    message_count,
+                    first_message_at as first_message_time,
+                    last_message_at as last_message_time,
+                    archived_at
+                FROM conversations
+                WHERE user_id = ?
+                ORDER BY created_at DESC
+            """
+            params: list = [user_id]
+            if limit:
+                sql += " LIMIT ?"
+                params.append(int(limit))
+            cursor.execute(sql, tuple(params))
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
         finally:
             conn.close()
     
+    @staticmethod
+    def _load_archive(cursor, conversation_id: int) -> List[Dict]:
+        cursor.execute("SELECT transcript FROM conversation_archives WHERE conversation_id = ?", (conversation_id,))
+        row = cursor.fetchone()
+        if not row:
+            return []
+        return _json.loads(_zlib.decompress(row["transcript"]).decode("utf-8"))
+    
+    def archive_conversations(self, older_than_days: int = 90, limit: int = 50) -> int:
+        """
+        마지막 메시지가 N일 지난 대화를 보관(압축 1행) 후 messages 에서 삭제
+        - 대화 요약 행(개수/시각)은 그대로 유지, get_messages_page 로 계속 열람 가능
+        - 예약 작업에서 조금씩(limit) 처리
+        return: 보관한 대화 수
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                SELECT id FROM conversations
+                WHERE archived_at IS NULL
+                  AND last_message_at < datetime('now', ?)
+                ORDER BY last_message_at
+                LIMIT ?
+            """, (f"-{int(older_than_days)} days", int(limit)))
+            ids = [int(r["id"]) for r in cursor.fetchall()]
+            for cid in ids:
+                cursor.execute("""
+                    SELECT id, role, content, timestamp FROM messages
+                    WHERE conversation_id = ?
+                    ORDER BY id
+                """, (cid,))
+                rows = [dict(r) for r in cursor.fetchall()]
+                blob = _zlib.compress(_json.dumps(rows, ensure_ascii=False).encode("utf-8"), 6)
+                cursor.execute("""
+                    INSERT OR REPLACE INTO conversation_archives (conversation_id, message_count, transcript)
+                    VALUES (?, ?, ?)
+                """, (cid, len(rows), blob))
+                cursor.execute("DELETE FROM messages WHERE conversation_id = ?", (cid,))
+                cursor.execute("DELETE FROM conversation_context WHERE conversation_id = ?", (cid,))
+                cursor.execute("UPDATE conversations SET archived_at = CURRENT_TIMESTAMP WHERE id = ?", (cid,))
+            conn.commit()
+            return len(ids)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
     def get_conversation_by_id(self, conversation_id: int) -> Optional[Dict]:
         """대화 세션 정보 조회"""
         conn = self._get_connection()
@@ -1456,15 +1530,22 @@ class DatabaseManager:
             conn.close()
     
     def get_all_messages_by_conversation(self, conversation_id: int) -> List[Dict]:
-        """대화의 모든 메시지 조회"""
+        """대화의 모든 메시지 조회(보관된 대화 포함)"""
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
+            cursor.execute("SELECT archived_at FROM conversations WHERE id = ?", (conversation_id,))
+            conv = cursor.fetchone()
+            if conv and conv["archived_at"]:
+                return [
+                    {"role": r["role"], "content": r["content"], "timestamp": r["timestamp"]}
+                    for r in self._load_archive(cursor, conversation_id)
+                ]
             cursor.execute("""
                 SELECT role, content, timestamp
                 FROM messages
                 WHERE conversation_id = ?
-                ORDER BY timestamp ASC
+                ORDER BY id ASC
             """, (conversation_id,))
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
@@ -1486,6 +1567,49 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    def _insert_behavior(
+        self,
+        cursor,
+        user_id: int,
+        behavior_type: str,
+        amount: float = None,
+        description: str = None,
+        category: str = None,
+        related_request_id: int = None,
+    ) -> None:
+        """행동 기록 INSERT(+자동저축) — 호출자의 트랜잭션 안에서 실행, 커밋은 호출자가"""
+        # 자동저축: 용돈(allowance) 발생 시 n%를 저축으로 자동 기록
+        auto_pct = 0
+        if str(behavior_type or "").strip() == "allowance" and float(amount or 0) > 0:
+            try:
+                cursor.execute(
+                    "SELECT percent, is_active FROM auto_saving_settings WHERE user_id = ? LIMIT 1",
+                    (int(user_id),),
+                )
+                stg = cursor.fetchone()
+                if stg and int(stg["is_active"] or 0) == 1:
+                    auto_pct = int(stg["percent"] or 0)
+            except sqlite3.Error:
+                auto_pct = 0
+
+        cursor.execute(
+            """
+            INSERT INTO behaviors (user_id, behavior_type, amount, category, description, related_request_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (user_id, behavior_type, amount, category, description, related_request_id),
+        )
+        if auto_pct > 0:
+            save_amt = int(round(float(amount) * (auto_pct / 100.0)))
+            if save_amt > 0:
+                cursor.execute(
+                    """
+                    INSERT INTO behaviors (user_id, behavior_type, amount, category, description, related_request_id)
+                    VALUES (?, 'saving', ?, ?, ?, ?)
+                    """,
+                    (int(user_id), float(save_amt), "자동저축", f"자동저축 {auto_pct}%", None),
+                )
+
     def save_behavior_v2(
         self,
         user_id: int,
@@ -1495,40 +1619,99 @@ class DatabaseManager:
         category: str = None,
         related_request_id: int = None,
     ):
-        """확장 행동 기록 저장(category/request 연동)"""
+        """
+        확장 행동 기록 저장(category/request 연동)
+        - 용돈(allowance) + 자동저축 기록을 한 트랜잭션으로 저장(지갑 원장도 트리거로 함께 갱신)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            self._insert_behavior(cursor, user_id, behavior_type, amount, description, category, related_request_id)
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ========== 지갑 원장 ==========
+
+    _SPEND_TYPES = ("planned_spending", "impulse_buying")
+
+    def get_balance(self, user_id: int) -> Dict:
+        """
+        지갑 잔액(추정) = 용돈 - 저축 - 지출(계획/충동)
+        - wallet_balances 원장에서 읽으므로 기록이 늘어나도 조회 비용이 일정합니다.
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
             cursor.execute(
-                """
-                INSERT INTO behaviors (user_id, behavior_type, amount, category, description, related_request_id)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (user_id, behavior_type, amount, category, description, related_request_id),
+                "SELECT behavior_type, total_amount FROM wallet_balances WHERE user_id = ?",
+                (int(user_id),),
             )
+            totals = {str(r["behavior_type"]): float(r["total_amount"] or 0) for r in cursor.fetchall()}
+        finally:
+            conn.close()
+        total_allowance = totals.get("allowance", 0.0)
+        total_saving = totals.get("saving", 0.0)
+        total_spend = sum(totals.get(t, 0.0) for t in self._SPEND_TYPES)
+        return {
+            "total_allowance": float(total_allowance),
+            "total_saving": float(total_saving),
+            "total_spend": float(total_spend),
+            "balance": float(total_allowance - total_saving - total_spend),
+        }
+
+    def rebuild_wallet_balances(self) -> int:
+        """behaviors 전체로 wallet_balances 재구축. return: 원장 row 수"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("DELETE FROM wallet_balances")
+            cursor.execute(WALLET_REBUILD_SQL)
             conn.commit()
-            # 자동저축: 용돈(allowance) 발생 시 n%를 저축으로 자동 기록
-            try:
-                if str(behavior_type or "").strip() == "allowance" and float(amount or 0) > 0:
-                    stg = self.get_auto_saving_setting(int(user_id))
-                    if stg and int(stg.get("is_active") or 0) == 1:
-                        pct = int(stg.get("percent") or 0)
-                        if pct > 0:
-                            save_amt = int(round(float(amount) * (pct / 100.0)))
-                            if save_amt > 0:
-                                cursor.execute(
-                                    """
-                                    INSERT INTO behaviors (user_id, behavior_type, amount, category, description, related_request_id)
-                                    VALUES (?, 'saving', ?, ?, ?, ?)
-                                    """,
-                                    (int(user_id), float(save_amt), "자동저축", f"자동저축 {pct}%", None),
-                                )
-                                conn.commit()
-            except Exception:
-                pass
+            cursor.execute("SELECT COUNT(*) as cnt FROM wallet_balances")
+            return int(cursor.fetchone()["cnt"] or 0)
         finally:
             conn.close()
 
+    def verify_wallet_balances(self, tolerance: float = 0.005) -> List[Dict]:
+        """
+        원장 vs behaviors 전체 합계 비교.
+        return: 불일치 목록 [{"user_id", "behavior_type", "ledger", "actual", "ledger_count", "actual_count"}]
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT user_id, behavior_type, COALESCE(SUM(amount), 0) as actual, COUNT(*) as actual_count
+                FROM behaviors
+                GROUP BY user_id, behavior_type
+                """
+            )
+            actual = {(int(r["user_id"]), str(r["behavior_type"])): (float(r["actual"]), int(r["actual_count"])) for r in cursor.fetchall()}
+            cursor.execute("SELECT user_id, behavior_type, total_amount, entry_count FROM wallet_balances")
+            ledger = {(int(r["user_id"]), str(r["behavior_type"])): (float(r["total_amount"]), int(r["entry_count"])) for r in cursor.fetchall()}
+        finally:
+            conn.close()
+
+        mismatches: List[Dict] = []
+        for key in sorted(set(actual) | set(ledger)):
+            a_amt, a_cnt = actual.get(key, (0.0, 0))
+            l_amt, l_cnt = ledger.get(key, (0.0, 0))
+            if abs(a_amt - l_amt) > tolerance or a_cnt != l_cnt:
+                mismatches.append(
+                    {
+                        "user_id": key[0],
+                        "behavior_type": key[1],
+                        "ledger": l_amt,
+                        "actual": a_amt,
+                        "ledger_count": l_cnt,
+                        "actual_count": a_cnt,
+                    }
+                )
+        return mismatches
+
     # ========== 자동저축 ==========
 
     def get_auto_saving_setting(self, user_id: int) -> Optional[Dict]:
@@ -1562,6 +1745,55 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    @staticmethod
+    def _last_week_bounds(today: _date) -> Tuple[_date, _date, str]:
+        """지난 주(월~일)와 week_key('YYYY-Www')"""
+        this_monday = today - _timedelta(days=today.weekday())
+        last_monday = this_monday - _timedelta(days=7)
+        last_sunday = this_monday - _timedelta(days=1)
+        iso = last_monday.isocalendar()
+        return last_monday, last_sunday, f"{iso.year}-W{int(iso.week):02d}"
+
+    def _grant_autosave_weekly_bonus(self, cursor, user_id: int, pct: int, bonus_coins: int, today: _date) -> tuple[bool, str]:
+        """주간 자동저축 보상 1명 처리(호출자 트랜잭션 안에서, 커밋은 호출자가)"""
+        last_monday, last_sunday, week_key = self._last_week_bounds(today)
+
+        # 이미 보상 받았나?
+        cursor.execute(
+            "SELECT 1 FROM auto_saving_weekly_rewards WHERE user_id = ? AND week_key = ? LIMIT 1",
+            (int(user_id), week_key),
+        )
+        if cursor.fetchone():
+            return False, "이미 지난주 보상을 받았어요."
+
+        start, end = day_range(last_monday, last_sunday)
+        cursor.execute(_sql.AUTOSAVE_WEEK_SUMS_SQL, (int(user_id), start, end))
+        row = cursor.fetchone()
+        allow_sum = float((row["allow_sum"] if row else 0) or 0)
+        auto_save_sum = float((row["auto_save_sum"] if row else 0) or 0)
+        if allow_sum <= 0:
+            return False, "지난주에 받은 용돈이 없어서 보상이 없어요."
+        expected = allow_sum * (pct / 100.0)
+        if auto_save_sum + 0.0001 < expected:
+            return False, "지난주 자동저축 달성이 부족해요."
+
+        # 보상 지급(코인): (user_id, week_key) UNIQUE 를 먼저 선점해 동시 세션 중복 지급 방지
+        cursor.execute(
+            "INSERT OR IGNORE INTO auto_saving_weekly_rewards (user_id, week_key) VALUES (?, ?)",
+            (int(user_id), week_key),
+        )
+        if cursor.rowcount != 1 or not self._claim_job(cursor, f"autosave:{int(user_id)}:{week_key}", "autosave_weekly"):
+            return False, "이미 지난주 보상을 받았어요."
+        cursor.execute(
+            "UPDATE users SET coins = COALESCE(coins,0) + ? WHERE id = ?",
+            (int(bonus_coins), int(user_id)),
+        )
+        cursor.execute(
+            "INSERT INTO notifications (user_id, title, body, level) VALUES (?, ?, ?, ?)",
+            (int(user_id), "주간 자동저축 보상! 🪙", f"지난주 자동저축 달성으로 코인 +{int(bonus_coins)}", "success"),
+        )
+        return True, f"지난주 보상으로 코인 +{int(bonus_coins)} 지급!"
+
     def try_grant_autosave_weekly_bonus(self, user_id: int, bonus_coins: int = 20) -> tuple[bool, str]:
         """
         자동저축 주간 보상(간단 버전)
@@ -1577,82 +1809,51 @@ class DatabaseManager:
         if pct <= 0:
             return False, "자동저축 비율이 0%예요."
 
-        today = _date.today()
-        # 이번 주 월요일
-        this_monday = today - _timedelta(days=today.weekday())
-        # 지난 주 월~일
-        last_monday = this_monday - _timedelta(days=7)
-        last_sunday = this_monday - _timedelta(days=1)
-        iso = last_monday.isocalendar()
-        week_key = f"{iso.year}-W{int(iso.week):02d}"
-
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            # 이미 보상 받았나?
-            cursor.execute(
-                "SELECT 1 FROM auto_saving_weekly_rewards WHERE user_id = ? AND week_key = ? LIMIT 1",
-                (int(user_id), week_key),
-            )
-            if cursor.fetchone():
-                return False, "이미 지난주 보상을 받았어요."
-
-            start = last_monday.isoformat()
-            end = last_sunday.isoformat()
-
-            cursor.execute(
-                """
-                SELECT COALESCE(SUM(amount),0) as s
-                FROM behaviors
-                WHERE user_id = ?
-                  AND behavior_type = 'allowance'
-                  AND date(timestamp) BETWEEN ? AND ?
-                """,
-                (int(user_id), start, end),
-            )
-            row = cursor.fetchone()
-            allow_sum = float((row["s"] if row else 0) or 0)
-            if allow_sum <= 0:
-                return False, "지난주에 받은 용돈이 없어서 보상이 없어요."
+            conn.execute("BEGIN IMMEDIATE")
+            ok, msg = self._grant_autosave_weekly_bonus(cursor, int(user_id), pct, int(bonus_coins), _date.today())
+            conn.commit()
+            return ok, msg
+        except Exception:
+            conn.rollback()
+            return False, "보상 처리에 실패했어요."
+        finally:
+            conn.close()
 
+    def run_autosave_weekly_bonuses(self, bonus_coins: int = 20) -> int:
+        """
+        자동저축을 켠 모든 아이에게 지난주 보상을 일괄 지급(예약 작업용)
+        return: 지급 건수
+        """
+        today = _date.today()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        granted = 0
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            _m, _s, week_key = self._last_week_bounds(today)
             cursor.execute(
                 """
-                SELECT COALESCE(SUM(amount),0) as s
-                FROM behaviors
-                WHERE user_id = ?
-                  AND behavior_type = 'saving'
-                  AND COALESCE(category,'') = '자동저축'
-                  AND date(timestamp) BETWEEN ? AND ?
+                SELECT s.user_id, s.percent
+                FROM auto_saving_settings s
+                WHERE s.is_active = 1 AND s.percent > 0
+                  AND NOT EXISTS (
+                      SELECT 1 FROM auto_saving_weekly_rewards w
+                      WHERE w.user_id = s.user_id AND w.week_key = ?
+                  )
                 """,
-                (int(user_id), start, end),
-            )
-            row = cursor.fetchone()
-            auto_save_sum = float((row["s"] if row else 0) or 0)
-            expected = allow_sum * (pct / 100.0)
-            if auto_save_sum + 0.0001 < expected:
-                return False, "지난주 자동저축 달성이 부족해요."
-
-            # 보상 지급(코인)
-            cursor.execute(
-                "UPDATE users SET coins = COALESCE(coins,0) + ? WHERE id = ?",
-                (int(bonus_coins), int(user_id)),
-            )
-            cursor.execute(
-                "INSERT INTO auto_saving_weekly_rewards (user_id, week_key) VALUES (?, ?)",
-                (int(user_id), week_key),
-            )
-            cursor.execute(
-                "INSERT INTO notifications (user_id, title, body, level) VALUES (?, ?, ?, ?)",
-                (int(user_id), "주간 자동저축 보상! 🪙", f"지난주 자동저축 달성으로 코인 +{int(bonus_coins)}", "success"),
+                (week_key,),
             )
+            for r in cursor.fetchall():
+                ok, _msg = self._grant_autosave_weekly_bonus(cursor, int(r["user_id"]), int(r["percent"]), int(bonus_coins), today)
+                granted += 1 if ok else 0
             conn.commit()
-            return True, f"지난주 보상으로 코인 +{int(bonus_coins)} 지급!"
+            return granted
         except Exception:
-            try:
-                conn.commit()
-            except Exception:
-                pass
-            return False, "보상 처리에 실패했어요."
+            conn.rollback()
+            raise
         finally:
             conn.close()
 
@@ -1749,16 +1950,10 @@ class DatabaseManager:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            q = """
-                SELECT COALESCE(SUM(amount),0) as s
-                FROM behaviors
-                WHERE user_id = ?
-                  AND behavior_type IN ('planned_spending','impulse_buying','spend')
-                  AND date(timestamp) BETWEEN ? AND ?
-            """
-            params = [int(user_id), str(start_date), str(end_date)]
+            q = _sql.SUM_SPEND_IN_RANGE_SQL
+            params = [int(user_id), *day_range(start_date, end_date)]
             if category:
-                q += " AND COALESCE(category,'') = ?"
+                q += _sql.SPEND_CATEGORY_FILTER_SQL
                 params.append(str(category))
             cursor.execute(q, params)
             row = cursor.fetchone()
@@ -1770,26 +1965,49 @@ class DatabaseManager:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(
-                """
-                SELECT COALESCE(SUM(amount),0) as s
-                FROM behaviors
-                WHERE user_id = ?
-                  AND behavior_type = 'saving'
-                  AND date(timestamp) = ?
-                """,
-                (int(user_id), str(day)),
-            )
+            cursor.execute(_sql.SUM_SAVING_IN_RANGE_SQL, (int(user_id), *day_range(day, day)))
             row = cursor.fetchone()
             return float((row["s"] if row else 0) or 0)
         finally:
             conn.close()
 
-    def compute_challenge_progress(self, inst: Dict) -> Dict:
+    _CHALLENGE_SPEND_TYPES = ("planned_spending", "impulse_buying", "spend")
+
+    def _load_challenge_series(self, cursor, user_id: int, insts: List[Dict], today: str) -> Tuple[Dict, Dict]:
         """
-        inst: get_challenge_instances()의 row(dict)
-        return: {"progress":0~1, "summary":str, "can_finalize":bool, "is_success":bool|None}
+        챌린지 진행도 계산용 데이터를 한 번에 로드
+        - series: {(date, behavior_type, category): amount}  (모든 챌린지 기간을 덮는 구간 1회 GROUP BY)
+        - checkins: {instance_id: [checkin_date, ...]}
         """
+        days: List[str] = [today]
+        for inst in insts:
+            for k in ("start_date", "end_date"):
+                v = str(inst.get(k) or "")[:10]
+                try:
+                    days.append(_date.fromisoformat(v).isoformat())
+                except Exception:
+                    pass
+
+        series: Dict[Tuple[str, str, str], float] = {}
+        start, end = day_range(min(days), max(days))
+        cursor.execute(_sql.CHALLENGE_SERIES_SQL, (int(user_id), start, end))
+        for r in cursor.fetchall():
+            series[(str(r["d"]), str(r["behavior_type"] or ""), str(r["cat"]))] = float(r["s"] or 0)
+
+        checkins: Dict[int, List[str]] = {}
+        habit_ids = [int(i["id"]) for i in insts if str(i.get("challenge_type") or "").strip() == "habit_custom"]
+        if habit_ids:
+            placeholders = ",".join(["?"] * len(habit_ids))
+            cursor.execute(
+                f"SELECT instance_id, checkin_date FROM challenge_checkins WHERE instance_id IN ({placeholders})",
+                tuple(habit_ids),
+            )
+            for r in cursor.fetchall():
+                checkins.setdefault(int(r["instance_id"]), []).append(str(r["checkin_date"]))
+        return series, checkins
+
+    def _evaluate_challenge(self, inst: Dict, series: Dict, checkins: Dict, today: str) -> Dict:
+        """_load_challenge_series() 결과로 챌린지 1개 진행도 계산(쿼리 없음)"""
         ctype = str(inst.get("challenge_type") or "").strip()
         start_date = str(inst.get("start_date") or "")
         end_date = str(inst.get("end_date") or "")
@@ -1799,24 +2017,37 @@ class DatabaseManager:
         except Exception:
             params = {}
 
-        uid = int(inst.get("user_id"))
-        today = _date.today().isoformat()
         can_finalize = today > end_date
 
+        def _spend(lo: str, hi: str, category: Optional[str] = None) -> float:
+            return sum(
+                amt
+                for (d, t, cat), amt in series.items()
+                if t in self._CHALLENGE_SPEND_TYPES and lo <= d <= hi and (category is None or cat == category)
+            )
+
+        def _saving_by_date() -> Dict[str, float]:
+            out: Dict[str, float] = {}
+            for (d, t, _cat), amt in series.items():
+                if t == "saving" and start_date <= d <= end_date:
+                    out[d] = out.get(d, 0.0) + amt
+            return out
+
         if ctype == "spend_cap":
             cap = float(params.get("cap_amount") or 0)
-            spent = self._sum_spend_in_range(uid, start_date, min(today, end_date))
+            spent = _spend(start_date, min(today, end_date))
             prog = 0.0 if cap <= 0 else min(1.0, spent / cap)
             remaining = cap - spent
             is_success = None
             if can_finalize:
-                total = self._sum_spend_in_range(uid, start_date, end_date)
+                total = _spend(start_date, end_date)
                 is_success = bool(total <= cap)
             return {
                 "progress": float(prog),
                 "summary": f"소비 {int(spent):,}원 / 목표 {int(cap):,}원 · 남은 {int(max(0, remaining)):,}원",
                 "can_finalize": bool(can_finalize),
                 "is_success": is_success,
+                "detail": {"spent": spent, "spent_today": _spend(today, today)},
             }
 
         if ctype == "reduce_category":
@@ -1824,11 +2055,11 @@ class DatabaseManager:
             baseline = float(params.get("baseline_amount") or 0)
             pct = float(params.get("reduction_pct") or 10)
             target = baseline * (1.0 - (pct / 100.0))
-            cur = self._sum_spend_in_range(uid, start_date, min(today, end_date), category=cat or None)
+            cur = _spend(start_date, min(today, end_date), category=cat or None)
             prog = 0.0 if target <= 0 else min(1.0, cur / target)
             is_success = None
             if can_finalize:
-                total = self._sum_spend_in_range(uid, start_date, end_date, category=cat or None)
+                total = _spend(start_date, end_date, category=cat or None)
                 is_success = bool(total <= target)
             label = cat or "카테고리"
             return {
@@ -1836,6 +2067,7 @@ class DatabaseManager:
                 "summary": f"{label} 소비 {int(cur):,}원 / 목표 {int(target):,}원(기준 {int(baseline):,}원 대비 {int(pct)}%↓)",
                 "can_finalize": bool(can_finalize),
                 "is_success": is_success,
+                "detail": {"spent": cur, "spent_today": _spend(today, today, category=cat or None)},
             }
 
         if ctype in ("daily_save_fixed", "daily_save_increasing"):
@@ -1845,14 +2077,14 @@ class DatabaseManager:
             except Exception:
                 return {"progress": 0.0, "summary": "기간 정보가 올바르지 않아요.", "can_finalize": False, "is_success": None}
 
+            saved_by_date = _saving_by_date()
             days_total = max(1, (e - s).days + 1)
             met = 0
+            met_all = 0
             required_today = 0
             for i in range(days_total):
                 d = (s + _timedelta(days=i)).isoformat()
-                if d > today:
-                    continue
-                saved = self._sum_saving_on_date(uid, d)
+                saved = saved_by_date.get(d, 0.0)
                 if ctype == "daily_save_fixed":
                     req = float(params.get("daily_amount") or 0)
                 else:
@@ -1861,26 +2093,15 @@ class DatabaseManager:
                     req = start_amt + inc * i
                 if d == today:
                     required_today = int(req)
-                if saved >= req and req > 0:
-                    met += 1
+                ok = saved >= req and req > 0
+                if ok:
+                    met_all += 1
+                    if d <= today:
+                        met += 1
 
             prog = min(1.0, met / float(days_total))
-            is_success = None
-            if can_finalize:
-                # 모든 날짜 충족했는지 재평가(전체)
-                met_all = 0
-                for i in range(days_total):
-                    d = (s + _timedelta(days=i)).isoformat()
-                    saved = self._sum_saving_on_date(uid, d)
-                    if ctype == "daily_save_fixed":
-                        req = float(params.get("daily_amount") or 0)
-                    else:
-                        start_amt = float(params.get("start_amount") or 500)
-                        inc = float(params.get("daily_increment") or 100)
-                        req = start_amt + inc * i
-                    if saved >= req and req > 0:
-                        met_all += 1
-                is_success = bool(met_all >= days_total)
+            # 정산 시에는 모든 날짜 충족 여부(전체)
+            is_success = bool(met_all >= days_total) if can_finalize else None
 
             title = "하루 저축" if ctype == "daily_save_fixed" else "점점 늘리는 저축"
             return {
@@ -1888,26 +2109,13 @@ class DatabaseManager:
                 "summary": f"{title} · 달성 {met}/{days_total}일 (오늘 목표 {int(required_today):,}원)",
                 "can_finalize": bool(can_finalize),
                 "is_success": is_success,
+                "detail": {"saved_by_date": saved_by_date},
             }
 
         if ctype == "habit_custom":
             target = int(params.get("target_count") or 7)
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            try:
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) as cnt
-                    FROM challenge_checkins c
-                    WHERE c.instance_id = ?
-                      AND c.checkin_date BETWEEN ? AND ?
-                    """,
-                    (int(inst.get("id")), start_date, min(today, end_date)),
-                )
-                row = cursor.fetchone()
-                cnt = int((row["cnt"] if row else 0) or 0)
-            finally:
-                conn.close()
+            hi = min(today, end_date)
+            cnt = sum(1 for d in checkins.get(int(inst.get("id") or 0), []) if start_date <= d <= hi)
             prog = 0.0 if target <= 0 else min(1.0, cnt / float(target))
             is_success = None
             if can_finalize:
@@ -1921,62 +2129,131 @@ class DatabaseManager:
 
         return {"progress": 0.0, "summary": "지원되지 않는 챌린지 타입이에요.", "can_finalize": False, "is_success": None}
 
-    def finalize_challenge_if_due(self, instance_id: int) -> Optional[Dict]:
-        """기간 종료 후 정산(완료/실패 처리 + 보상 지급)"""
+    def compute_progress_bulk(self, user_id: int, instances: Optional[List[Dict]] = None) -> Dict[int, Dict]:
+        """
+        사용자의 챌린지 진행도를 한 번에 계산(챌린지 수/기간과 무관하게 쿼리 2~3번)
+        instances: get_challenge_instances() rows (없으면 진행 중(active) 전체)
+        return: {instance_id: compute_challenge_progress()와 같은 dict (+ "detail")}
+        """
+        insts = instances if instances is not None else self.get_challenge_instances(user_id, status="active", limit=200)
+        insts = [i for i in insts if int(i.get("user_id") or user_id) == int(user_id)]
+        if not insts:
+            return {}
+        today = _date.today().isoformat()
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
+            series, checkins = self._load_challenge_series(cursor, int(user_id), insts, today)
+        finally:
+            conn.close()
+        return {int(i["id"]): self._evaluate_challenge(i, series, checkins, today) for i in insts}
+
+    def compute_challenge_progress(self, inst: Dict) -> Dict:
+        """
+        inst: get_challenge_instances()의 row(dict)
+        return: {"progress":0~1, "summary":str, "can_finalize":bool, "is_success":bool|None}
+        """
+        uid = int(inst.get("user_id"))
+        today = _date.today().isoformat()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            series, checkins = self._load_challenge_series(cursor, uid, [inst], today)
+        finally:
+            conn.close()
+        return self._evaluate_challenge(inst, series, checkins, today)
+
+    def _finalize_challenge(self, cursor, inst: Dict, today: str) -> Dict:
+        """챌린지 1개 정산(호출자 트랜잭션 안에서, 커밋은 호출자가). 멱등 키 'challenge:<id>'"""
+        if str(inst.get("status")) != "active":
+            return inst
+        series, checkins = self._load_challenge_series(cursor, int(inst.get("user_id")), [inst], today)
+        prog = self._evaluate_challenge(inst, series, checkins, today)
+        if not prog.get("can_finalize"):
+            return inst
+        is_success = prog.get("is_success")
+        if is_success is None:
+            return inst
+
+        instance_id = int(inst["id"])
+        new_status = "completed" if is_success else "failed"
+        cursor.execute(
+            "UPDATE challenge_instances SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'active'",
+            (new_status, instance_id),
+        )
+        if cursor.rowcount != 1 or not self._claim_job(cursor, f"challenge:{instance_id}", "challenge_finalize"):
+            return inst
+        # 보상 지급(성공 시)
+        if is_success:
+            r_amount = float(inst.get("reward_amount") or 0)
+            r_coins = int(inst.get("reward_coins") or 0)
+            uid = int(inst.get("user_id"))
+            if r_amount > 0:
+                cursor.execute(
+                    """
+                    INSERT INTO behaviors (user_id, behavior_type, amount, category, description)
+                    VALUES (?, 'allowance', ?, '챌린지', ?)
+                    """,
+                    (uid, float(r_amount), f"챌린지 보상: {inst.get('template_title') or ''}"),
+                )
+            if r_coins > 0:
+                cursor.execute("UPDATE users SET coins = COALESCE(coins,0) + ? WHERE id = ?", (r_coins, uid))
             cursor.execute(
-                """
-                SELECT i.*, t.title as template_title, t.challenge_type, t.params_json, t.reward_amount, t.reward_coins
-                FROM challenge_instances i
-                JOIN challenge_templates t ON t.id = i.template_id
-                WHERE i.id = ?
-                LIMIT 1
-                """,
-                (int(instance_id),),
+                "INSERT INTO notifications (user_id, title, body, level) VALUES (?, ?, ?, ?)",
+                (uid, "챌린지 성공! 🎉", f"{inst.get('template_title')} 보상을 받았어요!", "success"),
             )
+        inst["status"] = new_status
+        return inst
+
+    _CHALLENGE_INSTANCE_SQL = """
+        SELECT i.*, t.title as template_title, t.challenge_type, t.params_json, t.reward_amount, t.reward_coins
+        FROM challenge_instances i
+        JOIN challenge_templates t ON t.id = i.template_id
+    """
+
+    def finalize_challenge_if_due(self, instance_id: int) -> Optional[Dict]:
+        """기간 종료 후 정산(완료/실패 처리 + 보상 지급)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor.execute(self._CHALLENGE_INSTANCE_SQL + " WHERE i.id = ? LIMIT 1", (int(instance_id),))
             row = cursor.fetchone()
             if not row:
+                conn.rollback()
                 return None
-            inst = dict(row)
-            if str(inst.get("status")) != "active":
-                return inst
-
-            prog = self.compute_challenge_progress(inst)
-            if not prog.get("can_finalize"):
-                return inst
-            is_success = prog.get("is_success")
-            if is_success is None:
-                return inst
-
-            new_status = "completed" if is_success else "failed"
+            inst = self._finalize_challenge(cursor, dict(row), _date.today().isoformat())
+            conn.commit()
+            return inst
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def finalize_due_challenges(self, limit: int = 200) -> int:
+        """
+        기간이 끝난 진행 중 챌린지를 일괄 정산(예약 작업용)
+        return: 정산(완료/실패 처리)된 건수
+        """
+        today = _date.today().isoformat()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        done = 0
+        try:
+            conn.execute("BEGIN IMMEDIATE")
             cursor.execute(
-                "UPDATE challenge_instances SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?",
-                (new_status, int(instance_id)),
+                self._CHALLENGE_INSTANCE_SQL + " WHERE i.status = 'active' AND i.end_date < ? ORDER BY i.end_date ASC LIMIT ?",
+                (today, int(limit)),
             )
-            # 보상 지급(성공 시)
-            if is_success:
-                r_amount = float(inst.get("reward_amount") or 0)
-                r_coins = int(inst.get("reward_coins") or 0)
-                uid = int(inst.get("user_id"))
-                if r_amount > 0:
-                    cursor.execute(
-                        """
-                        INSERT INTO behaviors (user_id, behavior_type, amount, category, description)
-                        VALUES (?, 'allowance', ?, '챌린지', ?)
-                        """,
-                        (uid, float(r_amount), f"챌린지 보상: {inst.get('template_title') or ''}"),
-                    )
-                if r_coins > 0:
-                    cursor.execute("UPDATE users SET coins = COALESCE(coins,0) + ? WHERE id = ?", (r_coins, uid))
-                cursor.execute(
-                    "INSERT INTO notifications (user_id, title, body, level) VALUES (?, ?, ?, ?)",
-                    (uid, "챌린지 성공! 🎉", f"{inst.get('template_title')} 보상을 받았어요!", "success"),
-                )
+            for row in cursor.fetchall():
+                inst = self._finalize_challenge(cursor, dict(row), today)
+                done += 1 if inst.get("status") in ("completed", "failed") else 0
             conn.commit()
-            inst["status"] = new_status
-            return inst
+            return done
+        except Exception:
+            conn.rollback()
+            raise
         finally:
             conn.close()
 
@@ -2164,32 +2441,6 @@ class DatabaseManager:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            # ✅ Cloud/구버전 DB 방어: goals/goal_contributions 테이블이 없으면 먼저 생성
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS goals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    title TEXT NOT NULL,
-                    target_amount REAL NOT NULL DEFAULT 0,
-                    is_active INTEGER NOT NULL DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS goal_contributions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    goal_id INTEGER NOT NULL,
-                    amount REAL NOT NULL DEFAULT 0,
-                    note TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            conn.commit()
-
             if active_only:
                 cursor.execute(
                     "SELECT * FROM goals WHERE user_id = ? AND is_active = 1 ORDER BY created_at DESC",
@@ -2209,19 +2460,6 @@ class DatabaseManager:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            # ✅ Cloud/구버전 DB 방어
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS goal_contributions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    goal_id INTEGER NOT NULL,
-                    amount REAL NOT NULL DEFAULT 0,
-                    note TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            conn.commit()
             cursor.execute(
                 "INSERT INTO goal_contributions (goal_id, amount, note) VALUES (?, ?, ?)",
                 (goal_id, amount, note),
@@ -2235,19 +2473,6 @@ class DatabaseManager:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            # ✅ Cloud/구버전 DB 방어
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS goal_contributions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    goal_id INTEGER NOT NULL,
-                    amount REAL NOT NULL DEFAULT 0,
-                    note TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            conn.commit()
             cursor.execute("SELECT SUM(amount) as total FROM goal_contributions WHERE goal_id = ?", (goal_id,))
             row = cursor.fetchone()
             return float(row["total"] or 0)
@@ -2266,6 +2491,32 @@ class DatabaseManager:
 
     # ========== 알림 ==========
 
+    @staticmethod
+    def _notification_row(item) -> Tuple[int, str, Optional[str], str]:
+        """dict 또는 (user_id, title[, body[, level]]) → INSERT 파라미터"""
+        if isinstance(item, dict):
+            return (
+                int(item["user_id"]),
+                str(item["title"]),
+                item.get("body"),
+                item.get("level") or "info",
+            )
+        user_id, title, *rest = item
+        body = rest[0] if rest else None
+        level = (rest[1] if len(rest) > 1 else None) or "info"
+        return int(user_id), str(title), body, level
+
+    @classmethod
+    def _insert_notifications(cls, cursor, items) -> int:
+        """알림 일괄 INSERT — 호출자의 트랜잭션 안에서 실행(읽지 않은 카운터는 트리거가 갱신)"""
+        rows = [cls._notification_row(it) for it in items]
+        if rows:
+            cursor.executemany(
+                "INSERT INTO notifications (user_id, title, body, level) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
     def create_notification(self, user_id: int, title: str, body: str = None, level: str = "info") -> int:
         conn = self._get_connection()
         cursor = conn.cursor()
@@ -2279,11 +2530,34 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    def create_notifications(self, notifications: List) -> int:
+        """
+        알림 여러 건을 한 트랜잭션으로 발행(형제 전체 알림, 예약 작업 등)
+        notifications: [{"user_id", "title", "body"?, "level"?}] 또는 (user_id, title, body, level) 튜플
+        return: 발행 건수
+        """
+        items = list(notifications or [])
+        if not items:
+            return 0
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            count = self._insert_notifications(cursor, items)
+            conn.commit()
+            return count
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
     def get_notifications(self, user_id: int, unread_only: bool = True, limit: int = 20):
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
             if unread_only:
+                # idx_notifications_user_read_created 범위를 역순으로 읽음(정렬 없음)
                 cursor.execute(
                     """
                     SELECT * FROM notifications
@@ -2308,16 +2582,52 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    def get_unread_notification_count(self, user_id: int) -> int:
+        """읽지 않은 알림 수(notification_counters 기본키 조회 1회)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT unread_count FROM notification_counters WHERE user_id = ?", (int(user_id),))
+            row = cursor.fetchone()
+            return max(int(row["unread_count"] or 0), 0) if row else 0
+        finally:
+            conn.close()
+
     def mark_notification_read(self, notification_id: int) -> bool:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("UPDATE notifications SET is_read = 1 WHERE id = ?", (notification_id,))
+            cursor.execute("UPDATE notifications SET is_read = 1 WHERE id = ? AND is_read = 0", (notification_id,))
             conn.commit()
             return cursor.rowcount > 0
         finally:
             conn.close()
 
+    def mark_all_notifications_read(self, user_id: int) -> int:
+        """사용자의 읽지 않은 알림 전체 읽음 처리(UPDATE 1회). return: 처리 건수"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("UPDATE notifications SET is_read = 1 WHERE user_id = ? AND is_read = 0", (int(user_id),))
+            conn.commit()
+            return int(cursor.rowcount or 0)
+        finally:
+            conn.close()
+
+    def rebuild_notification_counters(self) -> int:
+        """notification_counters 를 notifications 전체로 재구축. return: 카운터 row 수"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("DELETE FROM notification_counters")
+            cursor.execute(NOTIFICATION_COUNTER_REBUILD_SQL)
+            conn.commit()
+            cursor.execute("SELECT COUNT(*) as cnt FROM notification_counters")
+            return int(cursor.fetchone()["cnt"] or 0)
+        finally:
+            conn.close()
+
     # ========== 정기 용돈 자동 실행 ==========
 
     def _next_run_for_recurring(self, row: Dict, today: _date) -> _date:
@@ -2350,16 +2660,20 @@ class DatabaseManager:
             m += 1
         return _safe_date(y, m, dom)
 
-    def run_due_recurring_allowances(self) -> int:
+    def run_due_recurring_allowances(self, limit: int = 200) -> int:
         """
         정기 용돈: next_run <= today 인 항목을 자동 지급.
-        - 스케줄러가 없으므로 앱 실행/페이지 진입 시 호출하는 방식
+        - 예약 작업(services.scheduler)에서 호출. 한 트랜잭션으로 일괄 처리
+        - 멱등 키 'recurring:<id>:<next_run>' 로 같은 회차 중복 지급 방지
         - 지급 후 next_run 갱신
         """
         today = _date.today()
         conn = self._get_connection()
         cursor = conn.cursor()
+        processed = 0
+        notices: List[Tuple] = []
         try:
+            conn.execute("BEGIN IMMEDIATE")
             cursor.execute(
                 """
                 SELECT ra.*, u.name as child_name
@@ -2367,61 +2681,59 @@ class DatabaseManager:
                 JOIN users u ON ra.child_id = u.id
                 WHERE ra.is_active = 1
                   AND ra.next_run IS NOT NULL
-                  AND date(ra.next_run) <= date('now')
+                  AND ra.next_run < ?
                 ORDER BY ra.next_run ASC
-                """
+                LIMIT ?
+                """,
+                ((today + _timedelta(days=1)).isoformat(), int(limit)),
             )
             due = [dict(r) for r in cursor.fetchall()]
+            for r in due:
+                rid = int(r["id"])
+                child_id = int(r["child_id"])
+                amount = float(r.get("amount") or 0)
+                freq = r.get("frequency")
+                memo = r.get("memo") or ""
+                run_key = str(r.get("next_run") or "")[:10]
+
+                # next_run 갱신
+                try:
+                    next_run = self._next_run_for_recurring(r, today)
+                except Exception:
+                    next_run = today + _timedelta(days=7)
+                cursor.execute(
+                    "UPDATE recurring_allowances SET next_run = ? WHERE id = ? AND next_run = ?",
+                    (next_run.isoformat(), rid, r.get("next_run")),
+                )
+                if cursor.rowcount != 1 or not self._claim_job(cursor, f"recurring:{rid}:{run_key}", "recurring_allowance"):
+                    continue
+
+                # 지급 기록 + 알림
+                self._insert_behavior(
+                    cursor,
+                    child_id,
+                    "allowance",
+                    amount,
+                    description=f"정기 용돈 지급({('매주' if freq=='weekly' else '매월')}) {memo}".strip(),
+                    category="정기용돈",
+                )
+                notices.append((child_id, "정기 용돈이 들어왔어요!", f"{int(amount):,}원을 받았어요.", "success"))
+                processed += 1
+            self._insert_notifications(cursor, notices)
+            conn.commit()
+            return processed
+        except Exception:
+            conn.rollback()
+            raise
         finally:
             conn.close()
 
-        processed = 0
-        for r in due:
-            rid = int(r["id"])
-            child_id = int(r["child_id"])
-            amount = float(r.get("amount") or 0)
-            freq = r.get("frequency")
-            memo = r.get("memo") or ""
-
-            # 지급 기록 + 알림
-            self.save_behavior_v2(
-                child_id,
-                "allowance",
-                amount,
-                description=f"정기 용돈 지급({('매주' if freq=='weekly' else '매월')}) {memo}".strip(),
-                category="정기용돈",
-            )
-            self.create_notification(child_id, "정기 용돈이 들어왔어요!", f"{int(amount):,}원을 받았어요.", level="success")
-
-            # next_run 갱신
-            try:
-                next_run = self._next_run_for_recurring(r, today)
-            except Exception:
-                next_run = today + _timedelta(days=7)
-
-            conn2 = self._get_connection()
-            cur2 = conn2.cursor()
-            try:
-                cur2.execute("UPDATE recurring_allowances SET next_run = ? WHERE id = ?", (next_run.isoformat(), rid))
-                conn2.commit()
-            finally:
-                conn2.close()
-
-            processed += 1
-
-        return processed
-    
     def get_user_behaviors(self, user_id: int, limit: int = 100) -> List[Dict]:
         """사용자의 행동 기록 조회"""
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("""
-                SELECT * FROM behaviors
-                WHERE user_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (user_id, limit))
+            cursor.execute(_sql.USER_BEHAVIORS_SQL, (user_id, limit))
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
         finally:
@@ -2488,53 +2800,353 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    _HABIT_METRICS = (
+        ("impulse_cnt", "b.behavior_type = 'impulse_buying'", "1"),
+        ("planned_cnt", "b.behavior_type = 'planned_spending'", "1"),
+        ("delayed_cnt", "b.behavior_type = 'delayed_gratification'", "1"),
+        ("comparing_cnt", "b.behavior_type = 'comparing_prices'", "1"),
+        ("saving_cnt", "b.behavior_type = 'saving'", "1"),
+        ("saving_amt", "b.behavior_type = 'saving'", "COALESCE(b.amount, 0)"),
+        ("spend_amt", "b.behavior_type IN ('planned_spending', 'impulse_buying')", "COALESCE(b.amount, 0)"),
+        ("total_cnt", "1", "1"),
+    )
+
+    def get_habit_counts(
+        self,
+        parent_code: Optional[str] = None,
+        user_ids: Optional[List[int]] = None,
+        windows: Tuple[Optional[int], ...] = (None,),
+        latest_rows: Optional[int] = 1000,
+    ) -> Dict[int, Dict[Optional[int], Dict[str, float]]]:
+        """
+        습관 점수용 집계(아이 계정 전체를 한 번의 GROUP BY로)
+        - parent_code 로 가족 제한, user_ids 를 주면 그 사용자들만(계정 유형 무관), 둘 다 없으면 모든 아이
+        - windows: 기간(일) 목록. None 은 '최근 latest_rows 건' 기준(기존 analyze_and_save 와 동일)
+        return: {user_id: {window: {impulse_cnt, planned_cnt, delayed_cnt, comparing_cnt,
+                                    saving_cnt, saving_amt, spend_amt, total_cnt}}}
+                 (기록이 없는 아이도 0으로 포함)
+        """
+        where = ["u.user_type = 'child'"] if user_ids is None else ["1"]
+        params: list = []
+        if parent_code:
+            where.append("u.parent_code = ?")
+            params.append(str(parent_code))
+        if user_ids is not None:
+            ids = [int(x) for x in user_ids]
+            if not ids:
+                return {}
+            where.append("u.id IN ({})".format(",".join(["?"] * len(ids))))
+            params.extend(ids)
+        user_where = " AND ".join(where)
+
+        conds: List[Tuple[str, list]] = []
+        for w in windows:
+            if w is None:
+                conds.append(("rn <= ?", [int(latest_rows)]) if latest_rows else ("1", []))
+            else:
+                conds.append(("b.timestamp >= datetime('now', ?)", [f"-{int(w)} days"]))
+
+        cols: List[str] = []
+        col_params: list = []
+        for i, (cond, cparams) in enumerate(conds):
+            for name, pred, value in self._HABIT_METRICS:
+                cols.append(f"COALESCE(SUM(CASE WHEN {cond} AND {pred} THEN {value} END), 0) AS w{i}_{name}")
+                col_params.extend(cparams)
+
+        # 기간 창만 있으면 가장 긴 창 밖의 기록은 읽지 않음(인덱스 범위 검색)
+        ts_where = ""
+        ts_params: list = []
+        if None not in windows and windows:
+            ts_where = "AND b.timestamp >= datetime('now', ?)"
+            ts_params = [f"-{max(int(w) for w in windows)} days"]
+
+        sql = f"""
+            WITH b AS (
+                SELECT b.user_id, b.behavior_type, b.amount, b.timestamp,
+                       ROW_NUMBER() OVER (PARTITION BY b.user_id ORDER BY b.timestamp DESC, b.id DESC) AS rn
+                FROM behaviors b
+                JOIN users u ON u.id = b.user_id
+                WHERE {user_where} {ts_where}
+            )
+            SELECT b.user_id, {", ".join(cols)}
+            FROM b
+            GROUP BY b.user_id
+        """
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT u.id FROM users u WHERE {user_where}", tuple(params))
+            out: Dict[int, Dict[Optional[int], Dict[str, float]]] = {
+                int(r["id"]): {w: {name: 0 for name, _p, _v in self._HABIT_METRICS} for w in windows}
+                for r in cursor.fetchall()
+            }
+            cursor.execute(sql, tuple(params + ts_params + col_params))
+            for r in cursor.fetchall():
+                uid = int(r["user_id"])
+                per_user = out.setdefault(uid, {})
+                for i, w in enumerate(windows):
+                    per_user[w] = {name: r[f"w{i}_{name}"] or 0 for name, _p, _v in self._HABIT_METRICS}
+            return out
+        finally:
+            conn.close()
+
+    def save_scores_bulk(self, rows: List[Tuple[int, float, float, float]]) -> int:
+        """금융습관 점수 일괄 저장. rows: [(user_id, impulsivity, saving_tendency, patience), ...]"""
+        if not rows:
+            return 0
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(
+                "INSERT INTO scores (user_id, impulsivity, saving_tendency, patience) VALUES (?, ?, ?, ?)",
+                [(int(u), float(i), float(s), float(p)) for u, i, s, p in rows],
+            )
+            conn.commit()
+            return len(rows)
+        finally:
+            conn.close()
+
     # ========== 홈 통계 ==========
 
+    @staticmethod
+    def _month_range(period: Optional[str]) -> Tuple[str, str, str]:
+        """'YYYY-MM' → ('YYYY-MM', 'YYYY-MM-01', 다음달 'YYYY-MM-01') (반열림 구간)"""
+        try:
+            y, m = [int(x) for x in str(period or "").split("-")[:2]]
+            start = _date(y, m, 1)
+        except Exception:
+            t = _date.today()
+            start = _date(t.year, t.month, 1)
+        end = _date(start.year + 1, 1, 1) if start.month == 12 else _date(start.year, start.month + 1, 1)
+        return start.strftime("%Y-%m"), start.isoformat(), end.isoformat()
+
+    @analytics_read
+    def get_family_summary(self, parent_code: str, period: Optional[str] = None) -> Dict:
+        """
+        부모 리포트용 가족 집계(자녀 N명이어도 쿼리 3번)
+        - 누적 합계/잔액: wallet_balances 원장
+        - 기간(period='YYYY-MM', 기본 이번 달) 합계: 일별 롤업(behavior_daily)을 (자녀, 타입, 카테고리)로 1회 GROUP BY
+        - 미션 완료 수: 누적/기간/최근 7일
+        return: {"period", "start", "end", "children": [...], "spend_by_category": {...}, "period_rows": [...], "totals": {...}}
+        """
+        ym, start, end = self._month_range(period)
+        out: Dict = {
+            "period": ym,
+            "start": start,
+            "end": end,
+            "children": [],
+            "spend_by_category": {},
+            "period_rows": [],
+            "totals": {},
+        }
+        if not parent_code:
+            return out
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT u.id, u.name, u.username, w.behavior_type, w.total_amount
+                FROM users u
+                LEFT JOIN wallet_balances w ON w.user_id = u.id
+                WHERE u.parent_code = ? AND u.user_type = 'child'
+                ORDER BY u.name, u.id
+                """,
+                (str(parent_code),),
+            )
+            children: Dict[int, Dict] = {}
+            for r in cursor.fetchall():
+                cid = int(r["id"])
+                ch = children.get(cid)
+                if ch is None:
+                    ch = {
+                        "id": cid,
+                        "name": r["name"] or r["username"] or f"ID {cid}",
+                        "username": r["username"] or "",
+                        "_totals": {},
+                        "period_allowance": 0.0,
+                        "period_saving": 0.0,
+                        "period_planned": 0.0,
+                        "period_impulse": 0.0,
+                        "missions_completed": 0,
+                        "missions_completed_period": 0,
+                        "missions_completed_7d": 0,
+                    }
+                    children[cid] = ch
+                if r["behavior_type"] is not None:
+                    ch["_totals"][str(r["behavior_type"])] = float(r["total_amount"] or 0)
+
+            cursor.execute(_sql.FAMILY_PERIOD_TOTALS_SQL, (str(parent_code), start, end))
+            period_rows = [
+                {
+                    "user_id": int(r["user_id"]),
+                    "behavior_type": str(r["behavior_type"] or ""),
+                    "category": str(r["category"]),
+                    "amount": float(r["amount"] or 0),
+                    "count": int(r["cnt"] or 0),
+                }
+                for r in cursor.fetchall()
+            ]
+
+            cursor.execute(_sql.FAMILY_MISSIONS_COMPLETED_SQL, (start, end, str(parent_code)))
+            mission_rows = cursor.fetchall()
+        finally:
+            conn.close()
+
+        period_key = {
+            "allowance": "period_allowance",
+            "saving": "period_saving",
+            "planned_spending": "period_planned",
+            "impulse_buying": "period_impulse",
+        }
+        spend_by_cat: Dict[str, float] = {}
+        for r in period_rows:
+            ch = children.get(r["user_id"])
+            key = period_key.get(r["behavior_type"])
+            if ch is not None and key:
+                ch[key] += r["amount"]
+            if r["behavior_type"] in self._SPEND_TYPES:
+                spend_by_cat[r["category"]] = spend_by_cat.get(r["category"], 0.0) + r["amount"]
+
+        for r in mission_rows:
+            ch = children.get(int(r["user_id"]))
+            if ch is not None:
+                ch["missions_completed"] = int(r["total"] or 0)
+                ch["missions_completed_period"] = int(r["in_period"] or 0)
+                ch["missions_completed_7d"] = int(r["last_7d"] or 0)
+
+        totals: Dict[str, float] = {}
+        for ch in children.values():
+            t = ch.pop("_totals")
+            ch["total_allowance"] = t.get("allowance", 0.0)
+            ch["total_saving"] = t.get("saving", 0.0)
+            ch["total_spend"] = sum(t.get(x, 0.0) for x in self._SPEND_TYPES)
+            ch["balance"] = ch["total_allowance"] - ch["total_saving"] - ch["total_spend"]
+            ch["period_spend"] = ch["period_planned"] + ch["period_impulse"]
+            for k, v in ch.items():
+                if k not in ("id", "name", "username"):
+                    totals[k] = totals.get(k, 0) + v
+
+        out["children"] = list(children.values())
+        out["spend_by_category"] = dict(sorted(spend_by_cat.items(), key=lambda x: x[1], reverse=True))
+        out["period_rows"] = period_rows
+        out["totals"] = totals
+        return out
+
+    @analytics_read
     def get_children_monthly_savings(self, parent_code: str) -> List[Dict]:
         """부모 코드로 연결된 모든 자녀의 최근 6개월간 월별 저축 합계 조회"""
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("""
-                SELECT 
-                    strftime('%m', b.timestamp) as month,
-                    SUM(b.amount) as total_amount
-                FROM behaviors b
-                JOIN users u ON b.user_id = u.id
-                WHERE u.parent_code = ? 
-                AND u.user_type = 'child'
-                AND b.behavior_type = 'saving'
-                AND b.timestamp >= date('now', '-6 months')
-                GROUP BY month
-                ORDER BY month ASC
-            """, (parent_code,))
+            # 일별 롤업(behavior_daily) 기준: 자녀별 6개월 ≈ 최대 180행
+            cursor.execute(_sql.CHILDREN_MONTHLY_SAVINGS_SQL, (parent_code,))
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
         finally:
             conn.close()
 
+    @analytics_read
     def get_children_behavior_stats_this_month(self, parent_code: str) -> Dict:
         """이번 달 자녀들의 금융 활동 통계 조회"""
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
             # 이번 달 저축 총액, 어제 저축액, 현재 잔액(가상)
-            cursor.execute("""
-                SELECT 
-                    SUM(CASE WHEN behavior_type = 'saving' THEN amount ELSE 0 END) as monthly_total,
-                    SUM(CASE WHEN behavior_type = 'saving' AND date(timestamp) = date('now', '-1 day') THEN amount ELSE 0 END) as yesterday_total
-                FROM behaviors b
-                JOIN users u ON b.user_id = u.id
-                WHERE u.parent_code = ? 
-                AND u.user_type = 'child'
-                AND strftime('%m', b.timestamp) = strftime('%m', 'now')
-                AND strftime('%Y', b.timestamp) = strftime('%Y', 'now')
-            """, (parent_code,))
+            cursor.execute(_sql.CHILDREN_STATS_THIS_MONTH_SQL, (parent_code,))
             row = cursor.fetchone()
             return dict(row) if row else {"monthly_total": 0, "yesterday_total": 0}
         finally:
             conn.close()
 
+    # ========== 일별 롤업(behavior_daily / emotion_daily) ==========
+
+    @analytics_read
+    def get_behavior_daily(self, user_id: int, days: int = 30) -> List[Dict]:
+        """
+        최근 N일 일별 행동 롤업(차트용)
+        return: [{"day", "behavior_type", "category", "total_amount", "entry_count"}, ...] (날짜순)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(_sql.BEHAVIOR_DAILY_RECENT_SQL, (int(user_id), f"-{int(days)} day"))
+            return [dict(r) for r in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    @analytics_read
+    def get_emotion_daily(self, user_id: int, days: int = 30) -> List[Dict]:
+        """
+        최근 N일 일별 감정 롤업(차트용)
+        return: [{"day", "emotion", "context", "entry_count"}, ...] (날짜순)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(_sql.EMOTION_DAILY_RECENT_SQL, (int(user_id), f"-{int(days)} day"))
+            return [dict(r) for r in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def rebuild_daily_rollups(self, since: Optional[str] = None) -> Dict[str, int]:
+        """
+        원본(behaviors/emotion_logs)으로 일별 롤업 재구축(백필). since='YYYY-MM-DD' 면 그 날짜 이후만
+        return: {"behavior_daily": 행 수, "emotion_daily": 행 수}
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for sql, params in rollup_rebuild_sql(since):
+                cursor.execute(sql, params)
+            conn.commit()
+            out = {}
+            for table in ("behavior_daily", "emotion_daily"):
+                cursor.execute(f"SELECT COUNT(*) as cnt FROM {table}")
+                out[table] = int(cursor.fetchone()["cnt"] or 0)
+            return out
+        finally:
+            conn.close()
+
+    def verify_daily_rollups(self, tolerance: float = 0.005) -> List[Dict]:
+        """
+        롤업 vs 원본 전체 집계 비교.
+        return: 불일치 목록 [{"table", "key", "rollup", "actual"}] (값은 (금액, 건수) 또는 건수)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(BEHAVIOR_DAILY_SELECT_SQL.format(where=""))
+            b_actual = {
+                (int(r["user_id"]), r["day"], r["behavior_type"], r["category"]): (float(r["total_amount"]), int(r["entry_count"]))
+                for r in cursor.fetchall()
+            }
+            cursor.execute("SELECT user_id, day, behavior_type, category, total_amount, entry_count FROM behavior_daily")
+            b_rollup = {
+                (int(r["user_id"]), r["day"], r["behavior_type"], r["category"]): (float(r["total_amount"]), int(r["entry_count"]))
+                for r in cursor.fetchall()
+            }
+            cursor.execute(EMOTION_DAILY_SELECT_SQL.format(where=""))
+            e_actual = {(int(r["user_id"]), r["day"], r["emotion"], r["context"]): int(r["entry_count"]) for r in cursor.fetchall()}
+            cursor.execute("SELECT user_id, day, emotion, context, entry_count FROM emotion_daily")
+            e_rollup = {(int(r["user_id"]), r["day"], r["emotion"], r["context"]): int(r["entry_count"]) for r in cursor.fetchall()}
+        finally:
+            conn.close()
+
+        mismatches: List[Dict] = []
+        for key in sorted(set(b_actual) | set(b_rollup)):
+            a_amt, a_cnt = b_actual.get(key, (0.0, 0))
+            r_amt, r_cnt = b_rollup.get(key, (0.0, 0))
+            if abs(a_amt - r_amt) > tolerance or a_cnt != r_cnt:
+                mismatches.append({"table": "behavior_daily", "key": key, "rollup": (r_amt, r_cnt), "actual": (a_amt, a_cnt)})
+        for key in sorted(set(e_actual) | set(e_rollup)):
+            if e_actual.get(key, 0) != e_rollup.get(key, 0):
+                mismatches.append({"table": "emotion_daily", "key": key, "rollup": e_rollup.get(key, 0), "actual": e_actual.get(key, 0)})
+        return mismatches
+
     def get_child_stats(self, user_id: int) -> Dict:
         """개별 자녀의 통계 정보 조회"""
         conn = self._get_connection()
@@ -2551,3 +3163,33 @@ class DatabaseManager:
             return dict(row) if row else {"activity_count": 0, "total_savings": 0}
         finally:
             conn.close()
+
+
+_shared: Dict[str, DatabaseManager] = {}
+_shared_lock = _threading.Lock()
+
+
+def get_db_manager(db_path: str = None) -> DatabaseManager:
+    """
+    프로세스 전역 공유 DatabaseManager 반환(페이지/서비스 공용).
+    - DB 파일 경로(또는 URL)별 1개 인스턴스
+    - 스키마 마이그레이션은 최초 1회만 실행
+    """
+    path = db_path or Config.DATABASE_URL or Config.DATABASE_PATH
+    # sqlite:///data/x.db 와 data/x.db 는 같은 파일 → 같은 인스턴스
+    key = backend_key(path)
+    inst = _shared.get(key)
+    if inst is not None:
+        return inst
+    with _shared_lock:
+        inst = _shared.get(key)
+        if inst is None:
+            inst = DatabaseManager(path)
+            _shared[key] = inst
+        return inst
+
+
+# AMF_DB_INSTRUMENT=1 이면 쿼리 계측 켜기(database/instrumentation.py)
+from database import instrumentation as _instrumentation  # noqa: E402
+
+_instrumentation.enable_from_env()
@@ -0,0 +1,164 @@
+"""
+로컬 테스트용 가짜 DB 서버 드라이버(DB-API 2.0, paramstyle="format")
+
+    AMF_DATABASE_URL=fake://shared
+
+- 같은 이름의 fake:// 는 프로세스 안에서 하나의 인메모리 DB(SQLite shared cache)를 공유
+  → 여러 DatabaseManager / 커넥션이 같은 '서버'를 보는 상황을 흉내냄
+- '%s' 자리표시자와 '%%' 이스케이프를 받으므로 DriverBackend 의 SQL 변환 경로를 그대로 거칩니다.
+- 예외는 드라이버 고유 클래스로 던져서 sqlite3 예외로의 변환도 함께 검증됩니다.
+"""
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from typing import Dict
+
+
+apilevel = "2.0"
+threadsafety = 2
+paramstyle = "format"
+
+
+class Error(Exception):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class IntegrityError(DatabaseError):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+class ProgrammingError(DatabaseError):
+    pass
+
+
+_ERRORS = (
+    (sqlite3.IntegrityError, IntegrityError),
+    (sqlite3.OperationalError, OperationalError),
+    (sqlite3.ProgrammingError, ProgrammingError),
+    (sqlite3.Error, DatabaseError),
+)
+
+# 인메모리 DB 는 마지막 커넥션이 닫히면 사라지므로 이름별로 1개를 붙잡아 둠
+_anchors: Dict[str, sqlite3.Connection] = {}
+_anchors_lock = threading.Lock()
+
+_FORMAT_RE = re.compile(r"%%|%s")
+
+
+def _uri(name: str) -> str:
+    return f"file:amf_fake_{name}?mode=memory&cache=shared"
+
+
+def _to_qmark(sql: str) -> str:
+    return _FORMAT_RE.sub(lambda m: "%" if m.group(0) == "%%" else "?", sql)
+
+
+def _wrap(e: sqlite3.Error) -> Error:
+    for src, dst in _ERRORS:
+        if isinstance(e, src):
+            return dst(str(e))
+    return Error(str(e))
+
+
+class Cursor:
+    def __init__(self, conn: sqlite3.Connection):
+        self._cur = conn.cursor()
+
+    def execute(self, sql: str, params=None):
+        try:
+            if params is None:
+                self._cur.execute(sql)
+            else:
+                self._cur.execute(_to_qmark(sql), tuple(params))
+        except sqlite3.Error as e:
+            raise _wrap(e) from e
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        try:
+            self._cur.executemany(_to_qmark(sql), [tuple(p) for p in seq_of_params])
+        except sqlite3.Error as e:
+            raise _wrap(e) from e
+        return self
+
+    def executescript(self, script: str):
+        try:
+            self._cur.executescript(script)
+        except sqlite3.Error as e:
+            raise _wrap(e) from e
+        return self
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchmany(self, size: int = 1):
+        return self._cur.fetchmany(size)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    def close(self) -> None:
+        self._cur.close()
+
+
+class Connection:
+    def __init__(self, name: str):
+        try:
+            self._conn = sqlite3.connect(_uri(name), uri=True, check_same_thread=False, timeout=5.0)
+        except sqlite3.Error as e:
+            raise _wrap(e) from e
+        # 서버 DB 처럼 첫 문장에서 트랜잭션이 시작되고 commit() 까지 유지
+        self._conn.isolation_level = "DEFERRED"
+        self._conn.execute("PRAGMA foreign_keys = ON")
+
+    def cursor(self) -> Cursor:
+        return Cursor(self._conn)
+
+    def commit(self) -> None:
+        try:
+            self._conn.commit()
+        except sqlite3.Error as e:
+            raise _wrap(e) from e
+
+    def rollback(self) -> None:
+        self._conn.rollback()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def connect(name: str = "default") -> Connection:
+    with _anchors_lock:
+        if name not in _anchors:
+            _anchors[name] = sqlite3.connect(_uri(name), uri=True, check_same_thread=False)
+    return Connection(name)
+
+
+def drop(name: str = "default") -> None:
+    """이름에 해당하는 가짜 서버 DB 폐기(열린 커넥션이 모두 닫히면 메모리 해제)"""
+    with _anchors_lock:
+        anchor = _anchors.pop(name, None)
+    if anchor is not None:
+        anchor.close()
@@ -0,0 +1,153 @@
+"""
+핫 경로 조회 SQL - DatabaseManager / utils.db 가 실행하는 문장을 그대로 담은 상수
+
+- 여기 있는 문자열을 실행하는 쪽과 실행 계획 점검(database/query_plans.py HOT_QUERIES)이 함께 import
+  → 쿼리를 고치면 점검 대상도 같이 바뀜(손으로 복사한 SQL 이 실제 쿼리와 어긋나지 않게)
+- 조건이 붙는 쿼리는 기본 문장 + 덧붙이는 조각(..._FILTER_SQL) 또는 {where}/{order_by} 템플릿으로 둠
+- 컬럼을 date()/strftime() 으로 감싸지 말고 반열림 구간(>= ? AND < ?)으로 비교(인덱스 사용)
+"""
+
+# ---------- behaviors(원본) ----------
+
+# _sum_spend_in_range: (user_id, start, end) [+ category]
+SUM_SPEND_IN_RANGE_SQL = """
+    SELECT COALESCE(SUM(amount),0) as s
+    FROM behaviors
+    WHERE user_id = ?
+      AND behavior_type IN ('planned_spending','impulse_buying','spend')
+      AND timestamp >= ? AND timestamp < ?
+"""
+SPEND_CATEGORY_FILTER_SQL = " AND COALESCE(category,'') = ?"
+
+# _sum_saving_on_date: (user_id, start, end)
+SUM_SAVING_IN_RANGE_SQL = """
+    SELECT COALESCE(SUM(amount),0) as s
+    FROM behaviors
+    WHERE user_id = ?
+      AND behavior_type = 'saving'
+      AND timestamp >= ? AND timestamp < ?
+"""
+
+# _grant_autosave_weekly_bonus: (user_id, start, end)
+AUTOSAVE_WEEK_SUMS_SQL = """
+    SELECT
+        COALESCE(SUM(CASE WHEN behavior_type = 'allowance' THEN amount END), 0) as allow_sum,
+        COALESCE(SUM(CASE WHEN behavior_type = 'saving' AND COALESCE(category,'') = '자동저축' THEN amount END), 0) as auto_save_sum
+    FROM behaviors
+    WHERE user_id = ?
+      AND behavior_type IN ('allowance', 'saving')
+      AND timestamp >= ? AND timestamp < ?
+"""
+
+# _load_challenge_series: (user_id, start, end)
+CHALLENGE_SERIES_SQL = """
+    SELECT date(timestamp) as d, behavior_type, COALESCE(category,'') as cat, COALESCE(SUM(amount),0) as s
+    FROM behaviors
+    WHERE user_id = ?
+      AND timestamp >= ? AND timestamp < ?
+    GROUP BY d, behavior_type, cat
+"""
+
+# get_user_behaviors: (user_id, limit)
+USER_BEHAVIORS_SQL = """
+    SELECT * FROM behaviors
+    WHERE user_id = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+# ---------- 부모 리포트(get_family_summary 등) ----------
+
+# get_family_summary 기간 합계: (parent_code, start, end)
+FAMILY_PERIOD_TOTALS_SQL = """
+    SELECT d.user_id,
+           d.behavior_type,
+           COALESCE(NULLIF(TRIM(d.category), ''), '기타') as category,
+           COALESCE(SUM(d.total_amount), 0) as amount,
+           SUM(d.entry_count) as cnt
+    FROM behavior_daily d
+    JOIN users u ON u.id = d.user_id
+    WHERE u.parent_code = ? AND u.user_type = 'child'
+      AND d.day >= ? AND d.day < ?
+    GROUP BY d.user_id, d.behavior_type, COALESCE(NULLIF(TRIM(d.category), ''), '기타')
+"""
+
+# get_family_summary 미션 완료 수: (start, end, parent_code)
+FAMILY_MISSIONS_COMPLETED_SQL = """
+    SELECT a.user_id,
+           COUNT(*) as total,
+           SUM(CASE WHEN a.completed_at >= ? AND a.completed_at < ? THEN 1 ELSE 0 END) as in_period,
+           SUM(CASE WHEN a.completed_at >= datetime('now', '-7 days') THEN 1 ELSE 0 END) as last_7d
+    FROM mission_assignments a
+    JOIN users u ON u.id = a.user_id
+    WHERE u.parent_code = ? AND u.user_type = 'child'
+      AND a.status = 'completed'
+    GROUP BY a.user_id
+"""
+
+# get_children_monthly_savings: (parent_code,)
+CHILDREN_MONTHLY_SAVINGS_SQL = """
+    SELECT
+        strftime('%m', d.day) as month,
+        SUM(d.total_amount) as total_amount
+    FROM behavior_daily d
+    JOIN users u ON d.user_id = u.id
+    WHERE u.parent_code = ?
+    AND u.user_type = 'child'
+    AND d.behavior_type = 'saving'
+    AND d.day >= date('now', '-6 months')
+    GROUP BY month
+    ORDER BY month ASC
+"""
+
+# get_children_behavior_stats_this_month: (parent_code,)
+CHILDREN_STATS_THIS_MONTH_SQL = """
+    SELECT
+        SUM(CASE WHEN behavior_type = 'saving' THEN total_amount ELSE 0 END) as monthly_total,
+        SUM(CASE WHEN behavior_type = 'saving' AND d.day = date('now', '-1 day')
+                 THEN total_amount ELSE 0 END) as yesterday_total
+    FROM behavior_daily d
+    JOIN users u ON d.user_id = u.id
+    WHERE u.parent_code = ?
+    AND u.user_type = 'child'
+    AND d.day >= date('now', 'start of month')
+    AND d.day < date('now', 'start of month', '+1 month')
+"""
+
+# ---------- 성장 차트(일별 롤업) ----------
+
+# get_behavior_daily: (user_id, '-N day')
+BEHAVIOR_DAILY_RECENT_SQL = """
+    SELECT day, behavior_type, category, total_amount, entry_count
+    FROM behavior_daily
+    WHERE user_id = ? AND day >= date('now', ?)
+    ORDER BY day
+"""
+
+# get_emotion_daily: (user_id, '-N day')
+EMOTION_DAILY_RECENT_SQL = """
+    SELECT day, emotion, context, entry_count
+    FROM emotion_daily
+    WHERE user_id = ? AND day >= date('now', ?)
+    ORDER BY day
+"""
+
+# ---------- 감정 기록 ----------
+
+# get_emotion_logs: (user_id, limit)
+EMOTION_LOGS_RECENT_SQL = """
+    SELECT *
+    FROM emotion_logs
+    WHERE user_id = ?
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+"""
+
+# utils.db 감정 컬렉션 find()/count_documents(): where 는 "user_id = ?" [+ emotion IN (...)] [+ created_at >= ?]
+EMOTIONS_FIND_SQL = """
+    SELECT id, user_id, context, emotion, note, created_at
+    FROM emotion_logs
+    WHERE {where}
+    ORDER BY {order_by}
+"""
+EMOTIONS_COUNT_SQL = "SELECT COUNT(*) AS cnt FROM emotion_logs WHERE {where}"
@@ -0,0 +1,508 @@
+"""
+DB 계측(instrumentation) - 어떤 DatabaseManager 메서드/SQL 이 화면 렌더 시간을 잡아먹는지 측정
+
+켜는 법: 환경변수 AMF_DB_INSTRUMENT=1 (또는 코드에서 enable())
+- 커넥션 풀이 계측 프록시를 돌려줌 → 커넥션 대여 수, SQL 문장별 호출 수/시간/행 수 기록
+- DatabaseManager 공개 메서드를 감싸서 메서드별 호출 수/시간/SQL 수/커넥션 대여 수 기록
+  (중첩 호출은 가장 바깥 메서드에 합산 = 페이지가 실제로 부른 단위)
+- 느린 쿼리: AMF_DB_SLOW_MS(기본 100ms) 이상이면 로그(amf.db.slow) + 최근 200건 보관
+- 구간 기록: 전체 누적 + rerun 단위(run key 제공 함수를 등록하면 세션별 직전 rerun 요약)
+- 메서드 호출 리스너: add_call_listener(fn) → fn(메서드, ms) (utils/profiler.py 가 DB 구간으로 사용)
+- 내보내기: export_json(path) / export_prometheus(path)
+  AMF_DB_METRICS_EXPORT=data/metrics/db.prom(.json) 이면 프로세스 종료 시 자동 저장
+꺼져 있으면 원래 풀/메서드를 그대로 쓰므로 비용이 없습니다.
+"""
+from __future__ import annotations
+
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, List, Optional
+
+
+logger = logging.getLogger("amf.db.slow")
+
+DEFAULT_SLOW_MS = 100.0
+SLOW_LOG_SIZE = 200
+MAX_SQL_KEY = 300
+# 세션별 rerun 기록 보관 수(오래된 세션부터 버림)
+MAX_RUN_KEYS = 200
+
+# 계측하지 않는 메서드(풀/계측 자체)
+_SKIP_METHODS = {"connection", "pool_stats"}
+
+_STR_RE = re.compile(r"'(?:[^']|'')*'")
+_NUM_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """리터럴을 ? 로, IN (?, ?, ...) 을 (?...) 로, 공백 1칸으로 → 같은 모양의 쿼리는 같은 키"""
+    s = _STR_RE.sub("?", str(sql or ""))
+    s = _NUM_RE.sub("?", s)
+    s = _WS_RE.sub(" ", s).strip()
+    s = _IN_RE.sub("(?...)", s)
+    return s[:MAX_SQL_KEY]
+
+
+def _new_entry() -> Dict[str, float]:
+    return {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+
+
+class Recorder:
+    """메서드/SQL 별 누적 카운터(한 구간: 전체 또는 rerun 1번)"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.methods: Dict[str, Dict[str, float]] = {}
+        self.statements: Dict[str, Dict[str, float]] = {}
+        self.connections = 0
+        self.queries = 0
+        self.query_ms = 0.0
+
+    def add_query(self, method: str, sql_key: str, ms: float, rows: int) -> None:
+        self.queries += 1
+        self.query_ms += ms
+        st = self.statements.get(sql_key)
+        if st is None:
+            st = self.statements[sql_key] = {**_new_entry(), "method": method}
+        st["calls"] += 1
+        st["total_ms"] += ms
+        st["rows"] += rows
+        if ms > st["max_ms"]:
+            st["max_ms"] = ms
+        m = self._method(method)
+        m["queries"] += 1
+        m["query_ms"] += ms
+        m["rows"] += rows
+
+    def add_fetch(self, method: str, sql_key: str, ms: float, rows: int) -> None:
+        # fetch 시간/행 수는 직전에 실행한 문장에 합산
+        self.query_ms += ms
+        st = self.statements.get(sql_key)
+        if st is not None:
+            st["total_ms"] += ms
+            st["rows"] += rows
+        m = self._method(method)
+        m["query_ms"] += ms
+        m["rows"] += rows
+
+    def add_connection(self, method: str) -> None:
+        self.connections += 1
+        self._method(method)["connections"] += 1
+
+    def add_call(self, method: str, ms: float) -> None:
+        m = self._method(method)
+        m["calls"] += 1
+        m["total_ms"] += ms
+        if ms > m["max_ms"]:
+            m["max_ms"] = ms
+
+    def _method(self, name: str) -> Dict[str, float]:
+        m = self.methods.get(name)
+        if m is None:
+            m = self.methods[name] = {**_new_entry(), "queries": 0, "query_ms": 0.0, "connections": 0}
+        return m
+
+    def summary(self, top: int = 20) -> Dict:
+        def _rows(d: Dict[str, Dict], key_name: str) -> List[Dict]:
+            items = sorted(d.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)[:top]
+            return [{key_name: k, **{f: (round(v, 3) if isinstance(v, float) else v) for f, v in e.items()}} for k, e in items]
+
+        return {
+            "started_at": self.started_at,
+            "elapsed_sec": round(time.time() - self.started_at, 3),
+            "connections": self.connections,
+            "queries": self.queries,
+            "query_ms": round(self.query_ms, 3),
+            "methods": _rows(self.methods, "method"),
+            "statements": _rows(self.statements, "sql"),
+        }
+
+
+# ---------- 전역 상태 ----------
+
+_lock = threading.RLock()
+_enabled = False
+_slow_ms = DEFAULT_SLOW_MS
+_total = Recorder()
+_slow_log: Deque[Dict] = deque(maxlen=SLOW_LOG_SIZE)
+# run key → (현재 rerun Recorder) / 세션 키 → 직전 rerun 요약
+_runs: Dict[Hashable, Recorder] = {}
+_last_runs: Dict[Hashable, Recorder] = {}
+_run_key_provider: Optional[Callable[[], Optional[tuple]]] = None
+# 바깥 메서드 호출이 끝날 때마다 (메서드 이름, ms) 로 불리는 함수들(렌더 프로파일러 등)
+_call_listeners: List[Callable[[str, float], None]] = []
+_originals: Dict[str, Callable] = {}
+
+# 현재 실행 중인 (가장 바깥) DatabaseManager 메서드 이름
+_current_method: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("amf_db_method", default=None)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_run_key_provider(fn: Optional[Callable[[], Optional[tuple]]]) -> None:
+    """
+    rerun 구분 키 제공 함수 등록. fn() → (세션 키, rerun 키) 또는 None
+    세션 키가 같고 rerun 키가 바뀌면 이전 rerun 기록을 '직전 rerun'으로 확정합니다.
+    """
+    global _run_key_provider
+    _run_key_provider = fn
+
+
+def add_call_listener(fn: Callable[[str, float], None]) -> None:
+    """메서드 호출 완료 알림 등록(멱등). 리스너 예외는 무시"""
+    with _lock:
+        if fn not in _call_listeners:
+            _call_listeners.append(fn)
+
+
+def remove_call_listener(fn: Callable[[str, float], None]) -> None:
+    with _lock:
+        if fn in _call_listeners:
+            _call_listeners.remove(fn)
+
+
+def _recorders() -> List[Recorder]:
+    recs = [_total]
+    fn = _run_key_provider
+    if fn is None:
+        return recs
+    try:
+        key = fn()
+    except Exception:
+        key = None
+    if not key:
+        return recs
+    session_key, run_key = key
+    rec = _runs.get(session_key)
+    if rec is None or getattr(rec, "run_key", None) != run_key:
+        if rec is not None:
+            _last_runs[session_key] = rec
+        rec = Recorder()
+        rec.run_key = run_key  # type: ignore[attr-defined]
+        _runs[session_key] = rec
+        if len(_runs) > MAX_RUN_KEYS:
+            oldest = next(iter(_runs))
+            _runs.pop(oldest, None)
+            _last_runs.pop(oldest, None)
+    recs.append(rec)
+    return recs
+
+
+def _method_name() -> str:
+    return _current_method.get() or "(direct)"
+
+
+def _record_query(sql: str, ms: float, rows: int, many: int = 0) -> str:
+    key = normalize_sql(sql)
+    method = _method_name()
+    with _lock:
+        for rec in _recorders():
+            rec.add_query(method, key, ms, rows)
+        if ms >= _slow_ms:
+            entry = {"at": time.time(), "method": method, "ms": round(ms, 3), "rows": rows, "sql": key}
+            if many:
+                entry["batch"] = many
+            _slow_log.append(entry)
+    if ms >= _slow_ms:
+        logger.warning("slow query %.1fms [%s] %s", ms, method, key)
+    return key
+
+
+def _record_fetch(key: Optional[str], ms: float, rows: int) -> None:
+    if key is None:
+        return
+    method = _method_name()
+    with _lock:
+        for rec in _recorders():
+            rec.add_fetch(method, key, ms, rows)
+
+
+def _record_connection() -> None:
+    method = _method_name()
+    with _lock:
+        for rec in _recorders():
+            rec.add_connection(method)
+
+
+# ---------- 커서/커넥션 프록시 ----------
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """execute/fetch 시간과 행 수를 기록하는 커서"""
+
+    _amf_key: Optional[str] = None
+
+    def execute(self, sql, parameters=()):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            ms = (time.perf_counter() - t0) * 1000.0
+            rows = max(int(self.rowcount), 0) if self.description is None else 0
+            self._amf_key = _record_query(sql, ms, rows)
+
+    def executemany(self, sql, seq_of_parameters):
+        params = seq_of_parameters if isinstance(seq_of_parameters, (list, tuple)) else list(seq_of_parameters)
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, params)
+        finally:
+            ms = (time.perf_counter() - t0) * 1000.0
+            self._amf_key = _record_query(sql, ms, max(int(self.rowcount), 0), many=len(params))
+
+    def executescript(self, sql_script):
+        t0 = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._amf_key = _record_query(sql_script, (time.perf_counter() - t0) * 1000.0, 0)
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        _record_fetch(self._amf_key, (time.perf_counter() - t0) * 1000.0, 1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, size=None):
+        t0 = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        _record_fetch(self._amf_key, (time.perf_counter() - t0) * 1000.0, len(rows))
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        _record_fetch(self._amf_key, (time.perf_counter() - t0) * 1000.0, len(rows))
+        return rows
+
+    def __next__(self):
+        row = super().__next__()
+        _record_fetch(self._amf_key, 0.0, 1)
+        return row
+
+
+def _make_connection_proxy(base_cls):
+    """PooledConnection 하위 클래스: cursor()/execute*() 를 계측 커서로"""
+
+    class InstrumentedConnection(base_cls):
+        __slots__ = ()
+
+        def __init__(self, pool, conn):
+            super().__init__(pool, conn)
+            _record_connection()
+
+        def cursor(self, factory=InstrumentedCursor):
+            return self.raw.cursor(factory)
+
+        def execute(self, sql, parameters=()):
+            return self.cursor().execute(sql, parameters)
+
+        def executemany(self, sql, seq_of_parameters):
+            return self.cursor().executemany(sql, seq_of_parameters)
+
+        def executescript(self, sql_script):
+            return self.cursor().executescript(sql_script)
+
+    return InstrumentedConnection
+
+
+# ---------- 메서드 래핑 ----------
+
+def _wrap_method(name: str, fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current_method.get() is not None:
+            return fn(*args, **kwargs)
+        token = _current_method.set(name)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            ms = (time.perf_counter() - t0) * 1000.0
+            _current_method.reset(token)
+            with _lock:
+                for rec in _recorders():
+                    rec.add_call(name, ms)
+            for listener in tuple(_call_listeners):
+                try:
+                    listener(name, ms)
+                except Exception:
+                    pass
+
+    wrapper.__amf_instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def enable(slow_ms: Optional[float] = None) -> None:
+    """계측 켜기(멱등). 풀 프록시 교체 + DatabaseManager 공개 메서드 래핑"""
+    global _enabled, _slow_ms
+    from database.db_manager import DatabaseManager
+    from database.pool import ConnectionPool, PooledConnection
+
+    with _lock:
+        if slow_ms is not None:
+            _slow_ms = float(slow_ms)
+        if _enabled:
+            return
+        ConnectionPool.proxy_class = _make_connection_proxy(PooledConnection)
+        for name, attr in list(vars(DatabaseManager).items()):
+            if name.startswith("_") or name in _SKIP_METHODS or not callable(attr):
+                continue
+            if isinstance(attr, (staticmethod, classmethod, type)):
+                continue
+            _originals[name] = attr
+            setattr(DatabaseManager, name, _wrap_method(name, attr))
+        _enabled = True
+
+
+def disable() -> None:
+    """계측 끄기(원래 풀 프록시/메서드 복원). 누적 기록은 유지"""
+    global _enabled
+    from database.db_manager import DatabaseManager
+    from database.pool import ConnectionPool, PooledConnection
+
+    with _lock:
+        if not _enabled:
+            return
+        ConnectionPool.proxy_class = PooledConnection
+        for name, fn in _originals.items():
+            setattr(DatabaseManager, name, fn)
+        _originals.clear()
+        _enabled = False
+
+
+def reset() -> None:
+    """누적/rerun/느린 쿼리 기록 초기화"""
+    global _total
+    with _lock:
+        _total = Recorder()
+        _runs.clear()
+        _last_runs.clear()
+        _slow_log.clear()
+
+
+def _env_flag(name: str) -> bool:
+    return str(os.getenv(name, "0")).strip().lower() in ("1", "true", "on", "yes")
+
+
+def enable_from_env() -> None:
+    """AMF_DB_INSTRUMENT=1 이면 켜고, AMF_DB_METRICS_EXPORT 가 있으면 종료 시 저장 등록"""
+    if not _env_flag("AMF_DB_INSTRUMENT"):
+        return
+    try:
+        slow = float(os.getenv("AMF_DB_SLOW_MS", DEFAULT_SLOW_MS))
+    except ValueError:
+        slow = DEFAULT_SLOW_MS
+    enable(slow_ms=slow)
+    path = os.getenv("AMF_DB_METRICS_EXPORT")
+    if path:
+        atexit.register(export, path)
+
+
+# ---------- 조회/내보내기 ----------
+
+def summary(top: int = 20) -> Dict:
+    """전체 누적 요약 + 느린 쿼리 최근 기록"""
+    with _lock:
+        out = _total.summary(top=top)
+        out["slow_ms"] = _slow_ms
+        out["slow_queries"] = list(_slow_log)[-top:]
+        out["enabled"] = _enabled
+        return out
+
+
+def run_summary(session_key: Hashable, top: int = 20) -> Dict:
+    """세션의 직전 rerun(완료된 것) 요약 + 현재 rerun 진행분"""
+    with _lock:
+        last = _last_runs.get(session_key)
+        cur = _runs.get(session_key)
+        return {
+            "last": last.summary(top=top) if last else None,
+            "current": cur.summary(top=top) if cur else None,
+        }
+
+
+def slow_queries(limit: int = 50) -> List[Dict]:
+    with _lock:
+        return list(_slow_log)[-int(limit):]
+
+
+def _prom_escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", " ").replace('"', '\\"')
+
+
+def to_prometheus(top: int = 50) -> str:
+    """Prometheus 텍스트 형식(textfile collector 용)"""
+    data = summary(top=top)
+    lines = [
+        "# HELP amf_db_connections_total Connection checkouts from the pool.",
+        "# TYPE amf_db_connections_total counter",
+        f"amf_db_connections_total {data['connections']}",
+        "# HELP amf_db_queries_total SQL statements executed.",
+        "# TYPE amf_db_queries_total counter",
+        f"amf_db_queries_total {data['queries']}",
+        "# HELP amf_db_query_seconds_total Time spent executing and fetching SQL.",
+        "# TYPE amf_db_query_seconds_total counter",
+        f"amf_db_query_seconds_total {data['query_ms'] / 1000.0:.6f}",
+        "# HELP amf_db_slow_queries Slow queries kept in the in-process log.",
+        "# TYPE amf_db_slow_queries gauge",
+        f"amf_db_slow_queries {len(data['slow_queries'])}",
+    ]
+    metrics = (
+        ("amf_db_method_calls_total", "counter", "calls", 1.0),
+        ("amf_db_method_seconds_total", "counter", "total_ms", 1000.0),
+        ("amf_db_method_queries_total", "counter", "queries", 1.0),
+        ("amf_db_method_rows_total", "counter", "rows", 1.0),
+        ("amf_db_method_connections_total", "counter", "connections", 1.0),
+    )
+    for metric, mtype, field, div in metrics:
+        lines.append(f"# TYPE {metric} {mtype}")
+        for m in data["methods"]:
+            value = m[field] / div
+            lines.append(f'{metric}{{method="{_prom_escape(m["method"])}"}} {value:.6f}'.rstrip("0").rstrip("."))
+    for metric, field, div in (
+        ("amf_db_statement_calls_total", "calls", 1.0),
+        ("amf_db_statement_seconds_total", "total_ms", 1000.0),
+        ("amf_db_statement_rows_total", "rows", 1.0),
+    ):
+        lines.append(f"# TYPE {metric} counter")
+        for s in data["statements"]:
+            value = s[field] / div
+            lines.append(f'{metric}{{sql="{_prom_escape(s["sql"])}"}} {value:.6f}'.rstrip("0").rstrip("."))
+    return "\n".join(lines) + "\n"
+
+
+def _atomic_write(path: str, text: str) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return path
+
+
+def export_json(path: str, top: int = 100) -> str:
+    return _atomic_write(path, json.dumps(summary(top=top), ensure_ascii=False, indent=2) + "\n")
+
+
+def export_prometheus(path: str, top: int = 100) -> str:
+    return _atomic_write(path, to_prometheus(top=top))
+
+
+def export(path: str) -> str:
+    """확장자로 형식 선택(.json → JSON, 그 외 → Prometheus 텍스트)"""
+    if str(path).lower().endswith(".json"):
+        return export_json(path)
+    return export_prometheus(path)
@@ -0,0 +1,151 @@
+"""
+DB 유지보수 CLI.
+
+사용 예:
+    python -m database.maintenance wallet --verify
+    python -m database.maintenance wallet --rebuild
+    python -m database.maintenance --db data/money_kids.db wallet --verify
+    python -m database.maintenance xp --verify
+    python -m database.maintenance rollups --verify
+    python -m database.maintenance rollups --rebuild --since 2026-01-01
+    python -m database.maintenance explain
+    python -m database.maintenance chats --archive --days 90 --vacuum
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from database.db_manager import get_db_manager
+from database.query_plans import check_query_plans
+
+
+def _cmd_wallet(db, args) -> int:
+    if args.rebuild:
+        n = db.rebuild_wallet_balances()
+        print(f"[OK] wallet_balances 재구축 완료 ({n} rows)")
+    if args.verify or not args.rebuild:
+        mismatches = db.verify_wallet_balances()
+        if not mismatches:
+            print("[OK] wallet_balances 원장이 behaviors와 일치합니다.")
+            return 0
+        print(f"[WARN] 불일치 {len(mismatches)}건")
+        for m in mismatches[:50]:
+            print(
+                f"   - user={m['user_id']} type={m['behavior_type']} "
+                f"ledger={m['ledger']:.0f}({m['ledger_count']}) actual={m['actual']:.0f}({m['actual_count']})"
+            )
+        return 1
+    return 0
+
+
+def _cmd_xp(db, args) -> int:
+    if args.rebuild:
+        n = db.rebuild_user_xp()
+        print(f"[OK] user_xp 재구축 완료 ({n} users)")
+    if args.verify or not args.rebuild:
+        mismatches = db.verify_user_xp()
+        if not mismatches:
+            print("[OK] user_xp 카운터가 전체 계산과 일치합니다.")
+            return 0
+        print(f"[WARN] 불일치 {len(mismatches)}건")
+        for m in mismatches[:50]:
+            print(f"   - user={m['user_id']} counter={m['counter']} actual={m['actual']}")
+        return 1
+    return 0
+
+
+def _cmd_rollups(db, args) -> int:
+    if args.rebuild:
+        counts = db.rebuild_daily_rollups(since=args.since)
+        scope = f"{args.since} 이후" if args.since else "전체"
+        print(f"[OK] 일별 롤업 {scope} 재구축 완료 (behavior_daily {counts['behavior_daily']} rows, emotion_daily {counts['emotion_daily']} rows)")
+    if args.verify or not args.rebuild:
+        mismatches = db.verify_daily_rollups()
+        if not mismatches:
+            print("[OK] 일별 롤업이 behaviors/emotion_logs 와 일치합니다.")
+            return 0
+        print(f"[WARN] 불일치 {len(mismatches)}건")
+        for m in mismatches[:50]:
+            print(f"   - {m['table']} {m['key']} rollup={m['rollup']} actual={m['actual']}")
+        return 1
+    return 0
+
+
+def _cmd_explain(db, args) -> int:
+    with db.connection() as conn:
+        results = check_query_plans(conn)
+    bad = [r for r in results if r["full_scans"]]
+    for r in results:
+        mark = "WARN" if r["full_scans"] else "OK"
+        print(f"[{mark}] {r['name']}")
+        if args.verbose or r["full_scans"]:
+            for line in r["plan"]:
+                print(f"   - {line}")
+    if bad:
+        print(f"[WARN] 전체 스캔 쿼리 {len(bad)}건")
+        return 1
+    return 0
+
+
+def _cmd_chats(db, args) -> int:
+    if args.archive:
+        total = 0
+        while True:
+            n = db.archive_conversations(older_than_days=args.days, limit=200)
+            total += n
+            if n < 200:
+                break
+        print(f"[OK] {args.days}일 지난 대화 {total}건 보관(archive)")
+    if args.vacuum:
+        with db.connection() as conn:
+            conn.execute("VACUUM")
+        print("[OK] VACUUM 완료")
+    if not args.archive and not args.vacuum:
+        with db.connection() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*), SUM(archived_at IS NOT NULL), COALESCE(SUM(message_count), 0) FROM conversations"
+            ).fetchone()
+            live = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        print(f"대화 {row[0]}건(보관 {row[1] or 0}건) · 메시지 {row[2]}건(보관 안 된 {live}건)")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m database.maintenance", description="AI Money Friends DB 유지보수")
+    parser.add_argument("--db", default=None, help="DB 파일 경로(기본: Config.DATABASE_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_wallet = sub.add_parser("wallet", help="지갑 원장(wallet_balances) 검증/재구축")
+    p_wallet.add_argument("--verify", action="store_true", help="behaviors 전체 합계와 비교")
+    p_wallet.add_argument("--rebuild", action="store_true", help="behaviors 전체로 재구축")
+    p_wallet.set_defaults(func=_cmd_wallet)
+
+    p_xp = sub.add_parser("xp", help="XP 카운터(user_xp) 검증/재구축")
+    p_xp.add_argument("--verify", action="store_true", help="behaviors/미션 전체 계산과 비교")
+    p_xp.add_argument("--rebuild", action="store_true", help="전체 계산으로 재구축")
+    p_xp.set_defaults(func=_cmd_xp)
+
+    p_rollups = sub.add_parser("rollups", help="일별 롤업(behavior_daily/emotion_daily) 검증/백필")
+    p_rollups.add_argument("--verify", action="store_true", help="원본 전체 집계와 비교")
+    p_rollups.add_argument("--rebuild", action="store_true", help="원본으로 재구축(백필)")
+    p_rollups.add_argument("--since", default=None, help="YYYY-MM-DD 이후 날짜만 재구축(기본: 전체)")
+    p_rollups.set_defaults(func=_cmd_rollups)
+
+    p_explain = sub.add_parser("explain", help="핫 경로 쿼리 실행 계획 점검(전체 스캔이면 실패)")
+    p_explain.add_argument("-v", "--verbose", action="store_true", help="모든 쿼리의 실행 계획 출력")
+    p_explain.set_defaults(func=_cmd_explain)
+
+    p_chats = sub.add_parser("chats", help="대화 기록 보관(archive)/압축")
+    p_chats.add_argument("--archive", action="store_true", help="오래된 대화를 압축 보관하고 messages 에서 삭제")
+    p_chats.add_argument("--days", type=int, default=90, help="마지막 메시지 후 N일 지난 대화(기본 90)")
+    p_chats.add_argument("--vacuum", action="store_true", help="삭제 후 DB 파일 크기 줄이기(VACUUM)")
+    p_chats.set_defaults(func=_cmd_chats)
+
+    args = parser.parse_args(argv)
+    db = get_db_manager(args.db)
+    return int(args.func(db, args) or 0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,640 @@
+"""
+버전 기반 스키마 마이그레이션.
+
+- 현재 스키마 버전은 `PRAGMA user_version`에 저장합니다.
+- MIGRATIONS 에 (버전, 설명, 함수)를 순서대로 추가하면 됩니다.
+- 각 마이그레이션은 멱등(IF NOT EXISTS/컬럼 존재 확인)으로 작성해
+  여러 프로세스가 동시에 실행해도 안전하게 합니다.
+- ensure_schema()는 프로세스당, DB 파일당 1회만 실제 검사/실행합니다.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from typing import Callable, List, Set, Tuple
+
+
+_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "schema.sql")
+
+
+def _read_schema() -> str:
+    with open(_SCHEMA_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _columns(conn, table: str) -> Set[str]:
+    return {str(r[1]) for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _add_column_if_missing(conn, table: str, column: str, decl: str) -> None:
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+# ========== 마이그레이션 ==========
+
+def _m001_baseline(conn) -> None:
+    """schema.sql + 구버전 DB 컬럼 보정(기존 _ensure_columns/create_user ALTER 통합)"""
+    conn.executescript(_read_schema())
+
+    _add_column_if_missing(conn, "behaviors", "category", "TEXT")
+    _add_column_if_missing(conn, "behaviors", "related_request_id", "INTEGER")
+
+    for column, decl in (
+        ("user_type", "TEXT DEFAULT 'child'"),
+        ("parent_ssn", "TEXT"),
+        ("phone_number", "TEXT"),
+        ("birth_date", "TEXT"),
+        ("character_code", "TEXT"),
+        ("character_nickname", "TEXT"),
+        ("character_skin_code", "TEXT"),
+        ("coins", "INTEGER NOT NULL DEFAULT 0"),
+        ("last_reward_level", "INTEGER NOT NULL DEFAULT 0"),
+        ("invite_code", "TEXT"),
+        ("parent_id", "INTEGER"),
+        ("children_json", "TEXT"),
+        ("agree_marketing", "INTEGER NOT NULL DEFAULT 0"),
+    ):
+        _add_column_if_missing(conn, "users", column, decl)
+
+
+WALLET_REBUILD_SQL = """
+INSERT INTO wallet_balances (user_id, behavior_type, total_amount, entry_count)
+SELECT user_id, behavior_type, COALESCE(SUM(amount), 0), COUNT(*)
+FROM behaviors
+GROUP BY user_id, behavior_type
+"""
+
+
+def _m002_wallet_balances(conn) -> None:
+    """
+    지갑 원장(wallet_balances): 사용자별/행동 타입별 누적 합계.
+    - behaviors INSERT/UPDATE/DELETE 트리거로 같은 트랜잭션 안에서 갱신
+    - 기존 행동 기록으로 1회 재구축
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS wallet_balances (
+            user_id INTEGER NOT NULL,
+            behavior_type TEXT NOT NULL,
+            total_amount REAL NOT NULL DEFAULT 0,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, behavior_type)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_behaviors_wallet_ai
+        AFTER INSERT ON behaviors
+        BEGIN
+            INSERT INTO wallet_balances (user_id, behavior_type, total_amount, entry_count)
+            VALUES (NEW.user_id, NEW.behavior_type, COALESCE(NEW.amount, 0), 1)
+            ON CONFLICT(user_id, behavior_type) DO UPDATE SET
+                total_amount = total_amount + excluded.total_amount,
+                entry_count = entry_count + 1,
+                updated_at = CURRENT_TIMESTAMP;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_behaviors_wallet_ad
+        AFTER DELETE ON behaviors
+        BEGIN
+            UPDATE wallet_balances
+            SET total_amount = total_amount - COALESCE(OLD.amount, 0),
+                entry_count = entry_count - 1,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = OLD.user_id AND behavior_type = OLD.behavior_type;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_behaviors_wallet_au
+        AFTER UPDATE OF user_id, behavior_type, amount ON behaviors
+        BEGIN
+            UPDATE wallet_balances
+            SET total_amount = total_amount - COALESCE(OLD.amount, 0),
+                entry_count = entry_count - 1,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = OLD.user_id AND behavior_type = OLD.behavior_type;
+            INSERT INTO wallet_balances (user_id, behavior_type, total_amount, entry_count)
+            VALUES (NEW.user_id, NEW.behavior_type, COALESCE(NEW.amount, 0), 1)
+            ON CONFLICT(user_id, behavior_type) DO UPDATE SET
+                total_amount = total_amount + excluded.total_amount,
+                entry_count = entry_count + 1,
+                updated_at = CURRENT_TIMESTAMP;
+        END
+        """
+    )
+    conn.execute("DELETE FROM wallet_balances")
+    conn.execute(WALLET_REBUILD_SQL)
+
+
+def _m003_range_indexes(conn) -> None:
+    """
+    기간 조회용 복합 인덱스(반열림 timestamp 구간 + 커버링)
+    - behaviors(user_id, behavior_type, timestamp, amount): 타입별 기간 합계를 테이블 접근 없이 계산
+    - behaviors(user_id, timestamp): 최근 기록 조회(정렬 없이)
+    - emotion_logs(user_id, created_at)
+    - 위 인덱스의 접두사와 겹치는 단일 컬럼 인덱스는 제거(쓰기 비용 절감)
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_behaviors_user_ts ON behaviors(user_id, timestamp)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_behaviors_user_type_ts ON behaviors(user_id, behavior_type, timestamp, amount)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_emotion_logs_user_created ON emotion_logs(user_id, created_at)")
+    conn.execute("DROP INDEX IF EXISTS idx_behaviors_user_id")
+    conn.execute("DROP INDEX IF EXISTS idx_emotion_logs_user_id")
+
+
+def _xp_weight(difficulty_expr: str) -> str:
+    """미션 난이도 → XP 가중치(get_xp 기준과 동일)"""
+    return f"(CASE COALESCE({difficulty_expr}, 'normal') WHEN 'easy' THEN 5 WHEN 'hard' THEN 12 ELSE 8 END)"
+
+
+def _xp_weight_of_template(template_id_expr: str) -> str:
+    return f"COALESCE((SELECT {_xp_weight('t.difficulty')} FROM mission_templates t WHERE t.id = {template_id_expr}), 0)"
+
+
+# 전체 계산(검증/재구축 기준): behaviors 개수 + 완료 미션 난이도 가중 합
+XP_FULL_SQL = f"""
+SELECT user_id, SUM(bc) as behavior_count, SUM(mx) as mission_xp
+FROM (
+    SELECT user_id, COUNT(*) as bc, 0 as mx
+    FROM behaviors
+    GROUP BY user_id
+    UNION ALL
+    SELECT a.user_id, 0 as bc, SUM({_xp_weight('t.difficulty')}) as mx
+    FROM mission_assignments a
+    JOIN mission_templates t ON a.template_id = t.id
+    WHERE a.status = 'completed'
+    GROUP BY a.user_id
+)
+GROUP BY user_id
+"""
+
+XP_REBUILD_SQL = f"""
+INSERT INTO user_xp (user_id, behavior_count, mission_xp)
+{XP_FULL_SQL}
+"""
+
+
+def _m004_user_xp(conn) -> None:
+    """
+    XP 카운터(user_xp): 사용자별 behaviors 개수 + 완료 미션 가중치 합.
+    - behaviors INSERT/DELETE, mission_assignments 완료 상태 변경, 템플릿 난이도 변경 시 트리거로 갱신
+    - 기존 데이터로 1회 재구축
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_xp (
+            user_id INTEGER PRIMARY KEY,
+            behavior_count INTEGER NOT NULL DEFAULT 0,
+            mission_xp INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+        """
+    )
+
+    def _bump(user_expr: str, behavior_delta: str, mission_delta: str, when: str = "") -> str:
+        where = f" WHERE {when}" if when else " WHERE 1"
+        return f"""
+            INSERT INTO user_xp (user_id, behavior_count, mission_xp)
+            SELECT {user_expr}, {behavior_delta}, {mission_delta}{where}
+            ON CONFLICT(user_id) DO UPDATE SET
+                behavior_count = behavior_count + excluded.behavior_count,
+                mission_xp = mission_xp + excluded.mission_xp,
+                updated_at = CURRENT_TIMESTAMP;
+        """
+
+    old_done = "OLD.status = 'completed'"
+    new_done = "NEW.status = 'completed'"
+    triggers = {
+        "trg_behaviors_xp_ai": f"AFTER INSERT ON behaviors BEGIN {_bump('NEW.user_id', '1', '0')} END",
+        "trg_behaviors_xp_ad": f"AFTER DELETE ON behaviors BEGIN {_bump('OLD.user_id', '-1', '0')} END",
+        "trg_behaviors_xp_au": (
+            "AFTER UPDATE OF user_id ON behaviors WHEN OLD.user_id IS NOT NEW.user_id "
+            f"BEGIN {_bump('OLD.user_id', '-1', '0')} {_bump('NEW.user_id', '1', '0')} END"
+        ),
+        "trg_missions_xp_ai": (
+            "AFTER INSERT ON mission_assignments WHEN NEW.status = 'completed' "
+            f"BEGIN {_bump('NEW.user_id', '0', _xp_weight_of_template('NEW.template_id'))} END"
+        ),
+        "trg_missions_xp_ad": (
+            "AFTER DELETE ON mission_assignments WHEN OLD.status = 'completed' "
+            f"BEGIN {_bump('OLD.user_id', '0', '-' + _xp_weight_of_template('OLD.template_id'))} END"
+        ),
+        "trg_missions_xp_au": (
+            "AFTER UPDATE OF status, template_id, user_id ON mission_assignments "
+            "BEGIN "
+            f"{_bump('OLD.user_id', '0', '-' + _xp_weight_of_template('OLD.template_id'), when=old_done)} "
+            f"{_bump('NEW.user_id', '0', _xp_weight_of_template('NEW.template_id'), when=new_done)} "
+            "END"
+        ),
+        "trg_mission_templates_xp_au": (
+            f"AFTER UPDATE OF difficulty ON mission_templates WHEN {_xp_weight('OLD.difficulty')} <> {_xp_weight('NEW.difficulty')} "
+            "BEGIN "
+            "UPDATE user_xp SET "
+            f"mission_xp = mission_xp + ({_xp_weight('NEW.difficulty')} - {_xp_weight('OLD.difficulty')}) * ("
+            "SELECT COUNT(*) FROM mission_assignments a "
+            "WHERE a.template_id = NEW.id AND a.user_id = user_xp.user_id AND a.status = 'completed'), "
+            "updated_at = CURRENT_TIMESTAMP "
+            "WHERE user_id IN (SELECT user_id FROM mission_assignments WHERE template_id = NEW.id AND status = 'completed'); "
+            "END"
+        ),
+        "trg_mission_templates_xp_ad": (
+            "AFTER DELETE ON mission_templates "
+            "BEGIN "
+            "UPDATE user_xp SET "
+            f"mission_xp = mission_xp - {_xp_weight('OLD.difficulty')} * ("
+            "SELECT COUNT(*) FROM mission_assignments a "
+            "WHERE a.template_id = OLD.id AND a.user_id = user_xp.user_id AND a.status = 'completed'), "
+            "updated_at = CURRENT_TIMESTAMP "
+            "WHERE user_id IN (SELECT user_id FROM mission_assignments WHERE template_id = OLD.id AND status = 'completed'); "
+            "END"
+        ),
+    }
+    for name, body in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    conn.execute("DELETE FROM user_xp")
+    conn.execute(XP_REBUILD_SQL)
+
+
+def _m005_job_runs(conn) -> None:
+    """
+    예약 작업 멱등 키(job_runs): 같은 키는 한 번만 처리(정기 용돈/리마인더/주간 보상/챌린지 정산)
+    - 예: 'recurring:12:2026-10-17', 'reminder:5', 'autosave:3:2026-W41', 'challenge:7'
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_runs (
+            job_key TEXT PRIMARY KEY,
+            job TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recurring_allowances_next_run ON recurring_allowances(is_active, next_run)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_pending ON reminders(is_sent, due_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_challenge_instances_status_end ON challenge_instances(status, end_date)")
+
+
+def _m006_conversation_context(conn) -> None:
+    """
+    대화 컨텍스트 창: 최근 N턴 + 누적 요약.
+    - conversation_context: 대화별 누적 요약과 요약에 포함된 마지막 메시지 id
+    - '요약 이후 메시지' 범위 조회는 기존 idx_messages_conversation_id(conversation_id)로 충분
+      (id 가 rowid 라 인덱스가 사실상 (conversation_id, id))
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS conversation_context (
+            conversation_id INTEGER PRIMARY KEY,
+            summary TEXT NOT NULL DEFAULT '',
+            summarized_upto INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (conversation_id) REFERENCES conversations(id)
+        )
+        """
+    )
+
+
+def _m007_llm_response_cache(conn) -> None:
+    """
+    AI 응답 캐시(llm_response_cache): 정규화한 질문 + 나이대 + 사용자 유형 + 모델 → 응답
+    - created_at/last_used_at 은 epoch 초(TTL/LRU 계산용)
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS llm_response_cache (
+            cache_key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            model TEXT NOT NULL,
+            user_type TEXT NOT NULL,
+            age_band TEXT NOT NULL,
+            prompt_norm TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL,
+            hit_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_bucket "
+        "ON llm_response_cache(kind, model, user_type, age_band, last_used_at)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_response_cache_lru ON llm_response_cache(last_used_at)")
+
+
+def _m008_conversation_stats(conn) -> None:
+    """
+    대화 요약 행(conversations.message_count/first_message_at/last_message_at) + 보관(archive)
+    - save_message 가 같은 트랜잭션에서 갱신. 여기서는 기존 대화 1회 재계산
+    - conversation_archives: 오래된 대화의 메시지를 압축(zlib JSON)해 한 행으로 보관하고 messages 에서 삭제
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    _add_column_if_missing(conn, "conversations", "message_count", "INTEGER NOT NULL DEFAULT 0")
+    _add_column_if_missing(conn, "conversations", "first_message_at", "TIMESTAMP")
+    _add_column_if_missing(conn, "conversations", "last_message_at", "TIMESTAMP")
+    _add_column_if_missing(conn, "conversations", "archived_at", "TIMESTAMP")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS conversation_archives (
+            conversation_id INTEGER PRIMARY KEY,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            transcript BLOB NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (conversation_id) REFERENCES conversations(id)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_user_created ON conversations(user_id, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_archive ON conversations(archived_at, last_message_at)")
+    conn.execute(
+        """
+        UPDATE conversations SET
+            message_count = (SELECT COUNT(*) FROM messages m WHERE m.conversation_id = conversations.id),
+            first_message_at = (SELECT MIN(m.timestamp) FROM messages m WHERE m.conversation_id = conversations.id),
+            last_message_at = (SELECT MAX(m.timestamp) FROM messages m WHERE m.conversation_id = conversations.id)
+        WHERE archived_at IS NULL
+        """
+    )
+
+
+NOTIFICATION_COUNTER_REBUILD_SQL = """
+INSERT INTO notification_counters (user_id, unread_count)
+SELECT user_id, COUNT(*)
+FROM notifications
+WHERE is_read = 0
+GROUP BY user_id
+"""
+
+
+def _m009_notification_counters(conn) -> None:
+    """
+    읽지 않은 알림 카운터(notification_counters) + 목록 조회용 복합 인덱스
+    - notifications INSERT/DELETE, is_read/user_id 변경 시 트리거로 같은 트랜잭션 안에서 갱신
+    - notifications(user_id, is_read, created_at): 읽지 않은 알림 최신순 조회(정렬 없이)
+    - 접두사가 겹치는 idx_notifications_user_id 는 제거
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS notification_counters (
+            user_id INTEGER PRIMARY KEY,
+            unread_count INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """
+    )
+
+    def _bump(user_expr: str, delta: str, when: str) -> str:
+        return f"""
+            INSERT INTO notification_counters (user_id, unread_count)
+            SELECT {user_expr}, {delta} WHERE {when}
+            ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + excluded.unread_count;
+        """
+
+    triggers = {
+        "trg_notifications_unread_ai": (
+            f"AFTER INSERT ON notifications WHEN NEW.is_read = 0 BEGIN {_bump('NEW.user_id', '1', '1')} END"
+        ),
+        "trg_notifications_unread_ad": (
+            f"AFTER DELETE ON notifications WHEN OLD.is_read = 0 BEGIN {_bump('OLD.user_id', '-1', '1')} END"
+        ),
+        "trg_notifications_unread_au": (
+            "AFTER UPDATE OF is_read, user_id ON notifications "
+            "WHEN OLD.is_read IS NOT NEW.is_read OR OLD.user_id IS NOT NEW.user_id "
+            "BEGIN "
+            f"{_bump('OLD.user_id', '-1', 'OLD.is_read = 0')} "
+            f"{_bump('NEW.user_id', '1', 'NEW.is_read = 0')} "
+            "END"
+        ),
+    }
+    for name, body in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_notifications_user_read_created ON notifications(user_id, is_read, created_at)"
+    )
+    conn.execute("DROP INDEX IF EXISTS idx_notifications_user_id")
+    conn.execute("DELETE FROM notification_counters")
+    conn.execute(NOTIFICATION_COUNTER_REBUILD_SQL)
+
+
+# 일별 롤업 키: 날짜로 읽을 수 없는 timestamp 는 원본 기간 조회(문자열 비교)에도 안 잡히므로 제외
+BEHAVIOR_DAILY_SELECT_SQL = """
+SELECT user_id, date(timestamp) as day, behavior_type, COALESCE(category, '') as category,
+       COALESCE(SUM(amount), 0) as total_amount, COUNT(*) as entry_count
+FROM behaviors
+WHERE date(timestamp) IS NOT NULL {where}
+GROUP BY user_id, day, behavior_type, COALESCE(category, '')
+"""
+
+EMOTION_DAILY_SELECT_SQL = """
+SELECT user_id, date(created_at) as day, emotion, COALESCE(context, '') as context, COUNT(*) as entry_count
+FROM emotion_logs
+WHERE date(created_at) IS NOT NULL {where}
+GROUP BY user_id, day, emotion, COALESCE(context, '')
+"""
+
+
+def rollup_rebuild_sql(since: str | None = None) -> List[Tuple[str, tuple]]:
+    """
+    일별 롤업 재구축(백필) 문장 목록. since='YYYY-MM-DD' 면 그 날짜 이후만 지우고 다시 채움
+    return: [(sql, params), ...] (한 트랜잭션에서 순서대로 실행)
+    """
+    if since:
+        b_where, e_where, params = "AND timestamp >= ?", "AND created_at >= ?", (str(since)[:10],)
+        return [
+            ("DELETE FROM behavior_daily WHERE day >= ?", params),
+            ("INSERT INTO behavior_daily (user_id, day, behavior_type, category, total_amount, entry_count) "
+             + BEHAVIOR_DAILY_SELECT_SQL.format(where=b_where), params),
+            ("DELETE FROM emotion_daily WHERE day >= ?", params),
+            ("INSERT INTO emotion_daily (user_id, day, emotion, context, entry_count) "
+             + EMOTION_DAILY_SELECT_SQL.format(where=e_where), params),
+        ]
+    return [
+        ("DELETE FROM behavior_daily", ()),
+        ("INSERT INTO behavior_daily (user_id, day, behavior_type, category, total_amount, entry_count) "
+         + BEHAVIOR_DAILY_SELECT_SQL.format(where=""), ()),
+        ("DELETE FROM emotion_daily", ()),
+        ("INSERT INTO emotion_daily (user_id, day, emotion, context, entry_count) "
+         + EMOTION_DAILY_SELECT_SQL.format(where=""), ()),
+    ]
+
+
+def _m010_daily_rollups(conn) -> None:
+    """
+    일별 롤업(차트/리포트용 사전 집계)
+    - behavior_daily(user_id, day, behavior_type, category): 금액 합계/건수
+    - emotion_daily(user_id, day, emotion, context): 건수
+    - 원본 INSERT/DELETE/UPDATE 트리거로 같은 트랜잭션 안에서 갱신(건수 0 이 된 행은 삭제)
+    - 부모 대시보드 미션 완료 수(누적/기간/7일)용 mission_assignments(user_id, status, completed_at) 커버링 인덱스
+    - 기존 데이터로 1회 백필(이후 재구축: python -m database.maintenance rollups --rebuild)
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS behavior_daily (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            behavior_type TEXT NOT NULL,
+            category TEXT NOT NULL DEFAULT '',
+            total_amount REAL NOT NULL DEFAULT 0,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day, behavior_type, category)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS emotion_daily (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            emotion TEXT NOT NULL,
+            context TEXT NOT NULL DEFAULT '',
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day, emotion, context)
+        ) WITHOUT ROWID
+        """
+    )
+
+    def _b_add(row: str) -> str:
+        return f"""
+            INSERT INTO behavior_daily (user_id, day, behavior_type, category, total_amount, entry_count)
+            SELECT {row}.user_id, date({row}.timestamp), {row}.behavior_type, COALESCE({row}.category, ''),
+                   COALESCE({row}.amount, 0), 1
+            WHERE date({row}.timestamp) IS NOT NULL
+            ON CONFLICT(user_id, day, behavior_type, category) DO UPDATE SET
+                total_amount = total_amount + excluded.total_amount,
+                entry_count = entry_count + 1;
+        """
+
+    def _b_sub(row: str) -> str:
+        key = (
+            f"user_id = {row}.user_id AND day = date({row}.timestamp) "
+            f"AND behavior_type = {row}.behavior_type AND category = COALESCE({row}.category, '')"
+        )
+        return f"""
+            UPDATE behavior_daily
+            SET total_amount = total_amount - COALESCE({row}.amount, 0), entry_count = entry_count - 1
+            WHERE {key};
+            DELETE FROM behavior_daily WHERE {key} AND entry_count <= 0;
+        """
+
+    def _e_add(row: str) -> str:
+        return f"""
+            INSERT INTO emotion_daily (user_id, day, emotion, context, entry_count)
+            SELECT {row}.user_id, date({row}.created_at), {row}.emotion, COALESCE({row}.context, ''), 1
+            WHERE date({row}.created_at) IS NOT NULL
+            ON CONFLICT(user_id, day, emotion, context) DO UPDATE SET entry_count = entry_count + 1;
+        """
+
+    def _e_sub(row: str) -> str:
+        key = (
+            f"user_id = {row}.user_id AND day = date({row}.created_at) "
+            f"AND emotion = {row}.emotion AND context = COALESCE({row}.context, '')"
+        )
+        return f"""
+            UPDATE emotion_daily SET entry_count = entry_count - 1 WHERE {key};
+            DELETE FROM emotion_daily WHERE {key} AND entry_count <= 0;
+        """
+
+    triggers = {
+        "trg_behaviors_daily_ai": f"AFTER INSERT ON behaviors BEGIN {_b_add('NEW')} END",
+        "trg_behaviors_daily_ad": f"AFTER DELETE ON behaviors BEGIN {_b_sub('OLD')} END",
+        "trg_behaviors_daily_au": (
+            "AFTER UPDATE OF user_id, behavior_type, category, amount, timestamp ON behaviors "
+            f"BEGIN {_b_sub('OLD')} {_b_add('NEW')} END"
+        ),
+        "trg_emotion_logs_daily_ai": f"AFTER INSERT ON emotion_logs BEGIN {_e_add('NEW')} END",
+        "trg_emotion_logs_daily_ad": f"AFTER DELETE ON emotion_logs BEGIN {_e_sub('OLD')} END",
+        "trg_emotion_logs_daily_au": (
+            "AFTER UPDATE OF user_id, emotion, context, created_at ON emotion_logs "
+            f"BEGIN {_e_sub('OLD')} {_e_add('NEW')} END"
+        ),
+    }
+    for name, body in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mission_assignments_user_status_completed "
+        "ON mission_assignments(user_id, status, completed_at)"
+    )
+    for sql, params in rollup_rebuild_sql():
+        conn.execute(sql, params)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "baseline schema + legacy columns", _m001_baseline),
+    (2, "wallet_balances ledger + triggers", _m002_wallet_balances),
+    (3, "composite range indexes on behaviors/emotion_logs", _m003_range_indexes),
+    (4, "user_xp counter + triggers", _m004_user_xp),
+    (5, "job_runs idempotency keys + scheduler indexes", _m005_job_runs),
+    (6, "conversation_context rolling summary + messages index", _m006_conversation_context),
+    (7, "llm_response_cache", _m007_llm_response_cache),
+    (8, "conversation summary columns + archives", _m008_conversation_stats),
+    (9, "notification_counters unread counter + (user_id, is_read, created_at) index", _m009_notification_counters),
+    (10, "behavior_daily/emotion_daily rollups + triggers", _m010_daily_rollups),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn) -> int:
+    row = conn.execute("PRAGMA user_version").fetchone()
+    return int((row[0] if row else 0) or 0)
+
+
+def migrate(conn) -> List[int]:
+    """
+    user_version 이후의 마이그레이션을 순서대로 적용.
+    return: 이번에 적용한 버전 목록
+    """
+    applied: List[int] = []
+    current = get_schema_version(conn)
+    for version, _desc, fn in MIGRATIONS:
+        if version <= current:
+            continue
+        fn(conn)
+        # PRAGMA user_version 은 바인딩 파라미터를 지원하지 않음(정수만 사용)
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.commit()
+        applied.append(version)
+        current = version
+    return applied
+
+
+_migrated: Set[str] = set()
+_migrate_lock = threading.Lock()
+
+
+def ensure_schema(pool, db_path: str) -> None:
+    """프로세스당/DB 파일(또는 URL)당 1회만 마이그레이션 실행"""
+    key = db_path if db_path == ":memory:" or "://" in db_path else os.path.abspath(db_path)
+    if key in _migrated:
+        return
+    with _migrate_lock:
+        if key in _migrated:
+            return
+        conn = pool.acquire()
+        try:
+            if get_schema_version(conn) < LATEST_VERSION:
+                try:
+                    migrate(conn)
+                except sqlite3.Error:
+                    conn.rollback()
+                    raise
+        finally:
+            conn.close()
+        _migrated.add(key)
@@ -0,0 +1,248 @@
+"""
+SQLite 커넥션 풀.
+
+- DB 파일(절대경로)당 프로세스 전역 풀 1개(get_pool)
+- 커넥션은 한 번에 한 스레드만 대여(checkout) → check_same_thread=False 로 안전하게 재사용
+- 반납 시 같은 스레드가 다시 빌리면 그 커넥션을 우선 돌려줌(스레드 친화)
+- PRAGMA(WAL/synchronous/cache/mmap/foreign_keys)는 커넥션 생성 시 1회만 적용
+- 기존 코드의 `conn.close()`는 실제로 닫지 않고 풀에 반납합니다.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+DEFAULT_PRAGMAS: tuple[tuple[str, object], ...] = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -8000),  # KiB 단위(음수) → 약 8MB
+    ("mmap_size", 64 * 1024 * 1024),
+    ("foreign_keys", "ON"),
+    ("temp_store", "MEMORY"),
+)
+
+
+class PooledConnection:
+    """
+    sqlite3.Connection 프록시.
+    - close(): 풀에 반납(실제 close 아님)
+    - 나머지 속성/메서드는 원본 커넥션에 위임
+    """
+
+    __slots__ = ("_pool", "_conn")
+
+    def __init__(self, pool: "ConnectionPool", conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn: Optional[sqlite3.Connection] = conn
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return self._conn
+
+    def __getattr__(self, name: str):
+        return getattr(self.raw, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        if name in PooledConnection.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.raw, name, value)
+
+    def __enter__(self):
+        return self.raw.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self.raw.__exit__(exc_type, exc, tb)
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
+
+class ConnectionPool:
+    """스레드 안전한 SQLite 커넥션 풀"""
+
+    # 대여 시 돌려줄 프록시 클래스(database.instrumentation 이 계측 프록시로 교체)
+    proxy_class = PooledConnection
+
+    def __init__(
+        self,
+        db_path: str,
+        max_size: int = 8,
+        wait_timeout: float = 2.0,
+        busy_timeout: float = 5.0,
+        pragmas: tuple[tuple[str, object], ...] = DEFAULT_PRAGMAS,
+    ):
+        self.db_path = db_path
+        self.max_size = max(1, int(max_size))
+        self.wait_timeout = float(wait_timeout)
+        self.busy_timeout = float(busy_timeout)
+        self.pragmas = tuple(pragmas or ())
+
+        self._cond = threading.Condition(threading.Lock())
+        # idle: (커넥션, 마지막으로 사용한 스레드 id) — 뒤쪽이 가장 최근 반납
+        self._idle: List[tuple[sqlite3.Connection, int]] = []
+        self._in_use = 0
+        self._stats: Dict[str, float] = {
+            "hits": 0,
+            "misses": 0,
+            "affinity_hits": 0,
+            "overflow": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "opened": 0,
+            "closed": 0,
+        }
+
+    # ---------- 내부 ----------
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas:
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.DatabaseError:
+                # 읽기 전용 FS 등에서 WAL 전환 실패 시에도 동작은 유지
+                pass
+        return conn
+
+    def _take_idle(self, tid: int) -> Optional[sqlite3.Connection]:
+        for i in range(len(self._idle) - 1, -1, -1):
+            if self._idle[i][1] == tid:
+                self._stats["affinity_hits"] += 1
+                return self._idle.pop(i)[0]
+        if self._idle:
+            return self._idle.pop()[0]
+        return None
+
+    # ---------- 공개 API ----------
+
+    def acquire(self) -> PooledConnection:
+        """커넥션 대여(유휴 재사용 → 신규 생성 → 대기 → 초과 생성 순)"""
+        tid = threading.get_ident()
+        with self._cond:
+            conn = self._take_idle(tid)
+            if conn is not None:
+                self._stats["hits"] += 1
+                self._in_use += 1
+                return self.proxy_class(self, conn)
+
+            if self._in_use >= self.max_size:
+                # 풀 소진: 잠시 대기 후에도 없으면 초과 커넥션을 엽니다(중첩 대여 교착 방지).
+                self._stats["waits"] += 1
+                started = time.perf_counter()
+                deadline = started + self.wait_timeout
+                while not self._idle and self._in_use >= self.max_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                waited = time.perf_counter() - started
+                self._stats["wait_time_total"] += waited
+                self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+
+                conn = self._take_idle(tid)
+                if conn is not None:
+                    self._stats["hits"] += 1
+                    self._in_use += 1
+                    return self.proxy_class(self, conn)
+                if self._in_use >= self.max_size:
+                    self._stats["overflow"] += 1
+
+            self._stats["misses"] += 1
+            self._stats["opened"] += 1
+            self._in_use += 1
+
+        try:
+            return self.proxy_class(self, self._open())
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._stats["opened"] -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """커넥션 반납(미커밋 트랜잭션은 롤백 → 기존 close()와 같은 의미)"""
+        broken = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            broken = True
+
+        with self._cond:
+            self._in_use = max(0, self._in_use - 1)
+            if not broken and len(self._idle) < self.max_size:
+                self._idle.append((conn, threading.get_ident()))
+                conn = None
+            self._cond.notify()
+
+        if conn is not None:
+            self._close_raw(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """with pool.connection() as conn: ... (예외 시 롤백, 항상 반납)"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _close_raw(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats["closed"] += 1
+
+    def close_all(self) -> None:
+        """유휴 커넥션 모두 닫기(대여 중인 커넥션은 반납 시 정리)"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _tid in idle:
+            self._close_raw(conn)
+
+    def stats(self) -> Dict[str, float]:
+        """풀 카운터 스냅샷(hits/misses/대기 시간 등)"""
+        with self._cond:
+            out = dict(self._stats)
+            out["in_use"] = self._in_use
+            out["idle"] = len(self._idle)
+            out["max_size"] = self.max_size
+        total = out["hits"] + out["misses"]
+        out["hit_rate"] = (out["hits"] / total) if total else 0.0
+        return out
+
+    def reset_stats(self) -> None:
+        with self._cond:
+            for k in self._stats:
+                self._stats[k] = 0.0 if isinstance(self._stats[k], float) else 0
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, **kwargs) -> ConnectionPool:
+    """DB 파일 경로별 프로세스 전역 풀 반환(없으면 생성)"""
+    key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_path, **kwargs)
+            _pools[key] = pool
+        return pool
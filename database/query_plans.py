@@ -0,0 +1,90 @@
+"""
+핫 경로 쿼리의 실행 계획(EXPLAIN QUERY PLAN) 점검.
+
+- HOT_QUERIES 에 자주 실행되는 조회 쿼리를 (이름, SQL, 파라미터)로 등록합니다.
+  SQL 은 DatabaseManager 가 실행하는 database/hot_queries.py 상수를 그대로 씀(손으로 복사하지 않음)
+- check_query_plans()는 WATCHED_TABLES(원본/일별 롤업/미션 배정)를 인덱스 없이 전체 스캔하는 쿼리를 찾아 돌려줍니다.
+- 컬럼을 date()/strftime()/datetime()으로 감싸면 인덱스를 못 타서 여기서 걸립니다.
+
+사용 예:
+    python -m database.maintenance explain
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Sequence, Tuple
+
+from database import hot_queries as _sql
+
+
+# 전체 스캔이 있으면 안 되는 테이블
+WATCHED_TABLES = ("behaviors", "emotion_logs", "behavior_daily", "emotion_daily", "mission_assignments")
+
+_DAY = ("2026-01-01", "2026-01-08")
+
+# 실제로 실행되는 문장(database/hot_queries.py)을 예시 파라미터로 점검
+HOT_QUERIES: List[Tuple[str, str, Sequence]] = [
+    ("sum_spend_in_range", _sql.SUM_SPEND_IN_RANGE_SQL, (1, *_DAY)),
+    ("sum_spend_in_range_category", _sql.SUM_SPEND_IN_RANGE_SQL + _sql.SPEND_CATEGORY_FILTER_SQL, (1, *_DAY, "간식")),
+    ("sum_saving_on_date", _sql.SUM_SAVING_IN_RANGE_SQL, (1, "2026-01-01", "2026-01-02")),
+    ("autosave_week_sums", _sql.AUTOSAVE_WEEK_SUMS_SQL, (1, *_DAY)),
+    ("challenge_series", _sql.CHALLENGE_SERIES_SQL, (1, *_DAY)),
+    ("recent_behaviors", _sql.USER_BEHAVIORS_SQL, (1, 50)),
+    ("family_period_totals", _sql.FAMILY_PERIOD_TOTALS_SQL, ("PC", *_DAY)),
+    ("family_missions_completed", _sql.FAMILY_MISSIONS_COMPLETED_SQL, (*_DAY, "PC")),
+    ("children_monthly_savings", _sql.CHILDREN_MONTHLY_SAVINGS_SQL, ("PC",)),
+    ("children_stats_this_month", _sql.CHILDREN_STATS_THIS_MONTH_SQL, ("PC",)),
+    ("growth_behavior_daily", _sql.BEHAVIOR_DAILY_RECENT_SQL, (1, "-90 day")),
+    ("growth_emotion_daily", _sql.EMOTION_DAILY_RECENT_SQL, (1, "-90 day")),
+    ("recent_emotions", _sql.EMOTION_LOGS_RECENT_SQL, (1, 30)),
+    (
+        "emotions_since",
+        _sql.EMOTIONS_FIND_SQL.format(where="user_id = ? AND created_at >= ?", order_by="created_at DESC, id DESC"),
+        (1, "2026-01-01 00:00:00"),
+    ),
+    (
+        "emotions_count_since",
+        _sql.EMOTIONS_COUNT_SQL.format(where="user_id = ? AND created_at >= ?"),
+        (1, "2026-01-01 00:00:00"),
+    ),
+]
+
+
+_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS (\w+))?(.*)$")
+
+
+def _full_scans(plan_details: List[str], sql: str) -> List[str]:
+    """
+    감시 대상 테이블의 'SCAN <table>' 을 골라냄
+    - 'SCAN ... USING (COVERING) INDEX' 도 인덱스 전체를 읽는 것이라 포함(범위 조회는 'SEARCH')
+    """
+    aliases = {t: t for t in WATCHED_TABLES}
+    for t in WATCHED_TABLES:
+        for m in re.finditer(rf"\b{t}\s+(?:AS\s+)?(\w+)", sql, flags=re.IGNORECASE):
+            alias = m.group(1)
+            if alias.upper() not in ("WHERE", "JOIN", "ON", "GROUP", "ORDER", "LIMIT", "SET", "VALUES"):
+                aliases[alias] = t
+    out: List[str] = []
+    for detail in plan_details:
+        m = _SCAN_RE.match(detail.strip())
+        if not m:
+            continue
+        if m.group(1) in aliases:
+            out.append(detail)
+    return out
+
+
+def explain(conn, sql: str, params: Sequence = ()) -> List[str]:
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, tuple(params)).fetchall()
+    return [str(r[3] if not hasattr(r, "keys") else r["detail"]) for r in rows]
+
+
+def check_query_plans(conn, queries: List[Tuple[str, str, Sequence]] | None = None) -> List[Dict]:
+    """
+    return: 쿼리별 [{"name", "plan": [...], "full_scans": [...]}]
+    """
+    results: List[Dict] = []
+    for name, sql, params in queries or HOT_QUERIES:
+        plan = explain(conn, sql, params)
+        results.append({"name": name, "plan": plan, "full_scans": _full_scans(plan, sql)})
+    return results
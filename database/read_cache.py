@@ -0,0 +1,328 @@
+"""
+DatabaseManager 읽기 캐시(세션 범위) + 쓰기 무효화.
+
+Streamlit은 상호작용마다 페이지 스크립트 전체를 다시 실행하므로
+get_user_by_id / get_notifications 같은 조회가 한 번의 rerun 안에서도 여러 번 반복됩니다.
+
+- CachedDatabaseManager: DatabaseManager를 감싸는 프록시
+  - READ_TAGS 에 등록된 조회 메서드는 (메서드, 인자) 키로 캐시(TTL + LRU 크기 제한)
+  - WRITE_TAGS 에 등록된 쓰기 메서드는 실행 후 관련 태그를 무효화
+  - 그 외 메서드/속성은 그대로 위임
+  - transaction() 블록 안의 조회는 캐시를 거치지 않음(쓰기 잠금을 잡은 상태에서 확인하는 값은 항상 DB 최신값)
+- 태그는 'entity:user_id' 형태. 'entity' 만 무효화하면 모든 사용자의 해당 entity가 무효화되고,
+  '*' 는 전체 무효화입니다.
+- 태그 버전은 프로세스 전역이라, 같은 프로세스의 다른 세션에서 쓴 변경도 바로 반영됩니다.
+  (DB를 직접 수정하는 경로는 TTL로 보정)
+"""
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# ========== 태그 버전(프로세스 전역) ==========
+
+_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()
+
+
+def _dep_keys(tag: str) -> Tuple[str, ...]:
+    """'notifications:3' → ('*', 'notifications', 'notifications:3')"""
+    base = tag.split(":", 1)[0]
+    return ("*", base, tag) if base != tag else ("*", tag)
+
+
+def bump(*tags: str) -> None:
+    """태그 무효화(버전 증가)"""
+    with _versions_lock:
+        for t in tags:
+            _versions[t] = _versions.get(t, 0) + 1
+
+
+def bump_all() -> None:
+    bump("*")
+
+
+def _snapshot(tags: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+    keys = sorted({k for t in tags for k in _dep_keys(t)})
+    return tuple((k, _versions.get(k, 0)) for k in keys)
+
+
+def _is_current(snapshot: Tuple[Tuple[str, int], ...]) -> bool:
+    return all(_versions.get(k, 0) == v for k, v in snapshot)
+
+
+# ========== 캐시 ==========
+
+class ReadCache:
+    """TTL + 크기 제한(LRU) 캐시"""
+
+    def __init__(self, ttl: float = 15.0, max_size: int = 256):
+        self.ttl = float(ttl)
+        self.max_size = int(max_size)
+        self._data: "OrderedDict[Tuple, Tuple[float, Tuple, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return False, None
+            stored_at, snap, value = item
+            if time.monotonic() - stored_at > self.ttl:
+                self.expired += 1
+            elif not _is_current(snap):
+                self.stale += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, value
+            del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Tuple, value: Any, snap: Tuple) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), snap, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+# ========== 메서드별 태그 ==========
+
+def _uid(args: tuple, kwargs: dict, name: str = "user_id") -> str:
+    v = kwargs.get(name, args[0] if args else "")
+    try:
+        return str(int(v))
+    except (TypeError, ValueError):
+        return str(v)
+
+
+def _user(entity: str, arg: str = "user_id") -> Callable[[tuple, dict], List[str]]:
+    return lambda a, k: [f"{entity}:{_uid(a, k, arg)}"]
+
+
+def _const(*tags: str) -> Callable[[tuple, dict], List[str]]:
+    return lambda a, k: list(tags)
+
+
+def _users_in(entity: str, arg: str, index: int = 0, key: str = "user_id") -> Callable[[tuple, dict], List[str]]:
+    """id 목록 인자(또는 key 를 가진 dict/튜플 목록) → 사용자별 태그"""
+    def tags(a: tuple, k: dict) -> List[str]:
+        items = k.get(arg, a[index] if len(a) > index else None) or []
+        out = []
+        for it in items:
+            v = it.get(key) if isinstance(it, dict) else (it[0] if isinstance(it, (list, tuple)) else it)
+            out.append(f"{entity}:{_uid((v,), {})}")
+        return out or [entity]
+
+    return tags
+
+
+def _combine(*fns: Callable[[tuple, dict], List[str]]) -> Callable[[tuple, dict], List[str]]:
+    return lambda a, k: [t for fn in fns for t in fn(a, k)]
+
+
+# 조회 메서드 → 의존 태그
+READ_TAGS: Dict[str, Callable[[tuple, dict], List[str]]] = {
+    "get_user_by_id": _user("user"),
+    "get_users_by_parent_code": _const("users"),
+    "get_users_by_parent_code_all": _const("users"),
+    "get_notifications": _user("notifications"),
+    "get_unread_notification_count": _user("notifications"),
+    "get_unlocked_skins": _user("skins"),
+    "get_goals": _user("goals"),
+    "get_goal_progress": _const("goals"),
+    "get_missions_for_user": _user("missions"),
+    "get_user_badges": _user("badges"),
+    "get_balance": _user("behaviors"),
+    "get_user_behaviors": _user("behaviors"),
+    "get_behavior_daily": _user("behaviors"),
+    "get_emotion_daily": _user("emotions"),
+    "get_xp": _combine(_user("behaviors"), _user("missions")),
+    "get_auto_saving_setting": _user("autosave"),
+    "get_challenge_instances": _user("challenges"),
+    "get_learning_progress": _user("learning"),
+    "get_habit_counts": _const("behaviors"),
+}
+
+# 쓰기 메서드 → 무효화 태그
+WRITE_TAGS: Dict[str, Callable[[tuple, dict], List[str]]] = {
+    "create_user": _const("users"),
+    "link_child_with_invite_code": _const("users", "user"),
+    "update_user_birth_date": _combine(_user("user"), _const("users")),
+    "update_user_character_code": _combine(_user("user"), _const("users")),
+    "update_user_character_nickname": _combine(_user("user"), _const("users")),
+    "update_user_character_skin_code": _combine(_user("user"), _const("users")),
+    "update_user_name": _combine(_user("user"), _const("users")),
+    "update_user_password": _user("user"),
+    "update_user_info": _combine(_user("user"), _const("users")),
+    "update_user_type": _combine(_user("user"), _const("users")),
+    "add_coins": _user("user"),
+    "unlock_skin": _user("skins"),
+    "purchase_skin": _combine(_user("skins"), _user("user")),
+    "grant_level_rewards_if_needed": _combine(_user("user"), _user("skins"), _user("notifications")),
+    "create_notification": _user("notifications"),
+    "create_notifications": _users_in("notifications", "notifications"),
+    "mark_notification_read": _const("notifications"),
+    "mark_all_notifications_read": _user("notifications"),
+    "rebuild_notification_counters": _const("notifications"),
+    "assign_custom_mission": _combine(
+        _users_in("missions", "child_ids", index=1), _users_in("notifications", "child_ids", index=1)
+    ),
+    "assign_daily_missions_if_needed": _user("missions"),
+    "complete_mission": _const("missions"),
+    "award_badges_if_needed": _user("badges"),
+    "save_behavior": _user("behaviors"),
+    "save_behavior_v2": _user("behaviors"),
+    "create_emotion_log": _user("emotions"),
+    "create_goal": _user("goals"),
+    "add_goal_contribution": _const("goals"),
+    "set_goal_active": _const("goals"),
+    "set_auto_saving_setting": _user("autosave"),
+    "try_grant_autosave_weekly_bonus": _combine(_user("user"), _user("notifications")),
+    "start_challenge": _user("challenges"),
+    "create_challenge_checkin": _const("challenges"),
+    "cancel_challenge_instance": _const("challenges"),
+    "finalize_challenge_if_due": _const("challenges", "behaviors", "user", "notifications"),
+    "upsert_learning_progress": _user("learning"),
+    "rebuild_wallet_balances": _const("behaviors"),
+    "rebuild_user_xp": _const("behaviors", "missions"),
+    "rebuild_daily_rollups": _const("behaviors", "emotions"),
+    "run_due_recurring_allowances": _const("*"),
+    "run_due_reminders": _const("*"),
+    "finalize_due_challenges": _const("*"),
+    "run_autosave_weekly_bonuses": _const("*"),
+}
+
+
+def _freeze(v: Any) -> Any:
+    if isinstance(v, dict):
+        return tuple(sorted((k, _freeze(x)) for k, x in v.items()))
+    if isinstance(v, (list, tuple, set)):
+        return tuple(_freeze(x) for x in v)
+    return v
+
+
+class CachedDatabaseManager:
+    """DatabaseManager 읽기 캐시 프록시(세션마다 1개)"""
+
+    def __init__(self, db, ttl: float = 15.0, max_size: int = 256):
+        self._db = db
+        self._cache = ReadCache(ttl=ttl, max_size=max_size)
+        # transaction() 블록 안에서 무효화한 태그(커밋/롤백 후 한 번 더 무효화)
+        self._tx_tags: Optional[List[str]] = None
+
+    @property
+    def raw(self):
+        """캐시 없이 원본 DatabaseManager"""
+        return self._db
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._db, name)
+        if not callable(attr):
+            return attr
+        if name in READ_TAGS:
+            return self._cached(name, attr, READ_TAGS[name])
+        if name in WRITE_TAGS:
+            return self._invalidating(attr, WRITE_TAGS[name])
+        return attr
+
+    def _cached(self, name: str, fn: Callable, tags_fn: Callable[[tuple, dict], List[str]]) -> Callable:
+        def wrapper(*args, **kwargs):
+            if self._tx_tags is not None:
+                # 트랜잭션 안: 다른 프로세스(스케줄러/다른 노드)의 쓰기는 태그를 올리지 않으므로 캐시 값을 믿을 수 없음
+                return fn(*args, **kwargs)
+            try:
+                key = (name, _freeze(args), _freeze(kwargs))
+                hash(key)
+            except TypeError:
+                return fn(*args, **kwargs)
+            found, value = self._cache.get(key)
+            if not found:
+                # 조회 전에 버전을 찍어 두면, 조회 중 다른 쓰기가 끼어들어도 다음 조회에서 stale 처리됨
+                snap = _snapshot(tags_fn(args, kwargs))
+                value = fn(*args, **kwargs)
+                self._cache.put(key, value, snap)
+            # 호출자가 결과(dict/list)를 수정해도 캐시가 오염되지 않도록 복사본 반환
+            return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+        wrapper.__name__ = name
+        return wrapper
+
+    def _invalidating(self, fn: Callable, tags_fn: Callable[[tuple, dict], List[str]]) -> Callable:
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tags = tags_fn(args, kwargs)
+                bump(*tags)
+                if self._tx_tags is not None:
+                    self._tx_tags.extend(tags)
+
+        wrapper.__name__ = getattr(fn, "__name__", "write")
+        return wrapper
+
+    @contextmanager
+    def transaction(self):
+        """
+        DatabaseManager.transaction() + 캐시 보정
+        - 블록 안 조회(READ_TAGS)는 캐시를 건너뛰고 DB 를 직접 읽음(잔액 확인 등 잠금 아래 검사용)
+        - 블록 안 조회는 아직 커밋 전 값을 캐시할 수 있고, 다른 세션은 커밋 전 옛 값을 캐시할 수 있으므로
+          블록이 끝나면(커밋/롤백 모두) 블록 안에서 무효화한 태그를 한 번 더 무효화
+        """
+        outer = self._tx_tags
+        if outer is None:
+            self._tx_tags = []
+        try:
+            with self._db.transaction() as uow:
+                yield uow
+        finally:
+            if outer is None:
+                tags, self._tx_tags = self._tx_tags, None
+                if tags:
+                    bump(*tags)
+
+    def invalidate(self, *tags: str) -> None:
+        """직접 SQL로 쓴 뒤 등 수동 무효화(태그 없으면 전체)"""
+        tags = tags or ("*",)
+        bump(*tags)
+        if self._tx_tags is not None:
+            self._tx_tags.extend(tags)
+
+    def cache_stats(self) -> Dict:
+        return self._cache.stats()
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
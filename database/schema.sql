@@ -170,9 +170,10 @@ CREATE TABLE IF NOT EXISTS reminders (
 -- 인덱스 생성
 CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations(user_id);
 CREATE INDEX IF NOT EXISTS idx_messages_conversation_id ON messages(conversation_id);
-CREATE INDEX IF NOT EXISTS idx_behaviors_user_id ON behaviors(user_id);
+CREATE INDEX IF NOT EXISTS idx_behaviors_user_ts ON behaviors(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_behaviors_user_type_ts ON behaviors(user_id, behavior_type, timestamp, amount);
 CREATE INDEX IF NOT EXISTS idx_behaviors_timestamp ON behaviors(timestamp);
-CREATE INDEX IF NOT EXISTS idx_emotion_logs_user_id ON emotion_logs(user_id);
+CREATE INDEX IF NOT EXISTS idx_emotion_logs_user_created ON emotion_logs(user_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_emotion_logs_created_at ON emotion_logs(created_at);
 CREATE INDEX IF NOT EXISTS idx_scores_user_id ON scores(user_id);
 CREATE INDEX IF NOT EXISTS idx_users_parent_code ON users(parent_code);
@@ -258,4 +259,85 @@ CREATE INDEX IF NOT EXISTS idx_auto_saving_weekly_rewards_user_id ON auto_saving
 CREATE INDEX IF NOT EXISTS idx_challenge_templates_parent_code ON challenge_templates(parent_code);
 CREATE INDEX IF NOT EXISTS idx_challenge_instances_user_id ON challenge_instances(user_id);
 CREATE INDEX IF NOT EXISTS idx_challenge_instances_status ON challenge_instances(status);
-CREATE INDEX IF NOT EXISTS idx_challenge_checkins_instance_id ON challenge_checkins(instance_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_challenge_checkins_instance_id ON challenge_checkins(instance_id);
+
+-- =========================
+-- 미션 / 배지 / 학습 / 목표
+-- =========================
+
+-- 미션 템플릿(시스템 공용: parent_code NULL)
+CREATE TABLE IF NOT EXISTS mission_templates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    parent_code TEXT,
+    title TEXT NOT NULL,
+    description TEXT,
+    difficulty TEXT DEFAULT 'easy',  -- easy|normal|hard
+    reward_amount REAL DEFAULT 0,
+    is_active INTEGER DEFAULT 1,
+    created_by INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 미션 배정(아이별)
+CREATE TABLE IF NOT EXISTS mission_assignments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    template_id INTEGER NOT NULL,
+    cycle TEXT NOT NULL, -- daily/weekly/custom
+    assigned_date TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'active', -- active/completed
+    completed_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 배지
+CREATE TABLE IF NOT EXISTS badges (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    code TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    icon TEXT,
+    required_xp INTEGER NOT NULL DEFAULT 0
+);
+
+-- 배지 획득
+CREATE TABLE IF NOT EXISTS user_badges (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    badge_id INTEGER NOT NULL,
+    earned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, badge_id)
+);
+
+-- 경제 교실 학습 진행
+CREATE TABLE IF NOT EXISTS learning_progress (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    lesson_code TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, lesson_code)
+);
+
+-- 저축 목표
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    target_amount REAL NOT NULL DEFAULT 0,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS goal_contributions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    goal_id INTEGER NOT NULL,
+    amount REAL NOT NULL DEFAULT 0,
+    note TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_mission_assignments_user_id ON mission_assignments(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_badges_user_id ON user_badges(user_id);
+CREATE INDEX IF NOT EXISTS idx_goals_user_id ON goals(user_id);
+CREATE INDEX IF NOT EXISTS idx_goal_contributions_goal_id ON goal_contributions(goal_id);
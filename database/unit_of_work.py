@@ -0,0 +1,190 @@
+"""
+작업 단위(unit of work) 트랜잭션 - 여러 DatabaseManager 메서드가 커넥션 1개 + 커밋 1번을 공유
+
+    with db.transaction():
+        if db.complete_mission(aid):
+            db.save_behavior_v2(uid, "allowance", 500)
+            db.create_notification(uid, "미션 완료!")
+    # 블록을 정상 종료하면 COMMIT 1회, 예외면 전체 ROLLBACK
+
+- 블록 안에서 _get_connection() 은 공유 커넥션의 SAVEPOINT 핸들을 돌려줍니다.
+  기존 메서드의 commit() → RELEASE, rollback() → ROLLBACK TO, close() → 미커밋분만 되돌림
+  이라 메서드 코드를 고치지 않아도 메서드 단위 원자성은 그대로 유지됩니다.
+- 메서드 안의 BEGIN / BEGIN IMMEDIATE 는 무시(바깥 BEGIN IMMEDIATE 가 이미 쓰기 잠금을 잡음)
+- 중첩 transaction() 은 SAVEPOINT 로 동작
+- 예외(st.rerun()/st.switch_page() 포함)는 롤백이므로 화면 이동은 블록 밖에서 호출하세요.
+"""
+from __future__ import annotations
+
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class UnitOfWork:
+    """진행 중인 작업 단위(풀 1개 기준, 컨텍스트별)"""
+
+    def __init__(self, pool, conn):
+        self.pool = pool
+        self.conn = conn
+        self._seq = 0
+
+    def savepoint(self) -> str:
+        self._seq += 1
+        name = f"amf_sp_{self._seq}"
+        self.conn.execute(f"SAVEPOINT {name}")
+        return name
+
+    def release(self, name: str) -> None:
+        self.conn.execute(f"RELEASE SAVEPOINT {name}")
+
+    def rollback_to(self, name: str) -> None:
+        self.conn.execute(f"ROLLBACK TO SAVEPOINT {name}")
+
+
+_current: contextvars.ContextVar[Optional[UnitOfWork]] = contextvars.ContextVar("amf_unit_of_work", default=None)
+
+
+def current(pool) -> Optional[UnitOfWork]:
+    """pool 에 대해 진행 중인 작업 단위(없으면 None)"""
+    uow = _current.get()
+    return uow if uow is not None and uow.pool is pool else None
+
+
+def _is_begin(sql) -> bool:
+    return isinstance(sql, str) and sql.lstrip()[:5].upper() == "BEGIN"
+
+
+def _is_select(sql) -> bool:
+    # 조회만 하는 문장은 되돌릴 것이 없으므로 SAVEPOINT 를 열지 않음
+    return isinstance(sql, str) and sql.lstrip()[:6].upper() == "SELECT"
+
+
+class _SavepointCursor:
+    """공유 커넥션 커서 프록시: BEGIN 무시 + 쓰기 전에 SAVEPOINT 보장"""
+
+    __slots__ = ("_owner", "_cur")
+
+    def __init__(self, owner: "SavepointConnection", cur):
+        self._owner = owner
+        self._cur = cur
+
+    def execute(self, sql, parameters=()):
+        if not _is_begin(sql):
+            if not _is_select(sql):
+                self._owner._ensure_savepoint()
+            self._cur.execute(sql, parameters)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._owner._ensure_savepoint()
+        self._cur.executemany(sql, seq_of_parameters)
+        return self
+
+    def executescript(self, script):
+        self._owner._ensure_savepoint()
+        self._cur.executescript(script)
+        return self
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __getattr__(self, name: str):
+        return getattr(self._cur, name)
+
+
+class SavepointConnection:
+    """
+    트랜잭션 블록 안에서 _get_connection() 이 돌려주는 커넥션 핸들(메서드 호출 1번 = SAVEPOINT 1개)
+    - SAVEPOINT 는 첫 쓰기 문장 때 열고, commit() 후 다시 쓰면 새로 엶
+    """
+
+    __slots__ = ("_uow", "_sp", "_closed")
+
+    def __init__(self, uow: UnitOfWork):
+        self._uow = uow
+        self._sp: Optional[str] = None
+        self._closed = False
+
+    def _ensure_savepoint(self) -> None:
+        if self._closed:
+            raise RuntimeError("closed connection handle inside transaction()")
+        if self._sp is None:
+            self._sp = self._uow.savepoint()
+
+    def cursor(self, *args, **kwargs) -> _SavepointCursor:
+        return _SavepointCursor(self, self._uow.conn.cursor(*args, **kwargs))
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self) -> None:
+        if self._sp is not None:
+            self._uow.release(self._sp)
+            self._sp = None
+
+    def rollback(self) -> None:
+        if self._sp is not None:
+            self._uow.rollback_to(self._sp)
+            self._uow.release(self._sp)
+            self._sp = None
+
+    def close(self) -> None:
+        """커밋하지 않은 변경은 되돌림(풀 반납 시 롤백과 같은 의미). 공유 커넥션은 반납하지 않음"""
+        if self._closed:
+            return
+        try:
+            self.rollback()
+        finally:
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def __getattr__(self, name: str):
+        return getattr(self._uow.conn, name)
+
+
+@contextmanager
+def transaction(pool) -> Iterator[UnitOfWork]:
+    """
+    pool 에 대한 작업 단위 시작(이미 진행 중이면 SAVEPOINT 로 중첩)
+    return: UnitOfWork (uow.conn 으로 직접 SQL 실행 가능)
+    """
+    outer = current(pool)
+    if outer is not None:
+        handle = SavepointConnection(outer)
+        handle._ensure_savepoint()
+        try:
+            yield outer
+        except BaseException:
+            handle.close()
+            raise
+        handle.commit()
+        handle.close()
+        return
+
+    conn = pool.acquire()
+    uow = UnitOfWork(pool, conn)
+    token = _current.set(uow)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        yield uow
+        conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        _current.reset(token)
+        conn.close()
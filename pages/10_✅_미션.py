@@ -2,7 +2,7 @@ import streamlit as st
 
 from datetime import date
 
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 
 
@@ -40,7 +40,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
     db.seed_default_missions_and_badges()
 
     user_id = int(st.session_state.get("user_id"))
@@ -102,33 +102,35 @@ def main():
                             st.caption(_ko_mission_desc(m.get("description")))
                         st.caption(f"난이도: {m.get('difficulty')} · 보상: {int(m.get('reward_amount') or 0):,}원")
                         if st.button("완료!", key=f"complete_{m['id']}", use_container_width=True, type="primary"):
+                            # 완료 → 보상 기록 → 알림 → 배지 → 레벨 보상: 한 트랜잭션(커밋 1회)
                             xp_before = 0
                             lvl_before = 1
-                            try:
-                                xp_before = int(db.get_xp(user_id) or 0) if hasattr(db, "get_xp") else 0
-                                lvl_before = max(1, xp_before // 20 + 1)
-                            except Exception:
-                                pass
-                            ok = db.complete_mission(int(m["id"]))
-                            if ok:
-                                reward = float(m.get("reward_amount") or 0)
-                                if reward > 0:
-                                    db.save_behavior_v2(user_id, "allowance", reward, description="미션 보상", category="미션")
-                                db.create_notification(user_id, "미션 완료!", f"보상 {int(reward):,}원을 받았어요.", level="success")
-                                db.award_badges_if_needed(user_id)
-                                xp_after = xp_before
-                                lvl_after = lvl_before
+                            with db.transaction():
                                 try:
-                                    xp_after = int(db.get_xp(user_id) or 0) if hasattr(db, "get_xp") else xp_before
-                                    lvl_after = max(1, xp_after // 20 + 1)
+                                    xp_before = int(db.get_xp(user_id) or 0) if hasattr(db, "get_xp") else 0
+                                    lvl_before = max(1, xp_before // 20 + 1)
                                 except Exception:
                                     pass
+                                ok = db.complete_mission(int(m["id"]))
+                                if ok:
+                                    reward = float(m.get("reward_amount") or 0)
+                                    if reward > 0:
+                                        db.save_behavior_v2(user_id, "allowance", reward, description="미션 보상", category="미션")
+                                    db.create_notification(user_id, "미션 완료!", f"보상 {int(reward):,}원을 받았어요.", level="success")
+                                    db.award_badges_if_needed(user_id)
+                                    xp_after = xp_before
+                                    lvl_after = lvl_before
+                                    try:
+                                        xp_after = int(db.get_xp(user_id) or 0) if hasattr(db, "get_xp") else xp_before
+                                        lvl_after = max(1, xp_after // 20 + 1)
+                                    except Exception:
+                                        pass
+                                    try:
+                                        reward_info = db.grant_level_rewards_if_needed(user_id) if hasattr(db, "grant_level_rewards_if_needed") else {}
+                                    except Exception:
+                                        reward_info = {}
+                            if ok:
                                 gained_xp = max(0, xp_after - xp_before)
-                                reward_info = {}
-                                try:
-                                    reward_info = db.grant_level_rewards_if_needed(user_id) if hasattr(db, "grant_level_rewards_if_needed") else {}
-                                except Exception:
-                                    reward_info = {}
                                 coins_gained = int((reward_info or {}).get("coins_gained") or 0)
                                 skins_unlocked = (reward_info or {}).get("skins_unlocked") or []
 
@@ -211,6 +213,7 @@ def main():
             desc = st.text_input("설명(선택)", placeholder="예: 저축 기록을 3번 남겨요")
             difficulty = st.selectbox("난이도", ["easy", "normal", "hard"])
             reward = st.number_input("보상(원)", min_value=0, step=100, value=500)
+            to_all = len(children) > 1 and st.checkbox("모든 자녀에게 보내기", value=False)
             submitted = st.form_submit_button("미션 추가", use_container_width=True, type="primary")
 
         if submitted:
@@ -218,21 +221,9 @@ def main():
                 st.error("제목을 입력하세요.")
             else:
                 tid = db.create_custom_mission(parent_code, title.strip(), desc or None, difficulty, float(reward), user_id)
-                # 바로 자녀에게 할당(custom)
-                conn = db._get_connection()
-                cur = conn.cursor()
-                try:
-                    cur.execute(
-                        """
-                        INSERT INTO mission_assignments (user_id, template_id, cycle, assigned_date, status)
-                        VALUES (?, ?, 'custom', ?, 'active')
-                        """,
-                        (child_id, tid, today),
-                    )
-                    conn.commit()
-                finally:
-                    conn.close()
-                db.create_notification(child_id, "새 미션이 도착했어요!", title.strip(), level="info")
+                # 바로 자녀에게 할당(custom) + 알림: 한 트랜잭션
+                targets = [int(c["id"]) for c in children] if to_all else [child_id]
+                db.assign_custom_mission(tid, targets, today, notify_body=title.strip())
                 st.success("커스텀 미션을 만들고 자녀에게 보냈어요!")
 
         st.divider()
@@ -1,15 +1,8 @@
 import streamlit as st
 
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
-
-
-FAQ = {
-    "저축": "저축은 지금 쓰지 않고 나중을 위해 돈을 모으는 거예요. 목표를 정하면 더 쉬워요!",
-    "이자": "이자는 은행에 돈을 맡기면 은행이 고마워서 주는 ‘보너스 돈’이라고 생각하면 돼요.",
-    "예산": "예산은 ‘이번 달에 어디에 얼마를 쓸지’ 미리 계획하는 표예요.",
-    "충동구매": "충동구매는 계획 없이 갑자기 사고 싶어서 사는 거예요. 10분만 기다리면 줄어들 수 있어요!",
-}
+from services.faq import reply as _reply
 
 
 def _guard_login() -> bool:
@@ -19,18 +12,15 @@ def _guard_login() -> bool:
     return True
 
 
-def _reply(text: str) -> str:
-    t = (text or "").strip()
-    if not t:
-        return "무엇을 도와줄까?"
-    for k, v in FAQ.items():
-        if k in t:
-            return v
-    if "추천" in t or "조언" in t:
-        return "오늘은 ‘하루에 1,000원’ 같은 작은 저축부터 해보자! 그리고 지출은 ‘계획 지출’로 적어보면 좋아."
-    if "퀴즈" in t:
-        return "퀴즈! ‘저축’은 (1) 지금 쓰기 (2) 나중을 위해 모으기 중 뭐일까?"
-    return "좋은 질문이야! 더 자세히 말해주면 내가 더 잘 도와줄게. 예: ‘간식에 돈을 너무 써요’ 같은 상황도 좋아."
+def _get_conversation_service():
+    """세션당 1개. 생성에 실패하면 None → 페이지에서 바로 오프라인 FAQ 답변"""
+    if "_conversation_service" not in st.session_state:
+        try:
+            from services.conversation_service import ConversationService
+            st.session_state["_conversation_service"] = ConversationService()
+        except Exception:
+            st.session_state["_conversation_service"] = None
+    return st.session_state["_conversation_service"]
 
 
 def main():
@@ -38,7 +28,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
@@ -50,7 +40,22 @@ def main():
     st.caption("경제 용어, 저축 조언, 퀴즈까지! 매일 조금씩 똑똑해져요.")
 
     conv_id = db.get_or_create_today_conversation(user_id)
-    history = db.get_conversation_messages(conv_id, limit=50)
+
+    # 최신 50개 + '이전 대화 더 보기'로 불러온 이전 페이지(키셋 커서는 세션에 보관)
+    older = st.session_state.setdefault(f"_chat_older_{conv_id}", {"messages": [], "next_before_id": None})
+    if older["messages"]:
+        # 이전 페이지를 펼친 뒤에는 그 이후 메시지를 이어서(새 메시지가 와도 빈틈 없이)
+        recent = db.get_recent_messages(conv_id, limit=1000, after_id=int(older["messages"][-1]["id"]))
+    else:
+        page = db.get_messages_page(conv_id, limit=50)
+        recent = page["messages"]
+        older["next_before_id"] = page["next_before_id"]
+    if older["next_before_id"] and st.button("⬆️ 이전 대화 더 보기", use_container_width=True):
+        prev = db.get_messages_page(conv_id, before_id=older["next_before_id"], limit=50)
+        older["messages"] = prev["messages"] + older["messages"] + ([] if older["messages"] else recent)
+        older["next_before_id"] = prev["next_before_id"]
+        st.rerun()
+    history = older["messages"] + recent
 
     for m in history:
         role = m.get("role")
@@ -60,9 +65,25 @@ def main():
 
     prompt = st.chat_input("경제 질문을 해보세요 (예: 이자, 저축, 충동구매)")
     if prompt:
-        db.save_message(conv_id, "user", prompt)
-        answer = _reply(prompt)
-        db.save_message(conv_id, "assistant", answer)
+        svc = _get_conversation_service()
+        if svc is not None:
+            with st.chat_message("user"):
+                st.markdown(prompt)
+            with st.chat_message("assistant"):
+                # 토큰이 도착하는 대로 표시(대화 저장은 서비스가 처리)
+                st.write_stream(
+                    svc.chat_stream(
+                        user_id,
+                        prompt,
+                        user_name=user_name,
+                        user_age=(db.get_user_by_id(user_id) or {}).get("age"),
+                        user_type=user_type,
+                    )
+                )
+        else:
+            db.save_message(conv_id, "user", prompt)
+            answer = _reply(prompt)
+            db.save_message(conv_id, "assistant", answer)
         st.rerun()
 
 
@@ -1,6 +1,6 @@
 import streamlit as st
 
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 
 
@@ -23,7 +23,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
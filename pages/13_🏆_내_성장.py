@@ -4,7 +4,7 @@ import pandas as pd
 import plotly.express as px
 
 from datetime import datetime
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 
 
@@ -35,7 +35,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
@@ -80,37 +80,19 @@ def main():
     elif period_label == "90일":
         days = 90
 
-    # 데이터 로드
+    # 데이터 로드: 일별 롤업(behavior_daily/emotion_daily) → 90일이어도 (일 × 유형) 행만 읽음
     try:
-        conn = db._get_connection()  # pylint: disable=protected-access
-        behaviors = pd.read_sql_query(
-            """
-            SELECT behavior_type, amount, category, timestamp
-            FROM behaviors
-            WHERE user_id = ?
-              AND datetime(timestamp) >= datetime('now', ?)
-            """,
-            conn,
-            params=(int(user_id), f"-{int(days)} day"),
+        behaviors = pd.DataFrame(
+            db.get_behavior_daily(int(user_id), days=days),
+            columns=["day", "behavior_type", "category", "total_amount", "entry_count"],
+        ).rename(columns={"total_amount": "amount"})
+        emotions = pd.DataFrame(
+            db.get_emotion_daily(int(user_id), days=days),
+            columns=["day", "emotion", "context", "entry_count"],
         )
-        emotions = pd.read_sql_query(
-            """
-            SELECT emotion, context, created_at
-            FROM emotion_logs
-            WHERE user_id = ?
-              AND datetime(created_at) >= datetime('now', ?)
-            """,
-            conn,
-            params=(int(user_id), f"-{int(days)} day"),
-        )
-        conn.close()
     except Exception:
-        try:
-            conn.close()
-        except Exception:
-            pass
-        behaviors = pd.DataFrame(columns=["behavior_type", "amount", "category", "timestamp"])
-        emotions = pd.DataFrame(columns=["emotion", "context", "created_at"])
+        behaviors = pd.DataFrame(columns=["day", "behavior_type", "category", "amount", "entry_count"])
+        emotions = pd.DataFrame(columns=["day", "emotion", "context", "entry_count"])
 
     behaviors["amount"] = pd.to_numeric(behaviors.get("amount"), errors="coerce").fillna(0)
 
@@ -145,9 +127,9 @@ def main():
     if not emo_src.empty and (emo_src["context"] == "daily").any():
         emo_src = emo_src.loc[emo_src["context"] == "daily"]
     emo_counts = (
-        emo_src.groupby("emotion", as_index=False)
-        .size()
-        .rename(columns={"emotion": "기분", "size": "횟수"})
+        emo_src.groupby("emotion", as_index=False)["entry_count"]
+        .sum()
+        .rename(columns={"emotion": "기분", "entry_count": "횟수"})
         .sort_values("횟수", ascending=False)
     )
     if len(emo_counts) > 6:
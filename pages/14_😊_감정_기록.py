@@ -1,12 +1,12 @@
 import streamlit as st
 
-import base64
 from datetime import datetime, timedelta, date
-from pathlib import Path
 from typing import Optional
 
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 from utils.db import get_db
+from utils.assets import asset_url
+from styles.registry import inject_global_styles, stylesheet
 
 
 EMOTION_ASSETS = {
@@ -37,21 +37,14 @@ EMOTION_LABELS = {
 TYPE_LABELS = ["지출 전", "저축", "오늘 기분"]
 
 
-def _resolve_asset_path(rel_path: str) -> Path:
-    p = Path(rel_path)
-    if p.is_file():
-        return p
-    # pages/ 아래에서 실행될 수도 있어서, 레포 루트를 기준으로 한 번 더 시도
-    return (Path(__file__).resolve().parents[1] / rel_path).resolve()
+# 감정 선택 카드 배경 이미지 표시 크기(CSS background-size 와 맞출 것)
+EMOTION_ICON_PX = 52
 
 
 def _try_make_png_data_uri(rel_path: str) -> Optional[str]:
+    # 표시 크기로 줄인 썸네일(프로세스 캐시). 정적 서빙이 켜져 있으면 URL
     try:
-        p = _resolve_asset_path(rel_path)
-        if not p.is_file():
-            return None
-        encoded = base64.b64encode(p.read_bytes()).decode("ascii")
-        return "data:image/png;base64," + encoded
+        return asset_url(rel_path, EMOTION_ICON_PX)
     except Exception:
         return None
 
@@ -66,7 +59,7 @@ def _guard_login() -> bool:
     return True
 
 
-def _inject_page_css():
+def _build_page_css() -> str:
     # ✅ f-string 금지 (CSS의 { }가 파이썬 포맷으로 해석될 수 있음)
     css = """
     /* ===== 감정 기록: 카카오뱅크 스타일(페이지 스코프) ===== */
@@ -322,15 +315,20 @@ def _inject_page_css():
     worried_uri = _try_make_png_data_uri(EMOTION_ASSETS["worried"]) or EMOTION_REMOTE_FALLBACKS["worried"]
     angry_uri = _try_make_png_data_uri(EMOTION_ASSETS["angry"]) or EMOTION_REMOTE_FALLBACKS["angry"]
 
-    css = (
+    return (
         css.replace("__URI_EXCITED__", excited_uri)
         .replace("__URI_HAPPY__", happy_uri)
         .replace("__URI_NEUTRAL__", neutral_uri)
         .replace("__URI_WORRIED__", worried_uri)
         .replace("__URI_ANGRY__", angry_uri)
     )
+
+
+def _inject_page_css():
     st.markdown('<div id="amf_emotion_page_anchor"></div>', unsafe_allow_html=True)
-    st.markdown("<style>\n" + css + "\n</style>", unsafe_allow_html=True)
+    # 모든 규칙이 페이지 앵커/전용 클래스로 스코프돼 있어 세션당 1번 <head> 에 넣어도 다른 페이지에 영향 없음
+    # (감정 이미지 data URI 포함 시트를 매 rerun 다시 보내지 않음)
+    inject_global_styles("emotion_page", stylesheet("emotion_page", _build_page_css))
 
 
 def _compute_streak(records: list[dict]) -> int:
@@ -1,6 +1,6 @@
 import streamlit as st
 
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 from utils.characters import get_character_by_code, get_skins_for_character, get_skin_by_code
 
@@ -17,7 +17,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
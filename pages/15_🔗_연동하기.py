@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from urllib.parse import quote as _urlquote
 import streamlit.components.v1 as components
 
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 
 
@@ -45,7 +45,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
@@ -359,8 +359,10 @@ def main():
 
             # 첫 미션/알림
             try:
-                db.create_notification(user_id, "연동 완료! 🎉", f"{parent_name}과 연결되었어요.", level="success")
-                db.create_notification(user_id, "첫 미션이 도착했어요! 🎁", "홈에서 오늘의 미션을 확인해볼까요?", level="success")
+                db.create_notifications([
+                    (user_id, "연동 완료! 🎉", f"{parent_name}과 연결되었어요.", "success"),
+                    (user_id, "첫 미션이 도착했어요! 🎁", "홈에서 오늘의 미션을 확인해볼까요?", "success"),
+                ])
                 if hasattr(db, "assign_daily_missions_if_needed"):
                     db.assign_daily_missions_if_needed(user_id, datetime.now().date().isoformat())
             except Exception:
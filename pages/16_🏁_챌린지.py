@@ -4,6 +4,7 @@ from datetime import date, timedelta
 from textwrap import dedent as _dedent
 
 from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 from utils.money_format import format_korean_won
 
@@ -51,35 +52,6 @@ def _parse_params_json(s: str) -> dict:
         return {}
 
 
-def _sum_by_date(db: DatabaseManager, user_id: int, start_s: str, end_s: str, behavior_type: str, category: str | None = None) -> dict[str, float]:
-    """
-    date(timestamp) 기준 합계 맵
-    """
-    conn = db._get_connection()  # pylint: disable=protected-access
-    cur = conn.cursor()
-    try:
-        q = """
-            SELECT date(timestamp) as d, COALESCE(SUM(amount),0) as s
-            FROM behaviors
-            WHERE user_id = ?
-              AND behavior_type = ?
-              AND date(timestamp) BETWEEN ? AND ?
-        """
-        params = [int(user_id), str(behavior_type), str(start_s), str(end_s)]
-        if category is not None:
-            q += " AND COALESCE(category,'') = ?"
-            params.append(str(category))
-        q += " GROUP BY date(timestamp)"
-        cur.execute(q, params)
-        rows = cur.fetchall()
-        return {str(r["d"]): float(r["s"] or 0) for r in rows}
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-
-
 def _progress_ring(pct: float, label: str) -> str:
     try:
         p = float(pct or 0)
@@ -125,7 +97,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
@@ -235,8 +207,11 @@ def main():
         if not active:
             st.caption("진행 중인 챌린지가 없어요. 아래에서 새로 시작해보자!")
         else:
+            # 진행도는 한 번에 계산(챌린지 수/기간과 무관하게 쿼리 몇 번)
+            progress_map = db.compute_progress_bulk(user_id, active)
             for inst in active:
-                prog = db.compute_challenge_progress(inst) if hasattr(db, "compute_challenge_progress") else {}
+                prog = progress_map.get(int(inst["id"])) or {}
+                detail = prog.get("detail") or {}
                 params = _parse_params_json(inst.get("params_json") or "")
                 ctype = str(inst.get("challenge_type") or "")
                 with st.container(border=True):
@@ -259,13 +234,11 @@ def main():
                     # ✅ 핵심 지표(실사용)
                     if ctype in ("spend_cap", "reduce_category"):
                         today = date.today().isoformat()
-                        start_s = str(inst.get("start_date") or today)
-                        end_s = str(min(today, str(inst.get("end_date") or today)))
                         days_left = _days_remaining_inclusive(str(inst.get("end_date") or today))
                         if ctype == "spend_cap":
                             cap = float(params.get("cap_amount") or 0)
-                            spent_so_far = db._sum_spend_in_range(user_id, start_s, end_s) if hasattr(db, "_sum_spend_in_range") else 0
-                            spent_today = db._sum_spend_in_range(user_id, today, today) if hasattr(db, "_sum_spend_in_range") else 0
+                            spent_so_far = float(detail.get("spent") or 0)
+                            spent_today = float(detail.get("spent_today") or 0)
                             left = float(cap) - float(spent_so_far)
                             recommend = 0 if days_left <= 0 else int(max(0.0, left) / float(days_left))
                             k1, k2, k3 = st.columns(3)
@@ -277,8 +250,8 @@ def main():
                             baseline = float(params.get("baseline_amount") or 0)
                             pct = float(params.get("reduction_pct") or 10)
                             target = baseline * (1.0 - (pct / 100.0))
-                            cur_cat = db._sum_spend_in_range(user_id, start_s, end_s, category=cat or None) if hasattr(db, "_sum_spend_in_range") else 0
-                            today_cat = db._sum_spend_in_range(user_id, today, today, category=cat or None) if hasattr(db, "_sum_spend_in_range") else 0
+                            cur_cat = float(detail.get("spent") or 0)
+                            today_cat = float(detail.get("spent_today") or 0)
                             left = float(target) - float(cur_cat)
                             recommend = 0 if days_left <= 0 else int(max(0.0, left) / float(days_left))
                             k1, k2, k3 = st.columns(3)
@@ -289,7 +262,7 @@ def main():
                     if ctype in ("daily_save_fixed", "daily_save_increasing"):
                         start_s = str(inst.get("start_date") or date.today().isoformat())
                         end_s = str(inst.get("end_date") or date.today().isoformat())
-                        saving_by_date = _sum_by_date(db, user_id, start_s, end_s, "saving")
+                        saving_by_date = detail.get("saved_by_date") or {}
                         try:
                             s = date.fromisoformat(start_s)
                             e = date.fromisoformat(end_s)
@@ -442,7 +415,7 @@ def main():
                     FROM behaviors
                     WHERE user_id = ?
                       AND behavior_type IN ('planned_spending','impulse_buying','spend')
-                      AND datetime(timestamp) >= datetime('now', ?)
+                      AND timestamp >= datetime('now', ?)
                     GROUP BY COALESCE(category,'미분류')
                     ORDER BY s DESC
                     LIMIT 10
@@ -658,8 +631,9 @@ def main():
         if not insts:
             st.caption("진행 중인 챌린지가 없어요.")
         else:
+            progress_map = db.compute_progress_bulk(int(child_id), insts)
             for inst in insts:
-                prog = db.compute_challenge_progress(inst) if hasattr(db, "compute_challenge_progress") else {}
+                prog = progress_map.get(int(inst["id"])) or {}
                 with st.container(border=True):
                     st.markdown(f"**{_type_badge(inst.get('challenge_type'))} · {inst.get('template_title')}**")
                     st.caption(_fmt_range(inst.get("start_date"), inst.get("end_date")))
@@ -4,7 +4,10 @@ from datetime import date, datetime
 from pathlib import Path
 
 from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
+from styles.registry import inject_page_styles, stylesheet
+from utils import profiler as prof
 
 
 def _resolve_asset_path(rel_path: str) -> str:
@@ -123,21 +126,9 @@ def _guard_login() -> bool:
 
 
 def _compute_balance(db: DatabaseManager, user_id: int) -> dict:
+    # 합계/잔액은 지갑 원장(wallet_balances)에서, 목록은 화면 표시용으로만 조회
     behaviors = db.get_user_behaviors(user_id, limit=2000)
-    total_allowance = sum((b.get("amount") or 0) for b in behaviors if b.get("behavior_type") == "allowance")
-    total_saving = sum((b.get("amount") or 0) for b in behaviors if b.get("behavior_type") == "saving")
-    total_spend = sum(
-        (b.get("amount") or 0)
-        for b in behaviors
-        if b.get("behavior_type") in ("planned_spending", "impulse_buying")
-    )
-    return {
-        "behaviors": behaviors,
-        "total_allowance": float(total_allowance),
-        "total_saving": float(total_saving),
-        "total_spend": float(total_spend),
-        "balance": float(total_allowance - total_saving - total_spend),
-    }
+    return {"behaviors": behaviors, **db.get_balance(user_id)}
 
 
 def _ko_mission_desc(desc: str | None) -> str:
@@ -160,7 +151,9 @@ def _ko_mission_desc(desc: str | None) -> str:
     return " ".join(s.split()).strip()
 
 def _inject_dashboard_css():
-    st.markdown(
+    # .stApp 배경/컨테이너 폭을 바꾸므로 페이지 스타일(압축본은 프로세스 캐시)
+    inject_page_styles(stylesheet(
+        "dashboard",
         """
         <style>
             /* 전역 디자인 토큰은 utils/menu.py에서 주입됩니다. */
@@ -408,22 +401,18 @@ def _inject_dashboard_css():
             }
         </style>
         """,
-        unsafe_allow_html=True,
-    )
+    ))
 
 
 def main():
     if not _guard_login():
         return
+    prof.start_page("dashboard")
 
+    prof.mark("setup", "db")
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
     _safe_seed_defaults(db)
-    # ✅ 스케줄러 대체: 앱 진입 시 정기용돈 자동 실행
-    try:
-        db.run_due_recurring_allowances()
-    except Exception:
-        pass
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
@@ -437,8 +426,10 @@ def main():
     elif user_type not in ("parent", "child"):
         user_type = "child"
 
+    prof.mark("menu", "render")
     render_sidebar_menu(user_id, user_name, user_type)
     _inject_dashboard_css()
+    prof.mark("header", "render")
 
     # ✅ 레벨업 대형 연출 카드(한 번만 표시)
     ev = st.session_state.pop("levelup_event", None)
@@ -506,60 +497,32 @@ def main():
         now = datetime.now()
         ym = f"{now.year}-{now.month:02d}"
 
-        # 1) 전체 자녀 용돈 현황 요약 + (자녀별) 이번 달 통계 캐시
-        total_balance = 0
-        total_allowance = 0
-        total_saving = 0
-        total_spend = 0
-        month_allowance = 0.0
-        month_saving = 0.0
-        month_spend = 0.0
-        month_impulse = 0.0
-        child_cards = []
-        for ch in children:
-            cid = int(ch["id"])
-            cstats = _compute_balance(db, cid)
-            total_balance += cstats["balance"]
-            total_allowance += cstats["total_allowance"]
-            total_saving += cstats["total_saving"]
-            total_spend += cstats["total_spend"]
-
-            cm_allow = 0.0
-            cm_save = 0.0
-            cm_spend = 0.0
-            cm_impulse = 0.0
-            for b in cstats["behaviors"]:
-                ts = str(b.get("timestamp") or "")
-                if not ts.startswith(ym):
-                    continue
-                t = b.get("behavior_type")
-                amt = float(b.get("amount") or 0)
-                if t == "allowance":
-                    cm_allow += amt
-                elif t == "saving":
-                    cm_save += amt
-                elif t == "planned_spending":
-                    cm_spend += amt
-                elif t == "impulse_buying":
-                    cm_impulse += amt
-            month_allowance += cm_allow
-            month_saving += cm_save
-            month_spend += cm_spend
-            month_impulse += cm_impulse
-
-            child_cards.append(
-                {
-                    "id": cid,
-                    "name": ch.get("name") or ch.get("username") or f"ID {cid}",
-                    "username": ch.get("username") or "",
-                    "balance": float(cstats["balance"]),
-                    "month_allowance": float(cm_allow),
-                    "month_saving": float(cm_save),
-                    "month_spend": float(cm_spend),
-                    "month_impulse": float(cm_impulse),
-                    "behaviors": cstats["behaviors"],
-                }
-            )
+        # 1) 전체 자녀 용돈 현황 요약 + (자녀별) 이번 달 통계: 가족 집계 1회
+        prof.mark("parent.summary", "db")
+        family = db.get_family_summary(parent_code, ym)
+        totals = family["totals"]
+        total_balance = totals.get("balance", 0)
+        total_allowance = totals.get("total_allowance", 0)
+        total_saving = totals.get("total_saving", 0)
+        total_spend = totals.get("total_spend", 0)
+        month_allowance = float(totals.get("period_allowance", 0))
+        month_saving = float(totals.get("period_saving", 0))
+        month_spend = float(totals.get("period_planned", 0))
+        month_impulse = float(totals.get("period_impulse", 0))
+        child_cards = [
+            {
+                "id": int(ch["id"]),
+                "name": ch["name"],
+                "username": ch["username"],
+                "balance": float(ch["balance"]),
+                "month_allowance": float(ch["period_allowance"]),
+                "month_saving": float(ch["period_saving"]),
+                "month_spend": float(ch["period_planned"]),
+                "month_impulse": float(ch["period_impulse"]),
+                "missions_completed_7d": int(ch["missions_completed_7d"]),
+            }
+            for ch in family["children"]
+        ]
 
         st.markdown("### 👨‍👩‍👧 가족 요약")
         r1c1, r1c2 = st.columns(2)
@@ -598,6 +561,7 @@ def main():
             return
 
         # ✅ 모바일 스크롤 줄이기: 탭으로 정리
+        prof.mark("parent.tabs", "render")
         tab_overview, tab_children, tab_timeline, tab_missions = st.tabs(["요약", "자녀", "타임라인", "미션"])
 
         with tab_overview:
@@ -669,7 +633,7 @@ def main():
             timeline = []
             for c in child_cards:
                 cname = c["name"]
-                for b in c["behaviors"][:40]:
+                for b in db.get_user_behaviors(int(c["id"]), limit=40):
                     ts = str(b.get("timestamp") or "")
                     btype = b.get("behavior_type") or ""
                     amt = float(b.get("amount") or 0)
@@ -715,65 +679,20 @@ def main():
 
         with tab_missions:
             st.subheader("✅ 미션 완료(가족)")
-            rows = []
-            month_missions = 0
-            try:
-                conn = db._get_connection()  # pylint: disable=protected-access
-                cur = conn.cursor()
-                cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='mission_assignments'")
-                has_m = bool(cur.fetchone())
-                if has_m:
-                    cur.execute(
-                        """
-                        SELECT u.name, COUNT(a.id) as completed
-                        FROM mission_assignments a
-                        JOIN users u ON a.user_id = u.id
-                        WHERE u.parent_code = ?
-                          AND u.user_type = 'child'
-                          AND a.status = 'completed'
-                          AND a.completed_at >= datetime('now', '-7 days')
-                        GROUP BY u.name
-                        ORDER BY completed DESC
-                        """,
-                        (parent_code,),
-                    )
-                    rows = cur.fetchall()
-                    cur.execute(
-                        """
-                        SELECT COUNT(*) as cnt
-                        FROM mission_assignments a
-                        JOIN users u ON a.user_id = u.id
-                        WHERE u.parent_code = ?
-                          AND u.user_type = 'child'
-                          AND a.status = 'completed'
-                          AND strftime('%Y-%m', a.completed_at) = ?
-                        """,
-                        (parent_code, ym),
-                    )
-                    month_missions = int((cur.fetchone() or {}).get("cnt") or 0)
-            except Exception:
-                rows = []
-                month_missions = 0
-            finally:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
+            rows = sorted(
+                ({"name": c["name"], "completed": c["missions_completed_7d"]} for c in child_cards if c["missions_completed_7d"] > 0),
+                key=lambda r: r["completed"],
+                reverse=True,
+            )
+            month_missions = int(totals.get("missions_completed_period", 0))
 
             if month_missions == 0:
                 # fallback: 보상 기록(용돈/미션 카테고리)로 대략 추정
-                try:
-                    est = 0
-                    for c in child_cards:
-                        for b in c["behaviors"][:500]:
-                            ts = str(b.get("timestamp") or "")
-                            if not ts.startswith(ym):
-                                continue
-                            if b.get("behavior_type") == "allowance" and (b.get("category") or "").strip() == "미션":
-                                est += 1
-                    month_missions = est
-                except Exception:
-                    month_missions = 0
+                month_missions = sum(
+                    r["count"]
+                    for r in family["period_rows"]
+                    if r["behavior_type"] == "allowance" and r["category"] == "미션"
+                )
 
             st.metric("이번 달 가족 미션 완료(합계)", f"{month_missions}개")
             if not rows:
@@ -798,6 +717,7 @@ def main():
 
     else:
         # 아이용 홈
+        prof.mark("child.profile", "db")
         cstats = _compute_balance(db, user_id)
         me = db.get_user_by_id(user_id) or {}
         try:
@@ -831,8 +751,10 @@ def main():
             st.caption("내 캐릭터가 아직 없어요. 설정에서 선택할 수 있어요.")
 
         # 감정 기록 - 리디자인(칩 + 하단 미니 CTA, 카카오뱅크 톤)
+        prof.mark("child.emotion", "render")
         st.markdown('<div id="amf_emotion_dash_anchor"></div>', unsafe_allow_html=True)
-        st.markdown(
+        inject_page_styles(stylesheet(
+            "dashboard.emotion",
             """
             <style>
             /* scope: dashboard emotion */
@@ -911,8 +833,7 @@ def main():
             }
             </style>
             """,
-            unsafe_allow_html=True,
-        )
+        ))
 
         # 상태
         if "emotion_type_dash" not in st.session_state:
@@ -1044,6 +965,7 @@ def main():
                         st.caption(note)
 
         # hero card - 전면 개편: 카드형, 여백 최소화
+        prof.mark("child.summary", "compute")
         with st.container(border=True):
             st.markdown(
                 f"""
@@ -1086,6 +1008,7 @@ def main():
                 st.metric("지출", f"{int(m_spend):,}원", delta=None)
 
         # 진행 중인 미션(오늘)
+        prof.mark("child.missions", "db")
         today = date.today().isoformat()
         db.assign_daily_missions_if_needed(user_id, today)
         missions = db.get_missions_for_user(user_id, date_str=today, active_only=True)
@@ -1104,51 +1027,53 @@ def main():
                         st.caption(f"난이도: {m.get('difficulty')} · 보상: {int(m.get('reward_amount') or 0):,}원")
                         if st.button("완료!", key=f"complete_m_{m['id']}", use_container_width=True, type="primary"):
                             # XP/레벨업 토스트(애니메이션 느낌)
+                            # 완료 → 보상 기록 → 알림 → 배지 → 레벨 보상: 한 트랜잭션(커밋 1회)
                             xp_before = 0
                             lvl_before = 1
-                            try:
-                                xp_before = int(db.get_xp(user_id) or 0) if hasattr(db, "get_xp") else 0
-                                lvl_before = max(1, xp_before // 20 + 1)
-                            except Exception:
-                                pass
-                            ok = db.complete_mission(int(m["id"]))
-                            if ok:
-                                reward = float(m.get("reward_amount") or 0)
-                                if reward > 0:
-                                    db.save_behavior_v2(
-                                        user_id,
-                                        "allowance",
-                                        reward,
-                                        description="미션 보상",
-                                        category="미션",
-                                    )
-                                db.create_notification(
-                                    user_id,
-                                    "미션 완료!",
-                                    f"보상 {int(reward):,}원을 받았어요.",
-                                    level="success",
-                                )
-                                db.award_badges_if_needed(user_id)
-
-                                # 레벨업 보상 처리
-                                xp_after = xp_before
-                                lvl_after = lvl_before
+                            with db.transaction():
                                 try:
-                                    xp_after = int(db.get_xp(user_id) or 0) if hasattr(db, "get_xp") else xp_before
-                                    lvl_after = max(1, xp_after // 20 + 1)
+                                    xp_before = int(db.get_xp(user_id) or 0) if hasattr(db, "get_xp") else 0
+                                    lvl_before = max(1, xp_before // 20 + 1)
                                 except Exception:
                                     pass
-
-                                gained_xp = max(0, xp_after - xp_before)
-                                reward_info = {}
-                                try:
-                                    reward_info = (
-                                        db.grant_level_rewards_if_needed(user_id)
-                                        if hasattr(db, "grant_level_rewards_if_needed")
-                                        else {}
+                                ok = db.complete_mission(int(m["id"]))
+                                if ok:
+                                    reward = float(m.get("reward_amount") or 0)
+                                    if reward > 0:
+                                        db.save_behavior_v2(
+                                            user_id,
+                                            "allowance",
+                                            reward,
+                                            description="미션 보상",
+                                            category="미션",
+                                        )
+                                    db.create_notification(
+                                        user_id,
+                                        "미션 완료!",
+                                        f"보상 {int(reward):,}원을 받았어요.",
+                                        level="success",
                                     )
-                                except Exception:
-                                    reward_info = {}
+                                    db.award_badges_if_needed(user_id)
+
+                                    # 레벨업 보상 처리
+                                    xp_after = xp_before
+                                    lvl_after = lvl_before
+                                    try:
+                                        xp_after = int(db.get_xp(user_id) or 0) if hasattr(db, "get_xp") else xp_before
+                                        lvl_after = max(1, xp_after // 20 + 1)
+                                    except Exception:
+                                        pass
+
+                                    try:
+                                        reward_info = (
+                                            db.grant_level_rewards_if_needed(user_id)
+                                            if hasattr(db, "grant_level_rewards_if_needed")
+                                            else {}
+                                        )
+                                    except Exception:
+                                        reward_info = {}
+                            if ok:
+                                gained_xp = max(0, xp_after - xp_before)
                                 coins_gained = int((reward_info or {}).get("coins_gained") or 0)
                                 skins_unlocked = (reward_info or {}).get("skins_unlocked") or []
 
@@ -1175,6 +1100,7 @@ def main():
         if st.button("📌 미션 페이지로 이동", use_container_width=True):
             st.switch_page("pages/10_✅_미션.py")
 
+        prof.mark("child.goals", "db")
         st.subheader("🎯 저축 목표")
         goals = db.get_goals(user_id, active_only=True)
         if not goals:
@@ -1208,6 +1134,7 @@ def main():
         st.divider()
 
         # 최근 활동(내 기록)
+        prof.mark("child.recent", "render")
         st.subheader("🕒 최근 활동")
         recent = cstats["behaviors"][:10]
         if not recent:
@@ -1259,4 +1186,6 @@ def main():
 
 if __name__ == "__main__":
     main()
+    # 조기 return(자녀 없음 등)도 포함해서 rerun 마지막에 타이밍 표시(프로파일링 켜짐일 때만)
+    prof.render_footer()
 
@@ -4,7 +4,7 @@ from datetime import datetime
 from urllib.parse import quote as _urlquote
 import streamlit.components.v1 as components
 
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 
 
@@ -20,7 +20,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
@@ -172,50 +172,19 @@ def main():
     st.subheader(f"👶 연결된 자녀 ({len(children)}명)")
     st.caption("카드를 눌러 자녀를 선택하거나, 바로 용돈 관리로 이동할 수 있어요.")
 
-    # 완료 미션 수(있으면) 한 번에 조회
-    completed_map = {}
-    try:
-        conn = db._get_connection()  # pylint: disable=protected-access
-        cur = conn.cursor()
-        ids = [int(c["id"]) for c in children]
-        if ids:
-            placeholders = ",".join(["?"] * len(ids))
-            cur.execute(
-                f"""
-                SELECT user_id, COUNT(*) as cnt
-                FROM mission_assignments
-                WHERE status = 'completed' AND user_id IN ({placeholders})
-                GROUP BY user_id
-                """,
-                tuple(ids),
-            )
-            for r in cur.fetchall():
-                completed_map[int(r["user_id"])] = int(r["cnt"] or 0)
-    except Exception:
-        completed_map = {}
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+    # 잔액/완료 미션 수는 가족 집계 한 번으로 조회
+    family = db.get_family_summary(parent_code)
+    family_map = {int(ch["id"]): ch for ch in family["children"]}
 
     cols = st.columns(2)
     for idx, c in enumerate(children):
         cid = int(c["id"])
         with cols[idx % 2]:
-            # 잔액(추정)
-            beh = db.get_user_behaviors(cid, limit=2000)
-            total_allowance = sum((b.get("amount") or 0) for b in beh if b.get("behavior_type") == "allowance")
-            total_saving = sum((b.get("amount") or 0) for b in beh if b.get("behavior_type") == "saving")
-            total_spend = sum(
-                (b.get("amount") or 0)
-                for b in beh
-                if b.get("behavior_type") in ("planned_spending", "impulse_buying")
-            )
-            balance = total_allowance - total_saving - total_spend
+            summary = family_map.get(cid) or {}
+            balance = summary.get("balance", 0)
 
             created_at = str(c.get("created_at") or "")[:10]
-            done = int(completed_map.get(cid, 0))
+            done = int(summary.get("missions_completed", 0))
 
             with st.container(border=True):
                 st.markdown(f"### 👶 {c.get('name')}")
@@ -248,15 +217,11 @@ def main():
     child_id = int(child_label_to_id[selected_label])
     child = db.get_user_by_id(child_id)
 
-    behaviors = db.get_user_behaviors(child_id, limit=2000)
-    total_allowance = sum((b.get("amount") or 0) for b in behaviors if b.get("behavior_type") == "allowance")
-    total_saving = sum((b.get("amount") or 0) for b in behaviors if b.get("behavior_type") == "saving")
-    total_spend = sum(
-        (b.get("amount") or 0)
-        for b in behaviors
-        if b.get("behavior_type") in ("planned_spending", "impulse_buying")
-    )
-    balance = total_allowance - total_saving - total_spend
+    # 최근 기록은 20건만 표시(합계/잔액은 지갑 원장)
+    behaviors = db.get_user_behaviors(child_id, limit=20)
+    wallet = db.get_balance(child_id)
+    total_allowance = wallet["total_allowance"]
+    balance = wallet["balance"]
     stats = db.get_child_stats(child_id)
 
     # ✅ 모바일 우선: 4열 → 2열(2줄)
@@ -3,6 +3,7 @@ import streamlit as st
 from datetime import date, datetime, timedelta
 
 from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 
 
@@ -18,21 +19,9 @@ def _month_prefix(dt: datetime) -> str:
 
 
 def _compute_balance(db: DatabaseManager, user_id: int) -> dict:
+    # 합계/잔액은 지갑 원장(wallet_balances)에서, 목록은 히스토리 표시용으로만 조회
     behaviors = db.get_user_behaviors(user_id, limit=5000)
-    total_allowance = sum((b.get("amount") or 0) for b in behaviors if b.get("behavior_type") == "allowance")
-    total_saving = sum((b.get("amount") or 0) for b in behaviors if b.get("behavior_type") == "saving")
-    total_spend = sum(
-        (b.get("amount") or 0)
-        for b in behaviors
-        if b.get("behavior_type") in ("planned_spending", "impulse_buying")
-    )
-    return {
-        "behaviors": behaviors,
-        "total_allowance": float(total_allowance),
-        "total_saving": float(total_saving),
-        "total_spend": float(total_spend),
-        "balance": float(total_allowance - total_saving - total_spend),
-    }
+    return {"behaviors": behaviors, **db.get_balance(user_id)}
 
 
 def _next_run_weekly(today: date, day_of_week: int) -> date:
@@ -67,12 +56,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
-    # ✅ 스케줄러 대체: 페이지 진입 시 정기용돈 자동 실행
-    try:
-        db.run_due_recurring_allowances()
-    except Exception:
-        pass
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
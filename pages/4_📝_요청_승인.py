@@ -1,6 +1,7 @@
 import streamlit as st
 
 from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 from utils.ui import render_page_header, section_label
 
@@ -20,7 +21,7 @@ def _guard_parent(db: DatabaseManager):
 
 def main():
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     parent_id, parent = _guard_parent(db)
     user_name = st.session_state.get("user_name", "사용자")
@@ -61,73 +62,67 @@ def main():
                 child_id = int(req["child_id"])
                 new_status = "approved" if approve else "rejected"
 
-                # ✅ 지출 승인 시 잔액 체크(0원 아래로 내려가는 지출 방지)
-                if approve and rtype == "spend":
-                    try:
-                        beh = db.get_user_behaviors(child_id, limit=5000)
-                        total_allow = sum((b.get("amount") or 0) for b in beh if b.get("behavior_type") == "allowance")
-                        total_save = sum((b.get("amount") or 0) for b in beh if b.get("behavior_type") == "saving")
-                        total_spend = sum(
-                            (b.get("amount") or 0)
-                            for b in beh
-                            if b.get("behavior_type") in ("planned_spending", "impulse_buying")
-                        )
-                        balance = float(total_allow - total_save - total_spend)
-                    except Exception:
-                        balance = 0.0
-                    need = float(req.get("amount") or 0)
-                    if need > balance:
-                        st.error(f"잔액이 부족해서 승인할 수 없어요. (잔액 {int(balance):,}원 / 요청 {int(need):,}원)")
+                # 잔액 확인 → 상태 변경 → 행동 기록 → 알림: 한 트랜잭션(중간 실패 시 전체 취소)
+                with db.transaction():
+                    # ✅ 지출 승인 시 잔액 체크(0원 아래로 내려가는 지출 방지)
+                    if approve and rtype == "spend":
+                        try:
+                            balance = float(db.get_balance(child_id)["balance"])
+                        except Exception:
+                            balance = 0.0
+                        need = float(req.get("amount") or 0)
+                        if need > balance:
+                            st.error(f"잔액이 부족해서 승인할 수 없어요. (잔액 {int(balance):,}원 / 요청 {int(need):,}원)")
+                            continue
+
+                    ok = db.decide_request(int(req["id"]), parent_id, new_status)
+                    if not ok:
+                        st.error("처리에 실패했어요.")
                         continue
 
-                ok = db.decide_request(int(req["id"]), parent_id, new_status)
-                if not ok:
-                    st.error("처리에 실패했어요.")
-                    continue
-
-                if new_status == "approved":
-                    # 승인 시: 행동 기록 생성
-                    if rtype == "allowance":
-                        db.save_behavior_v2(
+                    if new_status == "approved":
+                        # 승인 시: 행동 기록 생성
+                        if rtype == "allowance":
+                            db.save_behavior_v2(
+                                child_id,
+                                "allowance",
+                                float(req.get("amount") or 0),
+                                description="부모 승인 지급",
+                                category=req.get("category"),
+                                related_request_id=int(req["id"]),
+                            )
+                        elif rtype == "spend":
+                            # 지출 승인: 최근 충동 시그널이 높으면 impulse_buying으로 기록
+                            btype = "planned_spending"
+                            try:
+                                sig = db.get_latest_risk_signal(child_id, within_minutes=60) if hasattr(db, "get_latest_risk_signal") else None
+                                if sig and (sig.get("signal_type") in ("impulse_request", "impulse_stop")) and int(sig.get("score") or 0) >= 70:
+                                    btype = "impulse_buying"
+                            except Exception:
+                                btype = "planned_spending"
+                            db.save_behavior_v2(
+                                child_id,
+                                btype,
+                                float(req.get("amount") or 0),
+                                description="부모 승인 지출",
+                                category=req.get("category"),
+                                related_request_id=int(req["id"]),
+                            )
+                        db.create_notification(
                             child_id,
-                            "allowance",
-                            float(req.get("amount") or 0),
-                            description="부모 승인 지급",
-                            category=req.get("category"),
-                            related_request_id=int(req["id"]),
+                            "요청이 승인되었어요!",
+                            f"{amount:,}원이 승인되었습니다.",
+                            level="success",
                         )
-                    elif rtype == "spend":
-                        # 지출 승인: 최근 충동 시그널이 높으면 impulse_buying으로 기록
-                        btype = "planned_spending"
-                        try:
-                            sig = db.get_latest_risk_signal(child_id, within_minutes=60) if hasattr(db, "get_latest_risk_signal") else None
-                            if sig and (sig.get("signal_type") in ("impulse_request", "impulse_stop")) and int(sig.get("score") or 0) >= 70:
-                                btype = "impulse_buying"
-                        except Exception:
-                            btype = "planned_spending"
-                        db.save_behavior_v2(
+                        st.success("승인 완료!")
+                    else:
+                        db.create_notification(
                             child_id,
-                            btype,
-                            float(req.get("amount") or 0),
-                            description="부모 승인 지출",
-                            category=req.get("category"),
-                            related_request_id=int(req["id"]),
+                            "요청이 거절되었어요",
+                            f"{amount:,}원 요청이 거절되었습니다.",
+                            level="warning",
                         )
-                    db.create_notification(
-                        child_id,
-                        "요청이 승인되었어요!",
-                        f"{amount:,}원이 승인되었습니다.",
-                        level="success",
-                    )
-                    st.success("승인 완료!")
-                else:
-                    db.create_notification(
-                        child_id,
-                        "요청이 거절되었어요",
-                        f"{amount:,}원 요청이 거절되었습니다.",
-                        level="warning",
-                    )
-                    st.info("거절 완료")
+                        st.info("거절 완료")
 
                 st.rerun()
 
@@ -2,7 +2,7 @@ import streamlit as st
 
 from datetime import datetime
 
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 from utils.ui import render_page_header, section_label
 from components.blob_character import get_blob_html
@@ -23,7 +23,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
@@ -74,49 +74,30 @@ def main():
         st.info("연결된 자녀가 없어요.")
         return
 
-    spend_by_cat = {}
-    for ch in children:
-        beh = db.get_user_behaviors(int(ch["id"]), limit=5000)
-        for b in beh:
-            ts = str(b.get("timestamp") or "")
-            if not ts.startswith(ym):
-                continue
-            if b.get("behavior_type") not in ("planned_spending", "impulse_buying"):
-                continue
-            cat = (b.get("category") or "기타").strip()
-            spend_by_cat[cat] = spend_by_cat.get(cat, 0) + float(b.get("amount") or 0)
+    # 가족 집계(자녀 수와 무관하게 쿼리 몇 번으로 끝남)
+    family = db.get_family_summary(parent_code, ym)
+    spend_by_cat = family["spend_by_category"]
 
     if not spend_by_cat:
         st.caption("이번 달 지출 기록이 아직 없어요.")
     else:
-        chart2 = [{"카테고리": k, "지출(원)": v} for k, v in sorted(spend_by_cat.items(), key=lambda x: x[1], reverse=True)]
+        chart2 = [{"카테고리": k, "지출(원)": v} for k, v in spend_by_cat.items()]
         with st.container(border=True):
             st.bar_chart(chart2, x="카테고리", y="지출(원)", use_container_width=True)
 
     st.divider()
 
     section_label("자녀별 요약")
-    summary = []
-    for ch in children:
-        cid = int(ch["id"])
-        beh = db.get_user_behaviors(cid, limit=5000)
-        total_allowance = sum((b.get("amount") or 0) for b in beh if b.get("behavior_type") == "allowance")
-        total_saving = sum((b.get("amount") or 0) for b in beh if b.get("behavior_type") == "saving")
-        total_spend = sum(
-            (b.get("amount") or 0)
-            for b in beh
-            if b.get("behavior_type") in ("planned_spending", "impulse_buying")
-        )
-        balance = total_allowance - total_saving - total_spend
-        summary.append(
-            {
-                "자녀": ch.get("name"),
-                "잔액(추정)": int(balance),
-                "용돈(지급)": int(total_allowance),
-                "저축": int(total_saving),
-                "지출": int(total_spend),
-            }
-        )
+    summary = [
+        {
+            "자녀": ch.get("name"),
+            "잔액(추정)": int(ch["balance"]),
+            "용돈(지급)": int(ch["total_allowance"]),
+            "저축": int(ch["total_saving"]),
+            "지출": int(ch["total_spend"]),
+        }
+        for ch in family["children"]
+    ]
     with st.container(border=True):
         st.dataframe(summary, use_container_width=True, hide_index=True)
 
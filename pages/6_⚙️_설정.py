@@ -2,7 +2,7 @@ import streamlit as st
 
 from datetime import date
 
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 from utils.characters import get_character_catalog, get_character_by_code, get_skins_for_character, get_skin_by_code
 from utils.ui import render_page_header, section_label
@@ -20,7 +20,7 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
@@ -200,6 +200,9 @@ def main():
         if not unread:
             st.success("읽지 않은 알림이 없어요.")
         else:
+            if st.button("모두 읽음 처리", key="read_all_notifications"):
+                db.mark_all_notifications_read(user_id)
+                st.rerun()
             for n in unread:
                 level = n.get("level", "info")
                 title = n.get("title", "")
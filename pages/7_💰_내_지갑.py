@@ -1,6 +1,6 @@
 import streamlit as st
 
-from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 from utils.ui import render_page_header, section_label
 
@@ -20,23 +20,20 @@ def main():
         return
 
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     user_id = int(st.session_state.get("user_id"))
     user_name = st.session_state.get("user_name", "사용자")
     render_sidebar_menu(user_id, user_name, "child")
 
     render_page_header("💰 내 지갑", "수입/저축/지출을 한눈에 확인해요.")
-    behaviors = db.get_user_behaviors(user_id, limit=5000)
-
-    total_allowance = sum((b.get("amount") or 0) for b in behaviors if b.get("behavior_type") == "allowance")
-    total_saving = sum((b.get("amount") or 0) for b in behaviors if b.get("behavior_type") == "saving")
-    total_spend = sum(
-        (b.get("amount") or 0)
-        for b in behaviors
-        if b.get("behavior_type") in ("planned_spending", "impulse_buying")
-    )
-    balance = total_allowance - total_saving - total_spend
+    # 최근 거래는 50건만 표시하므로 50건만 조회(합계는 지갑 원장)
+    behaviors = db.get_user_behaviors(user_id, limit=50)
+    wallet = db.get_balance(user_id)
+    total_allowance = wallet["total_allowance"]
+    total_saving = wallet["total_saving"]
+    total_spend = wallet["total_spend"]
+    balance = wallet["balance"]
 
     with st.container(border=True):
         st.markdown(
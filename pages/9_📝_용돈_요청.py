@@ -1,6 +1,7 @@
 import streamlit as st
 
 from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
 from utils.menu import render_sidebar_menu, hide_sidebar_navigation
 from datetime import datetime, timedelta
 import time
@@ -39,7 +40,7 @@ def _guard_child(db: DatabaseManager):
 
 def main():
     hide_sidebar_navigation()
-    db = DatabaseManager()
+    db = get_session_db()
 
     child = _guard_child(db)
     user_id = int(st.session_state.get("user_id"))
@@ -102,11 +103,7 @@ def main():
         # ✅ 지출 요청: '잠깐 멈추기' 개입
         # ✅ 잔액(추정) 표시 + 초과 요청 방지(0원 아래 지출 방지)
         try:
-            beh = db.get_user_behaviors(user_id, limit=5000)
-            total_allow = sum((b.get("amount") or 0) for b in beh if b.get("behavior_type") == "allowance")
-            total_save = sum((b.get("amount") or 0) for b in beh if b.get("behavior_type") == "saving")
-            total_spend = sum((b.get("amount") or 0) for b in beh if b.get("behavior_type") in ("planned_spending", "impulse_buying"))
-            balance = float(total_allow - total_save - total_spend)
+            balance = float(db.get_balance(user_id)["balance"])
         except Exception:
             balance = 0.0
         st.caption(f"현재 잔액(추정): **{int(balance):,}원**")
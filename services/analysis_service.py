@@ -1,11 +1,45 @@
-from database.db_manager import DatabaseManager
-from typing import List, Dict
+from database.db_manager import get_db_manager
+from typing import List, Dict, Optional, Tuple
+
+# 롤링 점수 기간(일)
+ROLLING_WINDOWS = (7, 30, 90)
+
+
+def scores_from_counts(c: Dict[str, float]) -> Dict[str, float]:
+    """
+    get_habit_counts 집계 1건 → 3가지 점수
+    (calculate_* 메서드와 같은 공식/기본값 50.0)
+    """
+    if not c or not c.get("total_cnt"):
+        return {"impulsivity": 50.0, "saving_tendency": 50.0, "patience": 50.0}
+
+    impulse = int(c.get("impulse_cnt") or 0)
+    planned = int(c.get("planned_cnt") or 0)
+    patient_extra = int(c.get("delayed_cnt") or 0) + int(c.get("comparing_cnt") or 0)
+    spend_cnt = impulse + planned
+
+    impulsivity = round(impulse / spend_cnt * 100, 1) if spend_cnt else 50.0
+
+    saving_amt = c.get("saving_amt") or 0
+    total_amount = saving_amt + (c.get("spend_amt") or 0)
+    if total_amount == 0:
+        saving_cnt = int(c.get("saving_cnt") or 0)
+        total_count = saving_cnt + spend_cnt
+        saving_tendency = round(saving_cnt / total_count * 100, 1) if total_count else 50.0
+    else:
+        saving_tendency = round(saving_amt / total_amount * 100, 1)
+
+    patience_total = spend_cnt + patient_extra
+    patience = round((planned + patient_extra) / patience_total * 100, 1) if patience_total else 50.0
+
+    return {"impulsivity": impulsivity, "saving_tendency": saving_tendency, "patience": patience}
+
 
 class AnalysisService:
     """금융습관 분석 서비스"""
     
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_db_manager()
     
     def calculate_impulsivity_score(self, behaviors: List[Dict]) -> float:
         """
@@ -124,22 +158,60 @@ class AnalysisService:
     
     def analyze_and_save(self, user_id: int) -> Dict[str, float]:
         """모든 점수 계산 후 DB 저장"""
-        # 최근 30일간의 행동 데이터 가져오기
-        behaviors = self.db.get_user_behaviors(user_id, limit=1000)
-        
-        # 점수 계산
-        impulsivity = self.calculate_impulsivity_score(behaviors)
-        saving_tendency = self.calculate_saving_tendency(behaviors)
-        patience = self.calculate_patience_score(behaviors)
+        # 최근 1000건을 SQL에서 바로 집계(행 목록을 파이썬으로 가져오지 않음)
+        counts = self.db.get_habit_counts(user_ids=[user_id]).get(int(user_id), {}).get(None)
+        scores = scores_from_counts(counts)
         
         # DB에 저장
-        self.db.save_score(user_id, impulsivity, saving_tendency, patience)
+        self.db.save_score(user_id, scores["impulsivity"], scores["saving_tendency"], scores["patience"])
         
-        return {
-            "impulsivity": impulsivity,
-            "saving_tendency": saving_tendency,
-            "patience": patience
-        }
+        return scores
+    
+    def score_users(
+        self,
+        parent_code: Optional[str] = None,
+        user_ids: Optional[List[int]] = None,
+        window_days: Optional[int] = None,
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        여러 사용자 점수를 한 번의 집계 쿼리로 계산(저장 안 함)
+        window_days=None 이면 최근 1000건 기준(analyze_and_save 와 동일)
+        """
+        counts = self.db.get_habit_counts(parent_code=parent_code, user_ids=user_ids, windows=(window_days,))
+        return {uid: scores_from_counts(per.get(window_days)) for uid, per in counts.items()}
+    
+    def rolling_scores(
+        self,
+        parent_code: Optional[str] = None,
+        user_ids: Optional[List[int]] = None,
+        windows: Tuple[int, ...] = ROLLING_WINDOWS,
+    ) -> Dict[int, Dict[int, Dict[str, float]]]:
+        """
+        7/30/90일 롤링 점수(기간별 조건부 집계를 한 번에)
+        return: {user_id: {7: {...}, 30: {...}, 90: {...}}}
+        """
+        windows = tuple(int(w) for w in windows)
+        counts = self.db.get_habit_counts(parent_code=parent_code, user_ids=user_ids, windows=windows)
+        return {uid: {w: scores_from_counts(per.get(w)) for w in windows} for uid, per in counts.items()}
+    
+    def _save_all(self, scores: Dict[int, Dict[str, float]]) -> None:
+        self.db.save_scores_bulk(
+            [(uid, s["impulsivity"], s["saving_tendency"], s["patience"]) for uid, s in scores.items()]
+        )
+    
+    def analyze_family(self, parent_code: str, window_days: Optional[int] = None, save: bool = True) -> Dict[int, Dict[str, float]]:
+        """가족(부모 코드)의 모든 아이 점수 계산 후 일괄 저장"""
+        scores = self.score_users(parent_code=parent_code, window_days=window_days)
+        if save:
+            self._save_all(scores)
+        return scores
+    
+    def analyze_all(self, window_days: Optional[int] = None, save: bool = True) -> Dict[int, Dict[str, float]]:
+        """모든 아이 점수 계산 후 일괄 저장(야간 배치 등)"""
+        scores = self.score_users(window_days=window_days)
+        if save:
+            self._save_all(scores)
+        return scores
     
     def get_latest_scores(self, user_id: int) -> Dict[str, float]:
         """최신 점수 조회 (없으면 계산)"""
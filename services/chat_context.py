@@ -0,0 +1,88 @@
+"""
+AI 대화 컨텍스트 창 - 최근 N턴 + 누적 요약
+
+대화가 길어져도 한 턴에 읽는 메시지 수와 프롬프트 길이가 일정하도록:
+- conversation_context.summarized_upto 이후 메시지 중 최신 몇 개만 읽음
+- 최근 max_turns 턴(토큰 예산 이내)은 그대로 프롬프트에 넣고
+- 창 밖으로 밀려난 메시지는 한 줄씩 누적 요약에 접어 넣음(LLM 호출 없이, 첫 토큰 지연 없음)
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+
+DEFAULT_MAX_TURNS = 6
+DEFAULT_TOKEN_BUDGET = 1200
+DEFAULT_SUMMARY_BUDGET = 300
+
+_LINE_CHARS = 80
+_ROLE_LABEL = {"user": "사용자", "assistant": "AI"}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    대략적인 토큰 수(토크나이저 없이)
+    - 한글 등 비ASCII 문자는 1자 ≈ 1토큰, ASCII 는 4자 ≈ 1토큰
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+def summarize_line(message: Dict) -> str:
+    """메시지 1개 → 요약 한 줄"""
+    label = _ROLE_LABEL.get(str(message.get("role")), "사용자")
+    text = " ".join(str(message.get("content") or "").split())
+    if len(text) > _LINE_CHARS:
+        text = text[:_LINE_CHARS].rstrip() + "…"
+    return f"- {label}: {text}"
+
+
+def fold_summary(summary: str, messages: List[Dict], budget: int = DEFAULT_SUMMARY_BUDGET) -> str:
+    """기존 요약에 메시지들을 덧붙이고, 예산을 넘으면 오래된 줄부터 버림"""
+    lines = [ln for ln in (summary or "").splitlines() if ln.strip()]
+    lines.extend(summarize_line(m) for m in messages)
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > budget:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def build_context(
+    db,
+    conversation_id: int,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    summary_budget: int = DEFAULT_SUMMARY_BUDGET,
+) -> Dict:
+    """
+    프롬프트용 컨텍스트 구성(+ 창 밖 메시지를 요약에 접어 저장)
+    return: {"summary": str, "messages": [{"role", "content"}, ...]}
+    """
+    max_messages = max(1, int(max_turns) * 2)
+    ctx = db.get_conversation_context(conversation_id)
+    summary = ctx.get("summary") or ""
+
+    # 매 턴 접어 넣으므로 요약 이후 메시지는 max_messages + 몇 개뿐. 여유분까지만 읽음
+    rows = db.get_recent_messages(conversation_id, limit=max_messages * 2, after_id=ctx.get("summarized_upto") or 0)
+
+    keep = rows[-max_messages:]
+    used = 0
+    start = len(keep)
+    for i in range(len(keep) - 1, -1, -1):
+        cost = estimate_tokens(keep[i].get("content") or "")
+        if start < len(keep) and used + cost > token_budget:
+            break
+        used += cost
+        start = i
+    folded = rows[: len(rows) - len(keep) + start]
+    keep = keep[start:]
+
+    if folded:
+        summary = fold_summary(summary, folded, summary_budget)
+        db.update_conversation_context(conversation_id, summary, int(folded[-1]["id"]))
+
+    return {
+        "summary": summary,
+        "messages": [{"role": m["role"], "content": m["content"]} for m in keep],
+    }
@@ -1,29 +1,39 @@
-"""대화 관리 서비스 - Gemini AI와 데이터베이스를 연결"""
-from typing import List, Dict, Optional
-from database.db_manager import DatabaseManager
-from services.gemini_service import GeminiService
+"""대화 관리 서비스 - LLM 게이트웨이(Gemini → OpenAI → Groq → FAQ)와 데이터베이스를 연결"""
+from typing import List, Dict, Optional, Iterator
+from database.db_manager import get_db_manager
+from services.llm_gateway import LLMGateway, get_llm_gateway
+from services.chat_context import build_context, DEFAULT_MAX_TURNS, DEFAULT_TOKEN_BUDGET
+from services.faq import DEFAULT_THRESHOLD as FAQ_THRESHOLD, get_faq_engine
 
 
 class ConversationService:
     """대화 세션 및 메시지 관리 서비스"""
     
-    def __init__(self):
-        self.db = DatabaseManager()
-        self.gemini_service = None
-        self._init_gemini_service()
+    def __init__(
+        self,
+        max_turns: int = DEFAULT_MAX_TURNS,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        gateway: Optional[LLMGateway] = None,
+        faq_threshold: Optional[float] = FAQ_THRESHOLD
+    ):
+        self.db = get_db_manager()
+        self.max_turns = int(max_turns)
+        self.token_budget = int(token_budget)
+        # 공급자 폴백/동시성/마감 시간은 게이트웨이가 담당(키가 없으면 오프라인 FAQ로 답함)
+        self.gateway = gateway or get_llm_gateway()
+        # 자주 묻는 질문은 로컬 FAQ가 먼저 답함(None 이면 항상 LLM)
+        self.faq_threshold = faq_threshold
+        self.answered_by = {"faq": 0, "llm": 0}
     
-    def _init_gemini_service(self):
-        """Gemini 서비스 초기화 시도"""
-        try:
-            from config import get_gemini_api_key
-            api_key = get_gemini_api_key()
-            if api_key:
-                self.gemini_service = GeminiService(api_key=api_key)
-            else:
-                self.gemini_service = None
-        except Exception as e:
-            # API 키가 없어도 서비스는 초기화되도록 함
-            self.gemini_service = None
+    def _faq_answer(self, user_message: str, user_type: str) -> Optional[str]:
+        if self.faq_threshold is None:
+            return None
+        hit = get_faq_engine().answer(
+            user_message,
+            threshold=self.faq_threshold,
+            audience="parent" if user_type == "parent" else "child"
+        )
+        return hit["answer"] if hit else None
     
     def get_or_create_conversation(self, user_id: int) -> int:
         """사용자의 대화 세션 가져오기 또는 생성"""
@@ -35,64 +45,73 @@ class ConversationService:
         # 충분히 큰 limit으로 모든 메시지 가져오기
         return self.db.get_conversation_messages(conversation_id, limit=1000)
     
-    def chat(
+    def build_context(self, conversation_id: int) -> Dict:
+        """프롬프트용 컨텍스트(최근 N턴 + 누적 요약)"""
+        return build_context(
+            self.db,
+            conversation_id,
+            max_turns=self.max_turns,
+            token_budget=self.token_budget,
+        )
+    
+    def chat_stream(
         self,
         user_id: int,
         user_message: str,
         user_name: str = None,
         user_age: int = None,
         user_type: str = 'child'
-    ) -> str:
-        """사용자 메시지 처리 및 AI 응답 생성"""
-        # Gemini 서비스가 없으면 다시 시도
-        if not self.gemini_service:
-            self._init_gemini_service()
-        
-        if not self.gemini_service:
-            return """안녕하세요! 😊
-
-현재 AI 상담 서비스가 준비 중이에요. 
-관리자에게 문의해주시면 곧 사용할 수 있도록 도와드릴게요!
-
-그동안 이런 질문들을 해볼 수 있어요:
-- 저축이 왜 중요한가요?
-- 용돈을 어떻게 관리하면 좋을까요?
-- 돈을 모으는 방법이 뭐예요?
-
-곧 AI 선생님이 답변해드릴 수 있도록 준비 중이에요! 💪"""
-        
+    ) -> Iterator[str]:
+        """사용자 메시지 처리 및 AI 응답 스트리밍(조각을 yield, 끝나면 전체 응답 저장)"""
         # 대화 세션 가져오기
         conversation_id = self.get_or_create_conversation(user_id)
         
         # 사용자 메시지 저장
         self.db.save_message(conversation_id, "user", user_message)
         
-        # 이전 메시지 가져오기 (컨텍스트용)
-        previous_messages = self.get_all_messages(conversation_id)
-        
-        # 메시지 형식 변환 (GeminiService가 기대하는 형식)
-        messages_for_ai = []
-        for msg in previous_messages:
-            messages_for_ai.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-        
-        # AI 응답 생성
+        parts: List[str] = []
         try:
-            ai_response = self.gemini_service.chat_with_context(
-                messages=messages_for_ai,
+            # 1차: 로컬 FAQ(자신 있을 때만). LLM 호출/지연 없음
+            local = self._faq_answer(user_message, user_type)
+            if local:
+                self.answered_by["faq"] += 1
+                parts.append(local)
+                yield local
+                return
+            self.answered_by["llm"] += 1
+            
+            # 최근 N턴 + 요약만 읽음(전체 기록을 읽지 않음)
+            context = self.build_context(conversation_id)
+            
+            for text in self.gateway.stream(
+                context["messages"],
+                summary=context["summary"],
                 user_name=user_name,
                 user_age=user_age,
                 user_type=user_type
-            )
-            
-            # AI 응답 저장
-            self.db.save_message(conversation_id, "assistant", ai_response)
-            
-            return ai_response
+            ):
+                parts.append(text)
+                yield text
         except Exception as e:
             error_msg = str(e)
             if len(error_msg) > 200:
                 error_msg = error_msg[:200] + "..."
-            return f"죄송해요, 오류가 발생했어요: {error_msg}"
+            yield f"죄송해요, 오류가 발생했어요: {error_msg}"
+        finally:
+            # 화면에서 중간에 끊겨도 받은 만큼은 저장
+            ai_response = "".join(parts).strip()
+            if ai_response:
+                self.db.save_message(conversation_id, "assistant", ai_response)
+    
+    def chat(
+        self,
+        user_id: int,
+        user_message: str,
+        user_name: str = None,
+        user_age: int = None,
+        user_type: str = 'child'
+    ) -> str:
+        """사용자 메시지 처리 및 AI 응답 생성"""
+        return "".join(
+            self.chat_stream(user_id, user_message, user_name=user_name, user_age=user_age, user_type=user_type)
+        ).strip()
@@ -0,0 +1,371 @@
+"""
+오프라인 FAQ/의도 매칭 엔진 - AI 친구의 1차 응답 수단
+
+- FAQ_ENTRIES: 금융 교육 FAQ(예시 질문들 + 키워드 + 답변 + 대상)
+- FAQEngine: 예시 질문마다 한글 문자 2-gram을 뽑아 역색인(bigram → 질문 목록)을 미리 만들고,
+  질문이 들어오면 겹치는 2-gram의 IDF 가중 코사인 점수로 가장 가까운 FAQ를 찾음(마이크로초 단위)
+- 점수 = √(코사인 × 질문 커버리지). 커버리지는 질문 2-gram 가중치 중 예시 질문과 겹친 비율
+  → "안녕 나 오늘 슬퍼"처럼 짧은 예시("안녕")가 긴 질문의 일부만 덮으면 점수가 낮아져 LLM으로 넘어감
+  + 키워드가 그대로 들어 있으면 가산점(인사처럼 어떤 문장에나 붙는 항목은 keyword_bonus=False 로 제외)
+- answer()가 threshold 이상일 때만 로컬로 답하고, 나머지는 LLM으로 넘김(ConversationService)
+- reply(): API 키/네트워크 없이도 항상 답하는 마지막 응답 수단(LLM 게이트웨이 FAQ 공급자)
+"""
+from __future__ import annotations
+
+import math
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+
+
+DEFAULT_THRESHOLD = 0.45
+KEYWORD_BONUS = 0.15
+
+FAQ_ENTRIES: List[Dict] = [
+    {
+        "id": "saving",
+        "questions": ["저축이 뭐예요", "저축은 왜 해야 해", "저축이 왜 중요해", "돈을 왜 모아야 해", "저축하는 이유"],
+        "keywords": ["저축"],
+        "answer": "저축은 지금 쓰지 않고 나중을 위해 돈을 모으는 거예요. 목표를 정하면 더 쉬워요!",
+    },
+    {
+        "id": "saving_how",
+        "questions": ["저축 잘하는 방법", "돈을 어떻게 모아요", "돈 모으는 방법이 뭐예요", "저축을 잘하려면 어떻게 해"],
+        "keywords": ["모으는 방법", "저축 방법"],
+        "answer": "용돈을 받으면 먼저 저축할 돈을 떼어 두고 남은 돈으로 쓰는 게 비법이에요! "
+                  "‘하루 1,000원’처럼 작게 시작하고, 저금통이나 목표 칸에 모인 돈을 자주 확인해 보세요.",
+    },
+    {
+        "id": "interest",
+        "questions": ["이자가 뭐예요", "이자는 뭐야", "은행이 돈을 더 주는 이유", "이자 받는 방법"],
+        "keywords": ["이자"],
+        "answer": "이자는 은행에 돈을 맡기면 은행이 고마워서 주는 ‘보너스 돈’이라고 생각하면 돼요.",
+    },
+    {
+        "id": "compound",
+        "questions": ["복리가 뭐예요", "복리와 단리 차이", "이자에 이자가 붙는 거"],
+        "keywords": ["복리", "단리"],
+        "answer": "복리는 ‘이자에도 이자가 붙는 것’이에요. 처음엔 작아 보여도 오래 맡길수록 눈덩이처럼 커져요. "
+                  "그래서 저축은 일찍 시작할수록 좋아요!",
+    },
+    {
+        "id": "budget",
+        "questions": ["예산이 뭐예요", "예산 짜는 법", "용돈 계획 세우는 방법", "예산은 왜 필요해"],
+        "keywords": ["예산"],
+        "answer": "예산은 ‘이번 달에 어디에 얼마를 쓸지’ 미리 계획하는 표예요.",
+    },
+    {
+        "id": "impulse",
+        "questions": ["충동구매가 뭐예요", "갑자기 사고 싶어요", "충동구매 안 하는 법", "자꾸 사고 싶어요 어떻게 해"],
+        "keywords": ["충동구매", "충동 구매", "충동"],
+        "answer": "충동구매는 계획 없이 갑자기 사고 싶어서 사는 거예요. 10분만 기다리면 줄어들 수 있어요!",
+    },
+    {
+        "id": "allowance",
+        "questions": ["용돈 관리 어떻게 해요", "용돈을 잘 쓰는 방법", "용돈이 금방 없어져요", "용돈을 어떻게 나눠요"],
+        "keywords": ["용돈 관리", "용돈"],
+        "answer": "용돈은 세 칸으로 나눠 보세요: 저축 칸, 쓸 돈 칸, 나눔 칸! "
+                  "받자마자 나눠 두면 금방 없어지지 않아요.",
+    },
+    {
+        "id": "ledger",
+        "questions": ["용돈기입장이 뭐예요", "용돈 기록 왜 해요", "가계부 쓰는 법", "기록은 어떻게 해"],
+        "keywords": ["용돈기입장", "기입장", "가계부", "기록"],
+        "answer": "용돈기입장은 들어온 돈과 나간 돈을 적는 공책이에요. "
+                  "적다 보면 ‘내가 간식에 이렇게 많이 썼네!’ 하고 돈의 길이 보여요.",
+    },
+    {
+        "id": "planned",
+        "questions": ["계획 소비가 뭐예요", "계획해서 쓰는 법", "사기 전에 계획하기"],
+        "keywords": ["계획 소비", "계획 지출", "계획"],
+        "answer": "계획 소비는 사기 전에 ‘무엇을, 얼마에, 왜’ 살지 미리 정하고 사는 거예요. "
+                  "목록을 만들어 가면 필요 없는 걸 덜 사게 돼요.",
+    },
+    {
+        "id": "compare",
+        "questions": ["가격 비교는 왜 해요", "가격 비교하는 방법", "어디가 더 싼지 알아보기"],
+        "keywords": ["가격 비교", "비교"],
+        "answer": "같은 물건도 가게마다 가격이 달라요. 두세 곳을 비교해 보면 같은 돈으로 더 알뜰하게 살 수 있어요!",
+    },
+    {
+        "id": "delay",
+        "questions": ["참는 게 왜 좋아요", "만족 지연이 뭐예요", "마시멜로 실험", "기다리면 뭐가 좋아"],
+        "keywords": ["만족 지연", "참기", "마시멜로"],
+        "answer": "지금 바로 쓰지 않고 조금 기다리면 더 큰 것을 얻을 수 있어요. "
+                  "이걸 ‘만족 지연’이라고 해요. 참은 만큼 목표에 가까워져요!",
+    },
+    {
+        "id": "need_want",
+        "questions": ["필요한 것과 원하는 것 차이", "꼭 필요한 건지 어떻게 알아", "갖고 싶은 거랑 필요한 거"],
+        "keywords": ["필요한 것", "원하는 것"],
+        "answer": "‘필요한 것’은 없으면 곤란한 것(학용품, 밥), ‘원하는 것’은 있으면 좋은 것(장난감, 간식)이에요. "
+                  "살 때 ‘이건 필요일까, 원함일까?’ 하고 물어보세요.",
+    },
+    {
+        "id": "goal",
+        "questions": ["저축 목표 세우는 법", "목표를 어떻게 정해요", "갖고 싶은 걸 사려면 얼마나 모아야 해"],
+        "keywords": ["목표"],
+        "answer": "갖고 싶은 물건 가격을 적고, 한 주에 얼마씩 모을지 나눠 보세요. "
+                  "예: 10,000원짜리 → 한 주에 2,500원씩 4주! 목표 칸에 모이는 걸 보면 신나요.",
+    },
+    {
+        "id": "bank",
+        "questions": ["은행은 뭐 하는 곳이에요", "은행에 돈을 맡기는 이유", "은행은 어떻게 돈을 벌어"],
+        "keywords": ["은행"],
+        "answer": "은행은 사람들의 돈을 안전하게 맡아 주고, 필요한 사람에게 빌려주는 곳이에요. "
+                  "맡긴 사람에게는 이자를 주고, 빌린 사람에게는 이자를 받아요.",
+    },
+    {
+        "id": "account",
+        "questions": ["통장이 뭐예요", "통장은 어떻게 만들어요", "내 통장 만들기"],
+        "keywords": ["통장", "계좌"],
+        "answer": "통장은 은행에 맡긴 내 돈이 얼마인지 적혀 있는 기록이에요. "
+                  "어린이 통장은 보호자와 함께 은행에 가면 만들 수 있어요.",
+    },
+    {
+        "id": "card",
+        "questions": ["카드는 공짜 돈이에요", "체크카드와 신용카드 차이", "카드로 사면 돈이 안 나가요"],
+        "keywords": ["카드", "신용카드", "체크카드"],
+        "answer": "카드는 공짜 돈이 아니에요! 체크카드는 통장에 있는 내 돈이 바로 나가고, "
+                  "신용카드는 나중에 갚아야 하는 ‘빌린 돈’이에요.",
+    },
+    {
+        "id": "debt",
+        "questions": ["빚이 뭐예요", "돈을 빌리면 어떻게 돼요", "대출이 뭐야", "친구한테 돈 빌려도 돼"],
+        "keywords": ["빚", "대출", "빌려"],
+        "answer": "빚은 빌린 돈이라서 꼭 갚아야 해요. 은행에서 빌리면 이자까지 더 내야 하죠. "
+                  "친구와 돈을 주고받을 때도 약속을 분명히 하는 게 좋아요.",
+    },
+    {
+        "id": "invest",
+        "questions": ["투자가 뭐예요", "주식이 뭐예요", "주식이 뭐야", "투자와 저축 차이", "주식으로 돈 버는 법"],
+        "keywords": ["투자", "주식"],
+        "answer": "투자는 돈이 더 커지길 기대하며 회사 같은 곳에 돈을 맡기는 거예요. "
+                  "저축보다 더 벌 수도 있지만 잃을 수도 있어서, 꼭 어른과 함께 공부해요.",
+    },
+    {
+        "id": "inflation",
+        "questions": ["물가가 뭐예요", "왜 물건값이 올라요", "인플레이션이 뭐야", "과자 값이 왜 올랐어"],
+        "keywords": ["물가", "인플레이션", "값이 올"],
+        "answer": "물가는 물건들의 평균 가격이에요. 시간이 지나면 물가가 조금씩 올라서 "
+                  "같은 돈으로 살 수 있는 게 줄어들어요. 그래서 이자를 받는 저축이 도움이 돼요.",
+    },
+    {
+        "id": "tax",
+        "questions": ["세금이 뭐예요", "세금은 왜 내요", "부가가치세가 뭐야"],
+        "keywords": ["세금"],
+        "answer": "세금은 학교, 도로, 공원처럼 모두가 함께 쓰는 것을 만들기 위해 나라에 내는 돈이에요. "
+                  "과자를 살 때도 가격 안에 세금이 들어 있어요!",
+    },
+    {
+        "id": "insurance",
+        "questions": ["보험이 뭐예요", "보험은 왜 들어요"],
+        "keywords": ["보험"],
+        "answer": "보험은 여러 사람이 조금씩 돈을 모아 두었다가, 그중 누군가에게 사고가 나면 도와주는 약속이에요.",
+    },
+    {
+        "id": "donation",
+        "questions": ["기부가 뭐예요", "나눔은 왜 해요", "기부는 어떻게 해"],
+        "keywords": ["기부", "나눔"],
+        "answer": "기부는 내 돈이나 물건을 도움이 필요한 사람과 나누는 거예요. "
+                  "용돈의 작은 부분을 ‘나눔 칸’에 모아 보는 것부터 시작할 수 있어요.",
+    },
+    {
+        "id": "exchange",
+        "questions": ["환율이 뭐예요", "외국 돈은 어떻게 바꿔요", "달러가 뭐야"],
+        "keywords": ["환율", "달러", "외국 돈"],
+        "answer": "환율은 우리나라 돈과 다른 나라 돈을 바꾸는 비율이에요. "
+                  "예를 들어 1달러를 사려면 원화가 얼마 필요한지 알려 줘요.",
+    },
+    {
+        "id": "money_history",
+        "questions": ["돈은 왜 생겼어요", "옛날에는 돈이 없었어", "물물교환이 뭐야"],
+        "keywords": ["물물교환", "돈의 역사"],
+        "answer": "옛날에는 쌀과 물고기처럼 물건끼리 바꿨어요(물물교환). 불편해서 모두가 믿는 ‘돈’이 생겼답니다.",
+    },
+    {
+        "id": "sale",
+        "questions": ["할인하면 무조건 이득이에요", "세일할 때 사는 게 좋아", "1+1은 무조건 사야 해"],
+        "keywords": ["할인", "세일", "1+1"],
+        "answer": "할인도 필요 없는 걸 사면 손해예요! ‘원래 사려던 물건인가?’를 먼저 확인해 보세요.",
+    },
+    {
+        "id": "greeting",
+        "questions": ["안녕", "안녕하세요", "반가워", "너는 누구야"],
+        "keywords": ["안녕"],
+        "keyword_bonus": False,
+        "answer": "안녕! 나는 돈 공부를 도와주는 AI 친구야. 저축, 용돈, 이자 같은 걸 물어봐 줘! 😊",
+    },
+    {
+        "id": "advice",
+        "questions": ["추천해 줘", "조언해 줘", "오늘 뭐 하면 좋을까", "돈 습관 추천"],
+        "keywords": ["추천", "조언"],
+        "answer": "오늘은 ‘하루에 1,000원’ 같은 작은 저축부터 해보자! 그리고 지출은 ‘계획 지출’로 적어보면 좋아.",
+    },
+    {
+        "id": "quiz",
+        "questions": ["퀴즈 내줘", "문제 내줘", "퀴즈 하자"],
+        "keywords": ["퀴즈"],
+        "answer": "퀴즈! ‘저축’은 (1) 지금 쓰기 (2) 나중을 위해 모으기 중 뭐일까?",
+    },
+    {
+        "id": "parent_allowance_amount",
+        "audience": "parent",
+        "questions": ["아이 용돈은 얼마가 적당한가요", "아이 용돈 얼마 줘야 해요", "초등학생 용돈 얼마", "용돈 금액 정하는 법"],
+        "keywords": ["용돈 얼마", "적당한 용돈"],
+        "answer": "금액보다 ‘규칙’이 중요해요. 아이가 스스로 책임질 지출(간식, 학용품 일부)을 함께 정하고 "
+                  "그만큼을 주기적으로 주세요. 저학년은 주 단위, 고학년은 월 단위로 늘려 가면 좋아요.",
+    },
+    {
+        "id": "parent_start_age",
+        "audience": "parent",
+        "questions": ["경제교육은 몇 살부터", "언제부터 용돈을 주나요", "아이 금융 교육 시작 시기"],
+        "keywords": ["몇 살", "시작 시기"],
+        "answer": "숫자를 세고 물건을 고를 수 있는 5~6세부터 저금통으로 시작할 수 있어요. "
+                  "초등 입학 무렵에는 정기 용돈과 간단한 기록을 함께 시작해 보세요.",
+    },
+    {
+        "id": "parent_impulse",
+        "audience": "parent",
+        "questions": ["아이가 충동구매를 해요", "아이가 자꾸 사달라고 해요", "떼쓰는 아이 대처"],
+        "keywords": ["사달라", "떼"],
+        "answer": "바로 거절하기보다 ‘위시리스트’에 적고 하루 기다려 보게 해 주세요. "
+                  "다음 날에도 갖고 싶으면 저축으로 모아서 사도록 하면 만족 지연을 연습할 수 있어요.",
+    },
+]
+
+_CLEAN_RE = re.compile(r"[^\w]", flags=re.UNICODE)
+
+
+def _normalize(text: str) -> str:
+    """전각/반각 통일, 소문자, 공백/문장부호 제거(2-gram 은 띄어쓰기와 무관하게)"""
+    return _CLEAN_RE.sub("", unicodedata.normalize("NFKC", str(text or "")).lower()).replace("_", "")
+
+
+def _bigrams(norm: str) -> set:
+    if len(norm) < 2:
+        return {norm} if norm else set()
+    return {norm[i:i + 2] for i in range(len(norm) - 1)}
+
+
+class FAQEngine:
+    """2-gram 역색인 + IDF 가중 코사인 × 질문 커버리지 점수 FAQ 매칭"""
+
+    def __init__(self, entries: Optional[List[Dict]] = None):
+        self.entries: List[Dict] = list(entries if entries is not None else FAQ_ENTRIES)
+        # 예시 질문 단위 문서: (entry 번호, 2-gram 집합)
+        self._docs: List[int] = []
+        self._doc_questions: List[str] = []
+        doc_grams: List[set] = []
+        for ei, entry in enumerate(self.entries):
+            for q in entry.get("questions") or []:
+                grams = _bigrams(_normalize(q))
+                if grams:
+                    self._docs.append(ei)
+                    self._doc_questions.append(q)
+                    doc_grams.append(grams)
+
+        n = len(doc_grams)
+        df: Dict[str, int] = {}
+        for grams in doc_grams:
+            for g in grams:
+                df[g] = df.get(g, 0) + 1
+        self._idf: Dict[str, float] = {g: math.log(1.0 + n / c) for g, c in df.items()}
+        # 색인에 없는 2-gram 은 최대 IDF 로 보고 질문 쪽 길이에 반영(엉뚱한 긴 질문의 점수를 낮춤)
+        self._unknown_idf = max(self._idf.values()) if self._idf else 1.0
+
+        self._index: Dict[str, List[int]] = {}
+        self._norms: List[float] = []
+        for di, grams in enumerate(doc_grams):
+            for g in grams:
+                self._index.setdefault(g, []).append(di)
+            self._norms.append(math.sqrt(sum(self._idf[g] ** 2 for g in grams)) or 1.0)
+
+        self._keywords: List[List[str]] = [
+            [_normalize(k) for k in (entry.get("keywords") or []) if _normalize(k)]
+            if entry.get("keyword_bonus", True) else []
+            for entry in self.entries
+        ]
+
+    def match(self, text: str, top_k: int = 3, audience: Optional[str] = None) -> List[Dict]:
+        """
+        점수 높은 FAQ 목록. return: [{"id", "score", "answer", "question"}]
+        audience: 'child'/'parent' 면 해당 대상(+공통) FAQ만
+        """
+        norm = _normalize(text)
+        grams = _bigrams(norm)
+        if not grams:
+            return []
+
+        q_weight = sum(self._idf.get(g, self._unknown_idf) ** 2 for g in grams) or 1.0
+        q_norm = math.sqrt(q_weight)
+
+        dots: Dict[int, float] = {}
+        for g in grams:
+            postings = self._index.get(g)
+            if not postings:
+                continue
+            w = self._idf[g] ** 2
+            for di in postings:
+                dots[di] = dots.get(di, 0.0) + w
+
+        best: Dict[int, tuple] = {}
+        for di, dot in dots.items():
+            ei = self._docs[di]
+            # 코사인만 쓰면 짧은 예시가 긴 질문의 일부(인사말 등)만 맞아도 점수가 높게 나옴
+            score = math.sqrt(dot / (q_norm * self._norms[di]) * (dot / q_weight))
+            if score > best.get(ei, (0.0, -1))[0]:
+                best[ei] = (score, di)
+
+        for ei, kws in enumerate(self._keywords):
+            if any(k in norm for k in kws):
+                score, di = best.get(ei, (0.0, -1))
+                best[ei] = (score + KEYWORD_BONUS, di)
+
+        results: List[Dict] = []
+        for ei, (score, di) in best.items():
+            entry = self.entries[ei]
+            target = entry.get("audience") or "all"
+            if audience and target not in ("all", audience):
+                continue
+            results.append({
+                "id": entry.get("id"),
+                "score": round(min(1.0, score), 4),
+                "answer": entry.get("answer", ""),
+                "question": self._doc_questions[di] if di >= 0 else (entry.get("questions") or [""])[0],
+            })
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results[: max(1, int(top_k))]
+
+    def answer(self, text: str, threshold: float = DEFAULT_THRESHOLD, audience: Optional[str] = None) -> Optional[Dict]:
+        """자신 있는 FAQ(점수 ≥ threshold)만 반환, 아니면 None(→ LLM)"""
+        hits = self.match(text, top_k=1, audience=audience)
+        if hits and hits[0]["score"] >= threshold:
+            return hits[0]
+        return None
+
+
+_engine: Optional[FAQEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_faq_engine() -> FAQEngine:
+    """프로세스 공용 엔진(색인은 최초 1회만 생성)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = FAQEngine()
+    return _engine
+
+
+def reply(text: str) -> str:
+    """항상 답하는 오프라인 응답(가장 가까운 FAQ, 없으면 다시 물어보기)"""
+    t = (text or "").strip()
+    if not t:
+        return "무엇을 도와줄까?"
+    hits = get_faq_engine().match(t, top_k=1)
+    if hits and hits[0]["score"] >= DEFAULT_THRESHOLD * 0.5:
+        return hits[0]["answer"]
+    return "좋은 질문이야! 더 자세히 말해주면 내가 더 잘 도와줄게. 예: ‘간식에 돈을 너무 써요’ 같은 상황도 좋아."
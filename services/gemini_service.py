@@ -1,11 +1,28 @@
 import google.generativeai as genai
-from typing import List, Dict
+from typing import List, Dict, Optional
 from config import Config
+from services.response_cache import (
+    ResponseCache,
+    get_chat_reply,
+    get_response_cache,
+    put_chat_reply,
+)
+
+
+def _chat_error_message(e: Exception) -> str:
+    """대화 API 오류 → 사용자용 안내 문구"""
+    error_msg = str(e)
+    if "Connection" in error_msg or "network" in error_msg.lower():
+        return "죄송해요, 인터넷 연결에 문제가 있어요. 네트워크 연결을 확인하고 다시 시도해주세요."
+    elif "API key" in error_msg.lower() or "401" in error_msg or "403" in error_msg:
+        return "죄송해요, API 인증에 문제가 있어요. API 키를 확인해주세요."
+    else:
+        return f"죄송해요, 오류가 발생했어요: {error_msg[:200]}"
 
 class GeminiService:
     """Google Gemini API 서비스 클래스"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache: Optional[ResponseCache] = None):
         config = Config()
         self.api_key = api_key or config.GEMINI_API_KEY
         
@@ -22,9 +39,19 @@ class GeminiService:
             raise ValueError(error_msg)
         
         genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-pro')  # gemini-pro 모델로 변경
+        self.model_name = 'gemini-pro'
+        self.model = genai.GenerativeModel(self.model_name)  # gemini-pro 모델로 변경
+        # 반복 질문/같은 코칭 입력은 API 호출 없이 응답(None 이면 캐시 끔)
+        self.cache = cache if cache is not None else get_response_cache()
+    
+    def _cache_get_chat(self, messages, user_name, user_age, user_type, summary=None) -> Optional[str]:
+        return get_chat_reply(self.cache, messages, self.model_name, user_name, user_age, user_type, summary)
+    
+    def _cache_put_chat(self, messages, reply, user_name, user_age, user_type, summary=None) -> None:
+        put_chat_reply(self.cache, messages, reply, self.model_name, user_name, user_age, user_type, summary)
     
-    def _get_system_prompt(self, user_name: str = None, user_age: int = None, user_type: str = 'child') -> str:
+    @staticmethod
+    def _get_system_prompt(user_name: str = None, user_age: int = None, user_type: str = 'child') -> str:
         """사용자 타입에 맞는 시스템 프롬프트 생성"""
         if user_type == 'parent':
             name_context = f"{user_name}님, " if user_name else ""
@@ -67,35 +94,58 @@ class GeminiService:
 
 대화 중에 아이가 저축, 소비, 계획, 인내심 등에 대해 언급하면 자연스럽게 긍정적으로 반응하세요."""
     
-    def chat_with_context(
-        self, 
-        messages: List[Dict[str, str]], 
+    def _build_chat_prompt(
+        self,
+        messages: List[Dict[str, str]],
+        summary: str = None,
         user_name: str = None,
         user_age: int = None,
         user_type: str = 'child'
     ) -> str:
-        """컨텍스트를 포함한 대화 생성"""
+        """시스템 프롬프트 + 이전 대화 요약 + 최근 대화 + 마지막 질문"""
         system_prompt = self._get_system_prompt(user_name, user_age, user_type)
         
         if not messages or len(messages) == 0:
             last_user_message = "안녕하세요!"
+            history = []
         else:
             last_user_message = messages[-1].get("content", "안녕하세요!")
+            history = messages[:-1]
         
-        user_content = f"{last_user_message}\n\n초등학생도 이해할 수 있는 자연스러운 한국어로 설명해줘."
+        parts = [system_prompt]
+        if summary:
+            parts.append(f"이전 대화 요약:\n{summary}")
+        if history:
+            lines = [
+                f"{'AI' if m.get('role') == 'assistant' else '사용자'}: {m.get('content', '')}"
+                for m in history
+            ]
+            parts.append("최근 대화:\n" + "\n".join(lines))
+        parts.append(f"{last_user_message}\n\n초등학생도 이해할 수 있는 자연스러운 한국어로 설명해줘.")
+        return "\n\n".join(parts)
+    
+    def chat_with_context(
+        self, 
+        messages: List[Dict[str, str]], 
+        user_name: str = None,
+        user_age: int = None,
+        user_type: str = 'child',
+        summary: str = None
+    ) -> str:
+        """컨텍스트를 포함한 대화 생성"""
+        cached = self._cache_get_chat(messages, user_name, user_age, user_type, summary)
+        if cached:
+            return cached
+        
+        prompt = self._build_chat_prompt(messages, summary, user_name, user_age, user_type)
         
         try:
-            prompt = f"{system_prompt}\n\n{user_content}"
             response = self.model.generate_content(prompt)
-            return response.text.strip()
+            reply = response.text.strip()
         except Exception as e:
-            error_msg = str(e)
-            if "Connection" in error_msg or "network" in error_msg.lower():
-                return "죄송해요, 인터넷 연결에 문제가 있어요. 네트워크 연결을 확인하고 다시 시도해주세요."
-            elif "API key" in error_msg.lower() or "401" in error_msg or "403" in error_msg:
-                return "죄송해요, API 인증에 문제가 있어요. API 키를 확인해주세요."
-            else:
-                return f"죄송해요, 오류가 발생했어요: {error_msg[:200]}"
+            return _chat_error_message(e)
+        self._cache_put_chat(messages, reply, user_name, user_age, user_type, summary)
+        return reply
     
     def generate_parent_coaching(
         self,
@@ -138,12 +188,27 @@ class GeminiService:
 
 친절하고 실용적인 톤으로 작성하되, 자녀를 격려하는 방향으로 제시하세요."""
 
+        # 점수/행동 요약이 같으면(프롬프트 동일) 이전 코칭 메시지 재사용
+        if self.cache is not None:
+            try:
+                cached = self.cache.get(prompt, kind="coaching", model=self.model_name, user_type="parent")
+                if cached:
+                    return cached
+            except Exception:
+                pass
+
         try:
             response = self.model.generate_content(prompt)
-            return response.text.strip()
+            reply = response.text.strip()
         except Exception as e:
             error_msg = str(e)
             if "Connection" in error_msg or "network" in error_msg.lower():
                 return "죄송해요, 인터넷 연결에 문제가 있어요. 네트워크 연결을 확인하고 다시 시도해주세요."
             else:
                 return f"코칭 메시지 생성 중 오류가 발생했습니다: {error_msg[:200]}"
+        if self.cache is not None and reply:
+            try:
+                self.cache.put(prompt, reply, kind="coaching", model=self.model_name, user_type="parent")
+            except Exception:
+                pass
+        return reply
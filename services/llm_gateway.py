@@ -0,0 +1,625 @@
+"""
+LLM 게이트웨이 - Gemini / OpenAI / Groq / 오프라인 FAQ 를 한 창구로
+
+- 프로세스당 1개의 이벤트 루프 스레드 + 크기가 정해진 작업 스레드 풀(max_workers)
+  (SDK 호출은 모두 동기라 풀에서 실행. 시간 초과로 포기한 호출도 끝날 때까지 자리를 차지하므로
+   풀이 꽉 차면 새 요청은 마감 시간까지만 기다렸다가 다음 공급자로 넘어감)
+- 공급자별 속도 제한(토큰 버킷)
+- 마감 시간(deadline): 요청 전체 기준. 각 시도는 남은 시간만큼만 기다림
+- 재시도: 지터를 준 지수 백오프. 인증/잘못된 요청 오류는 재시도 없이 다음 공급자로
+- 폴백 순서: gemini → openai → groq → faq (키가 있는 공급자만. AMF_LLM_PROVIDERS 로 변경)
+- 스트리밍(stream): 첫 조각을 마감 시간 안에 못 받으면 다음 공급자로. 이후에는 조각 사이 idle_timeout
+- StubProvider: 테스트/벤치마크용 가짜 공급자
+
+사용 예:
+    gw = get_llm_gateway()
+    result = gw.generate([{"role": "user", "content": "저축이 왜 중요해?"}], user_age=9)
+    result["text"], result["provider"]
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from config import Config, get_gemini_api_key
+from services import faq
+from services.response_cache import get_chat_reply, put_chat_reply
+
+
+DEFAULT_DEADLINE_SEC = 15.0
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_PROVIDER_ORDER = "gemini,openai,groq,faq"
+
+
+class ProviderError(Exception):
+    """공급자 호출 실패(retryable=False 면 재시도 없이 다음 공급자로)"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+_FATAL_MARKERS = ("api key", "api_key", "401", "403", "permission", "invalid_argument", "400")
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, ProviderError):
+        return exc.retryable
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    msg = str(exc).lower()
+    return not any(m in msg for m in _FATAL_MARKERS)
+
+
+def _last_user_text(request: Dict) -> str:
+    messages = request.get("messages") or []
+    return str((messages[-1].get("content") if messages else "") or "")
+
+
+class RateLimiter:
+    """토큰 버킷(초당 rate 개, 최대 burst 개까지 몰아서)"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, int(rate)))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """토큰 1개를 가져오면 0, 아니면 기다려야 할 초"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    async def acquire(self, deadline: float) -> bool:
+        """마감 시간 안에 토큰을 얻으면 True"""
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+# ========== 공급자 ==========
+
+class Provider:
+    """
+    공급자 기본형. complete()/stream()은 동기 함수이며 게이트웨이의 작업 스레드에서 실행됩니다.
+    request: {"messages", "summary", "user_name", "user_age", "user_type"}
+    """
+
+    name = "provider"
+    local = False  # True 면 풀/속도 제한/재시도 없이 바로 실행(오프라인 응답)
+    supports_stream = False
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None):
+        self.limiter = RateLimiter(rate, burst) if rate else None
+
+    def complete(self, request: Dict, timeout: float) -> str:
+        raise NotImplementedError
+
+    def stream(self, request: Dict, timeout: float) -> Iterator[str]:
+        yield self.complete(request, timeout)
+
+
+def _system_prompt(request: Dict) -> str:
+    from services.gemini_service import GeminiService
+
+    system = GeminiService._get_system_prompt(
+        request.get("user_name"), request.get("user_age"), request.get("user_type") or "child"
+    )
+    if request.get("summary"):
+        system += f"\n\n이전 대화 요약:\n{request['summary']}"
+    return system
+
+
+def _cached_reply(service, model: str, request: Dict) -> Optional[str]:
+    """
+    공급자 공용 대화 캐시 조회 - 시스템 프롬프트에 들어가는 이름/유형/나이와 이전 대화/요약을 모두 키에 반영
+    (서비스의 chat_with_context 와 같은 키라서 게이트웨이 경유 여부와 관계없이 재사용)
+    """
+    return get_chat_reply(
+        getattr(service, "cache", None),
+        request.get("messages") or [],
+        model,
+        request.get("user_name"),
+        request.get("user_age"),
+        request.get("user_type") or "child",
+        request.get("summary"),
+    )
+
+
+def _store_reply(service, model: str, request: Dict, text: str) -> None:
+    put_chat_reply(
+        getattr(service, "cache", None),
+        request.get("messages") or [],
+        text,
+        model,
+        request.get("user_name"),
+        request.get("user_age"),
+        request.get("user_type") or "child",
+        request.get("summary"),
+    )
+
+
+class GeminiProvider(Provider):
+    """Gemini 대화(스트리밍 구현은 여기 하나. 오류는 삼키지 않고 올려서 게이트웨이가 재시도/폴백)"""
+
+    name = "gemini"
+    supports_stream = True
+
+    def __init__(self, service, rate: Optional[float] = 1.0, burst: Optional[int] = 5):
+        super().__init__(rate, burst)
+        self.service = service
+
+    def _prompt(self, request: Dict) -> str:
+        return self.service._build_chat_prompt(
+            request.get("messages") or [],
+            request.get("summary"),
+            request.get("user_name"),
+            request.get("user_age"),
+            request.get("user_type") or "child",
+        )
+
+    def complete(self, request: Dict, timeout: float) -> str:
+        cached = _cached_reply(self.service, self.service.model_name, request)
+        if cached:
+            return cached
+        response = self.service.model.generate_content(self._prompt(request), request_options={"timeout": timeout})
+        text = response.text.strip()
+        _store_reply(self.service, self.service.model_name, request, text)
+        return text
+
+    def stream(self, request: Dict, timeout: float) -> Iterator[str]:
+        cached = _cached_reply(self.service, self.service.model_name, request)
+        if cached:
+            yield cached
+            return
+        response = self.service.model.generate_content(
+            self._prompt(request), stream=True, request_options={"timeout": timeout}
+        )
+        parts: List[str] = []
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # 안전 필터 등으로 텍스트가 없는 조각
+                continue
+            if text:
+                parts.append(text)
+                yield text
+        _store_reply(self.service, self.service.model_name, request, "".join(parts).strip())
+
+
+class OpenAIProvider(Provider):
+    name = "openai"
+
+    def __init__(self, service, rate: Optional[float] = 3.0, burst: Optional[int] = 5):
+        super().__init__(rate, burst)
+        self.service = service
+
+    def complete(self, request: Dict, timeout: float) -> str:
+        cached = _cached_reply(self.service, self.service.model, request)
+        if cached:
+            return cached
+        response = self.service.client.with_options(timeout=timeout).responses.create(
+            model=self.service.model,
+            input=[{"role": "system", "content": _system_prompt(request)}, *(request.get("messages") or [])],
+        )
+        text = (response.output_text or "").strip()
+        _store_reply(self.service, self.service.model, request, text)
+        return text
+
+
+class GroqProvider(Provider):
+    name = "groq"
+
+    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile", rate: Optional[float] = 0.5, burst: Optional[int] = 3):
+        super().__init__(rate, burst)
+        from groq import Groq
+
+        self.client = Groq(api_key=api_key)
+        self.model = model
+
+    def complete(self, request: Dict, timeout: float) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "system", "content": _system_prompt(request)}, *(request.get("messages") or [])],
+            timeout=timeout,
+        )
+        return (response.choices[0].message.content or "").strip()
+
+
+class FAQProvider(Provider):
+    """오프라인 FAQ(항상 답함)"""
+
+    name = "faq"
+    local = True
+
+    def complete(self, request: Dict, timeout: float) -> str:
+        return faq.reply(_last_user_text(request))
+
+
+class StubProvider(Provider):
+    """
+    테스트용 가짜 공급자
+    - latency: 호출마다 대기(초), failures: 처음 N번 실패, error: 실패 시 던질 예외
+    - chunks 를 주면 스트리밍 공급자로 동작
+    """
+
+    def __init__(
+        self,
+        name: str = "stub",
+        reply: str = "stub reply",
+        latency: float = 0.0,
+        failures: int = 0,
+        error: Optional[Exception] = None,
+        chunks: Optional[Sequence[str]] = None,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+    ):
+        super().__init__(rate, burst)
+        self.name = name
+        self.reply = reply
+        self.latency = float(latency)
+        self.failures = int(failures)
+        self.error = error
+        self.chunks = list(chunks) if chunks is not None else None
+        self.supports_stream = chunks is not None
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _maybe_fail(self) -> None:
+        with self._lock:
+            self.calls += 1
+            if self.failures > 0:
+                self.failures -= 1
+                raise self.error or ProviderError(f"{self.name} failure")
+
+    def complete(self, request: Dict, timeout: float) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        self._maybe_fail()
+        return self.reply
+
+    def stream(self, request: Dict, timeout: float) -> Iterator[str]:
+        self._maybe_fail()
+        for chunk in self.chunks or [self.reply]:
+            if self.latency:
+                time.sleep(self.latency)
+            yield chunk
+
+
+# ========== 게이트웨이 ==========
+
+class LLMGateway:
+    """공급자 폴백 체인 + 동시성/속도/마감 시간 제어"""
+
+    def __init__(
+        self,
+        providers: Sequence[Provider],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        deadline: float = DEFAULT_DEADLINE_SEC,
+        attempts: int = 2,
+        backoff_base: float = 0.25,
+        backoff_cap: float = 2.0,
+        idle_timeout: Optional[float] = None,
+    ):
+        self.providers: List[Provider] = list(providers)
+        self.max_workers = max(1, int(max_workers))
+        self.deadline = float(deadline)
+        self.attempts = max(1, int(attempts))
+        self.backoff_base = float(backoff_base)
+        self.backoff_cap = float(backoff_cap)
+        self.idle_timeout = float(idle_timeout or deadline)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="amf-llm")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stats_lock = threading.Lock()
+        self._stats: Dict = {"requests": 0, "fallbacks": 0, "retries": 0, "timeouts": 0, "providers": {}}
+
+    # ----- 이벤트 루프 -----
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None:
+            return self._loop
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run() -> None:
+                    asyncio.set_event_loop(loop)
+                    # 작업 스레드 수와 같게: 포기한 호출이 끝나기 전에는 새 호출을 풀에 쌓지 않음
+                    self._slots = asyncio.Semaphore(self.max_workers)
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=run, name="amf-llm-loop", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    # ----- 통계 -----
+
+    def _count(self, key: str, provider: Optional[str] = None, outcome: Optional[str] = None) -> None:
+        with self._stats_lock:
+            if key:
+                self._stats[key] += 1
+            if provider:
+                per = self._stats["providers"].setdefault(provider, {"ok": 0, "error": 0, "timeout": 0})
+                per[outcome] += 1
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                **{k: v for k, v in self._stats.items() if k != "providers"},
+                "providers": {k: dict(v) for k, v in self._stats["providers"].items()},
+                "order": [p.name for p in self.providers],
+                "max_workers": self.max_workers,
+            }
+
+    # ----- 실행 -----
+
+    async def _acquire_slot(self, deadline: float) -> None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        await asyncio.wait_for(self._slots.acquire(), timeout=remaining)
+
+    def _release_slot(self, _fut=None) -> None:
+        self._loop.call_soon_threadsafe(self._slots.release)
+
+    async def _call(self, provider: Provider, request: Dict, deadline: float) -> str:
+        """공급자 1곳 호출(재시도 포함)"""
+        loop = asyncio.get_running_loop()
+        last_exc: BaseException = asyncio.TimeoutError()
+        for attempt in range(self.attempts):
+            try:
+                if provider.limiter and not await provider.limiter.acquire(deadline):
+                    raise ProviderError(f"{provider.name} rate limited", retryable=False)
+                await self._acquire_slot(deadline)
+                remaining = max(0.0, deadline - time.monotonic())
+                fut = loop.run_in_executor(self._executor, provider.complete, request, remaining)
+                # 슬롯은 스레드가 실제로 끝날 때 반납(shield: 시간 초과여도 호출 자체는 취소 불가)
+                fut.add_done_callback(self._release_slot)
+                return await asyncio.wait_for(asyncio.shield(fut), timeout=remaining)
+            except Exception as e:
+                last_exc = e
+                if not _is_retryable(e) or attempt + 1 >= self.attempts:
+                    break
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+                if time.monotonic() + delay >= deadline:
+                    break
+                self._count("retries")
+                await asyncio.sleep(delay)
+        raise last_exc
+
+    async def _generate_chain(self, providers: Sequence[Provider], request: Dict, deadline: float, started: float, errors: List[Dict]) -> Dict:
+        for i, p in enumerate(providers):
+            if i > 0 or errors:
+                self._count("fallbacks")
+            try:
+                if p.local:
+                    text = p.complete(request, max(0.0, deadline - time.monotonic()))
+                else:
+                    text = await self._call(p, request, deadline)
+            except asyncio.TimeoutError:
+                self._count("timeouts", p.name, "timeout")
+                errors.append({"provider": p.name, "error": "timeout"})
+                continue
+            except Exception as e:
+                self._count("", p.name, "error")
+                errors.append({"provider": p.name, "error": str(e)[:200]})
+                continue
+            if text:
+                self._count("", p.name, "ok")
+                return {"text": text, "provider": p.name, "errors": errors, "elapsed": time.monotonic() - started}
+            errors.append({"provider": p.name, "error": "empty"})
+        return {"text": "", "provider": None, "errors": errors, "elapsed": time.monotonic() - started}
+
+    @staticmethod
+    def _request(messages: List[Dict], summary=None, user_name=None, user_age=None, user_type: str = "child") -> Dict:
+        return {
+            "messages": list(messages or []),
+            "summary": summary,
+            "user_name": user_name,
+            "user_age": user_age,
+            "user_type": user_type or "child",
+        }
+
+    async def agenerate(self, messages: List[Dict], deadline: Optional[float] = None, **context) -> Dict:
+        """비동기 응답 생성. return: {"text", "provider", "errors", "elapsed"}"""
+        self._count("requests")
+        started = time.monotonic()
+        end = started + float(deadline or self.deadline)
+        # 동시성 슬롯은 게이트웨이 루프에 묶여 있으므로 어느 루프에서 호출해도 그쪽에서 실행
+        fut = self._submit(self._generate_chain(self.providers, self._request(messages, **context), end, started, []))
+        return await asyncio.wrap_future(fut)
+
+    def _local_fallback(self, request: Dict, started: float, errors: List[Dict]) -> Dict:
+        for p in self.providers:
+            if p.local:
+                return {"text": p.complete(request, 0.0), "provider": p.name, "errors": errors, "elapsed": time.monotonic() - started}
+        return {"text": "", "provider": None, "errors": errors, "elapsed": time.monotonic() - started}
+
+    def generate(self, messages: List[Dict], deadline: Optional[float] = None, **context) -> Dict:
+        """동기 응답 생성(Streamlit 스크립트 스레드용). 마감 시간 + 여유 1초 안에 반드시 반환"""
+        self._count("requests")
+        started = time.monotonic()
+        end = started + float(deadline or self.deadline)
+        request = self._request(messages, **context)
+        fut = self._submit(self._generate_chain(self.providers, request, end, started, []))
+        try:
+            return fut.result(timeout=max(0.0, end - time.monotonic()) + 1.0)
+        except FutureTimeout:
+            fut.cancel()
+            self._count("timeouts")
+            return self._local_fallback(request, started, [{"provider": "gateway", "error": "timeout"}])
+
+    async def _pump(self, provider: Provider, request: Dict, deadline: float, q: "queue.Queue", cancel: threading.Event) -> None:
+        """스트리밍 공급자 조각을 큐로(작업 스레드에서 실행)"""
+        try:
+            if provider.limiter and not await provider.limiter.acquire(deadline):
+                raise ProviderError(f"{provider.name} rate limited", retryable=False)
+            await self._acquire_slot(deadline)
+        except Exception as e:
+            q.put(("error", e))
+            return
+
+        def run() -> None:
+            try:
+                for chunk in provider.stream(request, max(0.1, deadline - time.monotonic())):
+                    if cancel.is_set():
+                        return
+                    q.put(("chunk", chunk))
+                q.put(("done", None))
+            except Exception as e:
+                q.put(("error", e))
+
+        fut = asyncio.get_running_loop().run_in_executor(self._executor, run)
+        fut.add_done_callback(self._release_slot)
+
+    def stream(self, messages: List[Dict], deadline: Optional[float] = None, **context) -> Iterator[str]:
+        """
+        동기 스트리밍(조각 yield)
+        - 첫 조각을 deadline 안에 못 받으면 다음 공급자로(비스트리밍 공급자는 generate 체인으로)
+        - 첫 조각 이후 실패/idle_timeout 이면 받은 데까지만
+        """
+        self._count("requests")
+        started = time.monotonic()
+        end = started + float(deadline or self.deadline)
+        request = self._request(messages, **context)
+        errors: List[Dict] = []
+
+        for idx, p in enumerate(self.providers):
+            if not p.supports_stream:
+                fut = self._submit(self._generate_chain(self.providers[idx:], request, end, started, errors))
+                try:
+                    result = fut.result(timeout=max(0.0, end - time.monotonic()) + 1.0)
+                except FutureTimeout:
+                    fut.cancel()
+                    result = self._local_fallback(request, started, errors)
+                if result.get("text"):
+                    yield result["text"]
+                return
+
+            if idx > 0:
+                self._count("fallbacks")
+            q: "queue.Queue" = queue.Queue()
+            cancel = threading.Event()
+            self._submit(self._pump(p, request, end, q, cancel))
+            got_any = False
+            while True:
+                wait = self.idle_timeout if got_any else end - time.monotonic()
+                try:
+                    kind, value = q.get(timeout=max(0.01, wait))
+                except queue.Empty:
+                    kind, value = "error", asyncio.TimeoutError()
+                if kind == "chunk":
+                    got_any = True
+                    yield value
+                    continue
+                if kind == "done":
+                    if got_any:
+                        self._count("", p.name, "ok")
+                        return
+                    errors.append({"provider": p.name, "error": "empty"})
+                    break
+                # error
+                cancel.set()
+                timeout = isinstance(value, asyncio.TimeoutError)
+                self._count("timeouts" if timeout else "", p.name, "timeout" if timeout else "error")
+                if got_any:
+                    return
+                errors.append({"provider": p.name, "error": "timeout" if timeout else str(value)[:200]})
+                break
+
+        result = self._local_fallback(request, started, errors)
+        if result.get("text"):
+            yield result["text"]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+# ========== 기본 게이트웨이 ==========
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+def build_default_gateway() -> LLMGateway:
+    """
+    설정된 키가 있는 공급자만 순서대로 묶음(SDK 미설치/초기화 실패 공급자는 건너뜀)
+    - AMF_LLM_PROVIDERS: 순서(기본 gemini,openai,groq,faq)
+    - AMF_LLM_DEADLINE: 요청 마감(초, 기본 15)
+    - AMF_LLM_WORKERS: 작업 스레드 수(기본 4)
+    """
+    order = [x.strip().lower() for x in (os.getenv("AMF_LLM_PROVIDERS") or DEFAULT_PROVIDER_ORDER).split(",") if x.strip()]
+    providers: List[Provider] = []
+    for name in order:
+        try:
+            if name == "gemini":
+                key = get_gemini_api_key()
+                if key:
+                    from services.gemini_service import GeminiService
+
+                    providers.append(GeminiProvider(GeminiService(api_key=key)))
+            elif name == "openai":
+                if Config.OPENAI_API_KEY:
+                    from services.openai_service import OpenAIService
+
+                    providers.append(OpenAIProvider(OpenAIService(api_key=Config.OPENAI_API_KEY)))
+            elif name == "groq":
+                if Config.GROQ_API_KEY:
+                    providers.append(GroqProvider(Config.GROQ_API_KEY))
+            elif name == "faq":
+                providers.append(FAQProvider())
+        except Exception:
+            continue
+    if not any(p.local for p in providers):
+        providers.append(FAQProvider())
+    return LLMGateway(
+        providers,
+        max_workers=int(_env_float("AMF_LLM_WORKERS", DEFAULT_MAX_WORKERS)),
+        deadline=_env_float("AMF_LLM_DEADLINE", DEFAULT_DEADLINE_SEC),
+    )
+
+
+_shared: Optional[LLMGateway] = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """프로세스 공용 게이트웨이"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = build_default_gateway()
+    return _shared
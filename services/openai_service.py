@@ -1,13 +1,36 @@
 from openai import OpenAI
-from typing import List, Dict
+from typing import List, Dict, Optional
 from config import Config
+from services.response_cache import ResponseCache, get_chat_reply, get_response_cache, put_chat_reply
 
 class OpenAIService:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache: Optional[ResponseCache] = None):
         self.client = OpenAI(api_key=api_key or Config.OPENAI_API_KEY)
         self.model = "gpt-4.1-mini"  # 안정적이고 빠름
+        # 반복 질문/같은 코칭 프롬프트는 API 호출 없이 응답(None 이면 캐시 끔)
+        self.cache = cache if cache is not None else get_response_cache()
+
+    def _cache_get(self, prompt: str, kind: str, user_age=None) -> Optional[str]:
+        if self.cache is None or not prompt:
+            return None
+        try:
+            return self.cache.get(prompt, kind=kind, model=self.model, user_age=user_age)
+        except Exception:
+            return None
+
+    def _cache_put(self, prompt: str, reply: str, kind: str, user_age=None) -> None:
+        if self.cache is None or not prompt or not reply:
+            return
+        try:
+            self.cache.put(prompt, reply, kind=kind, model=self.model, user_age=user_age)
+        except Exception:
+            pass
 
     def chat_with_context(self, messages: List[Dict[str, str]], user_name=None, user_age=None) -> str:
+        # 시스템 프롬프트에 이름이 없으므로 마지막 질문 + 나이대 + 이전 대화 해시로 캐시
+        cached = get_chat_reply(self.cache, messages, self.model, user_age=user_age)
+        if cached:
+            return cached
         try:
             response = self.client.responses.create(
                 model=self.model,
@@ -20,17 +43,24 @@ class OpenAIService:
                 ],
             )
 
-            return response.output_text
+            reply = response.output_text
 
         except Exception as e:
             return f"AI 호출 오류: {e}"
+        put_chat_reply(self.cache, messages, reply, self.model, user_age=user_age)
+        return reply
 
     def generate_parent_coaching(self, prompt: str) -> str:
+        cached = self._cache_get(prompt, "coaching")
+        if cached:
+            return cached
         try:
             response = self.client.responses.create(
                 model=self.model,
                 input=prompt
             )
-            return response.output_text
+            reply = response.output_text
         except Exception as e:
             return f"코칭 오류: {e}"
+        self._cache_put(prompt, reply, "coaching")
+        return reply
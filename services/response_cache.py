@@ -0,0 +1,345 @@
+"""
+AI 응답 캐시 - 같은 질문/같은 코칭 입력은 API를 다시 부르지 않음
+
+- 키: 정규화한 프롬프트 + 나이대 + 사용자 유형 + 모델(+ 종류: chat/coaching)
+- 저장: 앱 DB의 llm_response_cache 테이블(프로세스 재시작 후에도 유지)
+- TTL 지난 항목은 조회 시 버리고, max_entries 를 넘으면 가장 오래 안 쓴 항목부터 삭제(LRU)
+- near_duplicate=True 로 조회하면 같은 버킷(종류/모델/유형/나이대)의 최근 항목 중
+  문자 2-gram 유사도가 threshold 이상인 응답도 재사용("저축이 왜 중요해?" ≈ "저축은 왜 중요해요")
+- 대화(chat)는 get_chat_reply()/put_chat_reply() 로만 캐시: 이름 버킷 + 이전 대화/요약 해시를 종류(kind)에 넣고,
+  이전 대화나 요약이 있으면 유사 질문 매칭을 하지 않음("왜?"/"응" 같은 후속 질문이 다른 대화의 답을 받지 않게)
+- 환경변수 AMF_LLM_CACHE=0 이면 get_response_cache()가 None(캐시 끔)
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+from database.db_manager import DatabaseManager, get_db_manager
+
+
+DEFAULT_TTL_SEC = 3 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_NEAR_THRESHOLD = 0.8
+NEAR_CANDIDATES = 200
+
+_PUNCT_RE = re.compile(r"[^\w\s]", flags=re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """전각/반각 통일, 소문자, 문장부호/이모지 제거, 공백 1칸"""
+    s = unicodedata.normalize("NFKC", str(text or "")).lower()
+    s = _PUNCT_RE.sub(" ", s)
+    return _SPACE_RE.sub(" ", s).strip()
+
+
+def age_band(age: Optional[int]) -> str:
+    """GeminiService 시스템 프롬프트와 같은 나이 구간"""
+    try:
+        a = int(age)
+    except (TypeError, ValueError):
+        return "na"
+    if a <= 0:
+        return "na"
+    if a < 8:
+        return "u8"
+    if a < 12:
+        return "8-11"
+    return "12+"
+
+
+def char_ngrams(text: str, n: int = 2) -> Set[str]:
+    s = text.replace(" ", "")
+    if len(s) < n:
+        return {s} if s else set()
+    return {s[i:i + n] for i in range(len(s) - n + 1)}
+
+
+def similarity(a: str, b: str, n: int = 2) -> float:
+    """문자 n-gram Dice 계수(0~1)"""
+    ga, gb = char_ngrams(a, n), char_ngrams(b, n)
+    if not ga or not gb:
+        return 0.0
+    return 2.0 * len(ga & gb) / (len(ga) + len(gb))
+
+
+def chat_context_digest(messages: Optional[List[Dict]], summary: Optional[str] = None) -> str:
+    """마지막 질문 앞의 대화 + 누적 요약 해시(둘 다 없으면 빈 문자열 = 문맥 없는 질문)"""
+    prior = list(messages or [])[:-1]
+    summary_norm = normalize_prompt(summary or "")
+    if not prior and not summary_norm:
+        return ""
+    raw = "\x1e".join(
+        [summary_norm] + [f"{m.get('role', '')}:{normalize_prompt(m.get('content', ''))}" for m in prior]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def chat_cache_kind(
+    user_name: Optional[str] = None,
+    messages: Optional[List[Dict]] = None,
+    summary: Optional[str] = None,
+) -> str:
+    """
+    대화 캐시 종류(kind)
+    - 시스템 프롬프트에 이름이 들어가므로 이름별 버킷(다른 아이 이름이 섞이지 않게)
+    - 이전 대화/요약이 있으면 그 해시까지 붙여 같은 문맥에서만 재사용
+    """
+    kind = "chat"
+    if user_name:
+        kind += ":" + hashlib.sha1(str(user_name).encode("utf-8")).hexdigest()[:12]
+    ctx = chat_context_digest(messages, summary)
+    return f"{kind}:ctx:{ctx}" if ctx else kind
+
+
+def get_chat_reply(
+    cache: Optional["ResponseCache"],
+    messages: Optional[List[Dict]],
+    model: str,
+    user_name: Optional[str] = None,
+    user_age: Optional[int] = None,
+    user_type: Optional[str] = None,
+    summary: Optional[str] = None,
+) -> Optional[str]:
+    """대화 응답 캐시 조회(모든 AI 서비스/게이트웨이 공급자 공용). 유사 질문 매칭은 문맥 없는 질문만"""
+    if cache is None or not messages:
+        return None
+    try:
+        return cache.get(
+            messages[-1].get("content", ""),
+            kind=chat_cache_kind(user_name, messages, summary),
+            model=model,
+            user_type=user_type or "child",
+            user_age=user_age,
+            near_duplicate=not chat_context_digest(messages, summary),
+        )
+    except Exception:
+        return None
+
+
+def put_chat_reply(
+    cache: Optional["ResponseCache"],
+    messages: Optional[List[Dict]],
+    reply: str,
+    model: str,
+    user_name: Optional[str] = None,
+    user_age: Optional[int] = None,
+    user_type: Optional[str] = None,
+    summary: Optional[str] = None,
+) -> None:
+    """대화 응답 캐시 저장(get_chat_reply 와 같은 키)"""
+    if cache is None or not messages or not reply:
+        return
+    try:
+        cache.put(
+            messages[-1].get("content", ""),
+            reply,
+            kind=chat_cache_kind(user_name, messages, summary),
+            model=model,
+            user_type=user_type or "child",
+            user_age=user_age,
+        )
+    except Exception:
+        pass
+
+
+class ResponseCache:
+    """DB 기반 AI 응답 캐시(TTL + LRU + 유사 질문 매칭)"""
+
+    def __init__(
+        self,
+        db: Optional[DatabaseManager] = None,
+        ttl: float = DEFAULT_TTL_SEC,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        near_threshold: float = DEFAULT_NEAR_THRESHOLD,
+    ):
+        self.db = db or get_db_manager()
+        self.ttl = float(ttl)
+        self.max_entries = int(max_entries)
+        self.near_threshold = float(near_threshold)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(kind: str, model: str, user_type: str, band: str, prompt_norm: str) -> str:
+        raw = "\x1f".join((kind, model, user_type, band, prompt_norm))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _count(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(
+        self,
+        prompt: str,
+        kind: str = "chat",
+        model: str = "",
+        user_type: str = "child",
+        user_age: Optional[int] = None,
+        near_duplicate: bool = False,
+    ) -> Optional[str]:
+        """캐시된 응답(없으면 None)"""
+        norm = normalize_prompt(prompt)
+        if not norm:
+            return None
+        band = age_band(user_age)
+        key = self.make_key(kind, model, user_type, band, norm)
+        now = time.time()
+
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT response, created_at FROM llm_response_cache WHERE cache_key = ?", (key,))
+            row = cursor.fetchone()
+            if row and now - float(row["created_at"]) > self.ttl:
+                cursor.execute("DELETE FROM llm_response_cache WHERE cache_key = ?", (key,))
+                conn.commit()
+                self._count("expired")
+                row = None
+            hit_key, counter = (key, "hits") if row else (None, None)
+
+            if row is None and near_duplicate:
+                cursor.execute(
+                    """
+                    SELECT cache_key, prompt_norm, response FROM llm_response_cache
+                    WHERE kind = ? AND model = ? AND user_type = ? AND age_band = ?
+                      AND created_at > ?
+                    ORDER BY last_used_at DESC
+                    LIMIT ?
+                    """,
+                    (kind, model, user_type, band, now - self.ttl, NEAR_CANDIDATES),
+                )
+                best: Tuple[float, Optional[Dict]] = (0.0, None)
+                for cand in cursor.fetchall():
+                    score = similarity(norm, cand["prompt_norm"])
+                    if score > best[0]:
+                        best = (score, cand)
+                if best[1] is not None and best[0] >= self.near_threshold:
+                    row = best[1]
+                    hit_key, counter = best[1]["cache_key"], "near_hits"
+
+            if row is None:
+                self._count("misses")
+                return None
+
+            cursor.execute(
+                "UPDATE llm_response_cache SET last_used_at = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                (now, hit_key),
+            )
+            conn.commit()
+            self._count(counter)
+            return row["response"]
+        finally:
+            conn.close()
+
+    def put(
+        self,
+        prompt: str,
+        response: str,
+        kind: str = "chat",
+        model: str = "",
+        user_type: str = "child",
+        user_age: Optional[int] = None,
+    ) -> None:
+        """응답 저장(오류 문구는 호출하는 쪽에서 걸러서 넘길 것)"""
+        norm = normalize_prompt(prompt)
+        text = (response or "").strip()
+        if not norm or not text:
+            return
+        band = age_band(user_age)
+        key = self.make_key(kind, model, user_type, band, norm)
+        now = time.time()
+
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO llm_response_cache
+                    (cache_key, kind, model, user_type, age_band, prompt_norm, response, created_at, last_used_at, hit_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+                """,
+                (key, kind, model, user_type, band, norm, text, now, now),
+            )
+            cursor.execute("DELETE FROM llm_response_cache WHERE created_at < ?", (now - self.ttl,))
+            evicted = int(cursor.rowcount or 0)
+            cursor.execute("SELECT COUNT(*) FROM llm_response_cache")
+            over = int(cursor.fetchone()[0]) - self.max_entries
+            if over > 0:
+                cursor.execute(
+                    """
+                    DELETE FROM llm_response_cache WHERE cache_key IN (
+                        SELECT cache_key FROM llm_response_cache ORDER BY last_used_at ASC LIMIT ?
+                    )
+                    """,
+                    (over,),
+                )
+                evicted += int(cursor.rowcount or 0)
+            conn.commit()
+        finally:
+            conn.close()
+        with self._lock:
+            self.stores += 1
+            self.evictions += evicted
+
+    def clear(self) -> None:
+        conn = self.db._get_connection()
+        try:
+            conn.execute("DELETE FROM llm_response_cache")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        """프로세스 내 적중률 + 저장된 항목 수"""
+        conn = self.db._get_connection()
+        try:
+            row = conn.execute("SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM llm_response_cache").fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            total = self.hits + self.near_hits + self.misses
+            return {
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "hit_rate": ((self.hits + self.near_hits) / total) if total else 0.0,
+                "entries": int(row[0] or 0),
+                "lifetime_hits": int(row[1] or 0),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+
+
+_shared: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def _cache_enabled() -> bool:
+    return str(os.getenv("AMF_LLM_CACHE", "1")).strip().lower() not in ("0", "false", "off", "no")
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """프로세스 공용 응답 캐시(AMF_LLM_CACHE=0 이면 None)"""
+    global _shared
+    if not _cache_enabled():
+        return None
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = ResponseCache()
+    return _shared
@@ -0,0 +1,146 @@
+"""
+예약 작업 스케줄러 - 페이지 렌더링과 분리된 쓰기 작업
+
+처리하는 작업(각각 한 트랜잭션 + 멱등 키로 중복 지급 방지):
+- 정기 용돈 지급(run_due_recurring_allowances)
+- 예약 리마인더 발행(run_due_reminders)
+- 기간 끝난 챌린지 정산(finalize_due_challenges)
+- 자동저축 주간 보상(run_autosave_weekly_bonuses)
+- 오래된 대화 보관(archive_conversations, 한 번에 조금씩)
+
+사용 예:
+    python -m services.scheduler --once
+    python -m services.scheduler --interval 60
+    (앱 안에서는 ensure_background_scheduler()가 프로세스당 1개의 데몬 스레드를 띄움)
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Optional, Tuple
+
+from database.db_manager import DatabaseManager, get_db_manager
+from database import read_cache
+
+
+DEFAULT_INTERVAL_SEC = 60.0
+
+
+class Scheduler:
+    """예약 작업 실행기(run_once 1회 실행 / start() 데몬 스레드 반복 실행)"""
+
+    def __init__(self, db: Optional[DatabaseManager] = None, interval: float = DEFAULT_INTERVAL_SEC, autosave_bonus_coins: int = 20):
+        self.db = db or get_db_manager()
+        self.interval = max(1.0, float(interval))
+        self.autosave_bonus_coins = int(autosave_bonus_coins)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+
+    def jobs(self) -> List[Tuple[str, Callable[[], int]]]:
+        return [
+            ("recurring_allowances", self.db.run_due_recurring_allowances),
+            ("reminders", self.db.run_due_reminders),
+            ("challenges", self.db.finalize_due_challenges),
+            ("autosave_weekly", lambda: self.db.run_autosave_weekly_bonuses(bonus_coins=self.autosave_bonus_coins)),
+            ("conversation_archive", self.db.archive_conversations),
+        ]
+
+    def run_once(self) -> Dict[str, int]:
+        """모든 작업을 1회 실행. 한 작업이 실패해도 나머지는 계속. return: 작업별 처리 건수(-1=실패)"""
+        result: Dict[str, int] = {}
+        for name, fn in self.jobs():
+            try:
+                result[name] = int(fn() or 0)
+            except Exception:
+                result[name] = -1
+                self.last_error = f"{name}: {traceback.format_exc(limit=3)}"
+        if any(v > 0 for v in result.values()):
+            # 세션 읽기 캐시가 예약 작업 결과(용돈/알림 등)를 바로 보도록 전체 무효화
+            read_cache.bump_all()
+        self.last_run = result
+        return result
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self) -> "Scheduler":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="amf-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+
+_background: Optional[Scheduler] = None
+_background_lock = threading.Lock()
+
+
+def _scheduler_enabled() -> bool:
+    return str(os.getenv("AMF_SCHEDULER", "1")).strip().lower() not in ("0", "false", "off", "no")
+
+
+def ensure_background_scheduler(interval: Optional[float] = None) -> Optional[Scheduler]:
+    """
+    프로세스당 1개의 백그라운드 스케줄러(데몬 스레드)를 띄움. 이미 떠 있으면 그대로 반환.
+    - 환경변수 AMF_SCHEDULER=0 이면 띄우지 않음(별도 프로세스로 `python -m services.scheduler` 실행 시)
+    - AMF_SCHEDULER_INTERVAL 로 주기(초) 조정
+    """
+    global _background
+    if not _scheduler_enabled():
+        return None
+    if _background is not None and _background.is_running:
+        return _background
+    with _background_lock:
+        if _background is None or not _background.is_running:
+            try:
+                sec = float(interval or os.getenv("AMF_SCHEDULER_INTERVAL") or DEFAULT_INTERVAL_SEC)
+            except ValueError:
+                sec = DEFAULT_INTERVAL_SEC
+            _background = Scheduler(interval=sec).start()
+    return _background
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.scheduler", description="AI Money Friends 예약 작업")
+    parser.add_argument("--db", default=None, help="DB 파일 경로(기본: Config.DATABASE_PATH)")
+    parser.add_argument("--once", action="store_true", help="1회 실행 후 종료")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_SEC, help="반복 주기(초)")
+    args = parser.parse_args(argv)
+
+    sched = Scheduler(db=get_db_manager(args.db), interval=args.interval)
+    if args.once:
+        result = sched.run_once()
+        print(" · ".join(f"{k}={v}" for k, v in result.items()))
+        if sched.last_error:
+            print(sched.last_error, file=sys.stderr)
+        return 1 if any(v < 0 for v in result.values()) else 0
+
+    try:
+        while True:
+            result = sched.run_once()
+            print(time.strftime("%Y-%m-%d %H:%M:%S"), " · ".join(f"{k}={v}" for k, v in result.items()), flush=True)
+            time.sleep(sched.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,5 +3,6 @@
 
 예:
 - styles.common: 전역 디자인 토큰 + 기본 컴포넌트 스타일
+- styles.registry: CSS 압축/해시 캐시 + 세션당 1번 주입
 """
 
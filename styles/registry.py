@@ -0,0 +1,168 @@
+"""
+스타일 레지스트리 - CSS를 프로세스당 1번 압축/해시하고, 전역 스타일은 세션당 1번만 주입
+
+매 rerun 마다 수백 줄짜리 <style> 블록을 st.markdown 으로 다시 보내면
+웹소켓으로 같은 바이트가 계속 가고, 브라우저도 매번 스타일을 다시 계산합니다.
+
+- stylesheet(name, css): 주석/공백 제거(minify) + sha1 해시, name 기준 프로세스 캐시
+  (css 문자열이 바뀌면 다시 빌드, css 대신 인자 없는 함수를 주면 최초 1번만 호출)
+- inject_global_styles(group, *sheets): 여러 시트를 합쳐 부모 문서 <head> 에 넣고
+  세션에 해시를 기록 → 같은 세션의 다음 rerun/페이지 이동에서는 아무것도 보내지 않음
+  (group 이 같은 이전 시트는 교체: 예) 보기 모드 변경)
+- inject_page_styles(*sheets): 페이지 전용 스타일(.stApp 배경 등)은 다른 페이지로 새지 않게
+  기존처럼 본문에 넣되, 압축본을 캐시에서 꺼내 씀
+- 환경변수 AMF_STYLE_INJECT=inline 이면 전역 스타일도 매 rerun 본문에 넣음(기존 방식)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple, Union
+
+import streamlit as st
+
+
+SESSION_KEY = "_amf_styles"
+
+_STYLE_TAG_RE = re.compile(r"</?style[^>]*>", flags=re.IGNORECASE)
+_COMMENT_RE = re.compile(r"/\*.*?\*/", flags=re.DOTALL)
+_SPACE_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+_IMPORT_RE = re.compile(r"@import\s+url\([^)]*\)\s*;|@import\s+[\"'][^\"']*[\"']\s*;")
+
+
+def minify_css(css: str) -> str:
+    """주석/줄바꿈/불필요한 공백 제거(값 안의 공백과 :가상클래스 앞 공백은 유지)"""
+    s = _STYLE_TAG_RE.sub("", str(css or ""))
+    s = _COMMENT_RE.sub("", s)
+    s = _SPACE_RE.sub(" ", s)
+    s = _PUNCT_RE.sub(r"\1", s)
+    s = s.replace(";}", "}")
+    return s.strip()
+
+
+def _hoist_imports(css: str) -> str:
+    """@import 는 시트 맨 앞에 있어야 적용되므로, 합친 뒤 앞으로 모음(중복 제거)"""
+    imports = []
+    for m in _IMPORT_RE.findall(css):
+        if m not in imports:
+            imports.append(m)
+    if not imports:
+        return css
+    return "".join(imports) + _IMPORT_RE.sub("", css)
+
+
+@dataclass(frozen=True)
+class Stylesheet:
+    name: str
+    css: str
+    digest: str
+
+    def tag(self) -> str:
+        return f'<style data-amf-style="{self.name}" data-amf-hash="{self.digest}">{self.css}</style>'
+
+
+CssSource = Union[str, Callable[[], str]]
+
+_lock = threading.Lock()
+# name → (원본 문자열 식별값, Stylesheet)
+_sheets: Dict[str, Tuple[object, Stylesheet]] = {}
+# (group, 시트 해시들) → 합친 Stylesheet
+_bundles: Dict[Tuple[str, Tuple[str, ...]], Stylesheet] = {}
+
+
+def _build(name: str, raw: str) -> Stylesheet:
+    css = _hoist_imports(minify_css(raw))
+    return Stylesheet(name, css, hashlib.sha1(css.encode("utf-8")).hexdigest()[:12])
+
+
+def stylesheet(name: str, source: CssSource) -> Stylesheet:
+    """압축된 시트(프로세스 캐시). 문자열 리터럴은 hash() 가 캐시돼서 재확인 비용이 거의 없음"""
+    hit = _sheets.get(name)
+    if callable(source):
+        if hit is not None:
+            return hit[1]
+        raw, ident = source(), None
+    else:
+        raw = source or ""
+        ident = (len(raw), hash(raw))
+        if hit is not None and hit[0] == ident:
+            return hit[1]
+    sheet = _build(name, raw)
+    with _lock:
+        _sheets[name] = (ident, sheet)
+    return sheet
+
+
+def bundle(group: str, *sheets: Stylesheet) -> Stylesheet:
+    """여러 시트를 하나로(구성 시트 해시 기준 프로세스 캐시)"""
+    key = (group, tuple(s.digest for s in sheets))
+    hit = _bundles.get(key)
+    if hit is not None:
+        return hit
+    merged = _build(group, "".join(s.css for s in sheets))
+    with _lock:
+        _bundles[key] = merged
+    return merged
+
+
+def _inline_mode() -> bool:
+    return str(os.getenv("AMF_STYLE_INJECT", "session")).strip().lower() == "inline"
+
+
+def _head_injector(sheet: Stylesheet) -> str:
+    # 부모 문서 <head> 의 같은 group 시트를 교체(해시가 같으면 그대로 둠)
+    payload = json.dumps(
+        {"group": sheet.name, "digest": sheet.digest, "css": sheet.css}, ensure_ascii=False
+    ).replace("</", "<\\/")
+    return (
+        "<script>(function(){var d=" + payload + ";"
+        "var doc=window.parent.document;"
+        "var cur=doc.head.querySelector('style[data-amf-style=\"'+d.group+'\"]');"
+        "if(cur&&cur.getAttribute('data-amf-hash')===d.digest)return;"
+        "var el=doc.createElement('style');"
+        "el.setAttribute('data-amf-style',d.group);el.setAttribute('data-amf-hash',d.digest);"
+        "el.textContent=d.css;"
+        "if(cur){cur.replaceWith(el);}else{doc.head.appendChild(el);}"
+        "})();</script>"
+    )
+
+
+def inject_global_styles(group: str, *sheets: Stylesheet) -> None:
+    """전역 스타일을 세션당 1번(내용이 바뀔 때만 다시) 부모 문서 <head> 에 주입"""
+    sheet = bundle(group, *sheets)
+    if _inline_mode():
+        st.markdown(sheet.tag(), unsafe_allow_html=True)
+        return
+
+    injected = st.session_state.setdefault(SESSION_KEY, {})
+    if injected.get(group) == sheet.digest:
+        return
+    try:
+        html = _head_injector(sheet)
+        if hasattr(st, "iframe"):
+            st.iframe(html, height=1)
+        else:
+            import streamlit.components.v1 as components
+
+            components.html(html, height=0)
+        injected[group] = sheet.digest
+    except Exception:
+        st.markdown(sheet.tag(), unsafe_allow_html=True)
+
+
+def inject_page_styles(*sheets: Stylesheet) -> None:
+    """페이지 전용 스타일(매 rerun 본문에, 압축본 사용)"""
+    if not sheets:
+        return
+    sheet = sheets[0] if len(sheets) == 1 else bundle("+".join(s.name for s in sheets), *sheets)
+    st.markdown(sheet.tag(), unsafe_allow_html=True)
+
+
+def reset_session_styles() -> None:
+    """세션에 기록된 주입 상태 초기화(다음 rerun 에서 다시 주입)"""
+    st.session_state.pop(SESSION_KEY, None)
@@ -0,0 +1,53 @@
+"""저장소 백엔드(database/backends.py)"""
+import sqlite3
+import uuid
+
+import pytest
+
+from database import fake_server
+from database.backends import backend_key, get_backend, translate_sql
+from database.db_manager import DatabaseManager, get_db_manager
+
+
+@pytest.mark.parametrize("url", ["postgresql://amf:secret@db:5432/amf", "mysql://amf:secret@db/amf"])
+def test_server_urls_are_rejected(url):
+    with pytest.raises(ValueError) as exc:
+        get_backend(url)
+    assert "secret" not in str(exc.value)
+
+
+def test_translate_placeholders_and_percent():
+    sql = "SELECT * FROM t WHERE a = ? AND b LIKE '10%' AND c = '?'"
+    assert translate_sql(sql, "format", True) == "SELECT * FROM t WHERE a = %s AND b LIKE '10%%' AND c = '?'"
+    # 파라미터 없이 실행하면 드라이버가 문자열을 포맷하지 않으므로 '%' 그대로
+    assert translate_sql("SELECT '10%'", "format", False) == "SELECT '10%'"
+    assert translate_sql("SELECT ?, ?", "numeric") == "SELECT :1, :2"
+    assert translate_sql("SELECT ?, ?", "named") == "SELECT :p1, :p2"
+
+
+def test_sqlite_url_and_path_share_one_manager(tmp_path):
+    path = str(tmp_path / "same.db")
+    assert backend_key(f"sqlite:///{path}") == backend_key(path)
+    assert get_db_manager(f"sqlite:///{path}") is get_db_manager(path)
+
+
+@pytest.fixture
+def fake_db():
+    name = f"test_{uuid.uuid4().hex[:8]}"
+    db = DatabaseManager(f"fake://{name}")
+    yield db
+    db._pool.close_all()
+    fake_server.drop(name)
+
+
+def test_fake_driver_crud_and_triggers(fake_db):
+    user_id = fake_db.create_user("kid1", "pw1234", "민수", 9, "P1")
+    assert fake_db.get_user_by_username("kid1")["id"] == user_id
+    with pytest.raises(sqlite3.IntegrityError):
+        fake_db.create_user("kid1", "pw1234", "민수", 9, "P1")
+
+    fake_db.save_behavior(user_id, "allowance", 5000)
+    fake_db.save_behavior(user_id, "saving", 2000)
+    balance = fake_db.get_balance(user_id)
+    assert balance["balance"] == pytest.approx(3000.0)
+    assert fake_db.backend_info()["driver"] == "database.fake_server"
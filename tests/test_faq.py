@@ -0,0 +1,51 @@
+"""오프라인 FAQ 매칭(services/faq.py)"""
+import pytest
+
+from services.faq import DEFAULT_THRESHOLD, FAQEngine
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return FAQEngine()
+
+
+@pytest.mark.parametrize(
+    "text, faq_id",
+    [
+        ("안녕", "greeting"),
+        ("안녕하세요!", "greeting"),
+        ("저축이 왜 중요해?", "saving"),
+        ("주식이 뭐야?", "invest"),
+        ("용돈이 금방 없어져요 ㅠㅠ", "allowance"),
+        ("충동구매 어떻게 참아?", "impulse"),
+        ("통장 만들고 싶어", "account"),
+    ],
+)
+def test_answers_known_questions(engine, text, faq_id):
+    hit = engine.answer(text)
+    assert hit is not None and hit["id"] == faq_id
+
+
+def test_greeting_with_feelings_goes_to_llm(engine):
+    # 인사말이 붙었다고 인사 FAQ로 답하면 안 됨
+    assert engine.answer("안녕 나 오늘 슬퍼") is None
+
+
+def test_greeting_does_not_shadow_topic(engine):
+    hits = engine.match("안녕 주식 뭐 사야 돼?", top_k=2)
+    assert hits[0]["id"] == "invest"
+    hit = engine.answer("안녕 주식 뭐 사야 돼?")
+    assert hit is None or hit["id"] == "invest"
+
+
+def test_partial_overlap_scores_below_threshold(engine):
+    for text in ("오늘 학교에서 친구랑 싸웠어", "엄마가 용돈을 안 줘서 화나"):
+        hits = engine.match(text, top_k=1)
+        assert not hits or hits[0]["score"] < DEFAULT_THRESHOLD
+
+
+def test_audience_filter(engine):
+    hit = engine.answer("아이 용돈은 얼마가 적당한가요?", audience="parent")
+    assert hit["id"] == "parent_allowance_amount"
+    hit = engine.answer("아이 용돈은 얼마가 적당한가요?", audience="child")
+    assert hit is None or hit["id"] != "parent_allowance_amount"
@@ -0,0 +1,26 @@
+"""핫 경로 쿼리 실행 계획(database/query_plans.py)"""
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.query_plans import HOT_QUERIES, check_query_plans
+
+
+@pytest.fixture(scope="module")
+def conn(tmp_path_factory):
+    db = DatabaseManager(str(tmp_path_factory.mktemp("plans") / "plans.db"))
+    c = db._get_connection()
+    yield c
+    c.close()
+
+
+@pytest.mark.parametrize("name", [q[0] for q in HOT_QUERIES])
+def test_hot_queries_use_indexes(conn, name):
+    query = next(q for q in HOT_QUERIES if q[0] == name)
+    result = check_query_plans(conn, [query])[0]
+    assert result["full_scans"] == [], result["plan"]
+
+
+def test_detects_wrapped_column(conn):
+    # 컬럼을 date() 로 감싸면 인덱스를 못 탐 → 점검에서 걸려야 함
+    bad = ("bad", "SELECT COUNT(*) FROM behaviors WHERE date(timestamp) = ?", ("2026-01-01",))
+    assert check_query_plans(conn, [bad])[0]["full_scans"]
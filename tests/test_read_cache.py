@@ -0,0 +1,22 @@
+"""세션 읽기 캐시(database/read_cache.py)"""
+from database.db_manager import DatabaseManager
+from database.read_cache import CachedDatabaseManager
+
+
+def test_reads_inside_transaction_bypass_cache(tmp_path):
+    raw = DatabaseManager(str(tmp_path / "cache.db"))
+    db = CachedDatabaseManager(raw)
+    uid = raw.create_user("kid", "pw1234", "민수", 9, "P1")
+    assert db.get_balance(uid)["balance"] == 0
+
+    # 다른 프로세스의 쓰기처럼 태그를 올리지 않는 변경
+    conn = raw._get_connection()
+    try:
+        conn.execute("INSERT INTO behaviors (user_id, behavior_type, amount) VALUES (?, 'allowance', 500)", (uid,))
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert db.get_balance(uid)["balance"] == 0  # 캐시(TTL 안)
+    with db.transaction():
+        assert db.get_balance(uid)["balance"] == 500
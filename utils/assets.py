@@ -0,0 +1,194 @@
+"""
+이미지 에셋 파이프라인 - 화면에 표시되는 크기로 줄인 썸네일 + data URI 캐시
+
+assets/emotions/*.png 는 70~200KB 원본이라 매 rerun 마다 base64 로 CSS/HTML 에 넣으면
+페이지마다 약 1MB 가 더 붙습니다. 여기서는:
+- 표시 크기(px) × 2(레티나)로 줄인 PNG 썸네일을 만들고(Pillow 가 없으면 원본 사용)
+- 디스크(assets/.thumbs/)와 프로세스 메모리에 원본 파일 mtime 을 키로 캐시
+- AMF_STATIC_ASSETS=1 이면 썸네일을 static/thumbs/ 에 두고 URL(app/static/...)로 참조
+  (.streamlit/config.toml 의 [server] enableStaticServing = true 필요)
+
+사용 예:
+    asset_url("assets/emotions/happy.png", 52)   # CSS background-image / <img src>
+    thumbnail_bytes(path, 100)                   # st.image 용
+    python -m utils.assets --sizes 44 52 100     # 썸네일 미리 생성
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+THUMB_DIR = REPO_ROOT / "assets" / ".thumbs"
+STATIC_THUMB_DIR = REPO_ROOT / "static" / "thumbs"
+STATIC_URL_PREFIX = "app/static/thumbs"
+
+# 화면에서 쓰는 크기: 감정 카드 배경(52), 리포트 아이콘(44), show_blob 기본(100)
+DISPLAY_SIZES = (44, 52, 100)
+RETINA_SCALE = 2
+
+_lock = threading.Lock()
+# (절대경로, 크기) → (mtime_ns, bytes, data_uri)
+_memo: Dict[Tuple[str, int], Tuple[int, bytes, str]] = {}
+
+
+def _static_enabled() -> bool:
+    return str(os.getenv("AMF_STATIC_ASSETS", "0")).strip().lower() in ("1", "true", "on", "yes")
+
+
+def resolve_asset(rel_path: str) -> Optional[Path]:
+    """실행 위치가 pages/ 아래여도 레포 루트 기준으로 한 번 더 찾음"""
+    p = Path(rel_path)
+    if p.is_file():
+        return p.resolve()
+    p = (REPO_ROOT / rel_path).resolve()
+    return p if p.is_file() else None
+
+
+def _resize_png(src: Path, px: int) -> bytes:
+    """긴 변을 px 로 맞춘 PNG(원본보다 작을 때만 줄임). Pillow 가 없으면 원본 그대로"""
+    raw = src.read_bytes()
+    try:
+        from PIL import Image
+    except ImportError:
+        return raw
+    try:
+        with Image.open(io.BytesIO(raw)) as im:
+            im.load()
+            if max(im.size) <= px:
+                return raw
+            im = im.convert("RGBA")
+            im.thumbnail((px, px), Image.LANCZOS)
+            out = io.BytesIO()
+            im.save(out, format="PNG", optimize=True)
+            data = out.getvalue()
+            return data if len(data) < len(raw) else raw
+    except Exception:
+        return raw
+
+
+def _thumb_path(base_dir: Path, src: Path, px: int) -> Path:
+    return base_dir / f"{src.stem}_{int(px)}.png"
+
+
+def _load_or_build(src: Path, px: int, mtime_ns: int) -> bytes:
+    """디스크 썸네일이 원본보다 새것이면 재사용, 아니면 만들어 저장(저장 실패는 무시)"""
+    cached = _thumb_path(THUMB_DIR, src, px)
+    try:
+        if cached.is_file() and cached.stat().st_mtime_ns >= mtime_ns:
+            return cached.read_bytes()
+    except OSError:
+        pass
+    data = _resize_png(src, px)
+    try:
+        THUMB_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, cached)
+    except OSError:
+        pass
+    return data
+
+
+def _entry(src: Path, size: Optional[int]) -> Optional[Tuple[int, bytes, str]]:
+    try:
+        mtime_ns = src.stat().st_mtime_ns
+    except OSError:
+        return None
+    px = int(size) * RETINA_SCALE if size else 0
+    key = (str(src), px)
+    hit = _memo.get(key)
+    if hit and hit[0] == mtime_ns:
+        return hit
+    data = _load_or_build(src, px, mtime_ns) if px else src.read_bytes()
+    uri = "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+    entry = (mtime_ns, data, uri)
+    with _lock:
+        _memo[key] = entry
+    return entry
+
+
+def thumbnail_bytes(path, size: Optional[int] = None) -> Optional[bytes]:
+    """표시 크기(size px)에 맞춘 PNG 바이트(size=None 이면 원본)"""
+    src = resolve_asset(str(path))
+    if not src:
+        return None
+    entry = _entry(src, size)
+    return entry[1] if entry else None
+
+
+def data_uri(path, size: Optional[int] = None) -> Optional[str]:
+    """표시 크기에 맞춘 PNG data URI(프로세스 메모리 캐시, 원본 mtime 이 바뀌면 다시 생성)"""
+    src = resolve_asset(str(path))
+    if not src:
+        return None
+    try:
+        entry = _entry(src, size)
+    except Exception:
+        return None
+    return entry[2] if entry else None
+
+
+def static_url(path, size: int) -> Optional[str]:
+    """static/thumbs/ 에 썸네일을 두고 정적 파일 URL 반환"""
+    src = resolve_asset(str(path))
+    if not src:
+        return None
+    data = thumbnail_bytes(src, size)
+    if data is None:
+        return None
+    target = _thumb_path(STATIC_THUMB_DIR, src, int(size) * RETINA_SCALE)
+    try:
+        if not target.is_file() or target.stat().st_mtime_ns < src.stat().st_mtime_ns:
+            STATIC_THUMB_DIR.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+    except OSError:
+        return None
+    return f"{STATIC_URL_PREFIX}/{target.name}"
+
+
+def asset_url(path, size: int) -> Optional[str]:
+    """CSS/HTML 에 넣을 이미지 주소: 정적 서빙이 켜져 있으면 URL, 아니면 작은 data URI"""
+    if _static_enabled():
+        url = static_url(path, size)
+        if url:
+            return url
+    return data_uri(path, size)
+
+
+def prewarm(paths: Iterable[str], sizes: Iterable[int] = DISPLAY_SIZES) -> int:
+    """썸네일 미리 생성(배포 시/최초 실행 시). return: 생성/확인한 개수"""
+    n = 0
+    for p in paths:
+        for s in sizes:
+            if thumbnail_bytes(p, s) is not None:
+                n += 1
+                if _static_enabled():
+                    static_url(p, s)
+    return n
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.assets", description="이미지 썸네일 미리 생성")
+    parser.add_argument("--dir", default="assets/emotions", help="원본 PNG 폴더(레포 루트 기준)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DISPLAY_SIZES), help="표시 크기(px)")
+    args = parser.parse_args(argv)
+
+    folder = (REPO_ROOT / args.dir).resolve()
+    files = sorted(str(p) for p in folder.glob("*.png"))
+    for f in files:
+        src = Path(f)
+        sizes = ", ".join(f"{s}px={len(thumbnail_bytes(src, s) or b''):,}B" for s in args.sizes)
+        print(f"{src.name}: 원본 {src.stat().st_size:,}B → {sizes}")
+    return 0 if files else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
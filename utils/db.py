@@ -5,7 +5,8 @@ from datetime import datetime
 from typing import Any, Dict, Iterable, Iterator, Optional
 import json
 
-from database.db_manager import DatabaseManager
+from database.db_manager import DatabaseManager, get_db_manager
+from database.hot_queries import EMOTIONS_COUNT_SQL, EMOTIONS_FIND_SQL
 from utils.auth import generate_parent_code, hash_password
 
 
@@ -74,18 +75,14 @@ class _EmotionsQuery:
             params.extend([str(x) for x in emo_in])
 
         if created_gte:
-            where.append("datetime(created_at) >= datetime(?)")
+            where.append("created_at >= ?")
             params.append(_to_sqlite_ts(created_gte))
 
         order_dir = "DESC" if self._sort_dir < 0 else "ASC"
-        order_by = "datetime(created_at) " + order_dir if self._sort_field == "created_at" else "datetime(created_at) " + order_dir
+        # created_at 은 'YYYY-MM-DD HH:MM:SS' 문자열이라 그대로 정렬해도 시간순(인덱스 사용)
+        order_by = f"created_at {order_dir}, id {order_dir}"
 
-        sql = f"""
-        SELECT id, user_id, context, emotion, note, created_at
-        FROM emotion_logs
-        WHERE {' AND '.join(where)}
-        ORDER BY {order_by}
-        """
+        sql = EMOTIONS_FIND_SQL.format(where=" AND ".join(where), order_by=order_by)
         if self._limit is not None:
             sql += " LIMIT ?"
             params.append(int(self._limit))
@@ -146,10 +143,10 @@ class _EmotionsCollection:
             params.extend([str(x) for x in emo_in])
 
         if created_gte:
-            where.append("datetime(created_at) >= datetime(?)")
+            where.append("created_at >= ?")
             params.append(_to_sqlite_ts(created_gte))
 
-        sql = f"SELECT COUNT(*) AS cnt FROM emotion_logs WHERE {' AND '.join(where)}"
+        sql = EMOTIONS_COUNT_SQL.format(where=" AND ".join(where))
         conn = self._dbm._get_connection()  # pylint: disable=protected-access
         cur = conn.cursor()
         try:
@@ -402,7 +399,7 @@ class _UsersCollection:
 
 class _DbFacade:
     def __init__(self):
-        self._dbm = DatabaseManager()
+        self._dbm = get_db_manager()
         self.emotions = _EmotionsCollection(self._dbm)
         self.users = _UsersCollection(self._dbm)
 
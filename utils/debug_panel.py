@@ -0,0 +1,85 @@
+"""관리자 전용 디버그 패널 - DB 계측(database/instrumentation.py) 요약을 사이드바에 표시"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Optional, Tuple
+
+import streamlit as st
+
+from config import Config
+from database import instrumentation
+
+
+METRICS_DIR = "data/metrics"
+
+
+def current_run_key() -> Optional[Tuple[str, int]]:
+    """
+    (세션 id, rerun 식별값). 스크립트 스레드 밖이면 None
+    - ScriptRunContext.cursors 는 rerun 시작 때마다 새 dict 로 교체되므로 그 id 로 rerun 을 구분
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        return None
+    if ctx is None:
+        return None
+    return ctx.session_id, id(ctx.cursors)
+
+
+instrumentation.set_run_key_provider(current_run_key)
+
+
+def is_admin(user_id) -> bool:
+    try:
+        return int(user_id) in Config.ADMIN_USER_IDS
+    except (TypeError, ValueError):
+        return False
+
+
+def _metrics_row(data: dict) -> None:
+    c1, c2, c3 = st.columns(3)
+    c1.metric("커넥션", data["connections"])
+    c2.metric("쿼리", data["queries"])
+    c3.metric("쿼리 ms", f"{data['query_ms']:.1f}")
+
+
+def render_db_debug_panel(user_id) -> None:
+    """계측이 켜져 있고 관리자일 때만 사이드바에 패널 표시"""
+    if not instrumentation.is_enabled() or not is_admin(user_id):
+        return
+    key = current_run_key()
+    runs = instrumentation.run_summary(key[0]) if key else {"last": None, "current": None}
+
+    with st.sidebar.expander("🛠 DB 계측(관리자)", expanded=False):
+        last = runs.get("last")
+        if last:
+            st.caption("직전 rerun")
+            _metrics_row(last)
+            st.dataframe(last["methods"], use_container_width=True, hide_index=True)
+            st.dataframe(last["statements"], use_container_width=True, hide_index=True)
+        else:
+            st.caption("직전 rerun 기록이 없어요(한 번 더 상호작용하면 표시).")
+
+        total = instrumentation.summary(top=15)
+        st.caption(f"프로세스 누적 · 느린 쿼리 기준 {total['slow_ms']:.0f}ms")
+        _metrics_row(total)
+        st.dataframe(total["methods"], use_container_width=True, hide_index=True)
+        if total["slow_queries"]:
+            st.caption("느린 쿼리(최근)")
+            st.dataframe(total["slow_queries"], use_container_width=True, hide_index=True)
+
+        c1, c2, c3 = st.columns(3)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        if c1.button("JSON", key="amf_dbg_export_json", use_container_width=True):
+            path = instrumentation.export_json(os.path.join(METRICS_DIR, f"db_{stamp}.json"))
+            st.success(path)
+        if c2.button("Prom", key="amf_dbg_export_prom", use_container_width=True):
+            path = instrumentation.export_prometheus(os.path.join(METRICS_DIR, "db.prom"))
+            st.success(path)
+        if c3.button("초기화", key="amf_dbg_reset", use_container_width=True):
+            instrumentation.reset()
+            st.rerun()
@@ -8,6 +8,10 @@ from pathlib import Path
 import streamlit as st
 
 from database.db_manager import DatabaseManager
+from utils.session_db import get_session_db
+from services.scheduler import ensure_background_scheduler
+from utils.debug_panel import render_db_debug_panel
+from styles.registry import inject_global_styles, inject_page_styles, stylesheet
 
 
 _PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -70,21 +74,27 @@ def render_sidebar_menu(user_id: int, user_name: str, user_type: str):
     # ===== 전역 날짜/알림 =====
     today_str = datetime.now().strftime("%Y.%m.%d")
     unread: list[dict] = []
+    unread_count = 0
     db: DatabaseManager | None = None
     try:
-        db = DatabaseManager()
-        # 예약 리마인더 실행(스케줄러 대체)
+        db = get_session_db()
+        # 정기 용돈/리마인더/챌린지 정산은 백그라운드 스케줄러가 처리(프로세스당 1회 시작)
         try:
-            if hasattr(db, "run_due_reminders"):
-                db.run_due_reminders()
+            ensure_background_scheduler()
         except Exception:
             pass
-        if hasattr(db, "get_notifications"):
+        # 배지는 카운터 기본키 조회 1회, 목록은 읽지 않은 알림이 있을 때만 조회
+        if hasattr(db, "get_unread_notification_count"):
+            unread_count = int(db.get_unread_notification_count(int(user_id)) or 0)
+            if unread_count:
+                unread = db.get_notifications(int(user_id), unread_only=True, limit=8) or []
+        elif hasattr(db, "get_notifications"):
             unread = db.get_notifications(int(user_id), unread_only=True, limit=20) or []
+            unread_count = len(unread)
     except Exception:
         unread = []
+        unread_count = 0
         db = None
-    unread_count = len(unread)
 
     def _render_top_menu_popover():
         with st.popover("☰", use_container_width=False):
@@ -169,10 +179,17 @@ def render_sidebar_menu(user_id: int, user_name: str, user_type: str):
                         st.rerun()
 
     def _render_top_alarm():
-        with st.popover("🔔", use_container_width=False):
+        with st.popover(f"🔔 {unread_count}" if unread_count else "🔔", use_container_width=False):
             st.markdown("**알림**")
             if unread_count:
                 st.caption(f"읽지 않은 알림: {unread_count}개")
+                if db and hasattr(db, "mark_all_notifications_read"):
+                    if st.button("모두 읽음", key="amf_top_read_all_notif", use_container_width=True):
+                        try:
+                            db.mark_all_notifications_read(int(user_id))
+                        except Exception:
+                            pass
+                        st.rerun()
             if not unread:
                 st.caption("새 알림이 없어요.")
             else:
@@ -651,9 +668,12 @@ def render_sidebar_menu(user_id: int, user_name: str, user_type: str):
     """
 
     # ✅ f-string 금지: CSS의 { }가 파이썬 포맷으로 해석되면 NameError 발생
-    st.markdown(
-        "<style>\n" + base_css + "\n" + topnav_mode_css + "\n" + responsive_css + "\n</style>",
-        unsafe_allow_html=True,
+    # 압축본은 프로세스당 1번 빌드, <head> 주입은 세션당 1번(보기 모드가 바뀌면 교체)
+    inject_global_styles(
+        "menu",
+        stylesheet("menu.base", base_css),
+        stylesheet(f"menu.topnav.{layout_mode}", topnav_mode_css),
+        stylesheet(f"menu.responsive.{layout_mode}", responsive_css),
     )
 
     # --- 사이드바 콘텐츠 시작 ---
@@ -793,5 +813,12 @@ def render_sidebar_menu(user_id: int, user_name: str, user_type: str):
                 except Exception:
                     st.rerun()
 
+    # 관리자 + AMF_DB_INSTRUMENT=1 일 때만 DB 계측 패널
+    render_db_debug_panel(user_id)
+
+_HIDE_SIDEBAR_NAV_CSS = "[data-testid='stSidebarNav'] {display: none !important;}"
+
+
 def hide_sidebar_navigation():
-    st.markdown("<style>[data-testid='stSidebarNav'] {display: none !important;}</style>", unsafe_allow_html=True)
+    # 로그인/회원가입 페이지는 기본 내비를 보여줘야 해서 세션 전역이 아닌 페이지 스타일로 둠
+    inject_page_styles(stylesheet("hide_sidebar_nav", _HIDE_SIDEBAR_NAV_CSS))
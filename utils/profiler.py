@@ -0,0 +1,314 @@
+"""
+페이지 렌더 프로파일러(선택) - rerun 마다 이름 붙인 구간(DB/계산/렌더) 시간을 측정
+
+켜는 법: 환경변수 AMF_PROFILE=1(전체) 또는 관리자(Config.ADMIN_USER_IDS)가 URL 에 ?profile=1
+(세션에 기억, ?profile=0 으로 끔). 관리자가 아니면 ?profile 은 무시
+꺼져 있으면 모든 함수가 바로 반환합니다.
+
+사용 예(페이지):
+    prof.start_page("dashboard")
+    prof.mark("menu", "render")          # 이전 구간을 닫고 새 구간 시작(들여쓰기 없이 순차 측정)
+    with prof.section("family_summary", "db"):
+        ...
+    prof.render_footer()                 # 현재 rerun 구간표 + 세션 전체 p50/p90/p99
+
+- DatabaseManager 메서드 호출은 자동으로 현재 구간 아래 'db:<메서드>' 로 기록
+  (database.instrumentation 의 메서드 래핑 사용)
+  계측은 프로파일 중인 세션이 있는 동안만 켜 둠(마지막 세션이 끄거나 PROFILE_SESSION_TTL 동안 조용하면 끔)
+- 구간별 self 시간을 data/profiles/<페이지>.folded 에 누적(flamegraph.pl / speedscope 호환)
+  파일이 MAX_FOLDED_BYTES 를 넘으면 <페이지>.folded.1 로 돌리고 새로 씀(최대 2개 파일)
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import streamlit as st
+
+from database import instrumentation
+from utils.debug_panel import current_run_key, is_admin
+
+
+PROFILE_DIR = "data/profiles"
+QUERY_PARAM = "profile"
+SESSION_KEY = "_amf_profile_on"
+KINDS = ("db", "compute", "render")
+# (페이지, 구간 경로)별 최근 샘플 수
+MAX_SAMPLES = 1000
+# 페이지별 folded 파일 최대 크기(넘으면 .folded.1 로 교체)
+MAX_FOLDED_BYTES = 8 * 1024 * 1024
+# 이 시간 동안 rerun 이 없는 프로파일 세션은 끝난 것으로 봄(탭을 닫은 경우)
+PROFILE_SESSION_TTL = 15 * 60.0
+
+_SLUG_RE = re.compile(r"[^0-9A-Za-z_.-]+")
+
+
+class _Frame:
+    __slots__ = ("name", "kind", "t0", "child_ms", "lap")
+
+    def __init__(self, name: str, kind: str, lap: bool = False):
+        self.name = name
+        self.kind = kind
+        self.t0 = time.perf_counter()
+        self.child_ms = 0.0
+        self.lap = lap
+
+
+class RunProfile:
+    """rerun 1번의 구간 기록"""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.thread_id = threading.get_ident()
+        self.root = _Frame(page, "page")
+        self.stack: List[_Frame] = [self.root]
+        # (구간 경로, 종류, 전체 ms, self ms)
+        self.records: List[Tuple[Tuple[str, ...], str, float, float]] = []
+        self.total_ms: Optional[float] = None
+
+    def path(self) -> Tuple[str, ...]:
+        return tuple(f.name for f in self.stack)
+
+    def push(self, name: str, kind: str, lap: bool = False) -> None:
+        self.stack.append(_Frame(name, kind, lap))
+
+    def pop(self) -> None:
+        if len(self.stack) <= 1:
+            return
+        path = self.path()
+        frame = self.stack.pop()
+        ms = (time.perf_counter() - frame.t0) * 1000.0
+        self.stack[-1].child_ms += ms
+        self.records.append((path, frame.kind, ms, max(ms - frame.child_ms, 0.0)))
+
+    def add_leaf(self, name: str, kind: str, ms: float) -> None:
+        self.stack[-1].child_ms += ms
+        self.records.append((self.path() + (name,), kind, ms, ms))
+
+    def close(self) -> float:
+        while len(self.stack) > 1:
+            self.pop()
+        if self.total_ms is None:
+            self.total_ms = (time.perf_counter() - self.root.t0) * 1000.0
+            self.records.append(((self.page,), "page", self.total_ms, max(self.total_ms - self.root.child_ms, 0.0)))
+        return self.total_ms
+
+
+_lock = threading.Lock()
+# 스레드 id → 진행 중인 RunProfile (스크립트 스레드에서만 기록, 백그라운드 작업은 제외)
+_active: Dict[int, RunProfile] = {}
+_samples: Dict[Tuple[str, str], Deque[float]] = {}
+# 프로파일 중인 세션 id → 마지막 rerun 시각
+_sessions: Dict[str, float] = {}
+# 계측을 이 모듈이 켰는지(AMF_DB_INSTRUMENT 등으로 이미 켜져 있었으면 끄지 않음)
+_owns_instrumentation = False
+
+
+def _env_enabled() -> bool:
+    return str(os.getenv("AMF_PROFILE", "0")).strip().lower() in ("1", "true", "on", "yes")
+
+
+def profiling_enabled() -> bool:
+    """환경변수 또는 관리자 세션의 ?profile=1 (세션에 기억)"""
+    if _env_enabled():
+        return True
+    try:
+        if not is_admin(st.session_state.get("user_id")):
+            # 로그아웃/다른 계정이면 켜 둔 값도 버림
+            st.session_state.pop(SESSION_KEY, None)
+            return False
+        qp = st.query_params.get(QUERY_PARAM)
+        if qp is not None:
+            st.session_state[SESSION_KEY] = str(qp).strip().lower() in ("1", "true", "on", "yes")
+        return bool(st.session_state.get(SESSION_KEY, False))
+    except Exception:
+        return False
+
+
+def _session_id() -> str:
+    key = current_run_key()
+    return str(key[0]) if key else f"thread-{threading.get_ident()}"
+
+
+def _track_session(on: bool) -> None:
+    """
+    프로파일 세션 등록/해제 후 계측 켜기/끄기
+    - 첫 세션이 켜질 때 계측 + DB 호출 리스너 등록
+    - 남은 세션이 없으면(꺼짐/TTL 만료) 이 모듈이 켠 계측만 끔
+    """
+    global _owns_instrumentation
+    now = time.time()
+    sid = _session_id()
+    with _lock:
+        if on:
+            _sessions[sid] = now
+        else:
+            _sessions.pop(sid, None)
+        for k in [k for k, t in _sessions.items() if now - t > PROFILE_SESSION_TTL]:
+            del _sessions[k]
+        active = bool(_sessions) or _env_enabled()
+        if active:
+            if not instrumentation.is_enabled():
+                instrumentation.enable()
+                _owns_instrumentation = True
+            instrumentation.add_call_listener(_on_db_call)
+            return
+        instrumentation.remove_call_listener(_on_db_call)
+        if _owns_instrumentation:
+            instrumentation.disable()
+            _owns_instrumentation = False
+
+
+def _current() -> Optional[RunProfile]:
+    return _active.get(threading.get_ident())
+
+
+def _on_db_call(method: str, ms: float) -> None:
+    prof = _current()
+    if prof is not None and prof.total_ms is None:
+        prof.add_leaf(f"db:{method}", "db", ms)
+
+
+def start_page(page: str) -> Optional[RunProfile]:
+    """rerun 시작(프로파일링이 꺼져 있으면 None)"""
+    if not profiling_enabled():
+        _active.pop(threading.get_ident(), None)
+        if _sessions:
+            _track_session(False)
+        return None
+    _track_session(True)
+    prof = RunProfile(page)
+    _active[prof.thread_id] = prof
+    return prof
+
+
+def mark(name: str, kind: str = "compute") -> None:
+    """순차 구간: 열려 있는 mark 구간을 닫고 새 구간 시작(section 안에서는 그 안의 하위 구간)"""
+    prof = _current()
+    if prof is None:
+        return
+    if prof.stack[-1].lap:
+        prof.pop()
+    prof.push(name, kind, lap=True)
+
+
+@contextmanager
+def section(name: str, kind: str = "compute") -> Iterator[None]:
+    """중첩 구간"""
+    prof = _current()
+    if prof is None:
+        yield
+        return
+    prof.push(name, kind)
+    depth = len(prof.stack)
+    try:
+        yield
+    finally:
+        # 블록 안에서 열고 닫지 않은 mark 구간까지 정리
+        while len(prof.stack) >= depth:
+            prof.pop()
+
+
+def _slug(page: str) -> str:
+    return _SLUG_RE.sub("_", page).strip("_") or "page"
+
+
+def _write_folded(prof: RunProfile) -> None:
+    lines = []
+    for path, _kind, _ms, self_ms in prof.records:
+        us = int(round(self_ms * 1000))
+        if us > 0:
+            lines.append(";".join(p.replace(";", ",").replace(" ", "_") for p in path) + f" {us}\n")
+    if not lines:
+        return
+    path = os.path.join(PROFILE_DIR, f"{_slug(prof.page)}.folded")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with _lock:
+            if os.path.exists(path) and os.path.getsize(path) >= MAX_FOLDED_BYTES:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+    except OSError:
+        pass
+
+
+def finish() -> Optional[RunProfile]:
+    """rerun 종료: 구간 닫기 → 전체 샘플 누적 → folded 파일에 추가"""
+    prof = _active.pop(threading.get_ident(), None)
+    if prof is None:
+        return None
+    prof.close()
+    with _lock:
+        for path, _kind, ms, _self in prof.records:
+            key = (prof.page, "/".join(path[1:]) or "(total)")
+            buf = _samples.get(key)
+            if buf is None:
+                buf = _samples[key] = deque(maxlen=MAX_SAMPLES)
+            buf.append(ms)
+    _write_folded(prof)
+    return prof
+
+
+def _pct(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[idx]
+
+
+def percentiles(page: Optional[str] = None) -> List[Dict]:
+    """(페이지, 구간)별 n / p50 / p90 / p99 / max (ms, 모든 세션 합산)"""
+    with _lock:
+        items = [(k, sorted(v)) for k, v in _samples.items() if page is None or k[0] == page]
+    rows = [
+        {
+            "page": k[0],
+            "section": k[1],
+            "n": len(v),
+            "p50_ms": round(_pct(v, 0.5), 2),
+            "p90_ms": round(_pct(v, 0.9), 2),
+            "p99_ms": round(_pct(v, 0.99), 2),
+            "max_ms": round(v[-1], 2) if v else 0.0,
+        }
+        for k, v in items
+    ]
+    rows.sort(key=lambda r: r["p50_ms"], reverse=True)
+    return rows
+
+
+def reset() -> None:
+    with _lock:
+        _samples.clear()
+
+
+def render_footer() -> None:
+    """rerun 을 마치고 접이식 타이밍 표 출력(프로파일링이 꺼져 있으면 아무것도 안 함)"""
+    prof = finish()
+    if prof is None:
+        return
+    rows = [
+        {
+            "section": " › ".join(path[1:]) or "(page)",
+            "kind": kind,
+            "ms": round(ms, 2),
+            "self_ms": round(self_ms, 2),
+            "%": round(100.0 * ms / prof.total_ms, 1) if prof.total_ms else 0.0,
+        }
+        for path, kind, ms, self_ms in prof.records
+        if len(path) > 1
+    ]
+    by_kind = {k: 0.0 for k in KINDS}
+    for path, kind, _ms, self_ms in prof.records:
+        if kind in by_kind:
+            by_kind[kind] += self_ms
+    label = " · ".join(f"{k} {v:.0f}ms" for k, v in by_kind.items())
+    with st.expander(f"⏱ 렌더 타이밍 {prof.total_ms:.0f}ms ({label})", expanded=False):
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        st.caption(f"전체 세션 누적(최근 {MAX_SAMPLES}회) · flamegraph: {PROFILE_DIR}/{_slug(prof.page)}.folded")
+        st.dataframe(percentiles(prof.page), use_container_width=True, hide_index=True)
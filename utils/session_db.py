@@ -0,0 +1,24 @@
+"""세션 범위 DB 읽기 캐시 - st.session_state 에 CachedDatabaseManager 1개를 보관"""
+from __future__ import annotations
+
+import streamlit as st
+
+from database.db_manager import get_db_manager
+from database.read_cache import CachedDatabaseManager
+
+
+_SESSION_KEY = "_db_read_cache"
+
+
+def get_session_db(ttl: float = 15.0, max_size: int = 256) -> CachedDatabaseManager:
+    """
+    페이지에서 쓰는 DB 핸들(읽기 캐시 포함)
+    - 같은 세션의 rerun 사이에서 조회 결과를 재사용하고, 쓰기 메서드 호출 시 관련 캐시를 무효화
+    - 캐시 통계: get_session_db().cache_stats()
+    """
+    db = get_db_manager()
+    cached = st.session_state.get(_SESSION_KEY)
+    if not isinstance(cached, CachedDatabaseManager) or cached.raw is not db:
+        cached = CachedDatabaseManager(db, ttl=ttl, max_size=max_size)
+        st.session_state[_SESSION_KEY] = cached
+    return cached
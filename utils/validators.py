@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 
-from database.db_manager import DatabaseManager
+from database.db_manager import get_db_manager
 
 
 def validate_username(username: str) -> tuple[bool, str]:
@@ -19,7 +19,7 @@ def validate_username(username: str) -> tuple[bool, str]:
         return False, "영문, 숫자, 언더스코어(_)만 사용 가능합니다"
 
     try:
-        db = DatabaseManager()
+        db = get_db_manager()
         existing = db.get_user_by_username(u) if hasattr(db, "get_user_by_username") else None
         if existing:
             return False, "이미 사용 중인 아이디입니다"